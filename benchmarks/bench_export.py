@@ -0,0 +1,69 @@
+"""
+Exporting synthetic snapshots to other formats.
+
+Benchmarks for formats whose optional dependencies are not installed are skipped.
+"""
+
+# stdlib
+import importlib
+import os
+import tempfile
+import time
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+
+from .synthetic import write_snapshot
+
+# The function which writes each format, and the module it is defined in.
+writers = {
+		"andi": ("pyms_agilent.export.andi", "write_andi"),
+		"hdf5": ("pyms_agilent.export.hdf5", "write_hdf5"),
+		"mgf": ("pyms_agilent.export.mgf", "write_mgf"),
+		"mzml": ("pyms_agilent.export.mzml", "write_mzml"),
+		"parquet": ("pyms_agilent.export.parquet", "write_parquet"),
+		}
+
+extensions = {"andi": ".cdf", "hdf5": ".h5", "mgf": ".mgf", "mzml": ".mzML", "parquet": ".parquet"}
+
+
+def setup_cache():
+	return str(write_snapshot("synthetic_export.pmaf", n_scans=2000, points_per_scan=1000))
+
+
+setup_cache.timeout = 300
+
+
+class Export:
+	timeout = 300
+	number = 1
+	repeat = 3
+
+	params = sorted(writers)
+	param_names = ["file_format"]
+
+	def setup(self, snapshot, file_format):
+		module_name, function_name = writers[file_format]
+
+		try:
+			self.writer = getattr(importlib.import_module(module_name), function_name)
+		except ImportError:
+			raise NotImplementedError(f"The dependencies for {file_format!r} are not installed.")
+
+		self.reader = FrozenDataReader(snapshot)
+		self.tmpdir = tempfile.TemporaryDirectory()
+		self.output = os.path.join(self.tmpdir.name, f"synthetic{extensions[file_format]}")
+
+	def teardown(self, snapshot, file_format):
+		self.reader.close_datafile()
+		self.tmpdir.cleanup()
+
+	def time_export(self, snapshot, file_format):
+		self.writer(self.reader, self.output)
+
+	def track_export_scans_per_second(self, snapshot, file_format):
+		start = time.perf_counter()
+		self.writer(self.reader, self.output)
+		return self.reader.total_scans / (time.perf_counter() - start)
+
+	track_export_scans_per_second.unit = "scans/s"
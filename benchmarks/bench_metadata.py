@@ -0,0 +1,93 @@
+"""
+Parsing the XML metadata files of the datafiles bundled with the tests, and of large synthetic datafiles.
+"""
+
+# stdlib
+import pathlib
+import tempfile
+
+# this package
+from pyms_agilent.metadata import extract_metadata, is_datafile
+from pyms_agilent.synthetic import SyntheticRun
+from pyms_agilent.xml_parser.acq_method import read_acqmethod
+from pyms_agilent.xml_parser.contents import read_contents_xml
+from pyms_agilent.xml_parser.default_mass_cal import read_mass_cal_xml
+from pyms_agilent.xml_parser.device_config_info import read_device_config_xml
+from pyms_agilent.xml_parser.devices import read_devices_xml
+from pyms_agilent.xml_parser.ms_actual_defs import read_ms_actuals_defs
+from pyms_agilent.xml_parser.ms_time_segments import read_msts_xml
+from pyms_agilent.xml_parser.sample_info import read_sample_info_xml
+
+from .synthetic import datafiles, datafiles_dir
+
+
+class ExtractMetadata:
+	params = datafiles
+	param_names = ["datafile"]
+
+	def time_extract_metadata(self, datafile):
+		extract_metadata(datafiles_dir / datafile)
+
+	def time_extract_metadata_serial(self, datafile):
+		extract_metadata(datafiles_dir / datafile, workers=1)
+
+	def time_extract_metadata_lazy_contents(self, datafile):
+		extract_metadata(datafiles_dir / datafile, lazy=True)["contents"]
+
+
+class ReadXML:
+	params = datafiles
+	param_names = ["datafile"]
+
+	def setup(self, datafile):
+		self.acqdata = datafiles_dir / datafile / "AcqData"
+
+	def time_read_acqmethod(self, datafile):
+		read_acqmethod(self.acqdata)
+
+	def time_read_contents_xml(self, datafile):
+		read_contents_xml(self.acqdata)
+
+	def time_read_mass_cal_xml(self, datafile):
+		read_mass_cal_xml(self.acqdata)
+
+	def time_read_device_config_xml(self, datafile):
+		read_device_config_xml(self.acqdata)
+
+	def time_read_devices_xml(self, datafile):
+		read_devices_xml(self.acqdata)
+
+	def time_read_ms_actuals_defs(self, datafile):
+		read_ms_actuals_defs(self.acqdata)
+
+	def time_read_msts_xml(self, datafile):
+		read_msts_xml(self.acqdata)
+
+	def time_read_sample_info_xml(self, datafile):
+		read_sample_info_xml(self.acqdata)
+
+
+class SyntheticMetadata:
+	"""
+	A synthetic 200,000 scan run, with many MS time segments.
+	"""
+
+	params = [1, 100, 1000]
+	param_names = ["n_segments"]
+
+	def setup(self, n_segments):
+		self.tmpdir = tempfile.TemporaryDirectory()
+		self.acqdata = pathlib.Path(self.tmpdir.name) / "Synthetic.d" / "AcqData"
+		SyntheticRun(n_scans=200_000, n_segments=n_segments).write_metadata(self.acqdata)
+
+	def teardown(self, n_segments):
+		self.tmpdir.cleanup()
+
+	def time_is_datafile(self, n_segments):
+		is_datafile(self.acqdata.parent)
+
+	def time_read_msts_xml(self, n_segments):
+		read_msts_xml(self.acqdata)
+
+	def time_read_contents_xml(self, n_segments):
+		read_contents_xml(self.acqdata)
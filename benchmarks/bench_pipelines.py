@@ -0,0 +1,103 @@
+"""
+Pipelines for reading spectra: parallel reading, prefetching, and sending spectra between processes.
+"""
+
+# stdlib
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.reduction import ForkingPickler
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.parallel import iter_spectra
+from pyms_agilent.prefetch import Prefetcher
+
+from .synthetic import write_snapshot
+
+
+def setup_cache():
+	return str(write_snapshot("synthetic_pipelines.pmaf", n_scans=4000, points_per_scan=2000))
+
+
+setup_cache.timeout = 300
+
+
+class ParallelRead:
+	timeout = 300
+	number = 1
+	repeat = 3
+
+	params = ([1, 2, 4], [False, True])
+	param_names = ["workers", "arrays"]
+
+	def setup(self, snapshot, workers, arrays):
+		# Start the workers before timing.
+		self.executor = ProcessPoolExecutor(max_workers=workers)
+		list(self.executor.map(int, range(workers)))
+
+	def teardown(self, snapshot, workers, arrays):
+		self.executor.shutdown(wait=True)
+
+	def _read(self, snapshot, workers, arrays):
+		return sum(
+				1 for _ in iter_spectra(
+						snapshot,
+						max_workers=workers,
+						arrays=arrays,
+						reader_factory=FrozenDataReader,
+						executor=self.executor,
+						)
+				)
+
+	def time_iter_spectra(self, snapshot, workers, arrays):
+		self._read(snapshot, workers, arrays)
+
+	def track_iter_spectra_scans_per_second(self, snapshot, workers, arrays):
+		start = time.perf_counter()
+		n_scans = self._read(snapshot, workers, arrays)
+		return n_scans / (time.perf_counter() - start)
+
+	track_iter_spectra_scans_per_second.unit = "scans/s"
+
+
+class Prefetch:
+	timeout = 300
+	number = 1
+	repeat = 3
+
+	params = [1, 8, 64]
+	param_names = ["depth"]
+
+	def setup(self, snapshot, depth):
+		self.reader = FrozenDataReader(snapshot)
+
+	def teardown(self, snapshot, depth):
+		self.reader.close_datafile()
+
+	def time_prefetch_spectra(self, snapshot, depth):
+		with Prefetcher(self.reader, depth=depth) as scans:
+			for _ in scans:
+				pass
+
+
+class SendSpectra:
+	params = [1_000, 100_000]
+	param_names = ["n_points"]
+
+	def setup(self, snapshot, n_points):
+		reader = FrozenDataReader(snapshot)
+		spectrum = reader.get_spectrum_by_scan(0)
+		reader.close_datafile()
+
+		values = {name: getattr(spectrum, name) for name in spectrum.to_dict()}
+		values["x_data"] = [float(i) for i in range(n_points)]
+		values["y_data"] = [float(i % 1000) for i in range(n_points)]
+		values["total_data_points"] = n_points
+		self.spectrum = type(spectrum)(**values)
+
+	def time_forking_pickler_round_trip(self, snapshot, n_points):
+		pickle.loads(ForkingPickler.dumps(self.spectrum))
+
+	def time_pickle_round_trip(self, snapshot, n_points):
+		pickle.loads(pickle.dumps(self.spectrum))
@@ -0,0 +1,111 @@
+"""
+Reading spectra and chromatograms from synthetic snapshots of large datafiles.
+
+The ``track_*`` benchmarks report throughput, where a fall (rather than a rise) is a regression.
+"""
+
+# stdlib
+import os
+import tempfile
+import time
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+
+from .synthetic import write_snapshot
+
+# (number of scans, points per scan)
+sizes = ["10000x200", "2000x5000"]
+
+
+def setup_cache():
+	"""
+	Write the snapshots once, and return their filenames for each size.
+	"""
+
+	snapshots = {}
+
+	for size in sizes:
+		n_scans, points_per_scan = map(int, size.split('x'))
+		snapshots[size] = str(write_snapshot(f"synthetic_{size}.pmaf", n_scans, points_per_scan))
+
+	return snapshots
+
+
+setup_cache.timeout = 600
+
+
+class OpenReader:
+	timeout = 300
+
+	params = sizes
+	param_names = ["size"]
+
+	def time_open(self, snapshots, size):
+		FrozenDataReader(snapshots[size]).close_datafile()
+
+	def time_open_and_get_tic(self, snapshots, size):
+		reader = FrozenDataReader(snapshots[size])
+		reader.get_tic()
+		reader.close_datafile()
+
+
+class ReadSpectra:
+	timeout = 300
+	number = 1
+	repeat = 3
+
+	params = sizes
+	param_names = ["size"]
+
+	def setup(self, snapshots, size):
+		self.reader = FrozenDataReader(snapshots[size])
+		self.n_scans = self.reader.total_scans
+
+	def teardown(self, snapshots, size):
+		self.reader.close_datafile()
+
+	def time_get_spectrum_by_scan(self, snapshots, size):
+		for scan_no in range(self.n_scans):
+			self.reader.get_spectrum_by_scan(scan_no)
+
+	def time_get_spectrum_arrays(self, snapshots, size):
+		for scan_no in range(self.n_scans):
+			self.reader.get_spectrum_arrays(scan_no)
+
+	def time_get_scan_record(self, snapshots, size):
+		for scan_no in range(self.n_scans):
+			self.reader.get_scan_record(scan_no)
+
+	def track_spectra_scans_per_second(self, snapshots, size):
+		start = time.perf_counter()
+		for scan_no in range(self.n_scans):
+			self.reader.get_spectrum_by_scan(scan_no)
+		return self.n_scans / (time.perf_counter() - start)
+
+	track_spectra_scans_per_second.unit = "scans/s"
+
+	def track_arrays_megabytes_per_second(self, snapshots, size):
+		nbytes = 0
+		start = time.perf_counter()
+		for scan_no in range(self.n_scans):
+			x_data, y_data = self.reader.get_spectrum_arrays(scan_no)
+			nbytes += x_data.nbytes + y_data.nbytes
+		return nbytes / (time.perf_counter() - start) / 1e6
+
+	track_arrays_megabytes_per_second.unit = "MB/s"
+
+
+class WriteSnapshot:
+	timeout = 300
+	number = 1
+	repeat = 3
+
+	def setup(self, snapshots):
+		self.tmpdir = tempfile.TemporaryDirectory()
+
+	def teardown(self, snapshots):
+		self.tmpdir.cleanup()
+
+	def time_write_snapshot(self, snapshots):
+		write_snapshot(os.path.join(self.tmpdir.name, "synthetic.pmaf"), n_scans=2000, points_per_scan=1000)
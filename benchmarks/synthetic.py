@@ -0,0 +1,44 @@
+"""
+Synthetic snapshots of large datafiles for the benchmarks.
+
+The snapshots are written with :mod:`pyms_agilent.synthetic`, so the benchmarks can run on any platform.
+"""
+
+# stdlib
+import pathlib
+
+# this package
+from pyms_agilent.synthetic import SyntheticRun
+
+__all__ = ["datafiles_dir", "datafiles", "write_snapshot"]
+
+#: The directory containing the datafiles bundled with the tests.
+datafiles_dir = pathlib.Path(__file__).parent.parent / "tests"
+
+#: The names of the datafiles bundled with the tests.
+datafiles = ["example1.d", "MJA5_1000_090919_001.d", "Propellant_Std_1ug_1_200124-0002.d"]
+
+
+def write_snapshot(
+		filename: str,
+		n_scans: int = 10_000,
+		points_per_scan: int = 1000,
+		n_segments: int = 4,
+		) -> pathlib.Path:
+	"""
+	Write a synthetic snapshot of an MS/MS run with polarity switching to ``filename``.
+
+	:param filename:
+	:param n_scans: The number of scans.
+	:param points_per_scan: The number of points in each spectrum.
+	:param n_segments: The number of MS time segments.
+	"""
+
+	run = SyntheticRun(
+			n_scans=n_scans,
+			points_per_scan=points_per_scan,
+			n_segments=n_segments,
+			polarity_switching=True,
+			)
+
+	return run.write_snapshot(filename)
@@ -0,0 +1,598 @@
+#  !/usr/bin/env python
+#
+#  archive.py
+"""
+Read ``.d`` datafiles directly from zip and tar archives, without extracting them.
+
+Paths inside an archive are represented by :class:`~.ArchivePath`, which supports the subset of the
+:class:`pathlib.Path` API used by :mod:`pyms_agilent.metadata` and the ``read_*`` functions in
+:mod:`pyms_agilent.xml_parser`. Those functions also accept string paths which pass through an archive,
+such as ``"/archive/runs_2020.zip/Propellant_Std_1ug_1_200124-0002.d"``.
+
+Members which are stored without compression (in a zip file or an uncompressed tar file) are read in place,
+so seeking within a member only reads the bytes requested. Compressed members are decompressed
+when they are opened.
+
+Example:
+
+.. code-block:: python
+
+	archive = open_archive("runs_2020.zip")
+
+	for datafile in archive.find_datafiles():
+		metadata = extract_metadata(datafile)
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import io
+import os
+import pathlib
+import posixpath
+import struct
+import tarfile
+import threading
+import zipfile
+from abc import ABC, abstractmethod
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+# 3rd party
+from domdf_python_tools.typing import PathLike
+
+__all__ = ["ArchivePath", "Archive", "ZipArchive", "TarArchive", "open_archive", "resolve_path"]
+
+_zip_local_header = struct.Struct("<4s2B4HL2L2H")
+
+
+def _normalise_member(member: str) -> str:
+	member = posixpath.normpath(member.replace('\\', '/')).strip('/')
+	return '' if member == '.' else member
+
+
+class _MemberFile(io.RawIOBase):
+	"""
+	Read-only, seekable file object for a member stored without compression at a known offset in an archive.
+
+	:param fileno: A file descriptor for the archive, which is not used by :mod:`zipfile` or :mod:`tarfile`.
+	:param offset: The offset of the member's data in the archive.
+	:param size: The size of the member's data.
+	:param lock: Lock held while reading, on platforms without :func:`os.pread`.
+	"""
+
+	def __init__(self, fileno: int, offset: int, size: int, lock: threading.Lock):
+		super().__init__()
+		self._fileno = fileno
+		self._offset = offset
+		self._size = size
+		self._position = 0
+		self._lock = lock
+
+	def readable(self) -> bool:
+		return True
+
+	def seekable(self) -> bool:
+		return True
+
+	def tell(self) -> int:
+		return self._position
+
+	def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+		if whence == io.SEEK_SET:
+			position = offset
+		elif whence == io.SEEK_CUR:
+			position = self._position + offset
+		elif whence == io.SEEK_END:
+			position = self._size + offset
+		else:
+			raise ValueError(f"Invalid whence ({whence})")
+
+		if position < 0:
+			raise ValueError(f"Negative seek position {position}")
+
+		self._position = position
+		return position
+
+	def readinto(self, buffer) -> int:  # type: ignore
+		size = max(0, min(len(buffer), self._size - self._position))
+		if not size:
+			return 0
+
+		if hasattr(os, "pread"):
+			data = os.pread(self._fileno, size, self._offset + self._position)
+		else:  # pragma: no cover (!Windows)
+			with self._lock:
+				os.lseek(self._fileno, self._offset + self._position, os.SEEK_SET)
+				data = os.read(self._fileno, size)
+
+		buffer[:len(data)] = data
+		self._position += len(data)
+		return len(data)
+
+
+class Archive(ABC):
+	"""
+	Base class for archives containing ``.d`` datafiles.
+
+	:param filename: The archive file.
+	"""
+
+	def __init__(self, filename: PathLike):
+		self.filename = pathlib.Path(filename)
+		self._fp = open(self.filename, "rb")  # noqa: SIM115
+		self._lock = threading.Lock()
+
+		# Separate descriptor for reading members in place, so the position of
+		# self._fp (used by zipfile and tarfile) is never changed behind their backs.
+		self._fd: Optional[int] = os.open(self.filename, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+		self._files: Dict[str, int] = {}
+		self._dirs: Set[str] = {''}
+
+	def _add_member(self, name: str, size: int, is_dir: bool = False) -> str:
+		name = _normalise_member(name)
+
+		if is_dir:
+			self._dirs.add(name)
+		else:
+			self._files[name] = size
+
+		parent = posixpath.dirname(name)
+		while parent not in self._dirs:
+			self._dirs.add(parent)
+			parent = posixpath.dirname(parent)
+
+		return name
+
+	@property
+	def root(self) -> "ArchivePath":
+		"""
+		The root directory of the archive.
+		"""
+
+		return ArchivePath(self)
+
+	def is_file(self, member: str) -> bool:
+		"""
+		Returns whether ``member`` is a file in the archive.
+
+		:param member:
+		"""
+
+		return member in self._files
+
+	def is_dir(self, member: str) -> bool:
+		"""
+		Returns whether ``member`` is a directory in the archive.
+
+		:param member:
+		"""
+
+		return member in self._dirs
+
+	def get_size(self, member: str) -> int:
+		"""
+		Returns the uncompressed size of ``member``.
+
+		:param member:
+		"""
+
+		try:
+			return self._files[member]
+		except KeyError:
+			raise FileNotFoundError(f"No such file in '{self.filename}': '{member}'") from None
+
+	def listdir(self, member: str) -> List[str]:
+		"""
+		Returns the names of the files and directories in the directory ``member``.
+
+		:param member:
+		"""
+
+		if member not in self._dirs:
+			raise NotADirectoryError(f"No such directory in '{self.filename}': '{member}'")
+
+		names = {
+				posixpath.basename(name)
+				for name in (self._files.keys() | self._dirs) if name and posixpath.dirname(name) == member
+				}
+		return sorted(names)
+
+	@abstractmethod
+	def stored_offset(self, member: str) -> Optional[int]:
+		"""
+		Returns the offset of the data for ``member`` in the archive file,
+		or :py:obj:`None` if the member is compressed and cannot be read in place.
+
+		:param member:
+		"""  # noqa: D400
+
+		raise NotImplementedError
+
+	@abstractmethod
+	def _open_compressed(self, member: str) -> IO[bytes]:
+		raise NotImplementedError
+
+	def open(self, member: str) -> IO[bytes]:  # noqa: A003  # pylint: disable=redefined-builtin
+		"""
+		Open ``member`` for reading in binary mode.
+
+		If the member is stored without compression the returned file object reads directly from the archive,
+		and supports seeking without reading the preceding data.
+
+		:param member:
+		"""
+
+		if self._fd is None:
+			raise ValueError(f"The archive '{self.filename}' has been closed.")
+
+		size = self.get_size(member)
+		offset = self.stored_offset(member)
+
+		if offset is None:
+			return self._open_compressed(member)
+
+		return io.BufferedReader(_MemberFile(self._fd, offset, size, self._lock))
+
+	def find_datafiles(self) -> Iterator["ArchivePath"]:
+		"""
+		Iterate over the ``.d`` datafiles in the archive.
+		"""
+
+		for directory in sorted(self._dirs):
+			if directory.lower().endswith(".d"):
+				if posixpath.join(directory, "AcqData", "Contents.xml") in self._files:
+					yield ArchivePath(self, directory)
+
+	def close(self) -> None:
+		"""
+		Close the archive file.
+
+		If the archive was opened with :func:`~.open_archive` it is removed from the cache,
+		so opening it again returns a new :class:`~.Archive`.
+		"""
+
+		with _archives_lock:
+			for key in [k for k, archive in _archives.items() if archive is self]:
+				del _archives[key]
+
+		self._fp.close()
+
+		if self._fd is not None:
+			os.close(self._fd)
+			self._fd = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+		self.close()
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({str(self.filename)!r})>"
+
+
+class ZipArchive(Archive):
+	"""
+	A zip archive containing ``.d`` datafiles.
+
+	:param filename: The archive file.
+	"""
+
+	def __init__(self, filename: PathLike):
+		super().__init__(filename)
+		self._zipfile = zipfile.ZipFile(self._fp)
+		self._infos: Dict[str, zipfile.ZipInfo] = {}
+		self._offsets: Dict[str, Optional[int]] = {}
+
+		for info in self._zipfile.infolist():
+			name = self._add_member(info.filename, info.file_size, is_dir=info.is_dir())
+			if not info.is_dir():
+				self._infos[name] = info
+
+	def stored_offset(self, member: str) -> Optional[int]:  # noqa: D102
+		if member not in self._offsets:
+			info = self._infos[member]
+
+			if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+				self._offsets[member] = None
+			else:
+				# The data follows the local file header, whose extra field may differ from the central directory.
+				header_file = _MemberFile(self._fd, info.header_offset, _zip_local_header.size, self._lock)
+				header = _zip_local_header.unpack(header_file.read(_zip_local_header.size))
+
+				if header[0] != b"PK\003\004":
+					raise zipfile.BadZipFile(f"Bad local file header for '{member}' in '{self.filename}'")
+
+				name_length, extra_length = header[-2:]
+				self._offsets[member] = info.header_offset + _zip_local_header.size + name_length + extra_length
+
+		return self._offsets[member]
+
+	def _open_compressed(self, member: str) -> IO[bytes]:
+		return self._zipfile.open(self._infos[member])
+
+	def close(self) -> None:  # noqa: D102
+		self._zipfile.close()
+		super().close()
+
+
+class TarArchive(Archive):
+	"""
+	A tar archive containing ``.d`` datafiles.
+
+	Members of uncompressed tar files are read in place. If the tar file is compressed
+	each member is decompressed into memory when it is opened.
+
+	:param filename: The archive file.
+	"""
+
+	def __init__(self, filename: PathLike):
+		super().__init__(filename)
+
+		try:
+			self._tarfile = tarfile.open(fileobj=self._fp, mode="r:")
+			self.compressed = False
+		except tarfile.ReadError:
+			self._fp.seek(0)
+			self._tarfile = tarfile.open(fileobj=self._fp, mode="r:*")
+			self.compressed = True
+
+		self._infos: Dict[str, tarfile.TarInfo] = {}
+
+		for info in self._tarfile.getmembers():
+			if info.isdir():
+				self._add_member(info.name, 0, is_dir=True)
+			elif info.isfile():
+				self._infos[self._add_member(info.name, info.size)] = info
+
+	def stored_offset(self, member: str) -> Optional[int]:  # noqa: D102
+		info = self._infos[member]
+
+		if self.compressed or info.issparse():
+			return None
+
+		return info.offset_data
+
+	def _open_compressed(self, member: str) -> IO[bytes]:
+		with self._lock:
+			fp = self._tarfile.extractfile(self._infos[member])
+			return io.BytesIO(fp.read())  # type: ignore
+
+	def close(self) -> None:  # noqa: D102
+		self._tarfile.close()
+		super().close()
+
+
+# Open archives, keyed by filename, modification time and size.
+_archives: Dict[Tuple[str, int, int], Archive] = {}
+_archives_lock = threading.Lock()
+
+
+def open_archive(filename: PathLike) -> Archive:
+	"""
+	Open the zip or tar archive ``filename``.
+
+	Archives are cached, so opening the same archive again does not re-read its index
+	unless the archive has been modified. The same :class:`~.Archive` is returned to every caller,
+	and it is removed from the cache when it is closed.
+
+	:param filename:
+
+	:raises ValueError: If the file is not a zip or tar archive.
+	"""
+
+	filename = os.path.abspath(filename)
+	stat = os.stat(filename)
+	key = (filename, stat.st_mtime_ns, stat.st_size)
+
+	stale: List[Archive] = []
+
+	with _archives_lock:
+		if key not in _archives:
+			if zipfile.is_zipfile(filename):
+				archive: Archive = ZipArchive(filename)
+			elif tarfile.is_tarfile(filename):
+				archive = TarArchive(filename)
+			else:
+				raise ValueError(f"'{filename}' is not a zip or tar archive.")
+
+			# The archive has been modified since it was last opened.
+			for old_key in [k for k in _archives if k[0] == filename]:
+				stale.append(_archives.pop(old_key))
+
+			_archives[key] = archive
+
+		archive = _archives[key]
+
+	# Closing takes the lock to remove the archive from the cache.
+	for old_archive in stale:
+		old_archive.close()
+
+	return archive
+
+
+class ArchivePath:
+	"""
+	A path to a file or directory inside an :class:`~.Archive`.
+
+	:param archive:
+	:param member: The path within the archive, with ``/`` as the separator.
+	"""
+
+	__slots__ = ("archive", "member")
+
+	def __init__(self, archive: Archive, member: str = ''):
+		self.archive = archive
+		self.member = _normalise_member(member)
+
+	def __truediv__(self, other: Union[str, pathlib.PurePath]) -> "ArchivePath":
+		other = str(other).replace('\\', '/')
+		return ArchivePath(self.archive, posixpath.join(self.member, other))
+
+	@property
+	def name(self) -> str:
+		"""
+		The final component of the path.
+		"""
+
+		return posixpath.basename(self.member)
+
+	@property
+	def stem(self) -> str:
+		"""
+		The final component of the path, without its suffix.
+		"""
+
+		return posixpath.splitext(self.name)[0]
+
+	@property
+	def suffix(self) -> str:
+		"""
+		The file extension of the final component of the path.
+		"""
+
+		return posixpath.splitext(self.name)[1]
+
+	@property
+	def parent(self) -> "ArchivePath":
+		"""
+		The parent directory of the path.
+		"""
+
+		return ArchivePath(self.archive, posixpath.dirname(self.member))
+
+	def exists(self) -> bool:
+		"""
+		Returns whether the path exists in the archive.
+		"""
+
+		return self.archive.is_file(self.member) or self.archive.is_dir(self.member)
+
+	def is_file(self) -> bool:
+		"""
+		Returns whether the path is a file in the archive.
+		"""
+
+		return self.archive.is_file(self.member)
+
+	def is_dir(self) -> bool:
+		"""
+		Returns whether the path is a directory in the archive.
+		"""
+
+		return self.archive.is_dir(self.member)
+
+	def iterdir(self) -> Iterator["ArchivePath"]:
+		"""
+		Iterate over the files and directories in this directory.
+		"""
+
+		for name in self.archive.listdir(self.member):
+			yield self / name
+
+	def is_stored(self) -> bool:
+		"""
+		Returns whether the file is stored without compression, and so can be read in place.
+		"""
+
+		return self.archive.stored_offset(self.member) is not None
+
+	def open(self, mode: str = 'r', encoding: Optional[str] = None) -> IO:  # noqa: A003  # pylint: disable=redefined-builtin
+		"""
+		Open the file for reading.
+
+		:param mode: Either ``'r'`` or ``'rb'``.
+		:param encoding: The encoding to use in text mode.
+		"""
+
+		if mode not in {'r', "rb"}:
+			raise ValueError("Files in archives can only be opened for reading.")
+
+		fp = self.archive.open(self.member)
+
+		if mode == "rb":
+			return fp
+
+		return io.TextIOWrapper(fp, encoding=encoding)  # type: ignore
+
+	def read_bytes(self) -> bytes:
+		"""
+		Returns the contents of the file as bytes.
+		"""
+
+		with self.open("rb") as fp:
+			return fp.read()
+
+	def read_text(self, encoding: Optional[str] = None) -> str:
+		"""
+		Returns the contents of the file as a string.
+
+		:param encoding:
+		"""
+
+		with self.open('r', encoding=encoding) as fp:
+			return fp.read()
+
+	def __str__(self) -> str:
+		if not self.member:
+			return str(self.archive.filename)
+		return os.path.join(str(self.archive.filename), *self.member.split('/'))
+
+	def __repr__(self) -> str:
+		return f"{type(self).__name__}({str(self.archive.filename)!r}, {self.member!r})"
+
+	def __eq__(self, other) -> bool:
+		if isinstance(other, ArchivePath):
+			return (self.archive.filename, self.member) == (other.archive.filename, other.member)
+		return NotImplemented
+
+	def __hash__(self) -> int:
+		return hash((self.archive.filename, self.member))
+
+
+def resolve_path(path: Union[PathLike, ArchivePath]) -> Union[pathlib.Path, ArchivePath]:
+	"""
+	Returns a :class:`pathlib.Path` for the given path, or an :class:`~.ArchivePath`
+	if the path does not exist and one of its parents is a zip or tar archive.
+
+	:param path:
+	"""  # noqa: D400
+
+	if isinstance(path, ArchivePath):
+		return path
+
+	path = pathlib.Path(path)
+
+	if path.exists():
+		return path
+
+	for parent in path.parents:
+		if parent.is_file():
+			try:
+				archive = open_archive(parent)
+			except ValueError:
+				return path
+
+			return ArchivePath(archive, path.relative_to(parent).as_posix())
+
+		elif parent.is_dir():
+			break
+
+	return path
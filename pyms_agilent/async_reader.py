@@ -0,0 +1,286 @@
+#  !/usr/bin/env python
+#
+#  async_reader.py
+"""
+:mod:`asyncio` interface for reading ``.d`` datafiles.
+
+Example:
+
+.. code-block:: python
+
+	async with await AsyncDataReader.open("Sample1.d") as reader:
+		tic = await reader.get_tic()
+
+		async for scan_no, spectrum in reader.iter_spectra():
+			...
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+
+# 3rd party
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.enums import DeviceType, SampleCategory, StoredDataType
+from pyms_agilent.mhdac.chromatograms import FrozenTIC
+from pyms_agilent.mhdac.mass_spec_data_reader import MSActual
+from pyms_agilent.mhdac.scan_record import FrozenMSScanRecord
+from pyms_agilent.mhdac.signalinfo import FrozenSignalInfo
+from pyms_agilent.mhdac.spectrum import FrozenSpecData
+from pyms_agilent.utils import freeze
+
+__all__ = ["AsyncDataReader"]
+
+_T = TypeVar("_T")
+
+
+class AsyncDataReader:
+	"""
+	Awaitable counterpart of :class:`~pyms_agilent.data_reader.DataReader`.
+
+	The datafile is opened and read on a dedicated thread, which owns the underlying reader,
+	so the event loop is never blocked by reading the datafile. Calls are run one at a time in the order they are made.
+
+	Spectra, chromatograms and other results are frozen on the reader's thread before they are returned,
+	so accessing their data does not call into the reader from the event loop.
+
+	Use :meth:`AsyncDataReader.open() <.AsyncDataReader.open>` to construct this class.
+
+	Cancelling a call which has not started yet prevents it from running.
+	A call which has already started runs to completion on the reader's thread, but its result is discarded.
+
+	:param executor: The single-threaded executor which owns the reader.
+	:param reader: The reader, which must only be accessed from the executor's thread.
+	"""
+
+	def __init__(self, executor: ThreadPoolExecutor, reader: DataReader):
+		self._executor: Optional[ThreadPoolExecutor] = executor
+		self._reader = reader
+
+		#: The filename of the datafile.
+		self.filename: str = reader.filename
+
+	@classmethod
+	async def open(  # noqa: A003  # pylint: disable=redefined-builtin
+			cls,
+			filename: PathLike,
+			reader_factory: Callable[[str], DataReader] = DataReader,
+			) -> "AsyncDataReader":
+		"""
+		Open the given datafile on a new, dedicated thread.
+
+		:param filename: The ``.d`` datafile to open.
+		:param reader_factory: The function to open the datafile with.
+		"""
+
+		executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AsyncDataReader")
+		loop = asyncio.get_event_loop()
+
+		try:
+			reader = await loop.run_in_executor(executor, reader_factory, os.fspath(filename))
+		except BaseException:
+			executor.shutdown(wait=False)
+			raise
+
+		return cls(executor, reader)
+
+	async def run(self, func: Callable[..., _T], *args, **kwargs) -> _T:
+		"""
+		Call ``func`` with the reader and the given arguments on the reader's thread, and return the result.
+
+		This can be used to call methods of :class:`~pyms_agilent.data_reader.DataReader`
+		which do not have an awaitable counterpart here. For example:
+
+		.. code-block:: python
+
+			devices = await reader.run(lambda r: r.get_devices())
+
+		:param func:
+		:param args: Positional arguments to pass to ``func`` after the reader.
+		:param kwargs: Keyword arguments to pass to ``func``.
+		"""
+
+		if self._executor is None:
+			raise ValueError("I/O operation on closed datafile.")
+
+		loop = asyncio.get_event_loop()
+		call = functools.partial(func, self._reader, *args, **kwargs)
+		return await loop.run_in_executor(self._executor, call)
+
+	async def _call(self, method_name: str, *args, **kwargs) -> Any:
+		return await self.run(_call_frozen, method_name, *args, **kwargs)
+
+	async def refresh_datafile(self) -> bool:
+		"""
+		Refreshes the data file and returns whether new data is present.
+		"""
+
+		return await self._call("refresh_datafile")
+
+	async def get_total_scans(self) -> int:
+		"""
+		Returns the total number of scans present.
+		"""
+
+		return await self.run(lambda reader: reader.total_scans)
+
+	async def get_tic(self) -> FrozenTIC:
+		"""
+		Returns the total ion chromatogram of the data.
+		"""
+
+		return await self._call("get_tic")
+
+	async def get_spectrum_by_scan(self, scan_no: int) -> FrozenSpecData:
+		"""
+		Returns a :class:`pyms_agilent.mhdac.spectrum.FrozenSpecData` object for the given scan.
+
+		:param scan_no:
+		"""
+
+		return await self._call("get_spectrum_by_scan", scan_no)
+
+	async def get_scan_record(self, scan_no: int) -> FrozenMSScanRecord:
+		"""
+		Returns metadata about the scan with the given number.
+
+		:param scan_no:
+		"""
+
+		return await self._call("get_scan_record", scan_no)
+
+	async def get_signal_listing(
+			self,
+			device_name: str,
+			device_type: DeviceType,
+			data_type: StoredDataType,
+			ordinal: int = 1,
+			) -> List[FrozenSignalInfo]:
+		"""
+		Returns a list of signals of the given type available for the given device.
+
+		:param device_name: The name of the device that recorded the signal.
+		:param device_type: The type of device that recorded the signal.
+		:param data_type:
+		:param ordinal:
+		"""
+
+		return await self._call(
+				"get_signal_listing",
+				device_name=device_name,
+				device_type=device_type,
+				data_type=data_type,
+				ordinal=ordinal,
+				)
+
+	async def get_ms_actuals(self) -> Dict[str, MSActual]:
+		"""
+		Returns the MS Actuals parameters.
+		"""
+
+		return await self.run(lambda reader: dict(reader.get_ms_actuals()))
+
+	async def get_sample_data(self, category: SampleCategory = SampleCategory.All) -> Dict[str, Any]:
+		"""
+		Returns a dictionary of additional metadata about the sample.
+
+		:param category: The category of metadata to return.
+		"""
+
+		return await self._call("get_sample_data", category)
+
+	async def iter_spectra(
+			self,
+			start: int = 0,
+			stop: Optional[int] = None,
+			batch_size: int = 50,
+			) -> AsyncIterator[Tuple[int, FrozenSpecData]]:
+		"""
+		Iterate over the spectra for a range of scans, yielding ``(scan_no, spectrum)`` tuples.
+
+		The spectra are read in batches, so each batch costs a single trip to the reader's thread.
+		Iteration can be cancelled between batches.
+
+		:param start: The first scan to read.
+		:param stop: The scan to stop at. If :py:obj:`None` all remaining scans are read.
+		:param batch_size: The number of spectra to read at a time.
+		"""
+
+		if batch_size < 1:
+			raise ValueError("'batch_size' must be at least 1.")
+
+		if stop is None:
+			stop = await self.get_total_scans()
+
+		for batch_start in range(start, stop, batch_size):
+			scan_numbers = range(batch_start, min(batch_start + batch_size, stop))
+			batch = await self.run(_read_spectra, scan_numbers)
+
+			for scan_no, spectrum in zip(scan_numbers, batch):
+				yield scan_no, spectrum
+
+	async def close(self) -> None:
+		"""
+		Close the datafile and stop the reader's thread.
+
+		Calls made before the datafile is closed are completed first.
+		"""
+
+		if self._executor is None:
+			return
+
+		executor, self._executor = self._executor, None
+
+		loop = asyncio.get_event_loop()
+		await loop.run_in_executor(executor, self._reader.close_datafile)
+		executor.shutdown(wait=False)
+
+	@property
+	def closed(self) -> bool:
+		"""
+		Returns whether the datafile has been closed.
+		"""
+
+		return self._executor is None
+
+	async def __aenter__(self) -> "AsyncDataReader":
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.close()
+
+	def __repr__(self) -> str:
+		return f"<{self.__class__.__name__}({self.filename!r})>"
+
+
+def _call_frozen(reader: DataReader, method_name: str, *args, **kwargs) -> Any:
+	return freeze(getattr(reader, method_name)(*args, **kwargs))
+
+
+def _read_spectra(reader: DataReader, scan_numbers: range) -> List[FrozenSpecData]:
+	return [freeze(reader.get_spectrum_by_scan(scan_no)) for scan_no in scan_numbers]
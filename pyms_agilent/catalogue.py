@@ -0,0 +1,455 @@
+#  !/usr/bin/env python
+#
+#  catalogue.py
+"""
+SQLite catalogue of the metadata in a collection of ``.d`` datafiles.
+
+The catalogue stores the fields from :file:`Contents.xml`, :file:`sample_info.xml`, :file:`Devices.xml`
+and :file:`MSTS.xml`, and the method name from :file:`AcqMethod.xml`, for every datafile in a directory tree.
+Refreshing the catalogue only re-parses datafiles whose XML files have changed since they were last catalogued.
+
+Example:
+
+.. code-block:: python
+
+	with MetadataCatalogue("runs.sqlite") as catalogue:
+		catalogue.refresh("/mnt/nas/MassHunter/Data", workers=8)
+
+		runs = catalogue.find(
+				instrument_name="QTOF 6545",
+				method_name="Cannabinoids in Urine.m",
+				acquired_after=datetime.datetime(2020, 1, 1),
+				)
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import datetime
+import json
+import os
+import pathlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# 3rd party
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pyms_agilent.metadata import find_datafiles, prepare_filepath
+from pyms_agilent.xml_parser.acq_method import read_acqmethod
+from pyms_agilent.xml_parser.contents import read_contents_xml
+from pyms_agilent.xml_parser.devices import read_devices_xml
+from pyms_agilent.xml_parser.ms_time_segments import read_msts_xml
+from pyms_agilent.xml_parser.sample_info import read_sample_info_xml
+
+__all__ = ["CATALOGUED_FILES", "RefreshResult", "MetadataCatalogue"]
+
+#: The files in the ``AcqData`` directory which are stored in the catalogue.
+#: A datafile is re-parsed if the modification time or size of any of these files changes.
+CATALOGUED_FILES = ("Contents.xml", "sample_info.xml", "AcqMethod.xml", "Devices.xml", "MSTS.xml")
+
+_schema = """\
+CREATE TABLE IF NOT EXISTS datafiles (
+	id INTEGER PRIMARY KEY,
+	path TEXT NOT NULL UNIQUE,
+	signature TEXT NOT NULL,
+	version INTEGER,
+	acquired_time TEXT,
+	acq_status INTEGER,
+	instrument_name TEXT,
+	locked_mode INTEGER,
+	measurement_type INTEGER,
+	separation_technique INTEGER,
+	total_run_duration REAL,
+	acq_software_version TEXT,
+	method_name TEXT,
+	method_path TEXT
+);
+CREATE INDEX IF NOT EXISTS datafiles_acquired_time ON datafiles (acquired_time);
+CREATE INDEX IF NOT EXISTS datafiles_instrument_name ON datafiles (instrument_name, acquired_time);
+CREATE INDEX IF NOT EXISTS datafiles_method_name ON datafiles (method_name, acquired_time);
+
+CREATE TABLE IF NOT EXISTS sample_info (
+	datafile_id INTEGER NOT NULL REFERENCES datafiles (id) ON DELETE CASCADE,
+	name TEXT NOT NULL,
+	display_name TEXT,
+	value TEXT,
+	data_type INTEGER,
+	units TEXT
+);
+CREATE INDEX IF NOT EXISTS sample_info_datafile ON sample_info (datafile_id);
+CREATE INDEX IF NOT EXISTS sample_info_name_value ON sample_info (name, value);
+
+CREATE TABLE IF NOT EXISTS devices (
+	datafile_id INTEGER NOT NULL REFERENCES datafiles (id) ON DELETE CASCADE,
+	device_id INTEGER,
+	display_name TEXT,
+	model_number TEXT,
+	serial_number TEXT,
+	type INTEGER,
+	ordinal_number INTEGER,
+	stored_data_type INTEGER,
+	vendor INTEGER,
+	driver_version TEXT,
+	firmware_version TEXT
+);
+CREATE INDEX IF NOT EXISTS devices_datafile ON devices (datafile_id);
+CREATE INDEX IF NOT EXISTS devices_model_number ON devices (model_number);
+CREATE INDEX IF NOT EXISTS devices_serial_number ON devices (serial_number);
+
+CREATE TABLE IF NOT EXISTS time_segments (
+	datafile_id INTEGER NOT NULL REFERENCES datafiles (id) ON DELETE CASCADE,
+	timesegment_id INTEGER,
+	start_time REAL,
+	end_time REAL,
+	n_scans INTEGER,
+	fixed_cycle_length INTEGER
+);
+CREATE INDEX IF NOT EXISTS time_segments_datafile ON time_segments (datafile_id);
+"""
+
+_datafile_columns = (
+		"path",
+		"signature",
+		"version",
+		"acquired_time",
+		"acq_status",
+		"instrument_name",
+		"locked_mode",
+		"measurement_type",
+		"separation_technique",
+		"total_run_duration",
+		"acq_software_version",
+		"method_name",
+		"method_path",
+		)
+
+
+class RefreshResult(NamedTuple):
+	"""
+	The outcome of :meth:`MetadataCatalogue.refresh() <.MetadataCatalogue.refresh>`.
+	"""
+
+	#: Datafiles which were not previously in the catalogue.
+	added: List[pathlib.Path]
+
+	#: Datafiles which were re-parsed because their XML files changed.
+	updated: List[pathlib.Path]
+
+	#: Datafiles which were removed from the catalogue because they no longer exist.
+	removed: List[pathlib.Path]
+
+	#: The number of datafiles which were unchanged.
+	unchanged: int
+
+	#: Datafiles which could not be parsed, and the exception raised.
+	errors: List[Tuple[pathlib.Path, Exception]]
+
+
+def _signature(datafile: pathlib.Path) -> str:
+	"""
+	Returns a string identifying the current state of the catalogued XML files in the datafile.
+
+	:param datafile:
+	"""
+
+	signature = []
+
+	for filename in CATALOGUED_FILES:
+		try:
+			stat = os.stat(os.path.join(datafile, "AcqData", filename))
+		except FileNotFoundError:
+			signature.append(None)
+		else:
+			signature.append([stat.st_mtime_ns, stat.st_size])
+
+	return json.dumps(signature)
+
+
+def _utc_isoformat(timestamp: datetime.datetime) -> str:
+	# Stored in UTC so the timestamps sort correctly as strings. Naive timestamps are assumed to be UTC.
+	if timestamp.tzinfo is None:
+		timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+	return timestamp.astimezone(datetime.timezone.utc).isoformat()
+
+
+def _optional(reader, acqdata_dir: pathlib.Path):
+	try:
+		return reader(acqdata_dir)
+	except FileNotFoundError:
+		return None
+
+
+def _parse_datafile(datafile: pathlib.Path, signature: str) -> Dict[str, Any]:
+	"""
+	Parse the metadata for a datafile into rows for the catalogue.
+
+	:param datafile:
+	:param signature:
+	"""
+
+	acqdata_dir = datafile / "AcqData"
+
+	contents = read_contents_xml(acqdata_dir)
+	sample_info = _optional(read_sample_info_xml, acqdata_dir)
+	method = _optional(read_acqmethod, acqdata_dir)
+	devices = _optional(read_devices_xml, acqdata_dir)
+	time_segments = _optional(read_msts_xml, acqdata_dir)
+
+	datafile_row = (
+			str(datafile),
+			signature,
+			contents.version,
+			_utc_isoformat(contents.acquired_time),
+			int(contents.acq_status),
+			contents.instrument_name,
+			int(contents.locked_mode),
+			int(contents.measurement_type),
+			int(contents.separation_technique),
+			contents.total_run_duration.total_seconds(),
+			contents.acq_software_version,
+			None if method is None else method.name,
+			None if method is None else str(method.filename),
+			)
+
+	return {
+			"datafile": datafile_row,
+			"sample_info": [(
+					field.name,
+					field.display_name,
+					None if field.value is None else str(field.value).strip(),
+					field.data_type,
+					field.units,
+					) for field in (sample_info or ())],
+			"devices": [(
+					device.device_id,
+					device.display_name,
+					device.model_number,
+					device.serial_number,
+					int(device.type_),
+					device.ordinal_number,
+					int(device.stored_data_type),
+					int(device.vendor),
+					device.driver_version,
+					device.firmware_version,
+					) for device in (devices or ())],
+			"time_segments": [(
+					segment.timesegment_id,
+					segment.start_time.total_seconds() / 60,
+					segment.end_time.total_seconds() / 60,
+					segment.n_scans,
+					int(segment.fixed_cycle_length),
+					) for segment in (time_segments or ())],
+			}
+
+
+class MetadataCatalogue:
+	"""
+	SQLite catalogue of the metadata in a collection of ``.d`` datafiles.
+
+	:param database: The SQLite database file. Created if it does not exist.
+
+	The catalogue can be used as a context manager, in which case it is closed on exit.
+	"""
+
+	def __init__(self, database: PathLike):
+		if str(database) != ":memory:":
+			database = prepare_filepath(database)
+
+		self.database = database
+		self.connection = sqlite3.connect(str(database))
+		self.connection.execute("PRAGMA foreign_keys = ON")
+		self.connection.executescript(_schema)
+
+	def close(self) -> None:
+		"""
+		Close the connection to the database.
+		"""
+
+		self.connection.close()
+
+	def __enter__(self) -> "MetadataCatalogue":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+		self.close()
+
+	def __len__(self) -> int:
+		return self.connection.execute("SELECT COUNT(*) FROM datafiles").fetchone()[0]
+
+	def _signatures(self, root: pathlib.Path) -> Dict[str, str]:
+		# Match on the path prefix so only datafiles under root are considered.
+		# LIKE ignores case, which would match sibling directories whose names differ only in case.
+		prefix = os.path.join(str(root), '')
+
+		rows = self.connection.execute(
+				"SELECT path, signature FROM datafiles WHERE substr(path, 1, length(?)) = ?",
+				(prefix, prefix),
+				)
+		return dict(rows)
+
+	def _store(self, parsed: Dict[str, Any]) -> None:
+		path = parsed["datafile"][0]
+		self.connection.execute("DELETE FROM datafiles WHERE path = ?", (path, ))
+
+		placeholders = ", ".join('?' * len(_datafile_columns))
+		cursor = self.connection.execute(
+				f"INSERT INTO datafiles ({', '.join(_datafile_columns)}) VALUES ({placeholders})",
+				parsed["datafile"],
+				)
+		datafile_id = cursor.lastrowid
+
+		self.connection.executemany(
+				"INSERT INTO sample_info VALUES (?, ?, ?, ?, ?, ?)",
+				[(datafile_id, *row) for row in parsed["sample_info"]],
+				)
+		self.connection.executemany(
+				"INSERT INTO devices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+				[(datafile_id, *row) for row in parsed["devices"]],
+				)
+		self.connection.executemany(
+				"INSERT INTO time_segments VALUES (?, ?, ?, ?, ?, ?)",
+				[(datafile_id, *row) for row in parsed["time_segments"]],
+				)
+
+	def refresh(self, root: PathLike, workers: Optional[int] = None) -> RefreshResult:
+		"""
+		Add or update the datafiles in the directory ``root`` and its subdirectories,
+		and remove datafiles under ``root`` which no longer exist.
+
+		Datafiles are only parsed if they are new, or if the modification time or size
+		of any of the :data:`~.CATALOGUED_FILES` has changed.
+
+		:param root: The directory to search for datafiles.
+		:param workers: The number of threads used to search for, check and parse the datafiles.
+			If :py:obj:`None` the default for :class:`concurrent.futures.ThreadPoolExecutor` is used.
+		"""  # noqa: D400
+
+		root = pathlib.Path(os.path.abspath(root))
+		known = self._signatures(root)
+
+		added: List[pathlib.Path] = []
+		updated: List[pathlib.Path] = []
+		errors: List[Tuple[pathlib.Path, Exception]] = []
+		unchanged = 0
+		seen = set()
+
+		def check(datafile: pathlib.Path) -> Tuple[pathlib.Path, Optional[Dict[str, Any]], Optional[Exception]]:
+			signature = _signature(datafile)
+
+			if known.get(str(datafile)) == signature:
+				return datafile, None, None
+
+			try:
+				return datafile, _parse_datafile(datafile, signature), None
+			except Exception as e:  # pylint: disable=broad-except
+				return datafile, None, e
+
+		with ThreadPoolExecutor(max_workers=workers) as executor:
+			for datafile, parsed, error in executor.map(check, find_datafiles(root, workers=workers)):
+				seen.add(str(datafile))
+
+				if error is not None:
+					errors.append((datafile, error))
+				elif parsed is None:
+					unchanged += 1
+				else:
+					if str(datafile) in known:
+						updated.append(datafile)
+					else:
+						added.append(datafile)
+
+					self._store(parsed)
+
+		removed = [pathlib.Path(path) for path in known if path not in seen]
+		self.connection.executemany("DELETE FROM datafiles WHERE path = ?", [(str(path), ) for path in removed])
+		self.connection.commit()
+
+		return RefreshResult(added=added, updated=updated, removed=removed, unchanged=unchanged, errors=errors)
+
+	def query(self, sql: str, parameters: Sequence[Any] = ()) -> List[sqlite3.Row]:
+		"""
+		Run an SQL query against the catalogue.
+
+		The tables are ``datafiles``, ``sample_info``, ``devices`` and ``time_segments``.
+		The last three are linked to ``datafiles`` by their ``datafile_id`` column.
+
+		:param sql:
+		:param parameters:
+		"""
+
+		cursor = self.connection.cursor()
+		cursor.row_factory = sqlite3.Row
+		return cursor.execute(sql, parameters).fetchall()
+
+	def find(
+			self,
+			instrument_name: Optional[str] = None,
+			method_name: Optional[str] = None,
+			acquired_after: Optional[datetime.datetime] = None,
+			acquired_before: Optional[datetime.datetime] = None,
+			device_model: Optional[str] = None,
+			**sample_info: str,
+			) -> List[pathlib.Path]:
+		r"""
+		Returns the datafiles matching all of the given criteria, in order of acquisition time.
+
+		:param instrument_name: The name of the instrument, from :file:`Contents.xml`.
+		:param method_name: The name of the acquisition method.
+		:param acquired_after: Only return datafiles acquired at or after this time.
+			Naive datetimes are assumed to be in UTC.
+		:param acquired_before: Only return datafiles acquired before this time.
+			Naive datetimes are assumed to be in UTC.
+		:param device_model: Only return datafiles acquired with a device with this model number.
+		:param \*\*sample_info: Fields from :file:`sample_info.xml`, with spaces in the field name
+			replaced by underscores (e.g. ``Sample_Name="Blank"``).
+		"""
+
+		conditions = []
+		parameters: List[Any] = []
+
+		if instrument_name is not None:
+			conditions.append("instrument_name = ?")
+			parameters.append(instrument_name)
+		if method_name is not None:
+			conditions.append("method_name = ?")
+			parameters.append(method_name)
+		if acquired_after is not None:
+			conditions.append("acquired_time >= ?")
+			parameters.append(_utc_isoformat(acquired_after))
+		if acquired_before is not None:
+			conditions.append("acquired_time < ?")
+			parameters.append(_utc_isoformat(acquired_before))
+		if device_model is not None:
+			conditions.append("id IN (SELECT datafile_id FROM devices WHERE model_number = ?)")
+			parameters.append(device_model)
+
+		for name, value in sample_info.items():
+			conditions.append("id IN (SELECT datafile_id FROM sample_info WHERE name = ? AND value = ?)")
+			parameters.extend([name.replace('_', ' '), value])
+
+		sql = "SELECT path FROM datafiles"
+		if conditions:
+			sql += " WHERE " + " AND ".join(conditions)
+		sql += " ORDER BY acquired_time"
+
+		return [pathlib.Path(row[0]) for row in self.connection.execute(sql, parameters)]
@@ -26,13 +26,15 @@ Higher level interface for reading ``.d`` data files..
 # stdlib
 import pathlib
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 # 3rd party
+import numpy  # type: ignore
 from domdf_python_tools.typing import PathLike
 from memoized_property import memoized_property  # type: ignore
 
 # this package
+from pyms_agilent import metadata
 from pyms_agilent.enums import (
 		DeviceType,
 		IonizationMode,
@@ -52,6 +54,7 @@ from pyms_agilent.mhdac.ms_scan_file_info import MSScanFileInformation
 from pyms_agilent.mhdac.scan_record import MSScanRecord
 from pyms_agilent.mhdac.signalinfo import SignalInfo
 from pyms_agilent.mhdac.spectrum import SpecData
+from pyms_agilent.xml_parser.devices import DeviceList, read_devices_xml
 
 __all__ = ["DataReader"]
 
@@ -63,6 +66,9 @@ class DataReader:
 	This class combined information from three nested classes in
 	:mod:`pyms_agilent.mhdac` into one.
 
+	Readers can be pickled (for example, to pass them to a :class:`concurrent.futures.ProcessPoolExecutor`),
+	in which case the datafile is opened again when the reader is unpickled.
+
 	:param filename: The ``.d`` data file to open.
 	"""
 
@@ -72,6 +78,9 @@ class DataReader:
 		# The lower level class we wrap
 		self._data_reader = mass_spec_data_reader.MassSpecDataReader(filename)
 
+		# Sample data for each category, populated on demand by get_sample_data.
+		self._sample_data: Dict[SampleCategory, Dict[str, Any]] = {}
+
 	def close_datafile(self) -> bool:
 		"""
 		Closes the datafile.
@@ -79,11 +88,16 @@ class DataReader:
 		:return:
 		"""
 
+		self._sample_data = {}
 		return self._data_reader.close_datafile()
 
 	def __del__(self):
 		self.close_datafile()
 
+	def __reduce__(self):
+		# The datafile is opened again when unpickled, for example in a worker process.
+		return self.__class__, (self.filename, )
+
 	def refresh_datafile(self) -> bool:
 		"""
 		Refreshes the data file and returns whether new data is present.
@@ -91,7 +105,16 @@ class DataReader:
 		:return: Whether new data is present in the data file
 		"""
 
-		return self._data_reader.refresh_datafile()
+		new_data = self._data_reader.refresh_datafile()
+
+		if new_data:
+			self._sample_data = {}
+
+			# The number of scans and other file information may have changed.
+			for attr_name in ("__file_info", "__ms_scan_file_info"):
+				self.__dict__.pop(attr_name, None)
+
+		return new_data
 
 	# TODO: file_information
 
@@ -356,6 +379,15 @@ class DataReader:
 
 		return self._data_reader.get_spectrum_by_scan(scan_no)
 
+	def get_spectrum_arrays(self, scan_no: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+		"""
+		Returns the x- and y-axis data for the given scan as :class:`numpy.ndarray` objects.
+
+		:param scan_no:
+		"""
+
+		return self._data_reader.get_spectrum_arrays(scan_no)
+
 	def get_spectrum_by_time(
 			self,
 			retention_time: float,
@@ -423,10 +455,18 @@ class DataReader:
 		"""
 		Returns a dictionary of additional metadata about the sample.
 
+		The metadata for each category is cached until the datafile is closed,
+		or :meth:`~.DataReader.refresh_datafile` finds new data.
+
 		:param category: The category of metadata to return.
 		"""
 
-		return self._data_reader.get_sample_data(category)
+		category = SampleCategory(category)
+
+		if category not in self._sample_data:
+			self._sample_data[category] = self._data_reader.get_sample_data(category)
+
+		return dict(self._sample_data[category])
 
 	def get_timesegment_ids(self) -> List[int]:
 		"""
@@ -451,3 +491,27 @@ class DataReader:
 		"""
 
 		return self._data_reader.get_scan_record(scan_no)
+
+	def get_devices(self) -> DeviceList:
+		"""
+		Returns the list of devices in the instrument configuration, parsed from :file:`Devices.xml`.
+		"""
+
+		return read_devices_xml(metadata.prepare_filepath(self.filename, mkdirs=False) / "AcqData")
+
+	def freeze_all(self, filename: PathLike) -> pathlib.Path:
+		"""
+		Write a frozen snapshot of the datafile.
+
+		The snapshot contains all of the data accessible through this class, and can be opened
+		on any platform with :class:`~pyms_agilent.frozen.FrozenDataReader`.
+
+		:param filename: The file to write the snapshot to.
+
+		:returns: The filename of the snapshot.
+		"""
+
+		# this package
+		from pyms_agilent.frozen import freeze_datafile
+
+		return freeze_datafile(self, filename)
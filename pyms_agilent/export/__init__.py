@@ -0,0 +1,28 @@
+#  !/usr/bin/env python
+#
+#  __init__.py
+"""
+Export ``.d`` datafiles to open formats.
+
+Each exporter takes a :class:`~pyms_agilent.data_reader.DataReader`
+(or a :class:`~pyms_agilent.frozen.FrozenDataReader`) and writes the data
+to disk scan by scan, so the memory used does not depend on the length of the run.
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
@@ -0,0 +1,212 @@
+#  !/usr/bin/env python
+#
+#  andi.py
+"""
+Export ``.d`` datafiles to ANDI-MS (netCDF) files.
+
+The file follows the layout of the ASTM E2077 / ANDI-MS template used by most GC-MS software,
+and can be read with :func:`pyms.GCMS.IO.ANDI.ANDI_reader`.
+
+The spectra are read as arrays with :meth:`DataReader.get_spectrum_arrays() <.DataReader.get_spectrum_arrays>`
+and appended to the file in a single pass, without constructing a :class:`pyms.GCMS.Class.GCMS_data` object.
+
+.. extras-require:: andi
+	:pyproject:
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import datetime
+import os
+import pathlib
+from typing import List
+
+# 3rd party
+import numpy  # type: ignore
+from domdf_python_tools.typing import PathLike
+from netCDF4 import Dataset  # type: ignore
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.enums import IonizationMode, MSStorageMode, SeparationTechniqueEnum
+from pyms_agilent.metadata import prepare_filepath
+
+__all__ = ["write_andi"]
+
+_ionization_modes = {
+		IonizationMode.EI: "Electron Impact",
+		IonizationMode.CI: "Chemical Ionization",
+		IonizationMode.ESI: "Electrospray Ionization",
+		IonizationMode.NanoEsi: "Electrospray Ionization",
+		IonizationMode.Jetstream: "Electrospray Ionization",
+		IonizationMode.Apci: "Atmospheric Pressure Chemical Ionization",
+		IonizationMode.Appi: "Atmospheric Pressure Photo Ionization",
+		IonizationMode.Maldi: "Matrix Assisted Laser Desorption Ionization",
+		}
+
+_polarities = {'+': "Positive Polarity", '-': "Negative Polarity"}
+
+_separation_types = {
+		SeparationTechniqueEnum.GC: "Gas-Liquid Chromatography",
+		SeparationTechniqueEnum.LC: "Liquid Chromatography",
+		SeparationTechniqueEnum.CE: "Capillary Electrophoresis",
+		}
+
+
+def _andi_timestamp(timestamp: datetime.datetime) -> str:
+	# YYYYMMDDhhmmss±ZZZZ
+	if timestamp.tzinfo is None:
+		return timestamp.strftime("%Y%m%d%H%M%S+0000")
+	return timestamp.strftime("%Y%m%d%H%M%S%z")
+
+
+def write_andi(reader: DataReader, filename: PathLike, chunk_size: int = 262144) -> pathlib.Path:
+	"""
+	Export the mass spectra in the datafile opened by ``reader`` to an ANDI-MS file.
+
+	:param reader:
+	:param filename: The file to write the ANDI-MS data to.
+	:param chunk_size: The approximate number of data points to buffer before appending them to the file.
+
+	:returns: The filename of the ANDI-MS file.
+	"""
+
+	filename = prepare_filepath(filename)
+	total_scans = reader.total_scans
+
+	rootgrp = Dataset(str(filename), 'w', format="NETCDF3_CLASSIC")
+
+	try:
+		now = datetime.datetime.now(datetime.timezone.utc)
+
+		rootgrp.dataset_completeness = "C1+C2"
+		rootgrp.ms_template_revision = "1.0.1"
+		rootgrp.netcdf_revision = "2.3.2"
+		rootgrp.languages = "English"
+		rootgrp.dataset_origin = "pyms-agilent"
+		rootgrp.netcdf_file_date_time_stamp = _andi_timestamp(now)
+		rootgrp.experiment_date_time_stamp = _andi_timestamp(reader.acquisition_time)
+		rootgrp.experiment_title = reader.datafile_name.stem
+		rootgrp.external_file_ref_0 = str(reader.datafile_name)
+		rootgrp.raw_data_mass_format = "Double"
+		rootgrp.raw_data_intensity_format = "Float"
+		rootgrp.raw_data_time_format = "Double"
+
+		if reader.spectra_format == MSStorageMode.ProfileSpectrum:
+			rootgrp.experiment_type = "Continuum Mass Spectrum"
+		else:
+			rootgrp.experiment_type = "Centroided Mass Spectrum"
+
+		for mode, name in _ionization_modes.items():
+			if IonizationMode(reader.ionisation_mode) & mode:
+				rootgrp.test_ionization_mode = name
+				break
+
+		if reader.ionisation_polarity in _polarities:
+			rootgrp.test_ionization_polarity = _polarities[reader.ionisation_polarity]
+
+		if reader.separation_technique in _separation_types:
+			rootgrp.test_separation_type = _separation_types[reader.separation_technique]
+
+		rootgrp.createDimension("scan_number", total_scans)
+		rootgrp.createDimension("point_number", None)
+
+		scan_index = rootgrp.createVariable("scan_index", "i4", ("scan_number", ))
+		point_count = rootgrp.createVariable("point_count", "i4", ("scan_number", ))
+		actual_scan_number = rootgrp.createVariable("actual_scan_number", "i4", ("scan_number", ))
+		scan_acquisition_time = rootgrp.createVariable("scan_acquisition_time", "f8", ("scan_number", ))
+		total_intensity = rootgrp.createVariable("total_intensity", "f8", ("scan_number", ))
+		mass_range_min = rootgrp.createVariable("mass_range_min", "f8", ("scan_number", ))
+		mass_range_max = rootgrp.createVariable("mass_range_max", "f8", ("scan_number", ))
+		mass_values = rootgrp.createVariable("mass_values", "f8", ("point_number", ))
+		intensity_values = rootgrp.createVariable("intensity_values", "f4", ("point_number", ))
+
+		scan_acquisition_time.units = "Seconds"
+		total_intensity.units = "Arbitrary Intensity Units"
+		mass_values.units = "M/Z"
+		mass_values.scale_factor = 1.0
+		intensity_values.units = "Arbitrary Intensity Units"
+		intensity_values.scale_factor = 1.0
+		intensity_values.add_offset = 0.0
+
+		# ANDI wants scale_factor and add_offset as metadata only
+		mass_values.set_auto_scale(False)
+		intensity_values.set_auto_scale(False)
+
+		index = numpy.zeros(total_scans, dtype=numpy.int32)
+		counts = numpy.zeros(total_scans, dtype=numpy.int32)
+		times = numpy.zeros(total_scans, dtype=numpy.float64)
+		tics = numpy.zeros(total_scans, dtype=numpy.float64)
+		mass_min = numpy.zeros(total_scans, dtype=numpy.float64)
+		mass_max = numpy.zeros(total_scans, dtype=numpy.float64)
+
+		mass_buffer: List[numpy.ndarray] = []
+		intensity_buffer: List[numpy.ndarray] = []
+		written = 0
+		buffered = 0
+
+		def flush() -> None:
+			nonlocal written, buffered, mass_buffer, intensity_buffer
+
+			if buffered:
+				mass_values[written:written + buffered] = numpy.concatenate(mass_buffer)
+				intensity_values[written:written + buffered] = numpy.concatenate(intensity_buffer)
+				written += buffered
+
+			mass_buffer, intensity_buffer, buffered = [], [], 0
+
+		for scan_no in range(total_scans):
+			scan_record = reader.get_scan_record(scan_no)
+			x_data, y_data = reader.get_spectrum_arrays(scan_no)
+
+			index[scan_no] = written + buffered
+			counts[scan_no] = len(x_data)
+			times[scan_no] = scan_record.retention_time * 60.0
+			tics[scan_no] = scan_record.tic
+
+			if len(x_data):
+				mass_min[scan_no] = x_data.min()
+				mass_max[scan_no] = x_data.max()
+
+			mass_buffer.append(x_data)
+			intensity_buffer.append(y_data)
+			buffered += len(x_data)
+
+			if buffered >= chunk_size:
+				flush()
+
+		flush()
+
+		scan_index[:] = index
+		point_count[:] = counts
+		actual_scan_number[:] = numpy.arange(total_scans, dtype=numpy.int32)
+		scan_acquisition_time[:] = times
+		total_intensity[:] = tics
+		mass_range_min[:] = mass_min
+		mass_range_max[:] = mass_max
+
+	except BaseException:
+		rootgrp.close()
+		os.unlink(filename)
+		raise
+
+	rootgrp.close()
+
+	return filename
@@ -0,0 +1,277 @@
+#  !/usr/bin/env python
+#
+#  hdf5.py
+"""
+Export ``.d`` datafiles to chunked, compressed `HDF5 <https://www.hdfgroup.org/solutions/hdf5/>`_ files.
+
+The file has the following layout:
+
+* ``/spectra/mz`` and ``/spectra/intensity`` -- the |mz| and intensity values of every scan, concatenated.
+* ``/spectra/offsets`` -- the index of the first value of each scan in the concatenated arrays.
+  There is one more offset than there are scans, so scan ``n`` is ``offsets[n]:offsets[n + 1]``.
+* ``/scans`` -- a table of the scan record metadata, with one row per scan.
+* ``/tic`` -- the total ion chromatogram, with ``x`` and ``y`` datasets.
+* ``/instrument_curves/<device name>/<signal name>`` -- the instrument curves for each device.
+  Where several devices share a name, each group name ends with the device's ordinal number,
+  e.g. ``/instrument_curves/DAD_2``.
+* ``/actuals/<parameter name>`` -- the MS actuals.
+
+The spectra datasets are chunked and compressed, so :func:`~.get_spectrum` and
+:func:`~.find_scans` only decompress the chunks containing the requested scans.
+
+.. extras-require:: hdf5
+	:pyproject:
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import pathlib
+from collections import Counter
+from typing import List, Optional, Tuple
+
+# 3rd party
+import h5py  # type: ignore
+import numpy  # type: ignore
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.enums import StoredDataType
+from pyms_agilent.exceptions import NotMS2Error
+from pyms_agilent.metadata import prepare_filepath
+
+__all__ = ["SCAN_DTYPE", "write_hdf5", "get_spectrum", "find_scans"]
+
+#: The dtype of the ``/scans`` table.
+SCAN_DTYPE = numpy.dtype([
+		("scan_id", "<i8"),
+		("time_segment", "<i4"),
+		("retention_time", "<f8"),
+		("ms_level", "<i1"),
+		("ms_scan_type", "<i4"),
+		("ion_polarity", "S2"),
+		("ionization_mode", "<i4"),
+		("tic", "<f8"),
+		("base_peak_mz", "<f8"),
+		("base_peak_intensity", "<f8"),
+		("collision_energy", "<f8"),
+		("fragmentor_voltage", "<f8"),
+		("compensation_field", "<f8"),
+		("dispersion_field", "<f8"),
+		("mz_of_interest", "<f8"),
+		("parent_scan_id", "<i8"),
+		("precursor_charge", "<i4"),
+		("precursor_intensity", "<f8"),
+		])
+
+
+def _resizable(group: h5py.Group, name: str, dtype, chunk_size: int, compression: Optional[str]) -> h5py.Dataset:
+	return group.create_dataset(
+			name,
+			shape=(0, ),
+			maxshape=(None, ),
+			dtype=dtype,
+			chunks=(chunk_size, ),
+			compression=compression,
+			shuffle=compression is not None,
+			)
+
+
+def _append(dataset: h5py.Dataset, values: numpy.ndarray) -> None:
+	if len(values):
+		start = dataset.shape[0]
+		dataset.resize((start + len(values), ))
+		dataset[start:] = values
+
+
+def _dataset_name(name: str) -> str:
+	# HDF5 uses '/' as the path separator
+	return name.replace('/', '_') or '_'
+
+
+def _write_xy(group: h5py.Group, name: str, x_data, y_data, compression: Optional[str]) -> h5py.Group:
+	xy_group = group.create_group(_dataset_name(name))
+	xy_group.attrs["name"] = name
+	xy_group.create_dataset('x', data=numpy.asarray(x_data, dtype="<f8"), compression=compression)
+	xy_group.create_dataset('y', data=numpy.asarray(y_data, dtype="<f8"), compression=compression)
+	return xy_group
+
+
+def write_hdf5(
+		reader: DataReader,
+		filename: PathLike,
+		chunk_size: int = 65536,
+		compression: Optional[str] = "gzip",
+		) -> pathlib.Path:
+	"""
+	Export the datafile opened by ``reader`` to a HDF5 file.
+
+	Scans are buffered until ``chunk_size`` values have been read, and then appended to the file,
+	so memory usage does not depend on the length of the run.
+
+	:param reader:
+	:param filename: The file to write the HDF5 data to.
+	:param chunk_size: The number of values in each chunk of the ``/spectra`` datasets.
+	:param compression: The compression filter to use, or :py:obj:`None` to disable compression.
+
+	:returns: The filename of the HDF5 file.
+	"""
+
+	filename = prepare_filepath(filename)
+	total_scans = reader.total_scans
+
+	with h5py.File(filename, 'w') as h5file:
+		h5file.attrs["datafile_name"] = str(reader.datafile_name)
+		h5file.attrs["acquisition_time"] = reader.acquisition_time.isoformat()
+
+		spectra = h5file.create_group("spectra")
+		mz_dataset = _resizable(spectra, "mz", "<f8", chunk_size, compression)
+		intensity_dataset = _resizable(spectra, "intensity", "<f8", chunk_size, compression)
+		offsets = numpy.zeros(total_scans + 1, dtype="<i8")
+		scans = numpy.zeros(total_scans, dtype=SCAN_DTYPE)
+
+		mz_buffer: List[numpy.ndarray] = []
+		intensity_buffer: List[numpy.ndarray] = []
+		buffered = 0
+
+		for scan_no in range(total_scans):
+			scan_record = reader.get_scan_record(scan_no)
+			spectrum = reader.get_spectrum_by_scan(scan_no)
+
+			mz_buffer.append(numpy.asarray(spectrum.x_data, dtype="<f8"))
+			intensity_buffer.append(numpy.asarray(spectrum.y_data, dtype="<f8"))
+			buffered += len(mz_buffer[-1])
+			offsets[scan_no + 1] = offsets[scan_no] + len(mz_buffer[-1])
+
+			try:
+				precursor_charge = spectrum.precursor_charge
+				precursor_intensity = spectrum.precursor_intensity
+			except NotMS2Error:
+				precursor_charge, precursor_intensity = 0, numpy.nan
+
+			scans[scan_no] = (
+					scan_record.scan_id,
+					scan_record.time_segment,
+					scan_record.retention_time,
+					int(scan_record.ms_level),
+					int(scan_record.ms_scan_type),
+					(scan_record.ion_polarity or '').encode("UTF-8"),
+					int(scan_record.ionization_mode),
+					scan_record.tic,
+					scan_record.base_peak_mz,
+					scan_record.base_peak_intensity,
+					scan_record.collision_energy,
+					scan_record.fragmentor_voltage,
+					scan_record.compensation_field,
+					scan_record.dispersion_field,
+					scan_record.mz_of_interest,
+					spectrum.parent_scan_id,
+					precursor_charge,
+					precursor_intensity,
+					)
+
+			if buffered >= chunk_size:
+				_append(mz_dataset, numpy.concatenate(mz_buffer))
+				_append(intensity_dataset, numpy.concatenate(intensity_buffer))
+				mz_buffer, intensity_buffer, buffered = [], [], 0
+
+		if mz_buffer:
+			_append(mz_dataset, numpy.concatenate(mz_buffer))
+			_append(intensity_dataset, numpy.concatenate(intensity_buffer))
+
+		spectra.create_dataset("offsets", data=offsets)
+		h5file.create_dataset("scans", data=scans, compression=compression)
+
+		tic = reader.get_tic()
+		_write_xy(h5file, "tic", tic.x_data, tic.y_data, compression)
+
+		curves_group = h5file.create_group("instrument_curves")
+		devices = reader.get_devices()
+		name_counts = Counter(device.display_name for device in devices)
+
+		for device in devices:
+			group_name = device.display_name
+			if name_counts[group_name] > 1:
+				group_name = f"{group_name}_{device.ordinal_number}"
+
+			for data_type in (StoredDataType.Chromatograms, StoredDataType.InstrumentCurves):
+				if not device.stored_data_type & data_type:
+					continue
+
+				signals = reader.get_signal_listing(
+						device_name=device.display_name,
+						device_type=device.type_,
+						data_type=data_type,
+						ordinal=device.ordinal_number,
+						)
+
+				for signal in signals:
+					device_group = curves_group.require_group(_dataset_name(group_name))
+					device_group.attrs["name"] = device.display_name
+					device_group.attrs["device_type"] = int(device.type_)
+					device_group.attrs["ordinal_number"] = device.ordinal_number
+
+					curve = signal.get_instrument_curve()
+					signal_group = _write_xy(device_group, signal.signal_name, curve.x_data, curve.y_data, compression)
+					signal_group.attrs["data_type"] = int(data_type)
+					signal_group.attrs["y_unit"] = str(curve.get_y_axis_info()[1])
+
+		actuals_group = h5file.create_group("actuals")
+
+		if reader.has_actuals:
+			for name, actual in reader.get_ms_actuals().items():
+				_write_xy(actuals_group, name, actual.x_array, actual.y_array, compression)
+
+	return filename
+
+
+def get_spectrum(h5file: h5py.File, scan_no: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+	"""
+	Returns the |mz| and intensity values for the given scan from a HDF5 file written by :func:`~.write_hdf5`.
+
+	Only the chunks containing the scan are read from the file.
+
+	:param h5file: The open HDF5 file.
+	:param scan_no: The scan number.
+	"""
+
+	offsets = h5file["spectra/offsets"]
+
+	if scan_no < 0:
+		raise ValueError("scan_no must be greater than or equal to 0")
+	elif scan_no >= offsets.shape[0] - 1:
+		raise ValueError("scan_no out of range")
+
+	start, stop = offsets[scan_no:scan_no + 2]
+
+	return h5file["spectra/mz"][start:stop], h5file["spectra/intensity"][start:stop]
+
+
+def find_scans(h5file: h5py.File, start_time: float, end_time: float) -> numpy.ndarray:
+	"""
+	Returns the numbers of the scans with retention times between ``start_time`` and ``end_time`` (inclusive).
+
+	:param h5file: The open HDF5 file, written by :func:`~.write_hdf5`.
+	:param start_time: The start of the time range, in minutes.
+	:param end_time: The end of the time range, in minutes.
+	"""
+
+	retention_times = h5file["scans"].fields("retention_time")[:]
+	return numpy.flatnonzero((retention_times >= start_time) & (retention_times <= end_time))
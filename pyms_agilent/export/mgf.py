@@ -0,0 +1,218 @@
+#  !/usr/bin/env python
+#
+#  mgf.py
+r"""
+Export the MS\ :superscript:`2` spectra from ``.d`` datafiles to Mascot Generic Format (MGF).
+
+Only the scan records are read for MS\ :superscript:`1` scans, so their spectra are never loaded.
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import bisect
+import os
+from operator import attrgetter
+from typing import Iterator, List, NamedTuple, Optional
+
+# 3rd party
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.enums import MSLevel
+from pyms_agilent.exceptions import NotMS2Error
+from pyms_agilent.metadata import prepare_filepath
+from pyms_agilent.mhdac.scan_record import MSScanRecord
+from pyms_agilent.mhdac.spectrum import SpecData
+
+__all__ = ["Precursor", "PrecursorIndex", "write_mgf"]
+
+
+class Precursor(NamedTuple):
+	r"""
+	An entry in a :class:`~.PrecursorIndex`, representing a single MS\ :superscript:`2` spectrum.
+	"""
+
+	#: The |mz| of the precursor ion.
+	mz: float
+
+	#: The charge of the precursor ion, or ``0`` if unknown.
+	charge: int
+
+	#: The retention time of the scan, in minutes.
+	retention_time: float
+
+	#: The scan number.
+	scan_no: int
+
+	#: The scan ID.
+	scan_id: int
+
+	#: The byte offset of the ``BEGIN IONS`` line for the spectrum in the MGF file.
+	offset: int
+
+
+class PrecursorIndex:
+	r"""
+	Index of MS\ :superscript:`2` spectra by the |mz| of their precursor ion.
+
+	Returned by :func:`~.write_mgf`.
+	"""
+
+	def __init__(self):
+		self._mz: List[float] = []
+		self._precursors: List[Precursor] = []
+		self._sorted = True
+
+	def add(self, precursor: Precursor) -> None:
+		"""
+		Add a spectrum to the index.
+
+		The index is sorted once, when it is next searched or iterated over,
+		so adding spectra one at a time is not quadratic in the number of spectra.
+
+		:param precursor:
+		"""
+
+		self._precursors.append(precursor)
+		self._sorted = False
+
+	def _sort(self) -> None:
+		if not self._sorted:
+			# The sort is stable, so spectra with the same precursor m/z stay in the order they were added.
+			self._precursors.sort(key=attrgetter("mz"))
+			self._mz = [precursor.mz for precursor in self._precursors]
+			self._sorted = True
+
+	def find(self, mz: float, tolerance: float = 0.01) -> List[Precursor]:
+		"""
+		Returns the spectra whose precursor |mz| is within ``tolerance`` of ``mz``, in order of |mz|.
+
+		:param mz:
+		:param tolerance:
+		"""
+
+		self._sort()
+		start = bisect.bisect_left(self._mz, mz - tolerance)
+		stop = bisect.bisect_right(self._mz, mz + tolerance)
+		return self._precursors[start:stop]
+
+	def __iter__(self) -> Iterator[Precursor]:
+		self._sort()
+		return iter(self._precursors)
+
+	def __len__(self) -> int:
+		return len(self._precursors)
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({len(self)} spectra)>"
+
+
+def _precursor_mz(spectrum: SpecData, scan_record: MSScanRecord) -> float:
+	if spectrum.mz_of_interest:
+		return spectrum.mz_of_interest[0].start
+	return scan_record.mz_of_interest
+
+
+def _format_ions(
+		title: str,
+		spectrum: SpecData,
+		scan_record: MSScanRecord,
+		precursor_mz: float,
+		charge: int,
+		) -> str:
+
+	try:
+		precursor_intensity: Optional[float] = spectrum.precursor_intensity
+	except NotMS2Error:
+		precursor_intensity = None
+
+	lines = ["BEGIN IONS", f"TITLE={title}"]
+
+	if precursor_intensity:
+		lines.append(f"PEPMASS={precursor_mz} {precursor_intensity}")
+	else:
+		lines.append(f"PEPMASS={precursor_mz}")
+
+	if charge:
+		lines.append(f"CHARGE={charge}{'-' if scan_record.ion_polarity == '-' else '+'}")
+
+	lines.append(f"RTINSECONDS={scan_record.retention_time * 60}")
+	lines.append(f"SCANS={scan_record.scan_id}")
+
+	for mz, intensity in zip(spectrum.x_data, spectrum.y_data):
+		lines.append(f"{float(mz)} {float(intensity)}")
+
+	lines.append("END IONS\n\n")
+	return '\n'.join(lines)
+
+
+def write_mgf(reader: DataReader, filename: PathLike) -> PrecursorIndex:
+	r"""
+	Export the MS\ :superscript:`2` spectra from the datafile opened by ``reader`` to MGF.
+
+	The scan record of each scan is checked first, and the spectrum is only read for
+	MS\ :superscript:`2` scans.
+
+	:param reader:
+	:param filename: The file to write the MGF data to.
+
+	:returns: An index of the exported spectra by precursor |mz|.
+	"""
+
+	filename = prepare_filepath(filename)
+	run_name = reader.datafile_name.stem
+	index = PrecursorIndex()
+
+	with open(filename, "wb") as fp:
+		try:
+			for scan_no in range(reader.total_scans):
+				scan_record = reader.get_scan_record(scan_no)
+				if scan_record.ms_level != MSLevel.MSMS:
+					continue
+
+				spectrum = reader.get_spectrum_by_scan(scan_no)
+				precursor_mz = _precursor_mz(spectrum, scan_record)
+
+				try:
+					charge = int(spectrum.precursor_charge)
+				except NotMS2Error:
+					charge = 0
+
+				offset = fp.tell()
+				title = f"{run_name} scanId={scan_record.scan_id}"
+				fp.write(_format_ions(title, spectrum, scan_record, precursor_mz, charge).encode("UTF-8"))
+
+				index.add(
+						Precursor(
+								mz=precursor_mz,
+								charge=charge,
+								retention_time=scan_record.retention_time,
+								scan_no=scan_no,
+								scan_id=scan_record.scan_id,
+								offset=offset,
+								)
+						)
+		except BaseException:
+			fp.close()
+			os.unlink(filename)
+			raise
+
+	return index
@@ -0,0 +1,548 @@
+#  !/usr/bin/env python
+#
+#  mzml.py
+"""
+Export ``.d`` datafiles to `mzML <https://www.psidev.info/mzML>`_.
+
+The mzML file is written one spectrum at a time, with the binary arrays encoded
+as base64 (optionally zlib-compressed) 64-bit floats. The file is wrapped in an
+``<indexedmzML>`` element, with the byte offset of each spectrum and chromatogram
+given at the end of the file so other tools can seek directly to a scan.
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import array
+import base64
+import hashlib
+import os
+import pathlib
+import re
+import zlib
+from datetime import datetime
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import quoteattr
+
+# 3rd party
+import numpy  # type: ignore
+from domdf_python_tools.typing import PathLike
+
+# this package
+import pyms_agilent
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.enums import MSLevel, MSScanType, MSStorageMode
+from pyms_agilent.exceptions import NotMS2Error
+from pyms_agilent.metadata import prepare_filepath
+from pyms_agilent.mhdac.scan_record import MSScanRecord
+from pyms_agilent.mhdac.spectrum import SpecData
+
+__all__ = ["MzMLWriter", "write_mzml", "native_id"]
+
+_cv_list = (
+		'<cvList count="2">\n'
+		'<cv id="MS" fullName="Proteomics Standards Initiative Mass Spectrometry Ontology" '
+		'URI="https://raw.githubusercontent.com/HUPO-PSI/psi-ms-CV/master/psi-ms.obo"/>\n'
+		'<cv id="UO" fullName="Unit Ontology" URI="http://ontologies.berkeleybop.org/uo.obo"/>\n'
+		"</cvList>\n"
+		)
+
+#: Spectrum type CV terms for MS\ :superscript:`n` scan types.
+_msn_spectrum_types = [
+		(MSScanType.ProductIon, ("MS:1000580", "MSn spectrum")),
+		(MSScanType.PrecursorIon, ("MS:1000341", "precursor ion spectrum")),
+		(MSScanType.NeutralLoss, ("MS:1000326", "constant neutral loss spectrum")),
+		(MSScanType.NeutralGain, ("MS:1000325", "constant neutral gain spectrum")),
+		(MSScanType.MultipleReaction, ("MS:1000583", "SRM spectrum")),
+		]
+
+_polarities = {
+		'+': ("MS:1000130", "positive scan"),
+		'-': ("MS:1000129", "negative scan"),
+		}
+
+
+def native_id(scan_id: int) -> str:
+	"""
+	Returns the mzML ``nativeID`` for the scan with the given ID,
+	in the Agilent MassHunter nativeID format (``MS:1001508``).
+
+	:param scan_id:
+	"""  # noqa: D400
+
+	return f"scanId={scan_id}"
+
+
+def _xml_id(value: str) -> str:
+	# run and spectrum IDs must be valid xsd:ID values
+	value = re.sub(r"[^\w.-]", '_', value)
+	if not value or not (value[0].isalpha() or value[0] == '_'):
+		value = '_' + value
+	return value
+
+
+def _cv_param(accession: str, name: str, value: object = '', unit: Optional[Tuple[str, str]] = None) -> str:
+	cv_ref = accession.split(':')[0]
+	param = f'<cvParam cvRef="{cv_ref}" accession="{accession}" name="{name}" value={quoteattr(str(value))}'
+
+	if unit is not None:
+		unit_accession, unit_name = unit
+		unit_cv_ref = unit_accession.split(':')[0]
+		param += f' unitCvRef="{unit_cv_ref}" unitAccession="{unit_accession}" unitName="{unit_name}"'
+
+	return param + "/>\n"
+
+
+_minute = ("UO:0000031", "minute")
+_mz = ("MS:1000040", "m/z")
+_counts = ("MS:1000131", "number of detector counts")
+_electronvolt = ("UO:0000266", "electronvolt")
+
+
+def _spectrum_type(spectrum: SpecData) -> Tuple[str, str]:
+	ms_scan_type = MSScanType(spectrum.ms_scan_type)
+
+	if spectrum.ms_level == MSLevel.MSMS:
+		for scan_type, term in _msn_spectrum_types:
+			if ms_scan_type & scan_type:
+				return term
+		return "MS:1000580", "MSn spectrum"
+
+	if ms_scan_type & MSScanType.SelectedIon:
+		return "MS:1000582", "SIM spectrum"
+
+	return "MS:1000579", "MS1 spectrum"
+
+
+def _precursor(spectrum: SpecData) -> Tuple[Optional[int], Optional[float]]:
+	try:
+		return spectrum.precursor_charge, spectrum.precursor_intensity
+	except NotMS2Error:
+		return None, None
+
+
+class MzMLWriter:
+	"""
+	Streaming writer for indexed mzML files.
+
+	Each spectrum is encoded and written to disk as soon as it is added;
+	only its byte offset is kept in memory for the index.
+
+	:param filename: The file to write the mzML data to.
+	:param compression: Whether to compress the binary arrays with zlib.
+
+	:meth:`~.MzMLWriter.begin` must be called before any spectra or chromatograms are added,
+	and the file is only complete once :meth:`~.MzMLWriter.close` has been called.
+	The writer can also be used as a context manager, in which case it is closed on exit.
+	If an exception is raised within the ``with`` block the incomplete file is removed.
+	"""
+
+	def __init__(self, filename: PathLike, compression: bool = True):
+		self.filename: pathlib.Path = prepare_filepath(filename)
+		self.compression: bool = bool(compression)
+
+		self._fp: Optional[BinaryIO] = open(self.filename, "wb")  # noqa: SIM115
+		self._sha1 = hashlib.sha1()
+
+		self._spectrum_count = 0
+		self._chromatogram_count = 0
+		self._spectrum_ids = array.array('q')
+		self._spectrum_offsets = array.array('q')
+		self._chromatogram_ids: List[str] = []
+		self._chromatogram_offsets = array.array('q')
+
+		# None -> not begun, "spectra", "chromatograms", "done"
+		self._section: Optional[str] = None
+
+	def _write(self, text: str) -> None:
+		if self._fp is None:
+			raise ValueError("I/O operation on closed writer.")
+
+		data = text.encode("UTF-8")
+		self._sha1.update(data)
+		self._fp.write(data)
+
+	def _encode_array(self, values: Iterable[float]) -> str:
+		data = numpy.ascontiguousarray(values, dtype="<f8").tobytes()
+		if self.compression:
+			data = zlib.compress(data)
+		return base64.b64encode(data).decode("ASCII")
+
+	def _binary_data_array(self, values: Iterable[float], array_type: Tuple[str, str], unit: Tuple[str, str]) -> str:
+		encoded = self._encode_array(values)
+
+		if self.compression:
+			compression = _cv_param("MS:1000574", "zlib compression")
+		else:
+			compression = _cv_param("MS:1000576", "no compression")
+
+		return ''.join([
+				f'<binaryDataArray encodedLength="{len(encoded)}">\n',
+				_cv_param("MS:1000523", "64-bit float"),
+				compression,
+				_cv_param(*array_type, unit=unit),
+				f"<binary>{encoded}</binary>\n",
+				"</binaryDataArray>\n",
+				])
+
+	def begin(
+			self,
+			run_id: str,
+			spectrum_count: int,
+			chromatogram_count: int = 0,
+			source_file: Optional[pathlib.PurePath] = None,
+			start_time: Optional[datetime] = None,
+			has_msn: bool = True,
+			) -> None:
+		r"""
+		Write the header of the mzML file, up to the start of the list of spectra.
+
+		:param run_id: The identifier for the run. Usually the name of the ``.d`` datafile without the suffix.
+		:param spectrum_count: The number of spectra that will be written.
+		:param chromatogram_count: The number of chromatograms that will be written.
+		:param source_file: The ``.d`` datafile the data was read from.
+		:param start_time: The time the acquisition started.
+		:param has_msn: Whether the file will contain MS\ :superscript:`n` spectra.
+		"""
+
+		if self._section is not None:
+			raise ValueError("The mzML header has already been written.")
+
+		self._spectrum_count = int(spectrum_count)
+		self._chromatogram_count = int(chromatogram_count)
+
+		self._write('<?xml version="1.0" encoding="utf-8"?>\n')
+		self._write(
+				'<indexedmzML xmlns="http://psi.hupo.org/ms/mzml" '
+				'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+				'xsi:schemaLocation="http://psi.hupo.org/ms/mzml '
+				'http://psidev.info/files/ms/mzML/xsd/mzML1.1.2_idx.xsd">\n'
+				)
+		self._write(
+				'<mzML xmlns="http://psi.hupo.org/ms/mzml" '
+				'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+				'xsi:schemaLocation="http://psi.hupo.org/ms/mzml '
+				'http://psidev.info/files/ms/mzML/xsd/mzML1.1.0.xsd" '
+				f'id={quoteattr(_xml_id(run_id))} version="1.1.0">\n'
+				)
+		self._write(_cv_list)
+
+		self._write("<fileDescription>\n<fileContent>\n")
+		self._write(_cv_param("MS:1000579", "MS1 spectrum"))
+		if has_msn:
+			self._write(_cv_param("MS:1000580", "MSn spectrum"))
+		self._write("</fileContent>\n")
+
+		if source_file is not None:
+			if source_file.is_absolute():
+				location = source_file.parent.as_uri()
+			else:
+				location = "file:///" + source_file.parent.as_posix()
+
+			self._write('<sourceFileList count="1">\n')
+			self._write(f'<sourceFile id="RAW1" name={quoteattr(source_file.name)} location={quoteattr(location)}>\n')
+			self._write(_cv_param("MS:1001508", "Agilent MassHunter nativeID format"))
+			self._write(_cv_param("MS:1001509", "Agilent MassHunter format"))
+			self._write("</sourceFile>\n</sourceFileList>\n")
+
+		self._write("</fileDescription>\n")
+
+		self._write('<softwareList count="1">\n')
+		self._write(f'<software id="pyms_agilent" version="{pyms_agilent.__version__}">\n')
+		self._write(_cv_param("MS:1000799", "custom unreleased software tool", "pyms-agilent"))
+		self._write("</software>\n</softwareList>\n")
+
+		self._write('<instrumentConfigurationList count="1">\n<instrumentConfiguration id="IC1">\n')
+		self._write(_cv_param("MS:1000490", "Agilent instrument model"))
+		self._write("</instrumentConfiguration>\n</instrumentConfigurationList>\n")
+
+		self._write('<dataProcessingList count="1">\n<dataProcessing id="pyms_agilent_conversion">\n')
+		self._write('<processingMethod order="0" softwareRef="pyms_agilent">\n')
+		self._write(_cv_param("MS:1000544", "Conversion to mzML"))
+		self._write("</processingMethod>\n</dataProcessing>\n</dataProcessingList>\n")
+
+		run_attributes = f'id={quoteattr(_xml_id(run_id))} defaultInstrumentConfigurationRef="IC1"'
+		if source_file is not None:
+			run_attributes += ' defaultSourceFileRef="RAW1"'
+		if start_time is not None:
+			run_attributes += f' startTimeStamp="{start_time.isoformat()}"'
+
+		self._write(f"<run {run_attributes}>\n")
+		self._write(
+				f'<spectrumList count="{self._spectrum_count}" '
+				'defaultDataProcessingRef="pyms_agilent_conversion">\n'
+				)
+
+		self._section = "spectra"
+
+	def add_spectrum(self, spectrum: SpecData, scan_record: Optional[MSScanRecord] = None) -> None:
+		"""
+		Write a spectrum to the file.
+
+		:param spectrum:
+		:param scan_record: The scan record for the spectrum, which provides the retention time,
+			the total ion current and the base peak.
+		"""
+
+		if self._fp is None:
+			raise ValueError("I/O operation on closed writer.")
+		elif self._section != "spectra":
+			raise ValueError("Spectra must be added after 'begin()' and before any chromatograms.")
+
+		if len(self._spectrum_offsets) >= self._spectrum_count:
+			raise ValueError(f"Only {self._spectrum_count} spectra were declared in 'begin()'.")
+
+		x_data = spectrum.x_data
+		y_data = spectrum.y_data
+		index = len(self._spectrum_offsets)
+		spectrum_id = native_id(spectrum.scan_id)
+
+		if scan_record is not None:
+			retention_time = scan_record.retention_time
+		else:
+			retention_time = spectrum.acquired_time_ranges[0].start
+
+		parts = [
+				f'<spectrum index="{index}" id="{spectrum_id}" defaultArrayLength="{len(x_data)}">\n',
+				_cv_param(*_spectrum_type(spectrum)),
+				_cv_param("MS:1000511", "ms level", max(int(spectrum.ms_level), 1)),
+				]
+
+		if spectrum.ionization_polarity in _polarities:
+			parts.append(_cv_param(*_polarities[spectrum.ionization_polarity]))
+
+		if spectrum.ms_storage_mode == MSStorageMode.PeakDetectedSpectrum:
+			parts.append(_cv_param("MS:1000127", "centroid spectrum"))
+		else:
+			parts.append(_cv_param("MS:1000128", "profile spectrum"))
+
+		if scan_record is not None:
+			parts.append(_cv_param("MS:1000285", "total ion current", scan_record.tic))
+			parts.append(_cv_param("MS:1000504", "base peak m/z", scan_record.base_peak_mz, unit=_mz))
+			parts.append(
+					_cv_param("MS:1000505", "base peak intensity", scan_record.base_peak_intensity, unit=_counts)
+					)
+
+		if len(x_data):
+			parts.append(_cv_param("MS:1000528", "lowest observed m/z", min(x_data), unit=_mz))
+			parts.append(_cv_param("MS:1000527", "highest observed m/z", max(x_data), unit=_mz))
+
+		parts.append('<scanList count="1">\n')
+		parts.append(_cv_param("MS:1000795", "no combination"))
+		parts.append("<scan>\n")
+		parts.append(_cv_param("MS:1000016", "scan start time", retention_time, unit=_minute))
+
+		if spectrum.measured_mass_range is not None:
+			parts.append('<scanWindowList count="1">\n<scanWindow>\n')
+			parts.append(
+					_cv_param("MS:1000501", "scan window lower limit", spectrum.measured_mass_range.start, unit=_mz)
+					)
+			parts.append(
+					_cv_param("MS:1000500", "scan window upper limit", spectrum.measured_mass_range.stop, unit=_mz)
+					)
+			parts.append("</scanWindow>\n</scanWindowList>\n")
+
+		parts.append("</scan>\n</scanList>\n")
+
+		precursor_charge, precursor_intensity = _precursor(spectrum)
+
+		if spectrum.ms_level == MSLevel.MSMS:
+			if spectrum.mz_of_interest:
+				precursor_mz: Optional[float] = spectrum.mz_of_interest[0].start
+			elif scan_record is not None:
+				precursor_mz = scan_record.mz_of_interest
+			else:
+				precursor_mz = None
+
+			if spectrum.parent_scan_id:
+				parts.append(f'<precursorList count="1">\n<precursor spectrumRef="{native_id(spectrum.parent_scan_id)}">\n')
+			else:
+				parts.append('<precursorList count="1">\n<precursor>\n')
+
+			if precursor_mz is not None:
+				parts.append("<isolationWindow>\n")
+				parts.append(_cv_param("MS:1000827", "isolation window target m/z", precursor_mz, unit=_mz))
+				parts.append("</isolationWindow>\n")
+				parts.append('<selectedIonList count="1">\n<selectedIon>\n')
+				parts.append(_cv_param("MS:1000744", "selected ion m/z", precursor_mz, unit=_mz))
+				if precursor_charge:
+					parts.append(_cv_param("MS:1000041", "charge state", precursor_charge))
+				if precursor_intensity is not None:
+					parts.append(_cv_param("MS:1000042", "peak intensity", precursor_intensity, unit=_counts))
+				parts.append("</selectedIon>\n</selectedIonList>\n")
+
+			parts.append("<activation>\n")
+			parts.append(_cv_param("MS:1000133", "collision-induced dissociation"))
+			parts.append(_cv_param("MS:1000045", "collision energy", spectrum.collision_energy, unit=_electronvolt))
+			parts.append("</activation>\n")
+			parts.append("</precursor>\n</precursorList>\n")
+
+		parts.append('<binaryDataArrayList count="2">\n')
+		parts.append(self._binary_data_array(x_data, ("MS:1000514", "m/z array"), _mz))
+		parts.append(self._binary_data_array(y_data, ("MS:1000515", "intensity array"), _counts))
+		parts.append("</binaryDataArrayList>\n</spectrum>\n")
+
+		self._spectrum_ids.append(int(spectrum.scan_id))
+		self._spectrum_offsets.append(self._fp.tell())  # type: ignore
+		self._write(''.join(parts))
+
+	def _end_spectra(self) -> None:
+		if len(self._spectrum_offsets) != self._spectrum_count:
+			raise ValueError(
+					f"{self._spectrum_count} spectra were declared in 'begin()', "
+					f"but {len(self._spectrum_offsets)} were written."
+					)
+
+		self._write("</spectrumList>\n")
+
+		if self._chromatogram_count:
+			self._write(
+					f'<chromatogramList count="{self._chromatogram_count}" '
+					'defaultDataProcessingRef="pyms_agilent_conversion">\n'
+					)
+
+		self._section = "chromatograms"
+
+	def add_tic(self, x_data: Iterable[float], y_data: Iterable[float]) -> None:
+		"""
+		Write the total ion chromatogram to the file.
+
+		:param x_data: The retention times, in minutes.
+		:param y_data: The total ion current at each retention time.
+		"""
+
+		if self._fp is None:
+			raise ValueError("I/O operation on closed writer.")
+		elif self._section == "spectra":
+			self._end_spectra()
+		elif self._section != "chromatograms":
+			raise ValueError("Chromatograms must be added after 'begin()'.")
+
+		if len(self._chromatogram_offsets) >= self._chromatogram_count:
+			raise ValueError(f"Only {self._chromatogram_count} chromatograms were declared in 'begin()'.")
+
+		x_data = list(x_data)
+		index = len(self._chromatogram_offsets)
+
+		self._chromatogram_ids.append("TIC")
+		self._chromatogram_offsets.append(self._fp.tell())  # type: ignore
+		self._write(
+				''.join([
+						f'<chromatogram index="{index}" id="TIC" defaultArrayLength="{len(x_data)}">\n',
+						_cv_param("MS:1000235", "total ion current chromatogram"),
+						'<binaryDataArrayList count="2">\n',
+						self._binary_data_array(x_data, ("MS:1000595", "time array"), _minute),
+						self._binary_data_array(y_data, ("MS:1000515", "intensity array"), _counts),
+						"</binaryDataArrayList>\n</chromatogram>\n",
+						])
+				)
+
+	def close(self) -> None:
+		"""
+		Write the index and close the file.
+		"""
+
+		if self._fp is None:
+			return
+
+		if self._section is None:
+			raise ValueError("'begin()' must be called before the file is closed.")
+
+		if self._section == "spectra":
+			self._end_spectra()
+
+		if len(self._chromatogram_offsets) != self._chromatogram_count:
+			raise ValueError(
+					f"{self._chromatogram_count} chromatograms were declared in 'begin()', "
+					f"but {len(self._chromatogram_offsets)} were written."
+					)
+
+		if self._chromatogram_count:
+			self._write("</chromatogramList>\n")
+
+		self._write("</run>\n</mzML>\n")
+
+		index_list_offset = self._fp.tell()
+		self._write(f'<indexList count="{2 if self._chromatogram_count else 1}">\n')
+		self._write('<index name="spectrum">\n')
+		for scan_id, offset in zip(self._spectrum_ids, self._spectrum_offsets):
+			self._write(f'<offset idRef="{native_id(scan_id)}">{offset}</offset>\n')
+		self._write("</index>\n")
+
+		if self._chromatogram_count:
+			self._write('<index name="chromatogram">\n')
+			for chromatogram_id, offset in zip(self._chromatogram_ids, self._chromatogram_offsets):
+				self._write(f'<offset idRef={quoteattr(chromatogram_id)}>{offset}</offset>\n')
+			self._write("</index>\n")
+
+		self._write("</indexList>\n")
+		self._write(f"<indexListOffset>{index_list_offset}</indexListOffset>\n")
+		self._write("<fileChecksum>")
+
+		# The checksum covers everything up to and including the opening <fileChecksum> tag.
+		self._fp.write(f"{self._sha1.hexdigest()}</fileChecksum>\n</indexedmzML>\n".encode("UTF-8"))
+		self._fp.close()
+		self._fp = None
+		self._section = "done"
+
+	def __enter__(self) -> "MzMLWriter":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+		if exc_type is None:
+			self.close()
+		elif self._fp is not None:
+			self._fp.close()
+			self._fp = None
+			os.unlink(self.filename)
+
+
+def write_mzml(reader: DataReader, filename: PathLike, compression: bool = True) -> pathlib.Path:
+	"""
+	Export the datafile opened by ``reader`` to mzML.
+
+	All scans are written in order, followed by the total ion chromatogram.
+
+	:param reader:
+	:param filename: The file to write the mzML data to.
+	:param compression: Whether to compress the binary arrays with zlib.
+
+	:returns: The filename of the mzML file.
+	"""
+
+	total_scans = reader.total_scans
+	datafile_name = reader.datafile_name
+
+	with MzMLWriter(filename, compression=compression) as writer:
+		writer.begin(
+				run_id=datafile_name.stem or writer.filename.stem,
+				spectrum_count=total_scans,
+				chromatogram_count=1,
+				source_file=datafile_name,
+				start_time=reader.acquisition_time,
+				has_msn=bool(MSScanType(reader.scan_types) & MSScanType.AllMSN),
+				)
+
+		for scan_no in range(total_scans):
+			writer.add_spectrum(reader.get_spectrum_by_scan(scan_no), reader.get_scan_record(scan_no))
+
+		tic = reader.get_tic()
+		writer.add_tic(tic.x_data, tic.y_data)
+
+	return writer.filename
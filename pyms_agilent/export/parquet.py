@@ -0,0 +1,190 @@
+#  !/usr/bin/env python
+#
+#  parquet.py
+"""
+Export ``.d`` datafiles to Apache Arrow record batches and Parquet files.
+
+See `Apache Arrow <https://arrow.apache.org/>`_ and `Parquet <https://parquet.apache.org/>`_.
+
+Each scan becomes one row, with the metadata from the scan record and spectrum as columns,
+and the |mz| and intensity values as ``list<float64>`` columns.
+
+.. extras-require:: parquet
+	:pyproject:
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import pathlib
+from typing import Any, Dict, Iterator, List, Optional
+
+# 3rd party
+import pyarrow  # type: ignore
+import pyarrow.parquet  # type: ignore
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.exceptions import NotMS2Error
+from pyms_agilent.metadata import prepare_filepath
+
+__all__ = ["SCAN_SCHEMA", "iter_record_batches", "write_parquet"]
+
+#: The schema of the record batches produced by :func:`~.iter_record_batches`.
+SCAN_SCHEMA = pyarrow.schema([
+		("scan_no", pyarrow.int64()),
+		("scan_id", pyarrow.int64()),
+		("time_segment", pyarrow.int32()),
+		("retention_time", pyarrow.float64()),
+		("ms_level", pyarrow.int8()),
+		("ms_scan_type", pyarrow.int32()),
+		("ion_polarity", pyarrow.string()),
+		("ionization_mode", pyarrow.int32()),
+		("tic", pyarrow.float64()),
+		("base_peak_mz", pyarrow.float64()),
+		("base_peak_intensity", pyarrow.float64()),
+		("collision_energy", pyarrow.float64()),
+		("is_collision_energy_dynamic", pyarrow.bool_()),
+		("fragmentor_voltage", pyarrow.float64()),
+		("is_fragmentor_voltage_dynamic", pyarrow.bool_()),
+		("compensation_field", pyarrow.float64()),
+		("dispersion_field", pyarrow.float64()),
+		("mz_of_interest", pyarrow.float64()),
+		("parent_scan_id", pyarrow.int64()),
+		("precursor_charge", pyarrow.int32()),
+		("precursor_intensity", pyarrow.float64()),
+		("mz", pyarrow.list_(pyarrow.float64())),
+		("intensity", pyarrow.list_(pyarrow.float64())),
+		])
+
+_scan_record_columns = [
+		"scan_id",
+		"time_segment",
+		"retention_time",
+		"ion_polarity",
+		"tic",
+		"base_peak_mz",
+		"base_peak_intensity",
+		"collision_energy",
+		"is_collision_energy_dynamic",
+		"fragmentor_voltage",
+		"is_fragmentor_voltage_dynamic",
+		"compensation_field",
+		"dispersion_field",
+		"mz_of_interest",
+		]
+
+_enum_columns = ["ms_level", "ms_scan_type", "ionization_mode"]
+
+
+def _new_columns() -> Dict[str, List[Any]]:
+	return {name: [] for name in SCAN_SCHEMA.names}
+
+
+def _make_batch(columns: Dict[str, List[Any]]) -> pyarrow.RecordBatch:
+	return pyarrow.RecordBatch.from_pydict(columns, schema=SCAN_SCHEMA)
+
+
+def iter_record_batches(reader: DataReader, batch_size: int = 1024) -> Iterator[pyarrow.RecordBatch]:
+	"""
+	Iterate over the scans in the datafile opened by ``reader`` as Arrow record batches.
+
+	Each record batch contains at most ``batch_size`` scans, all from the same MS time segment.
+	A new batch is started whenever the time segment changes.
+
+	:param reader:
+	:param batch_size: The maximum number of scans in each batch.
+	"""
+
+	if batch_size < 1:
+		raise ValueError("'batch_size' must be at least 1.")
+
+	columns = _new_columns()
+	time_segment: Optional[int] = None
+
+	for scan_no in range(reader.total_scans):
+		scan_record = reader.get_scan_record(scan_no)
+		spectrum = reader.get_spectrum_by_scan(scan_no)
+
+		if columns["scan_no"] and (
+				scan_record.time_segment != time_segment or len(columns["scan_no"]) >= batch_size
+				):
+			yield _make_batch(columns)
+			columns = _new_columns()
+
+		time_segment = scan_record.time_segment
+
+		columns["scan_no"].append(scan_no)
+
+		for name in _scan_record_columns:
+			columns[name].append(getattr(scan_record, name))
+
+		for name in _enum_columns:
+			columns[name].append(int(getattr(scan_record, name)))
+
+		columns["parent_scan_id"].append(spectrum.parent_scan_id)
+
+		try:
+			columns["precursor_charge"].append(spectrum.precursor_charge)
+			columns["precursor_intensity"].append(spectrum.precursor_intensity)
+		except NotMS2Error:
+			columns["precursor_charge"].append(None)
+			columns["precursor_intensity"].append(None)
+
+		columns["mz"].append(spectrum.x_data)
+		columns["intensity"].append(spectrum.y_data)
+
+	if columns["scan_no"]:
+		yield _make_batch(columns)
+
+
+def write_parquet(
+		reader: DataReader,
+		filename: PathLike,
+		batch_size: int = 1024,
+		compression: str = "zstd",
+		) -> pathlib.Path:
+	"""
+	Export the datafile opened by ``reader`` to a Parquet file.
+
+	Each record batch from :func:`~.iter_record_batches` is written as its own row group,
+	so no row group spans more than one MS time segment. Readers such as DuckDB and Polars
+	can therefore skip whole time segments using the row group statistics.
+
+	:param reader:
+	:param filename: The file to write the Parquet data to.
+	:param batch_size: The maximum number of scans in each row group.
+	:param compression: The compression codec to use for the Parquet file.
+
+	:returns: The filename of the Parquet file.
+	"""
+
+	filename = prepare_filepath(filename)
+
+	schema = SCAN_SCHEMA.with_metadata({
+			"pyms_agilent.datafile_name": str(reader.datafile_name),
+			"pyms_agilent.acquisition_time": reader.acquisition_time.isoformat(),
+			})
+
+	with pyarrow.parquet.ParquetWriter(str(filename), schema, compression=compression) as writer:
+		for batch in iter_record_batches(reader, batch_size=batch_size):
+			writer.write_table(pyarrow.Table.from_batches([batch], schema=schema), row_group_size=batch.num_rows)
+
+	return filename
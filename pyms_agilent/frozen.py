@@ -0,0 +1,754 @@
+#  !/usr/bin/env python
+#
+#  frozen.py
+"""
+Offline snapshots of ``.d`` datafiles, readable without the Agilent MassHunter Data Access Component.
+
+A snapshot is written once on a machine where :class:`~pyms_agilent.data_reader.DataReader` can run
+(using :meth:`DataReader.freeze_all() <pyms_agilent.data_reader.DataReader.freeze_all>`),
+and can then be opened on any platform with :class:`~.FrozenDataReader`.
+
+The snapshot is a single file, laid out as follows:
+
+* The 8-byte marker ``PYMSAGFZ``.
+* The spectra, instrument curves and other numeric arrays, as little-endian 64-bit values.
+* A UTF-8 encoded JSON header describing the datafile and the location of each array.
+* A 24-byte footer giving the offset and length of the header, followed by the marker again.
+
+The arrays are written as the data is read, so the header comes last.
+:class:`~.FrozenDataReader` memory-maps the file and only reads the arrays that are requested.
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import datetime
+import enum
+import json
+import os
+import pathlib
+import struct
+from typing import Any, BinaryIO, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+# 3rd party
+import attr
+import numpy  # type: ignore
+from domdf_python_tools.typing import PathLike
+from memoized_property import memoized_property  # type: ignore
+
+# this package
+from pyms_agilent.archive import ArchivePath, resolve_path
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.enums import DeviceType, IonizationMode, MSScanType, SampleCategory, StoredDataType
+from pyms_agilent.metadata import prepare_filepath
+from pyms_agilent.mhdac.chromatograms import FrozenTIC
+from pyms_agilent.mhdac.file_information import FrozenFileInformation
+from pyms_agilent.mhdac.mass_spec_data_reader import MSActual
+from pyms_agilent.mhdac.ms_scan_file_info import FrozenMSScanFileInformation
+from pyms_agilent.mhdac.scan_record import FrozenMSScanRecord, UndefinedMSScanRecord
+from pyms_agilent.mhdac.signalinfo import FrozenSignalInfo
+from pyms_agilent.mhdac.spectrum import FrozenMS2SpecData, FrozenSpecData
+from pyms_agilent.xml_parser.devices import Device, DeviceList
+
+__all__ = ["MAGIC", "FORMAT_VERSION", "FrozenDataFileWriter", "FrozenDataReader", "freeze_datafile"]
+
+#: Marker written at the start and end of a frozen datafile.
+MAGIC = b"PYMSAGFZ"
+
+#: The version of the frozen datafile format written by this module.
+FORMAT_VERSION = 1
+
+# header offset, header length, marker
+_footer = struct.Struct("<QQ8s")
+
+_scan_record_fields = [a.name for a in attr.fields(FrozenMSScanRecord)]
+_spectrum_fields = [a.name for a in attr.fields(FrozenMS2SpecData) if a.name not in {"x_data", "y_data"}]
+_file_information_fields = [a.name for a in attr.fields(FrozenFileInformation) if a.name != "ms_scan_file_info"]
+_ms_scan_file_info_fields = [a.name for a in attr.fields(FrozenMSScanFileInformation)]
+
+
+def _json_default(obj: Any) -> Any:
+	# Converts values json can't handle itself into basic types.
+
+	if isinstance(obj, enum.Enum):
+		return obj.value
+	elif isinstance(obj, datetime.datetime):
+		return obj.timestamp()
+	elif isinstance(obj, pathlib.PurePath):
+		return str(obj)
+	elif isinstance(obj, numpy.generic):
+		return obj.item()
+	elif hasattr(obj, "to_dict"):
+		return obj.to_dict()
+	else:
+		return str(obj)
+
+
+def _as_dict(obj: Any) -> Dict[str, Any]:
+	"""
+	Returns the data of a scan record or spectrum as a dictionary.
+
+	This is equivalent to ``obj.to_dict()``, but much faster for the frozen classes.
+
+	:param obj:
+	"""
+
+	if attr.has(type(obj)):
+		return {a.name: getattr(obj, a.name) for a in attr.fields(type(obj))}
+	else:
+		return obj.to_dict()
+
+
+class FrozenDataFileWriter:
+	"""
+	Writes a frozen snapshot of a ``.d`` datafile, which can be read with :class:`~.FrozenDataReader`.
+
+	The spectra are written to disk as the scans are added, so only the scan records
+	and a few values from each spectrum are kept in memory until the header is written.
+
+	:param filename: The file to write the snapshot to.
+
+	The snapshot is only complete once :meth:`~.FrozenDataFileWriter.close` has been called.
+	The writer can also be used as a context manager, in which case it is closed on exit.
+	If an exception is raised within the ``with`` block the incomplete file is removed.
+	"""
+
+	def __init__(self, filename: PathLike):
+		self.filename: pathlib.Path = prepare_filepath(filename)
+		self._fp: Optional[BinaryIO] = open(self.filename, "wb")  # noqa: SIM115
+		self._fp.write(MAGIC)
+
+		self._header: Dict[str, Any] = {
+				"format_version": FORMAT_VERSION,
+				"file_information": None,
+				"devices": None,
+				"tic": None,
+				"signals": [],
+				"ms_actuals": {},
+				"has_actuals": False,
+				"sample_data": {},
+				"timesegment_ids": [],
+				}
+
+		self._scan_records: Dict[str, List[Any]] = {name: [] for name in _scan_record_fields}
+		self._spectra: Dict[str, List[Any]] = {name: [] for name in _spectrum_fields}
+		self._spectrum_offsets: List[int] = []
+		self._spectrum_lengths: List[int] = []
+
+	def _write_array(self, values: Iterable, dtype: str = "<f8") -> Dict[str, Any]:
+		"""
+		Write an array of values to the file, and returns a descriptor for the header.
+
+		:param values:
+		:param dtype: The numpy dtype to store the values as.
+		"""
+
+		if self._fp is None:
+			raise ValueError("I/O operation on closed writer.")
+
+		array = numpy.ascontiguousarray(values, dtype=dtype)
+		offset = self._fp.tell()
+		self._fp.write(array.tobytes())
+
+		return {"offset": offset, "length": len(array), "dtype": dtype}
+
+	def set_file_information(self, file_information: FrozenFileInformation) -> None:
+		"""
+		Set the information about the datafile.
+
+		:param file_information:
+		"""
+
+		self._header["file_information"] = file_information.to_dict(convert_values=True)
+
+	def set_devices(self, devices: DeviceList) -> None:
+		"""
+		Set the list of devices in the instrument configuration.
+
+		:param devices:
+		"""
+
+		self._header["devices"] = {"version": devices.version, "devices": [dict(device) for device in devices]}
+
+	def add_scan(self, scan_record, spectrum) -> None:
+		"""
+		Add a scan to the snapshot.
+
+		Scans must be added in order.
+
+		:param scan_record: The :class:`~pyms_agilent.mhdac.scan_record.MSScanRecord`
+			or :class:`~pyms_agilent.mhdac.scan_record.FrozenMSScanRecord` for the scan.
+		:param spectrum: The :class:`~pyms_agilent.mhdac.spectrum.SpecData`
+			or :class:`~pyms_agilent.mhdac.spectrum.FrozenSpecData` for the scan.
+		"""
+
+		record_dict = _as_dict(scan_record)
+		for name in _scan_record_fields:
+			self._scan_records[name].append(record_dict[name])
+
+		spectrum_dict = _as_dict(spectrum)
+		for name in _spectrum_fields:
+			self._spectra[name].append(spectrum_dict.get(name))
+
+		x_data = self._write_array(spectrum_dict["x_data"])
+		self._write_array(spectrum_dict["y_data"])
+		self._spectrum_offsets.append(x_data["offset"])
+		self._spectrum_lengths.append(x_data["length"])
+
+	def set_tic(self, tic) -> None:
+		"""
+		Set the total ion chromatogram.
+
+		:param tic: The :class:`~pyms_agilent.mhdac.chromatograms.TIC`
+			or :class:`~pyms_agilent.mhdac.chromatograms.FrozenTIC`.
+		"""
+
+		tic_dict = dict(tic.to_dict())
+		x_data = self._write_array(tic_dict.pop("x_data"))
+		y_data = self._write_array(tic_dict.pop("y_data"))
+		self._header["tic"] = {"data": tic_dict, 'x': x_data, 'y': y_data}
+
+	def add_signals(
+			self,
+			device_name: str,
+			device_type: DeviceType,
+			data_type: StoredDataType,
+			ordinal: int,
+			signals: Sequence,
+			) -> None:
+		"""
+		Add the result of :meth:`DataReader.get_signal_listing() <.DataReader.get_signal_listing>`
+		for a device to the snapshot.
+
+		:param device_name: The name of the device that recorded the signal.
+		:param device_type: The type of device that recorded the signal.
+		:param data_type:
+		:param ordinal:
+		:param signals: A list of :class:`~pyms_agilent.mhdac.signalinfo.SignalInfo`
+			or :class:`~pyms_agilent.mhdac.signalinfo.FrozenSignalInfo` objects.
+		"""  # noqa: D400
+
+		signal_list = []
+
+		for signal in signals:
+			signal_dict = dict(signal.to_dict())
+			curve_dict = dict(signal_dict.pop("instrument_curve").to_dict())
+			x_data = self._write_array(curve_dict.pop("x_data"))
+			y_data = self._write_array(curve_dict.pop("y_data"))
+			signal_list.append({"signal": signal_dict, "curve": curve_dict, 'x': x_data, 'y': y_data})
+
+		self._header["signals"].append({
+				"device_name": str(device_name),
+				"device_type": int(device_type),
+				"data_type": int(data_type),
+				"ordinal": int(ordinal),
+				"signals": signal_list,
+				})
+
+	def set_ms_actuals(self, ms_actuals: Mapping[str, MSActual]) -> None:
+		"""
+		Set the MS Actuals parameters.
+
+		:param ms_actuals: Mapping of parameter names to values.
+		"""
+
+		self._header["has_actuals"] = True
+
+		for name in ms_actuals.keys():
+			x_array, y_array = ms_actuals[name]
+			self._header["ms_actuals"][name] = {'x': self._write_array(x_array), 'y': self._write_array(y_array)}
+
+	def set_sample_data(self, category: SampleCategory, sample_data: Mapping[str, Any]) -> None:
+		"""
+		Set the additional metadata about the sample for the given category.
+
+		:param category:
+		:param sample_data:
+		"""
+
+		self._header["sample_data"][SampleCategory(category).name] = dict(sample_data)
+
+	def set_timesegment_ids(self, timesegment_ids: Iterable[int]) -> None:
+		"""
+		Set the list of timesegment IDs.
+
+		:param timesegment_ids:
+		"""
+
+		self._header["timesegment_ids"] = [int(x) for x in timesegment_ids]
+
+	def close(self) -> None:
+		"""
+		Write the header and close the file.
+		"""
+
+		if self._fp is None:
+			return
+
+		self._header["scan_records"] = self._scan_records
+		self._header["spectra"] = {
+				"columns": self._spectra,
+				"offsets": self._write_array(self._spectrum_offsets, dtype="<i8"),
+				"lengths": self._write_array(self._spectrum_lengths, dtype="<i8"),
+				}
+
+		header = json.dumps(self._header, default=_json_default).encode("UTF-8")
+		header_offset = self._fp.tell()
+		self._fp.write(header)
+		self._fp.write(_footer.pack(header_offset, len(header), MAGIC))
+		self._fp.close()
+		self._fp = None
+
+	def __enter__(self) -> "FrozenDataFileWriter":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+		if exc_type is None:
+			self.close()
+		elif self._fp is not None:
+			self._fp.close()
+			self._fp = None
+			os.unlink(self.filename)
+
+
+def freeze_datafile(reader: DataReader, filename: PathLike) -> pathlib.Path:
+	"""
+	Write a frozen snapshot of the datafile opened by ``reader``.
+
+	The snapshot contains the file information, all scan records and spectra, the TIC,
+	the instrument curves for every device, the MS actuals and the sample data.
+
+	:param reader:
+	:param filename: The file to write the snapshot to.
+
+	:returns: The filename of the snapshot.
+	"""
+
+	ms_scan_file_info = FrozenMSScanFileInformation(
+			**{name: getattr(reader, name) for name in _ms_scan_file_info_fields},
+			)
+	file_information = FrozenFileInformation(
+			**{name: getattr(reader, name) for name in _file_information_fields},
+			ms_scan_file_info=ms_scan_file_info,
+			)
+
+	with FrozenDataFileWriter(filename) as writer:
+		writer.set_file_information(file_information)
+
+		for scan_no in range(ms_scan_file_info.total_scans):
+			writer.add_scan(reader.get_scan_record(scan_no), reader.get_spectrum_by_scan(scan_no))
+
+		writer.set_tic(reader.get_tic())
+
+		devices = reader.get_devices()
+		writer.set_devices(devices)
+
+		for device in devices:
+			for data_type in (StoredDataType.Chromatograms, StoredDataType.InstrumentCurves):
+				if device.stored_data_type & data_type:
+					signals = reader.get_signal_listing(
+							device_name=device.display_name,
+							device_type=device.type_,
+							data_type=data_type,
+							ordinal=device.ordinal_number,
+							)
+					writer.add_signals(device.display_name, device.type_, data_type, device.ordinal_number, signals)
+
+		if reader.has_actuals:
+			writer.set_ms_actuals(reader.get_ms_actuals())
+
+		for category in SampleCategory:
+			writer.set_sample_data(category, reader.get_sample_data(category))
+
+		writer.set_timesegment_ids(reader.get_timesegment_ids())
+
+	return writer.filename
+
+
+_polarity_lookup = {1: '+', -1: '-', 0: "+-"}
+
+
+def _map_file(path: Union[pathlib.Path, ArchivePath], size: int) -> numpy.ndarray:
+	"""
+	Returns a read-only array of the bytes in the given file.
+
+	:param path:
+	:param size: The size of the file.
+	"""
+
+	if not isinstance(path, ArchivePath):
+		return numpy.memmap(path, dtype=numpy.uint8, mode='r')
+
+	offset = path.archive.stored_offset(path.member)
+
+	if offset is None:
+		# Compressed members cannot be mapped, so are read into memory.
+		return numpy.frombuffer(path.read_bytes(), dtype=numpy.uint8)
+
+	return numpy.memmap(path.archive.filename, dtype=numpy.uint8, mode='r', offset=offset, shape=(size, ))
+
+
+class FrozenDataReader(DataReader):
+	"""
+	Reads a snapshot written by :meth:`DataReader.freeze_all() <.DataReader.freeze_all>`.
+
+	This class has the same interface as :class:`~pyms_agilent.data_reader.DataReader`,
+	but returns the frozen versions of the classes in :mod:`pyms_agilent.mhdac`.
+	It does not require the Agilent MassHunter Data Access Component, and works on any platform.
+
+	:param filename: The snapshot to open. This may be inside a zip or tar archive, in which case it is
+		memory-mapped in place if it is stored without compression, or read into memory otherwise.
+
+	:raises FileNotFoundError: if the snapshot cannot be found.
+	:raises ValueError: if the file is not a frozen datafile.
+	"""
+
+	def __init__(self, filename: Union[PathLike, ArchivePath]):  # pylint: disable=super-init-not-called
+		path = resolve_path(filename)
+		self.filename: str = str(path)
+
+		if not path.is_file():
+			raise FileNotFoundError(self.filename)
+
+		self._mmap: Optional[numpy.ndarray] = None
+
+		if isinstance(path, ArchivePath):
+			size = path.archive.get_size(path.member)
+		else:
+			size = os.path.getsize(self.filename)
+
+		if size >= len(MAGIC) + _footer.size:
+			self._mmap = _map_file(path, size)
+			header_offset, header_length, magic = _footer.unpack(bytes(self._mmap[-_footer.size:]))
+
+		if self._mmap is None or magic != MAGIC or bytes(self._mmap[:len(MAGIC)]) != MAGIC:
+			raise ValueError(f"'{self.filename}' is not a frozen datafile.")
+
+		header_bytes = bytes(self._mmap[header_offset:header_offset + header_length])
+		self._header: Dict[str, Any] = json.loads(header_bytes.decode("UTF-8"))
+
+		if self._header["format_version"] > FORMAT_VERSION:
+			raise ValueError(f"Unsupported frozen datafile version {self._header['format_version']}.")
+
+	def _get_array(self, descriptor: Mapping[str, Any]) -> numpy.ndarray:
+		"""
+		Returns a read-only, memory-mapped view of the array with the given descriptor.
+
+		:param descriptor:
+		"""
+
+		if self._mmap is None:
+			raise ValueError("I/O operation on closed datafile.")
+
+		dtype = numpy.dtype(descriptor["dtype"])
+		start = descriptor["offset"]
+		return self._mmap[start:start + descriptor["length"] * dtype.itemsize].view(dtype)
+
+	def close_datafile(self) -> bool:
+		"""
+		Closes the datafile.
+
+		:return:
+		"""
+
+		# The underlying file is closed once all arrays obtained from it have been garbage collected.
+		self._mmap = None
+		return True
+
+	def refresh_datafile(self) -> bool:
+		"""
+		Refreshes the data file and returns whether new data is present.
+
+		Snapshots never change, so this always returns :py:obj:`False`.
+		"""
+
+		return False
+
+	@memoized_property
+	def _file_info(self) -> FrozenFileInformation:  # type: ignore
+		return FrozenFileInformation.from_dict(self._header["file_information"])
+
+	@memoized_property
+	def _ms_scan_file_info(self) -> FrozenMSScanFileInformation:  # type: ignore
+		return self._file_info.ms_scan_file_info
+
+	@memoized_property
+	def _scan_retention_times(self) -> numpy.ndarray:
+		return numpy.asarray(self._header["scan_records"]["retention_time"], dtype=numpy.float64)
+
+	def get_devices(self) -> DeviceList:
+		"""
+		Returns the list of devices in the instrument configuration.
+		"""
+
+		devices = self._header["devices"]
+
+		if devices is None:
+			return DeviceList(1)
+
+		return DeviceList(devices["version"], [Device(**device) for device in devices["devices"]])
+
+	def is_uv_signal_present(self, device_type: DeviceType, signal_name: str, device_name: str):
+		"""
+		Returns whether a UV signal is present for the specified device type.
+
+		:param device_type: The type of device that acquired the data.
+		:param signal_name:
+		:param device_name: The name of the device that acquired the data.
+		"""
+
+		if not self.uv_data_present:
+			return False
+
+		for listing in self._header["signals"]:
+			if listing["device_name"] == device_name and listing["device_type"] == device_type:
+				for signal in listing["signals"]:
+					if signal["signal"]["signal_name"] == signal_name:
+						return True
+
+		return False
+
+	def is_datatype_present(self, datatype: StoredDataType, device_name: str, ordinal_number: int = 1) -> bool:
+		"""
+		Returns whether data is present for the given device.
+
+		:param datatype: The type of data to check for.
+		:param device_name: The name of the device.
+		:param ordinal_number: The ordinal number of the device.
+		"""
+
+		for device in self.get_devices():
+			if device.display_name == device_name and device.ordinal_number == ordinal_number:
+				return bool(device.stored_data_type & datatype)
+
+		return False
+
+	def get_device_name(self, device_type: DeviceType) -> Optional[str]:
+		"""
+		Returns the name of the device in the instrument configuration with the given type.
+
+		:param device_type:
+		"""
+
+		for device in self.get_devices():
+			if device.type_ == device_type:
+				return device.display_name
+
+		return None
+
+	def get_tic(self) -> FrozenTIC:  # type: ignore
+		"""
+		Returns the total ion chromatogram of the data.
+		"""
+
+		tic = self._header["tic"]
+
+		if tic is None:
+			raise ValueError("The datafile does not contain a TIC.")
+
+		return FrozenTIC(
+				**tic["data"],
+				x_data=self._get_array(tic['x']).tolist(),
+				y_data=self._get_array(tic['y']).tolist(),
+				)
+
+	def get_spectrum_arrays(self, scan_no: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+		"""
+		Returns the x- and y-axis data for the given scan as memory-mapped :class:`numpy.ndarray` objects.
+
+		This avoids constructing a :class:`~pyms_agilent.mhdac.spectrum.FrozenSpecData` object.
+		The arrays are read-only.
+
+		:param scan_no: The scan number.
+
+		:raises: :exc:`ValueError` if the scan number is out of range.
+		"""
+
+		scan_no = self._check_scan_no(scan_no)
+
+		spectra = self._header["spectra"]
+		offset = int(self._get_array(spectra["offsets"])[scan_no])
+		length = int(self._get_array(spectra["lengths"])[scan_no])
+
+		x_data = self._get_array({"offset": offset, "length": length, "dtype": "<f8"})
+		y_data = self._get_array({"offset": offset + length * 8, "length": length, "dtype": "<f8"})
+
+		return x_data, y_data
+
+	def _check_scan_no(self, scan_no: int) -> int:
+		scan_no = int(scan_no)
+
+		if scan_no < 0:
+			raise ValueError("scan_no must be greater than or equal to 0")
+		elif scan_no >= len(self._scan_retention_times):
+			raise ValueError("scan_no out of range")
+
+		return scan_no
+
+	def get_spectrum_by_scan(self, scan_no: int) -> FrozenSpecData:  # type: ignore
+		"""
+		Returns a :class:`pyms_agilent.mhdac.spectrum.FrozenSpecData` object for the given scan.
+
+		:param scan_no: The scan number.
+
+		:raises: :exc:`ValueError` if the scan number is out of range.
+		"""
+
+		scan_no = self._check_scan_no(scan_no)
+		x_data, y_data = self.get_spectrum_arrays(scan_no)
+
+		spectrum = {name: column[scan_no] for name, column in self._header["spectra"]["columns"].items()}
+		spectrum["x_data"] = x_data.tolist()
+		spectrum["y_data"] = y_data.tolist()
+
+		if spectrum["precursor_charge"] is None:
+			del spectrum["precursor_charge"]
+			del spectrum["precursor_intensity"]
+			return FrozenSpecData(**spectrum)
+		else:
+			return FrozenMS2SpecData(**spectrum)
+
+	def get_spectrum_by_time(  # type: ignore
+		self,
+		retention_time: float,
+		scan_type: MSScanType = MSScanType.All,
+		ionization_polarity: int = 1,
+		ionization_mode: IonizationMode = IonizationMode.Unspecified,
+		) -> FrozenSpecData:
+		"""
+		Returns a :class:`pyms_agilent.mhdac.spectrum.FrozenSpecData` object
+		for the spectrum closest to the given retention time.
+
+		:param retention_time:
+		:param scan_type:
+		:param ionization_polarity: The ionization polarity. 1 = positive, -1 = negative, 0 = +-
+		:param ionization_mode:
+
+		:raises: :exc:`ValueError` if the retention time is less than zero or no such scan exists for the given parameters.
+		"""  # noqa: D400
+
+		if ionization_polarity is None:
+			raise ValueError("'ionization_polarity' cannot be None.")
+		if float(retention_time) < 0:
+			raise ValueError("retention_time cannot be < 0")
+
+		scan_records = self._header["scan_records"]
+		mask = numpy.ones(len(self._scan_retention_times), dtype=bool)
+
+		if scan_type != MSScanType.All:
+			scan_types = numpy.asarray(scan_records["ms_scan_type"], dtype=numpy.int64)
+			mask &= (scan_types & int(scan_type)) != 0
+
+		if ionization_polarity != 0:
+			polarity = _polarity_lookup[int(numpy.sign(ionization_polarity))]
+			mask &= numpy.asarray([p == polarity for p in scan_records["ion_polarity"]], dtype=bool)
+
+		if ionization_mode != IonizationMode.Unspecified:
+			modes = numpy.asarray(scan_records["ionization_mode"], dtype=numpy.int64)
+			mask &= (modes & int(ionization_mode)) != 0
+
+		candidates = numpy.flatnonzero(mask)
+		if not len(candidates):
+			raise ValueError("No such scan.")
+
+		distances = numpy.abs(self._scan_retention_times[candidates] - float(retention_time))
+		return self.get_spectrum_by_scan(int(candidates[numpy.argmin(distances)]))
+
+	def get_signal_listing(  # type: ignore
+		self,
+		device_name: str,
+		device_type: DeviceType,
+		data_type: StoredDataType,
+		ordinal: int = 1,
+		) -> List[FrozenSignalInfo]:
+		"""
+		Returns a list of signals of the given type available for the given device.
+
+		:param device_name: The name of the device that recorded the signal.
+		:param device_type: The type of device that recorded the signal.
+		:param data_type:
+		:param ordinal:
+		"""
+
+		for listing in self._header["signals"]:
+			if (
+					listing["device_name"] == device_name and listing["device_type"] == device_type
+					and listing["data_type"] == data_type and listing["ordinal"] == ordinal
+					):
+				break
+		else:
+			return []
+
+		signal_list = []
+
+		for signal in listing["signals"]:
+			curve = dict(signal["curve"])
+			curve["x_data"] = self._get_array(signal['x']).tolist()
+			curve["y_data"] = self._get_array(signal['y']).tolist()
+			signal_list.append(FrozenSignalInfo(**signal["signal"], instrument_curve=curve))
+
+		return signal_list
+
+	def get_ms_actuals(self) -> Dict[str, MSActual]:  # type: ignore
+		"""
+		Returns the MS Actuals parameters.
+		"""
+
+		return {
+				name: MSActual(self._get_array(arrays['x']).tolist(), self._get_array(arrays['y']).tolist())
+				for name, arrays in self._header["ms_actuals"].items()
+				}
+
+	def get_sample_data(self, category: SampleCategory = SampleCategory.All) -> Dict[str, Any]:
+		"""
+		Returns a dictionary of additional metadata about the sample.
+
+		:param category: The category of metadata to return.
+		"""
+
+		return dict(self._header["sample_data"].get(SampleCategory(category).name, {}))
+
+	def get_timesegment_ids(self) -> List[int]:
+		"""
+		Returns a list of timesegment IDs.
+		"""
+
+		return list(self._header["timesegment_ids"])
+
+	@property
+	def has_actuals(self) -> bool:
+		"""
+		Returns whether the datafile contains MS Actuals data.
+		"""
+
+		return self._header["has_actuals"]
+
+	def get_scan_record(self, scan_no: int) -> FrozenMSScanRecord:  # type: ignore
+		"""
+		Returns metadata about the scan with the given number.
+
+		:param scan_no:
+		"""
+
+		scan_no = int(scan_no)
+
+		if not 0 <= scan_no < len(self._scan_retention_times):
+			return UndefinedMSScanRecord
+
+		return FrozenMSScanRecord(**{name: column[scan_no] for name, column in self._header["scan_records"].items()})
@@ -0,0 +1,394 @@
+#  !/usr/bin/env python
+#
+#  host.py
+"""
+Long-lived process which keeps datafiles open, and serves them to other processes over a local socket.
+
+Loading the MHDAC and opening a datafile takes several seconds. A :class:`~.ReaderHost` pays that cost once,
+and any number of short-lived processes can then read from it with a :class:`~.ReaderClient`.
+Arrays (such as spectra) are passed through :mod:`multiprocessing.shared_memory` where it is available
+(Python 3.8 and above) rather than being pickled.
+
+The host can use the MHDAC (the ``native`` backend), or replay snapshots written by
+:meth:`DataReader.freeze_all() <.DataReader.freeze_all>` (the ``replay`` backend), which works on any platform.
+
+Start a host with:
+
+.. code-block:: bash
+
+	$ python -m pyms_agilent.host --address /tmp/pyms-agilent.sock --backend native
+
+and read from it with:
+
+.. code-block:: python
+
+	with ReaderClient("/tmp/pyms-agilent.sock") as client:
+		mz, intensity = client.get_spectrum_arrays("Sample1.d", scan_no=10)
+		tic = client.call("Sample1.d", "get_tic")
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import argparse
+import os
+import pickle
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# 3rd party
+import numpy  # type: ignore
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.pool import ReaderPool
+from pyms_agilent.sharing import read_shared_arrays, share_arrays, shared_memory
+from pyms_agilent.utils import freeze
+
+__all__ = ["backends", "ReaderHost", "ReaderClient", "main"]
+
+#: The functions used to open datafiles for each of the host's backends.
+backends: Dict[str, Callable[[str], DataReader]] = {
+		"native": DataReader,
+		"replay": FrozenDataReader,
+		}
+
+
+class ReaderHost:
+	"""
+	Serves datafiles to :class:`~.ReaderClient` objects in other processes.
+
+	Each client connection is handled on its own thread, and datafiles are kept open in a
+	:class:`~pyms_agilent.pool.ReaderPool` between requests.
+
+	:param address: The address to listen on. This is a named pipe on Windows, and a Unix socket elsewhere.
+		If :py:obj:`None` a free address is chosen.
+	:param authkey: Shared secret which clients must know to connect.
+		Requests are pickled, so anyone who can connect to the host can run code in it.
+	:param backend: The name of the backend (see :data:`~.backends`), or a function to open datafiles with.
+	:param max_per_file: The maximum number of readers to open for each datafile.
+	:param max_open: The maximum number of readers to have open at once.
+	:param idle_timeout: The number of seconds after which an unused reader is closed.
+		If :py:obj:`None` readers are kept open until the host is shut down.
+	"""
+
+	# How often (in seconds) idle client threads check whether the host has been shut down.
+	_poll_interval: float = 0.1
+
+	def __init__(
+			self,
+			address: Optional[str] = None,
+			authkey: Optional[bytes] = None,
+			backend: Union[str, Callable[[str], DataReader]] = "native",
+			max_per_file: int = 1,
+			max_open: int = 16,
+			idle_timeout: Optional[float] = None,
+			):
+
+		if isinstance(backend, str):
+			try:
+				reader_factory = backends[backend]
+			except KeyError:
+				raise ValueError(f"Unknown backend {backend!r}. Choose from: {', '.join(backends)}") from None
+		else:
+			reader_factory = backend
+
+		self.pool = ReaderPool(
+				max_per_file=max_per_file,
+				max_open=max_open,
+				idle_timeout=idle_timeout,
+				reader_factory=reader_factory,
+				)
+
+		self._listener = Listener(address, authkey=authkey)
+		self._closed = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+		self._client_threads: List[threading.Thread] = []
+		self._lock = threading.Lock()
+
+	@property
+	def address(self) -> str:
+		"""
+		Returns the address the host is listening on.
+		"""
+
+		return self._listener.address
+
+	def serve_forever(self) -> None:
+		"""
+		Accept and serve clients until :meth:`~.ReaderHost.shutdown` is called.
+		"""
+
+		while not self._closed.is_set():
+			try:
+				connection = self._listener.accept()
+			except (OSError, EOFError, AuthenticationError):
+				if self._closed.is_set():
+					break
+				# A client which failed authentication, or disconnected while connecting.
+				continue
+
+			thread = threading.Thread(target=self._serve_client, args=(connection, ), daemon=True)
+
+			with self._lock:
+				self._client_threads = [t for t in self._client_threads if t.is_alive()]
+				self._client_threads.append(thread)
+
+			thread.start()
+
+	def start(self) -> "ReaderHost":
+		"""
+		Serve clients from a background thread.
+		"""
+
+		if self._thread is not None:
+			raise RuntimeError("The host has already been started.")
+
+		self._thread = threading.Thread(target=self.serve_forever, name="ReaderHost", daemon=True)
+		self._thread.start()
+		return self
+
+	def shutdown(self) -> None:
+		"""
+		Stop accepting clients, disconnect the existing ones, and close all datafiles.
+		"""
+
+		if self._closed.is_set():
+			return
+
+		self._closed.set()
+
+		# Wake up accept() so serve_forever() can return. The connection does not wait to be authenticated,
+		# as serve_forever() may have already returned.
+		try:
+			Client(self.address).close()
+		except (OSError, EOFError):
+			pass
+
+		self._listener.close()
+
+		if self._thread is not None:
+			self._thread.join()
+
+		# Each client thread notices the host is closed within _poll_interval and disconnects its client.
+		with self._lock:
+			client_threads = list(self._client_threads)
+
+		for thread in client_threads:
+			thread.join()
+
+		self.pool.close()
+
+	def __enter__(self) -> "ReaderHost":
+		return self.start()
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.shutdown()
+
+	def _handle(self, request: Tuple[str, str, str, tuple, dict]) -> Tuple[Any, ...]:
+		kind, filename, method_name, args, kwargs = request
+
+		if method_name.startswith('_'):
+			raise AttributeError(f"Cannot call private method {method_name!r}")
+
+		with self.pool.reader(filename) as reader:
+			result = getattr(reader, method_name)(*args, **kwargs)
+
+		if kind == "arrays":
+			if isinstance(result, numpy.ndarray):
+				result = (result, )
+
+			arrays = [numpy.ascontiguousarray(array) for array in result]
+
+			if shared_memory is None:  # pragma: no cover (py38+)
+				return ("ok", tuple(arrays))
+
+			block, specs = share_arrays(arrays)
+			return ("shared", block, specs)
+
+		return ("ok", freeze(result))
+
+	def _serve_client(self, connection: Connection) -> None:
+		# The block sent in the last response. The client removes the block once it has read the arrays,
+		# but on Windows the block only exists while a process has it open.
+		outstanding = None
+
+		try:
+			while not self._closed.is_set():
+				try:
+					if not connection.poll(self._poll_interval):
+						continue
+					request = connection.recv()
+				except (EOFError, OSError):
+					break
+
+				if outstanding is not None:
+					outstanding.close()
+					outstanding = None
+
+				try:
+					response = self._handle(request)
+				except Exception as e:
+					response = ("error", e)
+
+				if response[0] == "shared":
+					outstanding = response[1]
+					response = ("shared", outstanding.name, response[2])
+
+				# Responses are sent with plain pickle, as the client does not share this process's
+				# resource tracker, so spectra cannot be sent through pyms_agilent.sharing.
+				try:
+					connection.send_bytes(pickle.dumps(response))
+				except Exception:
+					# The result (or exception) could not be pickled.
+					connection.send_bytes(pickle.dumps(("error", RuntimeError(repr(response[1])))))
+
+		finally:
+			if outstanding is not None:
+				outstanding.close()
+
+			connection.close()
+
+
+class ReaderClient:
+	"""
+	Reads datafiles through a :class:`~.ReaderHost` in another process.
+
+	A client should only be used by one thread at a time.
+
+	:param address: The address the host is listening on.
+	:param authkey: The shared secret the host was started with.
+	"""
+
+	def __init__(self, address: str, authkey: Optional[bytes] = None):
+		self._connection: Optional[Connection] = Client(address, authkey=authkey)
+
+	def _request(self, kind: str, filename: PathLike, method: str, args: tuple, kwargs: dict) -> Any:
+		if self._connection is None:
+			raise ValueError("The client has been closed.")
+
+		self._connection.send((kind, str(filename), method, args, kwargs))
+		response = self._connection.recv()
+
+		if response[0] == "error":
+			raise response[1]
+		elif response[0] == "shared":
+			return read_shared_arrays(response[1], response[2])
+		else:
+			return response[1]
+
+	def call(self, filename: PathLike, method: str, *args, **kwargs) -> Any:
+		"""
+		Call a method of :class:`~pyms_agilent.data_reader.DataReader` for the given datafile, and return the result.
+
+		Objects which wrap .NET objects are returned in their frozen form.
+
+		:param filename: The datafile to read.
+		:param method: The name of the method.
+		:param args: Positional arguments to pass to the method.
+		:param kwargs: Keyword arguments to pass to the method.
+		"""
+
+		return self._request("call", filename, method, args, kwargs)
+
+	def get_arrays(self, filename: PathLike, method: str, *args, **kwargs) -> Tuple[numpy.ndarray, ...]:
+		"""
+		Call a method which returns one or more :class:`numpy.ndarray` objects, and return the arrays.
+
+		The arrays are passed through shared memory where possible.
+
+		:param filename: The datafile to read.
+		:param method: The name of the method.
+		:param args: Positional arguments to pass to the method.
+		:param kwargs: Keyword arguments to pass to the method.
+		"""
+
+		return self._request("arrays", filename, method, args, kwargs)
+
+	def get_spectrum_arrays(self, filename: PathLike, scan_no: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+		"""
+		Returns the x- and y-axis data for the given scan as :class:`numpy.ndarray` objects.
+
+		:param filename: The datafile to read.
+		:param scan_no:
+		"""
+
+		return self.get_arrays(filename, "get_spectrum_arrays", scan_no)  # type: ignore
+
+	def close(self) -> None:
+		"""
+		Disconnect from the host.
+		"""
+
+		if self._connection is not None:
+			self._connection.close()
+			self._connection = None
+
+	def __enter__(self) -> "ReaderClient":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+	"""
+	Run a :class:`~.ReaderHost` until interrupted.
+
+	If the ``PYMS_AGILENT_HOST_AUTHKEY`` environment variable is set, clients must use it as their ``authkey``.
+
+	:param argv: The command line arguments. If :py:obj:`None` :py:data:`sys.argv` is used.
+	"""
+
+	parser = argparse.ArgumentParser(
+			prog="python -m pyms_agilent.host",
+			description="Serve datafiles to other processes.",
+			)
+	parser.add_argument("--address", help="The address to listen on.")
+	parser.add_argument("--backend", choices=sorted(backends), default="native")
+	parser.add_argument("--max-open", type=int, default=16, help="The maximum number of readers to have open.")
+	parser.add_argument("--idle-timeout", type=float, help="Close readers which are unused for this many seconds.")
+	args = parser.parse_args(argv)
+
+	authkey = os.environ.get("PYMS_AGILENT_HOST_AUTHKEY")
+
+	host = ReaderHost(
+			args.address,
+			authkey=authkey.encode("UTF-8") if authkey else None,
+			backend=args.backend,
+			max_open=args.max_open,
+			idle_timeout=args.idle_timeout,
+			)
+	print(f"Listening on {host.address}", flush=True)
+
+	try:
+		host.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		host.shutdown()
+
+
+if __name__ == "__main__":
+	main()
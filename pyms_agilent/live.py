@@ -0,0 +1,277 @@
+#  !/usr/bin/env python
+#
+#  live.py
+"""
+Follow a datafile while the instrument is still writing it.
+
+Example:
+
+.. code-block:: python
+
+	reader = DataReader("Sample1.d")
+
+	async for event in follow(reader):
+		if isinstance(event, NewScan):
+			dashboard.add_point(event.record.retention_time, event.record.tic)
+		else:
+			dashboard.extend_curve(event.signal_name, event.x_data, event.y_data)
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.enums import StoredDataType
+from pyms_agilent.metadata import is_acquisition_complete
+from pyms_agilent.mhdac.scan_record import FrozenMSScanRecord
+from pyms_agilent.mhdac.spectrum import FrozenSpecData
+from pyms_agilent.utils import freeze
+
+__all__ = ["NewScan", "NewCurvePoints", "LiveEvent", "follow"]
+
+
+class NewScan(NamedTuple):
+	"""
+	A scan which has been written to the datafile since the last poll.
+	"""
+
+	#: The number of the scan, for :meth:`DataReader.get_scan_record() <.DataReader.get_scan_record>`.
+	scan_no: int
+
+	#: Metadata about the scan.
+	record: FrozenMSScanRecord
+
+	#: The spectrum for the scan, or :py:obj:`None` if spectra were not requested.
+	spectrum: Optional[FrozenSpecData]
+
+
+class NewCurvePoints(NamedTuple):
+	"""
+	Points which have been added to an instrument curve since the last poll.
+	"""
+
+	#: The name of the device that recorded the signal.
+	device_name: str
+
+	#: The ordinal number of the device that recorded the signal.
+	ordinal: int
+
+	#: The name of the signal.
+	signal_name: str
+
+	#: The x-axis values of the new points.
+	x_data: List[float]
+
+	#: The y-axis values of the new points.
+	y_data: List[float]
+
+
+#: Type hint for the events yielded by :func:`~.follow`.
+LiveEvent = Union[NewScan, NewCurvePoints]
+
+_CurveKey = Tuple[str, int, str]
+
+
+class _Follower:
+	"""
+	Tracks how much of a datafile has been consumed.
+
+	:param reader:
+	:param spectra: Whether to read the spectrum for each new scan.
+	:param curves: Whether to report new instrument-curve points.
+	"""
+
+	def __init__(self, reader: DataReader, spectra: bool, curves: bool):
+		self.reader = reader
+		self.spectra = spectra
+		self.curves = curves
+
+		self.next_scan_no = 0
+		self.last_scan_id: Optional[int] = None
+		self.curve_points: Dict[_CurveKey, int] = {}
+
+		# The instrument curves are only read again once the datafile has new data.
+		self.curves_changed = True
+
+	def refresh(self) -> bool:
+		"""
+		Refresh the datafile, and return whether new data is present.
+		"""
+
+		if self.reader.refresh_datafile():
+			self.curves_changed = True
+			return True
+
+		return False
+
+	def new_scans(self) -> Iterator[NewScan]:
+		"""
+		Returns the scans added since the last call.
+		"""
+
+		total_scans = self.reader.total_scans
+
+		while self.next_scan_no < total_scans:
+			scan_no = self.next_scan_no
+			self.next_scan_no += 1
+
+			record = freeze(self.reader.get_scan_record(scan_no))
+
+			# The scan IDs only increase, so anything at or below the last one has already been consumed.
+			if self.last_scan_id is not None and record.scan_id <= self.last_scan_id:
+				continue
+
+			self.last_scan_id = record.scan_id
+			spectrum = freeze(self.reader.get_spectrum_by_scan(scan_no)) if self.spectra else None
+			yield NewScan(scan_no, record, spectrum)
+
+	def new_curve_points(self) -> Iterator[NewCurvePoints]:
+		"""
+		Returns the instrument-curve points added since the last call.
+		"""
+
+		if not self.curves or not self.curves_changed:
+			return
+
+		self.curves_changed = False
+
+		for device in self.reader.get_devices():
+			if not device.stored_data_type & StoredDataType.InstrumentCurves:
+				continue
+
+			signals = self.reader.get_signal_listing(
+					device_name=device.display_name,
+					device_type=device.type_,
+					data_type=StoredDataType.InstrumentCurves,
+					ordinal=device.ordinal_number,
+					)
+
+			for signal in signals:
+				curve = signal.get_instrument_curve()
+				key = (device.display_name, device.ordinal_number, signal.signal_name)
+				consumed = self.curve_points.get(key, 0)
+
+				# Only read the points when the curve has grown.
+				if curve.total_data_points <= consumed:
+					continue
+
+				x_data, y_data = list(curve.x_data), list(curve.y_data)
+
+				if len(x_data) > consumed:
+					self.curve_points[key] = len(x_data)
+					yield NewCurvePoints(*key, x_data[consumed:], y_data[consumed:])
+
+	def drain(self) -> Iterator[LiveEvent]:
+		"""
+		Iterate over the data added since the last call.
+		"""
+
+		yield from self.new_scans()
+		yield from self.new_curve_points()
+
+
+async def follow(
+		reader: DataReader,
+		poll_interval: float = 1.0,
+		max_interval: float = 10.0,
+		backoff: float = 2.0,
+		idle_timeout: Optional[float] = None,
+		stop_when_complete: bool = True,
+		spectra: bool = True,
+		curves: bool = True,
+		) -> AsyncIterator[LiveEvent]:
+	"""
+	Follow a datafile which is being acquired, yielding only the data added since the last poll.
+
+	The data already in the file is yielded first. The datafile is then polled with
+	:meth:`DataReader.refresh_datafile() <.DataReader.refresh_datafile>`, waiting ``poll_interval``
+	seconds after new data is found and backing off to ``max_interval`` seconds while there is none.
+
+	The reader is only accessed from a dedicated thread, so the event loop is not blocked while the
+	datafile is read, and the reader must not be used elsewhere while it is being followed.
+	Each event is read as it is consumed.
+
+	:param reader: The datafile to follow.
+	:param poll_interval: The number of seconds to wait between polls while data is being written.
+	:param max_interval: The maximum number of seconds to wait between polls.
+	:param backoff: The factor the wait is multiplied by after each poll which finds no new data.
+	:param idle_timeout: Stop following the datafile if no new data is found for this many seconds.
+		If :py:obj:`None` the datafile is followed until the acquisition is complete.
+	:param stop_when_complete: Stop following the datafile once ``AcqStatus`` in :file:`Contents.xml`
+		shows the acquisition is complete. See :func:`~pyms_agilent.metadata.is_acquisition_complete`.
+	:param spectra: Whether to read the spectrum for each new scan.
+	:param curves: Whether to yield new instrument-curve points.
+	"""
+
+	if poll_interval <= 0:
+		raise ValueError("'poll_interval' must be greater than zero.")
+	if max_interval < poll_interval:
+		raise ValueError("'max_interval' cannot be less than 'poll_interval'.")
+	if backoff < 1:
+		raise ValueError("'backoff' cannot be less than 1.")
+
+	loop = asyncio.get_event_loop()
+	executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="follow")
+	follower = _Follower(reader, spectra=spectra, curves=curves)
+	delay = poll_interval
+	last_data = loop.time()
+	complete = False
+
+	try:
+		while True:
+			events = follower.drain()
+
+			while True:
+				event = await loop.run_in_executor(executor, next, events, None)
+				if event is None:
+					break
+
+				last_data = loop.time()
+				yield event
+
+			if complete:
+				return
+
+			if stop_when_complete:
+				complete = await loop.run_in_executor(executor, is_acquisition_complete, reader.filename)
+
+			if complete:
+				# Pick up anything written between the last poll and the end of the acquisition.
+				await loop.run_in_executor(executor, follower.refresh)
+				follower.curves_changed = True
+				continue
+
+			if idle_timeout is not None and loop.time() - last_data >= idle_timeout:
+				return
+
+			await asyncio.sleep(delay)
+
+			if await loop.run_in_executor(executor, follower.refresh):
+				delay = poll_interval
+			else:
+				delay = min(delay * backoff, max_interval)
+
+	finally:
+		executor.shutdown(wait=False)
@@ -29,13 +29,20 @@ Extract metadata from Agilent ``.d`` datafiles.
 #
 
 # stdlib
+import os
 import pathlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union, overload
 
 # 3rd party
 from domdf_python_tools.typing import PathLike
-from typing_extensions import TypedDict
+from lxml import etree  # type: ignore
+from typing_extensions import Literal, TypedDict
 
 # this package
+from pyms_agilent.archive import ArchivePath, resolve_path
+from pyms_agilent.enums import AcqStatusEnum
 from pyms_agilent.xml_parser.acq_method import AcqMethod, read_acqmethod
 from pyms_agilent.xml_parser.contents import Contents, read_contents_xml
 from pyms_agilent.xml_parser.default_mass_cal import CalibrationList, read_mass_cal_xml
@@ -45,25 +52,58 @@ from pyms_agilent.xml_parser.ms_actual_defs import ActualsDef, read_ms_actuals_d
 from pyms_agilent.xml_parser.ms_time_segments import MSTimeSegments, read_msts_xml
 from pyms_agilent.xml_parser.sample_info import SampleInfo, read_sample_info_xml
 
-__all__ = ["prepare_filepath", "MetadataDict", "extract_metadata", "is_datafile"]
+__all__ = [
+		"prepare_filepath",
+		"MetadataDict",
+		"LazyMetadataDict",
+		"extract_metadata",
+		"is_datafile",
+		"is_acquisition_complete",
+		"find_datafiles",
+		]
 
 
-def prepare_filepath(file_name: PathLike, mkdirs: bool = True) -> pathlib.Path:
+@overload
+def prepare_filepath(file_name: PathLike, mkdirs: Literal[True] = ...) -> pathlib.Path: ...
+
+
+@overload
+def prepare_filepath(
+		file_name: Union[PathLike, ArchivePath],
+		mkdirs: Literal[False],
+		) -> Union[pathlib.Path, ArchivePath]: ...
+
+
+def prepare_filepath(
+		file_name: Union[PathLike, ArchivePath],
+		mkdirs: bool = True,
+		) -> Union[pathlib.Path, ArchivePath]:
 	"""
 	Convert a filename string into a :class:`pathlib.Path` object, and create parent directories if required.
 
+	If ``mkdirs`` is :py:obj:`False` and the file is inside a zip or tar archive
+	an :class:`~pyms_agilent.archive.ArchivePath` is returned instead.
+
 	:param file_name: file_name to process
 	:param mkdirs: Whether the parent directory of the file should be created if it doesn't exist.
 	"""
 
+	if isinstance(file_name, ArchivePath):
+		if mkdirs:
+			raise ValueError(f"Cannot write to '{file_name}' as archives are read-only.")
+		return file_name
+
 	if not isinstance(file_name, pathlib.Path):
 		try:
 			file_name = pathlib.Path(file_name)
 		except TypeError:
 			raise TypeError(f"'file_name' must be a string or a PathLike object, not {type(file_name)}")
 
-	if not file_name.parent.is_dir() and mkdirs:
-		file_name.parent.mkdir(parents=True)
+	if mkdirs:
+		if not file_name.parent.is_dir():
+			file_name.parent.mkdir(parents=True)
+	else:
+		return resolve_path(file_name)
 
 	return file_name
 
@@ -83,48 +123,252 @@ class MetadataDict(TypedDict):
 	sample_info: SampleInfo  #: List of information about the sample, parsed from :file:`sample_info.xml`.
 
 
-def extract_metadata(file_name: PathLike) -> MetadataDict:
-	"""
-	Extract metadata from an Agilent ``.d`` datafile.
+#: Functions to parse each of the metadata files, keyed by the corresponding key in :class:`~.MetadataDict`.
+_metadata_readers: Dict[str, Callable[[Union[pathlib.Path, ArchivePath]], Any]] = {
+		"method": read_acqmethod,
+		"contents": read_contents_xml,
+		"default_mass_cal": read_mass_cal_xml,
+		"device_config_info": read_device_config_xml,
+		"devices": read_devices_xml,
+		"ms_actual_defs": read_ms_actuals_defs,
+		"ms_time_segments": read_msts_xml,
+		"sample_info": read_sample_info_xml,
+		}
+
 
-	:param file_name: name of the ``.d`` datafile
+class LazyMetadataDict(Mapping[str, Any]):
 	"""
+	Read-only mapping with the same keys as :class:`~.MetadataDict`,
+	which only parses each XML file the first time its key is accessed.
+
+	The parsed values are cached, and access is thread-safe.
+
+	:param file_name: name of the ``.d`` datafile, which may be inside a zip or tar archive.
+	"""  # noqa: D400
+
+	def __init__(self, file_name: Union[PathLike, ArchivePath]):
+		file_name = prepare_filepath(file_name, mkdirs=False)
+
+		if not is_datafile(file_name):
+			raise ValueError(f"'{file_name}' does not appear to be a valid .d datafile.")
+
+		self.file_name: Union[pathlib.Path, ArchivePath] = file_name
+		self._acqdata_dir = file_name / "AcqData"
+		self._cache: Dict[str, Any] = {}
+		self._locks = {key: threading.Lock() for key in _metadata_readers}
+
+	def __getitem__(self, key: str) -> Any:
+		if key not in _metadata_readers:
+			raise KeyError(key)
+
+		# The cache is checked again once the lock is held, as another thread may have parsed the file.
+		if key not in self._cache:
+			with self._locks[key]:
+				if key not in self._cache:
+					self._cache[key] = _metadata_readers[key](self._acqdata_dir)
+
+		return self._cache[key]
+
+	def __contains__(self, key: object) -> bool:
+		# Avoids parsing the file, which Mapping.__contains__ would do.
+		return key in _metadata_readers
 
-	file_name = prepare_filepath(file_name)
+	def __iter__(self) -> Iterator[str]:
+		return iter(_metadata_readers)
 
-	if not is_datafile(file_name):
-		raise ValueError(f"'{file_name}' does not appear to be a valid .d datafile.")
+	def __len__(self) -> int:
+		return len(_metadata_readers)
+
+	def is_loaded(self, key: str) -> bool:
+		"""
+		Returns whether the file for ``key`` has already been parsed.
+
+		:param key:
+		"""
+
+		return key in self._cache
+
+	def load_all(self, workers: Optional[int] = None) -> MetadataDict:
+		"""
+		Parse all of the metadata files which have not yet been parsed, and return the result as a dictionary.
+
+		:param workers: The number of threads to parse the files with.
+			If :py:obj:`None` or ``1`` the files are parsed in the current thread, which is fastest
+			unless the files are on slow storage (such as a network share).
+		"""
+
+		if workers is None or workers <= 1:
+			values = [self[key] for key in _metadata_readers]
+		else:
+			with ThreadPoolExecutor(max_workers=workers) as executor:
+				values = list(executor.map(self.__getitem__, _metadata_readers))
+
+		return dict(zip(_metadata_readers, values))  # type: ignore
+
+	def __repr__(self) -> str:
+		loaded = ", ".join(key for key in _metadata_readers if key in self._cache)
+		return f"<{type(self).__name__}({str(self.file_name)!r}, loaded=[{loaded}])>"
+
+
+@overload
+def extract_metadata(
+		file_name: Union[PathLike, ArchivePath],
+		lazy: Literal[False] = ...,
+		workers: Optional[int] = ...,
+		) -> MetadataDict: ...
+
+
+@overload
+def extract_metadata(
+		file_name: Union[PathLike, ArchivePath],
+		lazy: Literal[True],
+		workers: Optional[int] = ...,
+		) -> LazyMetadataDict: ...
+
+
+def extract_metadata(
+		file_name: Union[PathLike, ArchivePath],
+		lazy: bool = False,
+		workers: Optional[int] = None,
+		) -> Union[MetadataDict, LazyMetadataDict]:
+	"""
+	Extract metadata from an Agilent ``.d`` datafile.
+
+	:param file_name: name of the ``.d`` datafile, which may be inside a zip or tar archive.
+	:param lazy: If :py:obj:`True`, return a :class:`~.LazyMetadataDict` which only parses
+		each file when it is first accessed.
+	:param workers: The number of threads to parse the files with when ``lazy`` is :py:obj:`False`.
+		If :py:obj:`None` the files are parsed in the current thread.
+	"""
 
-	acqdata_dir = file_name / "AcqData"
+	metadata = LazyMetadataDict(file_name)
 
-	return {
-			"method": read_acqmethod(acqdata_dir),
-			"contents": read_contents_xml(acqdata_dir),
-			"default_mass_cal": read_mass_cal_xml(acqdata_dir),
-			"device_config_info": read_device_config_xml(acqdata_dir),
-			"devices": read_devices_xml(acqdata_dir),
-			"ms_actual_defs": read_ms_actuals_defs(acqdata_dir),
-			"ms_time_segments": read_msts_xml(acqdata_dir),
-			"sample_info": read_sample_info_xml(acqdata_dir),
-			}
+	if lazy:
+		return metadata
+	else:
+		return metadata.load_all(workers=workers)
 
 
-def is_datafile(file_name: PathLike) -> bool:
+def is_datafile(file_name: Union[PathLike, ArchivePath]) -> bool:
 	"""
 	Returns whether the given path is a valid data file.
 
-	:param file_name: name of the ``.d`` datafile
+	:param file_name: name of the ``.d`` datafile, which may be inside a zip or tar archive.
 	"""
 
+	if isinstance(file_name, ArchivePath):
+		return (file_name / "AcqData" / "Contents.xml").is_file()
+
 	if not isinstance(file_name, pathlib.Path):
 		try:
 			file_name = pathlib.Path(file_name)
 		except TypeError:
 			raise TypeError(f"'file_name' must be a string or a PathLike object, not {type(file_name)}")
 
-	if file_name.exists():
-		if file_name.is_dir():
-			if ((file_name / "AcqData") / "Contents.xml").exists():
-				return True
+	# A single stat is enough; it fails if file_name is missing or is not a directory.
+	if _has_contents_xml(str(file_name)):
+		return True
+
+	archive_path = resolve_path(file_name)
+	if isinstance(archive_path, ArchivePath):
+		return is_datafile(archive_path)
 
 	return False
+
+
+def is_acquisition_complete(file_name: Union[PathLike, ArchivePath]) -> bool:
+	"""
+	Returns whether the instrument has finished writing the given datafile.
+
+	This is determined from ``AcqStatus`` in :file:`Contents.xml`, which is
+	:py:enum:mem:`~pyms_agilent.enums.AcqStatusEnum.End` or :py:enum:mem:`~pyms_agilent.enums.AcqStatusEnum.Stop`
+	once the acquisition has finished. A datafile whose :file:`Contents.xml` is missing or
+	cannot be parsed (for example, because it is being written) is not complete.
+
+	:param file_name: name of the ``.d`` datafile, which may be inside a zip or tar archive.
+	"""
+
+	try:
+		contents = read_contents_xml(prepare_filepath(file_name, mkdirs=False) / "AcqData")
+	except (OSError, ValueError, etree.LxmlError):
+		return False
+
+	return contents.acq_status in {AcqStatusEnum.End, AcqStatusEnum.Stop}
+
+
+def _has_contents_xml(path: str) -> bool:
+	return os.path.exists(os.path.join(path, "AcqData", "Contents.xml"))
+
+
+def _scan_directory(directory: str) -> Tuple[List[str], List[str]]:
+	"""
+	Returns the datafiles and the other subdirectories in ``directory``.
+
+	Directories with the ``.d`` suffix are never returned as subdirectories, whether or not they are valid datafiles.
+
+	:param directory:
+	"""
+
+	datafiles: List[str] = []
+	subdirectories: List[str] = []
+
+	try:
+		with os.scandir(directory) as it:
+			for entry in it:
+				try:
+					if entry.name.lower().endswith(".d"):
+						if _has_contents_xml(entry.path):
+							datafiles.append(entry.path)
+					elif entry.is_dir(follow_symlinks=False):
+						subdirectories.append(entry.path)
+				except OSError:
+					continue
+	except OSError:
+		# Unreadable directories are skipped, as with os.walk
+		pass
+
+	return datafiles, subdirectories
+
+
+def find_datafiles(root: PathLike, workers: Optional[int] = None) -> Iterator[pathlib.Path]:
+	"""
+	Search for ``.d`` datafiles in ``root`` and its subdirectories.
+
+	Datafiles are yielded as soon as they are found, so processing can begin before the search is complete.
+	The contents of ``.d`` directories are not searched, and symbolic links to directories are not followed.
+
+	:param root: The directory to search.
+	:param workers: The number of threads used to scan directories.
+		If :py:obj:`None` the default for :class:`concurrent.futures.ThreadPoolExecutor` is used.
+		If ``1`` the directories are scanned in the calling thread, and the datafiles are yielded in a stable order.
+		Otherwise, the order of the datafiles is not defined.
+	"""
+
+	root = os.fspath(root)
+
+	if workers == 1:
+		pending = [root]
+
+		while pending:
+			datafiles, subdirectories = _scan_directory(pending.pop())
+			yield from map(pathlib.Path, sorted(datafiles))
+			pending.extend(sorted(subdirectories, reverse=True))
+
+		return
+
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		futures = {executor.submit(_scan_directory, root)}
+
+		try:
+			while futures:
+				done, futures = wait(futures, return_when=FIRST_COMPLETED)
+
+				for future in done:
+					datafiles, subdirectories = future.result()
+					futures.update(executor.submit(_scan_directory, directory) for directory in subdirectories)
+					yield from map(pathlib.Path, datafiles)
+
+		finally:
+			# If the generator is closed early, don't scan the rest of the tree.
+			for future in futures:
+				future.cancel()
@@ -25,7 +25,7 @@ Classes to access chromatographic data from ``.d`` datafiles.
 
 # stdlib
 from abc import ABC
-from typing import Any, List, MutableMapping, Optional, Sequence, Tuple, Union
+from typing import Any, Iterable, List, MutableMapping, Optional, Sequence, Tuple, Union
 
 # 3rd party
 import attr
@@ -45,7 +45,8 @@ from pyms_agilent.enums import (
 		MSStorageMode
 		)
 from pyms_agilent.mhdac.agilent import DataAnalysis
-from pyms_agilent.utils import Range, frozen_comparison, polarity_map, ranges_from_list
+from pyms_agilent.sharing import register_reducer
+from pyms_agilent.utils import Range, _reduce_frozen, frozen_comparison, polarity_map, ranges_from_list
 
 __all__ = [
 		"Signal",
@@ -55,6 +56,7 @@ __all__ = [
 		"y_axis_info_converter",
 		"FrozenInstrumentCurve",
 		"TIC",
+		"FrozenTIC",
 		]
 
 
@@ -349,6 +351,8 @@ class InstrumentCurve(Signal):  # pragma: no cover (!Windows)
 
 		return FrozenInstrumentCurve(**self.to_dict())
 
+	__reduce_ex__ = _reduce_frozen
+
 
 def axis_info_converter(info: Sequence[int]) -> Tuple[DataValueType, DataUnit]:
 	"""
@@ -600,10 +604,101 @@ class TIC(Signal):  # pragma: no cover (!Windows)
 
 		return the_dict
 
-	# TODO: Freeze and FrozenTIC
+	def freeze(self) -> "FrozenTIC":
+		"""
+		Returns a :class:`~pyms_agilent.mhdac.chromatograms.FrozenTIC` object
+		containing the same data as this object.
+		"""  # noqa: D400
+
+		return FrozenTIC(**self.to_dict())
+
+	__reduce_ex__ = _reduce_frozen
+
+
+def _range_converter(iterable: Iterable[Sequence[float]]) -> List[Range]:
+	return [Range(*r) for r in iterable]
+
+
+@serde
+@add_attrs_doc
+@frozen_comparison(TIC)
+@attr.s(slots=True, frozen=True)
+class FrozenTIC(FrozenSignal):
+	"""
+	Frozen version of :class:`~.TIC`.
+
+	Represents a Total Ion Chromatogram.
+	"""
+
+	abundance_limit: float = attr.ib(converter=float)
+	"""
+	The abundance limit of the TIC data; that is the largest value that could be seen
+	in the data (the theoretical "full scale" value).
+	"""
+
+	acquired_time_ranges: List[Range] = attr.ib(converter=_range_converter)
+	"""
+	The list of time ranges over which the data was acquired.
+
+	If the data was acquired over only one time range, the list will contain only one element.
+	"""
+
+	#: The collision energy used to acquire the data.
+	collision_energy: float = attr.ib(converter=float)
+
+	#: The value of the Fragmentor Voltage used to acquire the data.
+	fragmentor_voltage: float = attr.ib(converter=float)
+
+	#: The ionization polarity used to acquire the data.
+	ionization_polarity: Optional[str] = attr.ib()
 
+	#: The ionization mode used to acquire the data.
+	ionization_mode: IonizationMode = attr.ib(converter=IonizationMode)
+
+	#: The mass spectrometry level, if the data was obtained via mass spectrometry.
+	ms_level: MSLevel = attr.ib(converter=MSLevel)
+
+	#: The mass spectrometry scan type, if the data was obtained via mass spectrometry.
+	ms_scan_type: MSScanType = attr.ib(converter=MSScanType)
+
+	#: The storage mode of the mass spectrometry data, if the data was obtained via mass spectrometry.
+	ms_storage_mode: MSStorageMode = attr.ib(converter=MSStorageMode)
+
+	#: A list of |mz| ranges of interest, if the data was obtained via mass spectrometry.
+	mz_of_interest: List[Range] = attr.ib(converter=_range_converter)
+
+	#: The measured |mz| range(s), if the data was obtained via mass spectrometry.
+	measured_mass_range: List[Range] = attr.ib(converter=_range_converter)
+
+	#: Whether any |mz| ranges were excluded, if the data was obtained via mass spectrometry.
+	mz_regions_were_excluded: bool = attr.ib(converter=bool)
+
+	#: The sampling period (the inter-scan delay) for the data.
+	sampling_period: float = attr.ib(converter=float)
+
+	#: The threshold of the data.
+	threshold: float = attr.ib(converter=float)
+
+	#: The type of data represented by the x-axis, and the corresponding unit.
+	x_axis_info: Tuple[DataValueType, DataUnit] = attr.ib(converter=axis_info_converter)
+
+	#: The type of data represented by the y-axis, and the corresponding unit.
+	y_axis_info: Tuple[DataValueType, DataUnit] = attr.ib(converter=axis_info_converter)
+
+	def get_x_axis_info(self) -> Tuple[DataValueType, DataUnit]:
+		"""
+		Returns the type of data represented by the x-axis, and the corresponding unit.
+		"""
+
+		return self.x_axis_info
+
+	def get_y_axis_info(self) -> Tuple[DataValueType, DataUnit]:
+		"""
+		Returns the type of data represented by the y-axis, and the corresponding unit.
+		"""
+
+		return self.y_axis_info
 
-# TODO: frozen TIC
 
 #  ChromFilter
 #  CreateBDAChromData
@@ -639,3 +734,5 @@ class TIC(Signal):  # pragma: no cover (!Windows)
 # has to be done after the frozen classes were defined.
 frozen_comparison(FrozenSignal)(Signal)
 frozen_comparison(FrozenInstrumentCurve)(InstrumentCurve)
+frozen_comparison(FrozenTIC)(TIC)
+register_reducer(InstrumentCurve, FrozenInstrumentCurve, TIC, FrozenTIC)
@@ -26,14 +26,21 @@ Provides metadata about ``.d`` datafiles.
 # stdlib
 import pathlib
 from datetime import datetime, timezone
-from typing import Optional, Union
+from typing import Any, Dict, MutableMapping, Optional, Union
+
+# 3rd party
+import attr
+from attr_utils.pprinter import pretty_repr
+from attr_utils.serialise import serde
+from domdf_python_tools.utils import strtobool
 
 # this package
 from pyms_agilent.enums import DeviceType, IRMStatus, MeasurementTypeEnum, SeparationTechniqueEnum, StoredDataType
 from pyms_agilent.mhdac.agilent import ArgumentOutOfRangeException, DataAnalysis
-from pyms_agilent.mhdac.ms_scan_file_info import MSScanFileInformation
+from pyms_agilent.mhdac.ms_scan_file_info import FrozenMSScanFileInformation, MSScanFileInformation
+from pyms_agilent.utils import frozen_comparison
 
-__all__ = ["FileInformation"]
+__all__ = ["FileInformation", "FrozenFileInformation"]
 
 
 class FileInformation:  # pragma: no cover (!Windows)
@@ -181,6 +188,32 @@ class FileInformation:  # pragma: no cover (!Windows)
 
 		return self.interface.GetDeviceName(device_type)
 
+	def to_dict(self) -> MutableMapping[str, Any]:
+		"""
+		Returns a dictionary containing the data of this
+		:class:`~pyms_agilent.mhdac.file_information.FileInformation` object.
+		"""  # noqa: D400
+
+		return dict(
+				acquisition_time=self.acquisition_time,
+				irm_status=self.irm_status,
+				datafile_name=self.datafile_name,
+				ms_data_present=self.ms_data_present,
+				non_ms_data_present=self.non_ms_data_present,
+				uv_data_present=self.uv_data_present,
+				measurement_type=self.measurement_type,
+				separation_technique=self.separation_technique,
+				ms_scan_file_info=self.ms_scan_file_info.freeze(),
+				)
+
+	def freeze(self) -> "FrozenFileInformation":
+		"""
+		Returns a :class:`~pyms_agilent.mhdac.file_information.FrozenFileInformation`
+		object containing the same data as this object.
+		"""  # noqa: D400
+
+		return FrozenFileInformation(**self.to_dict())
+
 
 # data reader
 # ----
@@ -201,3 +234,69 @@ class FileInformation:  # pragma: no cover (!Windows)
 # GetDeviceTable  # broken
 # GetSignalTable  # broken
 # GetSpectrumXAxisLimit  # broken
+
+
+def _datetime_converter(value: Union[datetime, float]) -> datetime:
+	if isinstance(value, datetime):
+		return value
+	else:
+		# POSIX timestamp, as used when serialising to JSON.
+		return datetime.fromtimestamp(float(value), tz=timezone.utc)
+
+
+def _ms_scan_file_info_converter(
+		value: Union[FrozenMSScanFileInformation, MSScanFileInformation, Dict[str, Any]],
+		) -> FrozenMSScanFileInformation:
+	if isinstance(value, FrozenMSScanFileInformation):
+		return value
+	elif isinstance(value, MSScanFileInformation):
+		return value.freeze()  # pragma: no cover (!Windows)
+	else:
+		return FrozenMSScanFileInformation.from_dict(value)
+
+
+@serde
+@pretty_repr
+@frozen_comparison(FileInformation)
+@attr.s(slots=True, frozen=True, eq=False)
+class FrozenFileInformation:
+	"""
+	Frozen version of :class:`~.FileInformation`.
+
+	Provides information about ``.d`` data files.
+	"""
+
+	#: The acquisition time of the data.
+	acquisition_time: datetime = attr.ib(converter=_datetime_converter)
+
+	irm_status: IRMStatus = attr.ib(converter=IRMStatus)
+	"""
+	The IRM/Runtime calibration status information - success or failure.
+
+	This is the logical bitwise OR of the IRMStatusValues of the IRM status for all scans in the file.
+	"""
+
+	#: The name of the data file.
+	datafile_name: pathlib.PureWindowsPath = attr.ib(converter=pathlib.PureWindowsPath)
+
+	#: Whether mass spectrometry data is present in the datafile.
+	ms_data_present: bool = attr.ib(converter=strtobool)
+
+	#: Whether non-mass spectrometry data (with the exception UV spectral data) is present in the datafile.
+	non_ms_data_present: bool = attr.ib(converter=strtobool)
+
+	#: Whether UV spectral data is present in the datafile.
+	uv_data_present: bool = attr.ib(converter=strtobool)
+
+	#: The measurement mode information, e.g. chromatographic or direct infusion.
+	measurement_type: MeasurementTypeEnum = attr.ib(converter=MeasurementTypeEnum)
+
+	#: The separation technique information, e.g. GC, LC, CE.
+	separation_technique: SeparationTechniqueEnum = attr.ib(converter=SeparationTechniqueEnum)
+
+	#: Information about the MS Scan File.
+	ms_scan_file_info: FrozenMSScanFileInformation = attr.ib(converter=_ms_scan_file_info_converter)
+
+
+# has to be done after FrozenFileInformation was defined.
+frozen_comparison(FrozenFileInformation)(FileInformation)
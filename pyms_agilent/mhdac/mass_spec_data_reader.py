@@ -28,6 +28,7 @@ import os
 from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Tuple, Union
 
 # 3rd party
+import numpy  # type: ignore
 from domdf_python_tools.typing import PathLike
 
 # this package
@@ -77,6 +78,10 @@ class MassSpecDataReader:  # pragma: no cover (!Windows)
 		self.interface.CloseDataFile(self.data_reader)
 		return True
 
+	def __reduce__(self):
+		# The datafile is opened again when unpickled.
+		return self.__class__, (self.filename, )
+
 	def refresh_datafile(self) -> bool:
 		"""
 		Refreshes the data file and returns whether new data is present.
@@ -111,6 +116,29 @@ class MassSpecDataReader:  # pragma: no cover (!Windows)
 		:raises: :exc:`ValueError` if the scan number is out of range.
 		"""
 
+		return SpecData(self._get_spectrum(scan_no))
+
+	def get_spectrum_arrays(self, scan_no: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+		"""
+		Returns the x- and y-axis data for the given scan as :class:`numpy.ndarray` objects.
+
+		The arrays are copied directly from the .NET spectrum, without creating a
+		:class:`pyms_agilent.mhdac.spectrum.SpecData` object or intermediate lists.
+
+		:param scan_no: The scan number.
+
+		:raises: :exc:`ValueError` if the scan number is out of range.
+		"""
+
+		spectrum = DataAnalysis.IBDASpecData(self._get_spectrum(scan_no))
+		x_array, y_array = spectrum.XArray, spectrum.YArray
+
+		return (
+				numpy.fromiter(x_array, dtype=numpy.float64, count=len(x_array)),
+				numpy.fromiter(y_array, dtype=numpy.float64, count=len(y_array)),
+				)
+
+	def _get_spectrum(self, scan_no: int) -> "DataAnalysis.BDASpecData":
 		# TODO: by number and scan type
 
 		peak_filter = DataAnalysis.MsdrPeakFilter()
@@ -120,7 +148,7 @@ class MassSpecDataReader:  # pragma: no cover (!Windows)
 
 		try:
 			# Signature is scan_no, peakMSFilter, peakMSMSFilter
-			return SpecData(self.interface(self.data_reader).GetSpectrum(int(scan_no), peak_filter, peak_filter))
+			return self.interface(self.data_reader).GetSpectrum(int(scan_no), peak_filter, peak_filter)
 		except NullReferenceException:
 			raise ValueError("scan_no out of range")
 
@@ -247,8 +275,7 @@ class MassSpecDataReader:  # pragma: no cover (!Windows)
 
 		if tables:
 			df = datatable2dataframe(tables[0])
-			df = df[["DisplayName", "DisplayValue"]].set_index("DisplayName", drop=True)
-			return df.to_dict()["DisplayValue"]
+			return dict(zip(df["DisplayName"], df["DisplayValue"]))
 
 		else:
 			return {}
@@ -35,7 +35,7 @@ from attr_utils.serialise import serde
 from pyms_agilent.enums import DeviceType
 from pyms_agilent.mhdac.agilent import DataAnalysis
 from pyms_agilent.mhdac.chromatograms import FrozenInstrumentCurve, InstrumentCurve
-from pyms_agilent.utils import frozen_comparison
+from pyms_agilent.utils import _reduce_frozen, frozen_comparison
 
 __all__ = ["SignalInfo", "FrozenSignalInfo"]
 
@@ -127,6 +127,8 @@ class SignalInfo:  # pragma: no cover (!Windows)
 
 		return FrozenSignalInfo(**self.to_dict())
 
+	__reduce_ex__ = _reduce_frozen
+
 
 def convert_instrument_curve(
 		curve: Union[InstrumentCurve, FrozenInstrumentCurve, Dict[str, Any]],
@@ -45,7 +45,7 @@ Provides access to information about a single spectrum in ``.d`` data files.
 #
 
 # stdlib
-from typing import Any, Iterable, List, MutableMapping, Optional, Tuple
+from typing import Any, Iterable, List, MutableMapping, Optional, Sequence, Tuple
 
 # 3rd party
 import attr
@@ -69,7 +69,8 @@ from pyms_agilent.enums import (
 from pyms_agilent.exceptions import NotMS2Error
 from pyms_agilent.mhdac.agilent import DataAnalysis
 from pyms_agilent.mhdac.chromatograms import axis_info_converter
-from pyms_agilent.utils import Range, frozen_comparison, polarity_map, ranges_from_list
+from pyms_agilent.sharing import register_reducer
+from pyms_agilent.utils import Range, _reduce_frozen, frozen_comparison, polarity_map, ranges_from_list
 
 __all__ = [
 		"SpecData",
@@ -527,6 +528,8 @@ class SpecData:  # pragma: no cover (!Windows)
 		else:
 			return FrozenSpecData(**self.to_dict())
 
+	__reduce_ex__ = _reduce_frozen
+
 
 # data_reader
 # ===============
@@ -554,8 +557,14 @@ class SpecData:  # pragma: no cover (!Windows)
 # ConvertDataToMassUnits  # Converts the spectrum to mass units if it is in time units. Presumably mutates data?
 
 
-def _range_converter(iterable: Iterable[Range]) -> List[Range]:
-	return list(iterable)
+def _range_converter(iterable: Iterable[Sequence[float]]) -> List[Range]:
+	return [Range(*r) for r in iterable]
+
+
+def _optional_range_converter(value: Optional[Sequence[float]]) -> Optional[Range]:
+	if value is None:
+		return None
+	return Range(*value)
 
 
 @serde
@@ -647,7 +656,7 @@ class FrozenSpecData:
 	"""
 
 	#: The measured |mz| range(s), if the data was obtained via mass spectrometry.
-	measured_mass_range: Range = attr.ib()
+	measured_mass_range: Optional[Range] = attr.ib(converter=_optional_range_converter)
 
 	#: The ordinal number of the spectrum.
 	ordinal_number: int = attr.ib(converter=int)
@@ -751,6 +760,7 @@ class FrozenMS2SpecData(FrozenSpecData):
 
 # has to be done after FrozenSpecData was defined.
 frozen_comparison(FrozenSpecData)(SpecData)
+register_reducer(SpecData, FrozenSpecData, FrozenMS2SpecData)
 
 
 @register_pretty(type(etc))
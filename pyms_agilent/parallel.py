@@ -0,0 +1,303 @@
+#  !/usr/bin/env python
+#
+#  parallel.py
+"""
+Read the spectra in a datafile using several processes.
+
+The scans are split into partitions, one for each MS time segment, which are subdivided into
+partitions of at most ``scans_per_partition`` scans. The partitions are read by worker processes,
+each of which keeps its own copy of the datafile open, and the spectra are returned in scan order.
+
+Example:
+
+.. code-block:: python
+
+	for scan_no, (mz, intensity) in iter_spectra("Sample1.d", arrays=True):
+		...
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import multiprocessing.util
+import os
+import pathlib
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# 3rd party
+import numpy  # type: ignore
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.sharing import SharedArrays, ensure_resource_tracker
+from pyms_agilent.xml_parser.ms_time_segments import read_msts_xml
+
+__all__ = ["Partition", "partition_scans", "iter_spectra", "read_spectra"]
+
+
+class Partition(NamedTuple):
+	"""
+	A contiguous range of scans.
+	"""
+
+	#: The first scan in the partition.
+	start: int
+
+	#: The scan after the last scan in the partition.
+	stop: int
+
+	#: The ID of the MS time segment the scans belong to, if known.
+	time_segment: Optional[int] = None
+
+	@property
+	def n_scans(self) -> int:
+		"""
+		Returns the number of scans in the partition.
+		"""
+
+		return self.stop - self.start
+
+
+def _time_segment_sizes(reader: DataReader) -> List[Tuple[int, int]]:
+	"""
+	Returns the ID and number of scans of each time segment, in acquisition order.
+
+	:param reader:
+	"""
+
+	total_scans = reader.total_scans
+
+	try:
+		time_segments = read_msts_xml(pathlib.Path(reader.filename) / "AcqData")
+	except FileNotFoundError:
+		time_segments = None
+
+	if time_segments and sum(segment.n_scans for segment in time_segments) == total_scans:
+		ordered = sorted(time_segments, key=lambda segment: segment.start_time)
+		return [(segment.timesegment_id, segment.n_scans) for segment in ordered]
+
+	# Otherwise find the runs of scans from the same time segment.
+	sizes: List[List[int]] = []
+
+	for scan_no in range(total_scans):
+		time_segment = reader.get_scan_record(scan_no).time_segment
+
+		if sizes and sizes[-1][0] == time_segment:
+			sizes[-1][1] += 1
+		else:
+			sizes.append([time_segment, 1])
+
+	return [(time_segment, n_scans) for time_segment, n_scans in sizes]
+
+
+def partition_scans(reader: DataReader, scans_per_partition: Optional[int] = None) -> List[Partition]:
+	"""
+	Split the scans in a datafile into partitions, one for each MS time segment.
+
+	The number of scans in each time segment is read from :file:`MSTS.xml` where it is available,
+	and from the scan records otherwise.
+
+	:param reader:
+	:param scans_per_partition: If given, time segments with more scans than this are split into several partitions.
+	"""
+
+	if scans_per_partition is not None and scans_per_partition < 1:
+		raise ValueError("'scans_per_partition' must be at least 1.")
+
+	partitions = []
+	start = 0
+
+	for time_segment, n_scans in _time_segment_sizes(reader):
+		stop = start + n_scans
+		step = scans_per_partition or n_scans
+
+		for partition_start in range(start, stop, step):
+			partitions.append(Partition(partition_start, min(partition_start + step, stop), time_segment))
+
+		start = stop
+
+	return partitions
+
+
+# The readers opened by this worker process, keyed by the factory and the filename.
+_worker_readers: Dict[Tuple[Callable[[str], DataReader], str], DataReader] = {}
+
+
+def _close_worker_readers() -> None:
+	"""
+	Close the readers opened by this worker process. This is run when the worker exits.
+	"""
+
+	while _worker_readers:
+		_, reader = _worker_readers.popitem()
+		reader.close_datafile()
+
+
+def _get_worker_reader(reader_factory: Callable[[str], DataReader], filename: str) -> DataReader:
+	"""
+	Returns the reader for the datafile in this worker process, opening it if necessary.
+
+	:param reader_factory:
+	:param filename:
+	"""
+
+	key = (reader_factory, filename)
+
+	if key not in _worker_readers:
+		if not _worker_readers:
+			# Worker processes exit without running atexit handlers, but do run multiprocessing's finalizers.
+			multiprocessing.util.Finalize(None, _close_worker_readers, exitpriority=10)
+
+		_worker_readers[key] = reader_factory(filename)
+
+	return _worker_readers[key]
+
+
+def _read_partition(
+		reader_factory: Callable[[str], DataReader],
+		filename: str,
+		partition: Partition,
+		arrays: bool,
+		) -> Any:
+	"""
+	Read the spectra in a partition. This is run in a worker process.
+
+	:param reader_factory:
+	:param filename:
+	:param partition:
+	:param arrays: If :py:obj:`True` the arrays for every scan are concatenated, so they are sent back
+		to the main process together.
+	"""
+
+	reader = _get_worker_reader(reader_factory, filename)
+	scan_numbers = range(partition.start, partition.stop)
+
+	if not arrays:
+		# Spectra are frozen when they are sent back to the main process.
+		return [reader.get_spectrum_by_scan(scan_no) for scan_no in scan_numbers]
+
+	x_arrays, y_arrays = zip(*(reader.get_spectrum_arrays(scan_no) for scan_no in scan_numbers))
+	lengths = numpy.fromiter(map(len, x_arrays), dtype=numpy.int64, count=len(x_arrays))
+
+	return SharedArrays([numpy.concatenate(x_arrays), numpy.concatenate(y_arrays), lengths])
+
+
+def _unpack_partition(partition: Partition, result: Any, arrays: bool) -> Iterator[Tuple[int, Any]]:
+	if not arrays:
+		yield from zip(range(partition.start, partition.stop), result)
+		return
+
+	x_data, y_data, lengths = result
+	boundaries = numpy.cumsum(lengths)[:-1]
+	x_arrays = numpy.split(x_data, boundaries)
+	y_arrays = numpy.split(y_data, boundaries)
+
+	yield from zip(range(partition.start, partition.stop), zip(x_arrays, y_arrays))
+
+
+def iter_spectra(
+		filename: PathLike,
+		partitions: Optional[Iterable[Partition]] = None,
+		scans_per_partition: Optional[int] = 250,
+		max_workers: Optional[int] = None,
+		arrays: bool = False,
+		reader_factory: Callable[[str], DataReader] = DataReader,
+		executor: Optional[Executor] = None,
+		) -> Iterator[Tuple[int, Any]]:
+	"""
+	Read spectra from the datafile in parallel, yielding ``(scan_no, spectrum)`` tuples in scan order.
+
+	Up to twice as many partitions as there are workers are read ahead of the partition being yielded,
+	so the number of spectra held in memory is bounded.
+
+	:param filename: The ``.d`` datafile to read.
+	:param partitions: The partitions to read, as :class:`~.Partition` objects or ``(start, stop)`` tuples.
+		If :py:obj:`None` every scan is read, with partitions from :func:`~.partition_scans`.
+	:param scans_per_partition: The maximum number of scans in each partition when ``partitions`` is :py:obj:`None`.
+	:param max_workers: The number of worker processes to use. Defaults to the number of CPUs.
+		Ignored if ``executor`` is given.
+	:param arrays: If :py:obj:`True` the spectra are returned as tuples of :class:`numpy.ndarray` objects
+		(see :meth:`DataReader.get_spectrum_arrays() <.DataReader.get_spectrum_arrays>`),
+		which is faster than returning :class:`~pyms_agilent.mhdac.spectrum.FrozenSpecData` objects.
+	:param reader_factory: The function to open the datafile with in each worker.
+	:param executor: An existing :class:`~concurrent.futures.ProcessPoolExecutor` to use.
+		If :py:obj:`None` a new one is created, and shut down afterwards.
+	"""
+
+	filename = os.fspath(filename)
+
+	if partitions is None:
+		reader = reader_factory(filename)
+
+		try:
+			partitions = partition_scans(reader, scans_per_partition)
+		finally:
+			reader.close_datafile()
+
+	own_executor = executor is None
+	if executor is None:
+		# Shared with the workers, so any spectra they send which are never received are cleaned up at exit.
+		ensure_resource_tracker()
+		executor = ProcessPoolExecutor(max_workers=max_workers)
+
+	# The number of workers the executor actually has, which may differ from max_workers if it was given.
+	n_workers = getattr(executor, "_max_workers", None) or max_workers or os.cpu_count() or 1
+	max_pending = 2 * n_workers
+	pending: Deque = deque()
+	to_submit = iter(partitions)
+
+	try:
+		while True:
+			for partition in (Partition(*p) for p in to_submit):
+				if partition.n_scans <= 0:
+					continue
+
+				future = executor.submit(_read_partition, reader_factory, filename, partition, arrays)
+				pending.append((partition, future))
+
+				if len(pending) >= max_pending:
+					break
+
+			if not pending:
+				break
+
+			partition, future = pending.popleft()
+			yield from _unpack_partition(partition, future.result(), arrays)
+
+	finally:
+		for _, future in pending:
+			future.cancel()
+
+		if own_executor:
+			executor.shutdown(wait=True)
+
+
+def read_spectra(filename: PathLike, **kwargs) -> List[Any]:
+	"""
+	Read spectra from the datafile in parallel, and return them in scan order.
+
+	:param filename: The ``.d`` datafile to read.
+	:param kwargs: Keyword arguments for :func:`~.iter_spectra`.
+	"""
+
+	return [spectrum for _, spectrum in iter_spectra(filename, **kwargs)]
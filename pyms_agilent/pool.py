@@ -0,0 +1,332 @@
+#  !/usr/bin/env python
+#
+#  pool.py
+"""
+Thread-safe pool of open :class:`~pyms_agilent.data_reader.DataReader` objects.
+
+Opening a datafile is expensive, but each reader can only be used by one thread at a time.
+The pool keeps readers open between requests, and hands each one to a single thread at a time.
+
+Example:
+
+.. code-block:: python
+
+	pool = ReaderPool(max_per_file=4, max_open=32)
+
+	def handle_request(filename: str, scan_no: int):
+		with pool.reader(filename) as reader:
+			return reader.get_spectrum_arrays(scan_no)
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, DefaultDict, Dict, Iterator, List, Optional, Tuple
+
+# 3rd party
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pyms_agilent.data_reader import DataReader
+
+__all__ = ["ReaderPool"]
+
+
+class ReaderPool:
+	"""
+	Keeps up to ``max_per_file`` readers open for each datafile, and up to ``max_open`` readers in total.
+
+	Readers are checked out with :meth:`~.ReaderPool.checkout` (or :meth:`~.ReaderPool.reader`),
+	and are only used by one thread at a time until they are checked back in.
+	Readers which have not been used for ``idle_timeout`` seconds are closed.
+
+	When the limit on the total number of readers is reached, the least recently used idle reader
+	for another datafile is closed to make room. If every reader is in use the caller waits for one
+	to be checked in.
+
+	:param max_per_file: The maximum number of readers to open for each datafile.
+	:param max_open: The maximum number of readers to have open at once.
+	:param idle_timeout: The number of seconds after which an unused reader is closed.
+		If :py:obj:`None` readers are only closed to make room for others, or when the pool is closed.
+	:param reader_factory: The function to open a datafile with.
+	"""
+
+	def __init__(
+			self,
+			max_per_file: int = 2,
+			max_open: int = 16,
+			idle_timeout: Optional[float] = 300.0,
+			reader_factory: Callable[[str], DataReader] = DataReader,
+			):
+
+		if max_per_file < 1:
+			raise ValueError("'max_per_file' must be at least 1.")
+		if max_open < 1:
+			raise ValueError("'max_open' must be at least 1.")
+
+		self.max_per_file = int(max_per_file)
+		self.max_open = int(max_open)
+		self.idle_timeout = idle_timeout
+		self.reader_factory = reader_factory
+
+		self._condition = threading.Condition()
+		self._closed = False
+
+		# Idle readers for each datafile, with the time they were checked in. The most recent is last.
+		self._idle: DefaultDict[str, List[Tuple[float, DataReader]]] = defaultdict(list)
+
+		# The number of open (or opening) readers for each datafile.
+		self._open: DefaultDict[str, int] = defaultdict(int)
+
+		# The datafile each checked out reader belongs to, keyed by the reader's id.
+		self._checked_out: Dict[int, str] = {}
+
+	@staticmethod
+	def _key(filename: PathLike) -> str:
+		return os.path.normcase(os.path.abspath(os.fspath(filename)))
+
+	@property
+	def open_count(self) -> int:
+		"""
+		Returns the number of readers which are currently open.
+		"""
+
+		with self._condition:
+			return sum(self._open.values())
+
+	@property
+	def idle_count(self) -> int:
+		"""
+		Returns the number of open readers which are not checked out.
+		"""
+
+		with self._condition:
+			return sum(map(len, self._idle.values()))
+
+	def _pop_expired(self, now: float) -> List[DataReader]:
+		"""
+		Remove the readers which have been idle for longer than ``idle_timeout``, and return them.
+
+		Must be called with the lock held. The readers should be closed once the lock is released.
+
+		:param now: The current value of :func:`time.monotonic`.
+		"""
+
+		if self.idle_timeout is None:
+			return []
+
+		expired = []
+
+		for key, idle in list(self._idle.items()):
+			while idle and now - idle[0][0] >= self.idle_timeout:
+				expired.append(idle.pop(0)[1])
+				self._open[key] -= 1
+
+		return expired
+
+	def _pop_least_recently_used(self) -> Optional[DataReader]:
+		"""
+		Remove the idle reader which was checked in longest ago, and return it.
+
+		Must be called with the lock held. The reader should be closed once the lock is released.
+		"""
+
+		candidates = [(idle[0][0], key) for key, idle in self._idle.items() if idle]
+
+		if not candidates:
+			return None
+
+		_, key = min(candidates)
+		self._open[key] -= 1
+		return self._idle[key].pop(0)[1]
+
+	@staticmethod
+	def _close_readers(readers: List[DataReader]) -> None:
+		for reader in readers:
+			reader.close_datafile()
+
+	def checkout(self, filename: PathLike, timeout: Optional[float] = None) -> DataReader:
+		"""
+		Returns an open reader for the given datafile, which must be returned with :meth:`~.ReaderPool.checkin`.
+
+		:param filename: The ``.d`` datafile to read.
+		:param timeout: The maximum number of seconds to wait for a reader to become available.
+			If :py:obj:`None` there is no limit.
+
+		:raises TimeoutError: if no reader became available within ``timeout`` seconds.
+		"""
+
+		key = self._key(filename)
+		deadline = None if timeout is None else time.monotonic() + timeout
+		to_close: List[DataReader] = []
+
+		try:
+			with self._condition:
+				while True:
+					if self._closed:
+						raise ValueError("The pool has been closed.")
+
+					now = time.monotonic()
+					to_close.extend(self._pop_expired(now))
+
+					if self._idle[key]:
+						# The most recently used reader is the most likely to still be warm.
+						_, reader = self._idle[key].pop()
+						self._checked_out[id(reader)] = key
+						return reader
+
+					if self._open[key] < self.max_per_file:
+						if sum(self._open.values()) >= self.max_open:
+							lru = self._pop_least_recently_used()
+							if lru is not None:
+								to_close.append(lru)
+
+						if sum(self._open.values()) < self.max_open:
+							# Reserve the slot, then open the datafile without holding the lock.
+							self._open[key] += 1
+							break
+
+					if deadline is not None and now >= deadline:
+						raise TimeoutError(f"Timed out waiting for a reader for '{filename}'.")
+
+					if to_close:
+						# Close the readers which were removed now, rather than once the wait is over,
+						# and let any other waiters use the slots they held.
+						readers, to_close = to_close, []
+						self._condition.notify_all()
+						self._condition.release()
+						try:
+							self._close_readers(readers)
+						finally:
+							self._condition.acquire()
+						continue
+
+					self._condition.wait(None if deadline is None else deadline - now)
+
+		finally:
+			self._close_readers(to_close)
+
+		try:
+			reader = self.reader_factory(os.fspath(filename))
+		except BaseException:
+			with self._condition:
+				self._open[key] -= 1
+				self._condition.notify_all()
+			raise
+
+		with self._condition:
+			self._checked_out[id(reader)] = key
+
+		return reader
+
+	def checkin(self, reader: DataReader, discard: bool = False) -> None:
+		"""
+		Return a reader obtained from :meth:`~.ReaderPool.checkout` to the pool.
+
+		:param reader:
+		:param discard: Close the reader rather than returning it to the pool,
+			for example because an error has left it in an unknown state.
+		"""
+
+		with self._condition:
+			try:
+				key = self._checked_out.pop(id(reader))
+			except KeyError:
+				raise ValueError("The reader was not checked out from this pool.") from None
+
+			to_close = self._pop_expired(time.monotonic())
+
+			if discard or self._closed:
+				self._open[key] -= 1
+				to_close.append(reader)
+			else:
+				self._idle[key].append((time.monotonic(), reader))
+
+			self._condition.notify_all()
+
+		self._close_readers(to_close)
+
+	@contextmanager
+	def reader(self, filename: PathLike, timeout: Optional[float] = None) -> Iterator[DataReader]:
+		"""
+		Context manager which checks out a reader for the given datafile, and checks it back in afterwards.
+
+		:param filename: The ``.d`` datafile to read.
+		:param timeout: The maximum number of seconds to wait for a reader to become available.
+			If :py:obj:`None` there is no limit.
+
+		:raises TimeoutError: if no reader became available within ``timeout`` seconds.
+		"""
+
+		reader = self.checkout(filename, timeout=timeout)
+
+		try:
+			yield reader
+		finally:
+			self.checkin(reader)
+
+	def evict_idle(self) -> int:
+		"""
+		Close the readers which have been idle for longer than ``idle_timeout``.
+
+		This also happens whenever a reader is checked out or in, but can be called periodically
+		so readers are closed even when the pool is not being used.
+
+		:returns: The number of readers which were closed.
+		"""
+
+		with self._condition:
+			expired = self._pop_expired(time.monotonic())
+			self._condition.notify_all()
+
+		self._close_readers(expired)
+		return len(expired)
+
+	def close(self) -> None:
+		"""
+		Close all idle readers. Readers which are checked out are closed when they are checked in.
+		"""
+
+		with self._condition:
+			self._closed = True
+			to_close = []
+
+			for key, idle in self._idle.items():
+				self._open[key] -= len(idle)
+				to_close.extend(reader for _, reader in idle)
+
+			self._idle.clear()
+			self._condition.notify_all()
+
+		self._close_readers(to_close)
+
+	def __enter__(self) -> "ReaderPool":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+	def __repr__(self) -> str:
+		return f"<{self.__class__.__name__}(open={self.open_count}, idle={self.idle_count})>"
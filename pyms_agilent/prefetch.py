@@ -0,0 +1,267 @@
+#  !/usr/bin/env python
+#
+#  prefetch.py
+"""
+Read scans ahead of the code processing them, on a background thread.
+
+When scans are processed in order, reading the next scan from the datafile can happen
+while the current one is being processed, rather than the two alternating.
+
+Example:
+
+.. code-block:: python
+
+	with Prefetcher(reader, depth=16) as scans:
+		for scan_no, spectrum in scans:
+			...
+
+	print(scans.stats)
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional, Tuple
+
+# 3rd party
+import attr
+import numpy  # type: ignore
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.utils import freeze
+
+__all__ = ["PrefetchStats", "Prefetcher", "estimate_size"]
+
+
+@attr.s(slots=True)
+class PrefetchStats:
+	"""
+	Statistics about how well reading and processing the scans overlapped.
+
+	If ``consumer_wait_time`` is large, reading the datafile is the bottleneck.
+	If ``producer_stall_time`` is large, processing the scans is the bottleneck,
+	or the queue is too small.
+	"""
+
+	#: The number of scans which have been read.
+	fetched: int = attr.ib(default=0)
+
+	#: The total time spent reading scans, in seconds.
+	fetch_time: float = attr.ib(default=0.0)
+
+	#: The number of times the consumer had to wait for a scan to be read.
+	consumer_waits: int = attr.ib(default=0)
+
+	#: The total time the consumer spent waiting for scans, in seconds.
+	consumer_wait_time: float = attr.ib(default=0.0)
+
+	#: The number of times reading was paused because the queue was full.
+	producer_stalls: int = attr.ib(default=0)
+
+	#: The total time reading was paused for, in seconds.
+	producer_stall_time: float = attr.ib(default=0.0)
+
+	#: The largest estimated size of the scans in the queue at any one time, in bytes.
+	peak_bytes: int = attr.ib(default=0)
+
+
+def estimate_size(item: Any) -> int:
+	"""
+	Estimate the memory used by a scan, in bytes.
+
+	Arrays are counted by their size, and spectra by the number of points in their ``x_data`` and ``y_data``.
+	Tuples and lists are counted by their contents.
+
+	:param item:
+	"""
+
+	if isinstance(item, numpy.ndarray):
+		return int(item.nbytes)
+	elif isinstance(item, (tuple, list)):
+		return sum(map(estimate_size, item))
+	elif hasattr(item, "x_data") and hasattr(item, "y_data"):
+		return 8 * (len(item.x_data) + len(item.y_data))
+	else:
+		return 0
+
+
+def _get_spectrum(reader: DataReader, scan_no: int) -> Any:
+	# Spectra from the native reader are converted from .NET here, on the background thread,
+	# rather than each time their data is accessed.
+	return freeze(reader.get_spectrum_by_scan(scan_no))
+
+
+class Prefetcher(Iterator[Tuple[int, Any]]):
+	"""
+	Iterate over ``(scan_no, item)`` tuples, reading up to ``depth`` scans ahead on a background thread.
+
+	While the prefetcher is running the reader must not be used by any other thread.
+
+	:param reader: The reader to read scans from.
+	:param scan_numbers: The scans to read, in the order to read them. If :py:obj:`None` every scan is read.
+	:param depth: The maximum number of scans to read ahead.
+	:param max_bytes: The maximum estimated size (see :func:`~.estimate_size`) of the scans read ahead.
+		A single scan larger than this is still read, once the queue is empty.
+		If :py:obj:`None` only ``depth`` limits the queue.
+	:param fetch: The function to read a scan with, which is given the reader and the scan number.
+		Defaults to reading the spectrum with :meth:`~.DataReader.get_spectrum_by_scan`,
+		and freezing it on the background thread.
+	:param size: The function to estimate the size of a scan with.
+	"""
+
+	def __init__(
+			self,
+			reader: DataReader,
+			scan_numbers: Optional[Iterable[int]] = None,
+			depth: int = 8,
+			max_bytes: Optional[int] = None,
+			fetch: Optional[Callable[[DataReader, int], Any]] = None,
+			size: Callable[[Any], int] = estimate_size,
+			):
+
+		if depth < 1:
+			raise ValueError("'depth' must be at least 1.")
+
+		if scan_numbers is None:
+			scan_numbers = range(reader.total_scans)
+
+		self.reader = reader
+		self.depth = int(depth)
+		self.max_bytes = max_bytes
+		self.stats = PrefetchStats()
+
+		self._scan_numbers = iter(scan_numbers)
+		self._fetch = fetch or _get_spectrum
+		self._size = size
+
+		self._condition = threading.Condition()
+		self._queue: Deque[Tuple[int, Any, int]] = deque()
+		self._queued_bytes = 0
+		self._finished = False
+		self._closed = False
+		self._error: Optional[BaseException] = None
+
+		self._thread = threading.Thread(target=self._run, name="Prefetcher", daemon=True)
+		self._thread.start()
+
+	def _has_room(self, size: int) -> bool:
+		if len(self._queue) >= self.depth:
+			return False
+		if self.max_bytes is not None and self._queue and self._queued_bytes + size > self.max_bytes:
+			return False
+		return True
+
+	def _run(self) -> None:
+		try:
+			for scan_no in self._scan_numbers:
+				if self._closed:
+					return
+
+				start = time.perf_counter()
+				item = self._fetch(self.reader, scan_no)
+				item_size = self._size(item)
+
+				with self._condition:
+					self.stats.fetched += 1
+					self.stats.fetch_time += time.perf_counter() - start
+
+					if not self._closed and not self._has_room(item_size):
+						self.stats.producer_stalls += 1
+						stall_start = time.perf_counter()
+
+						while not self._closed and not self._has_room(item_size):
+							self._condition.wait()
+
+						self.stats.producer_stall_time += time.perf_counter() - stall_start
+
+					if self._closed:
+						return
+
+					self._queue.append((scan_no, item, item_size))
+					self._queued_bytes += item_size
+					self.stats.peak_bytes = max(self.stats.peak_bytes, self._queued_bytes)
+					self._condition.notify_all()
+
+		except BaseException as e:  # pylint: disable=broad-except
+			with self._condition:
+				self._error = e
+
+		finally:
+			with self._condition:
+				self._finished = True
+				self._condition.notify_all()
+
+	def __iter__(self) -> "Prefetcher":
+		return self
+
+	def __next__(self) -> Tuple[int, Any]:
+		with self._condition:
+			if self._closed:
+				raise StopIteration
+
+			if not self._queue and not self._finished:
+				self.stats.consumer_waits += 1
+				wait_start = time.perf_counter()
+
+				while not self._queue and not self._finished:
+					self._condition.wait()
+
+				self.stats.consumer_wait_time += time.perf_counter() - wait_start
+
+			if self._queue:
+				scan_no, item, item_size = self._queue.popleft()
+				self._queued_bytes -= item_size
+				self._condition.notify_all()
+				return scan_no, item
+
+			if self._error is not None:
+				# Raised once, at the position of the scan which could not be read.
+				error, self._error = self._error, None
+				raise error
+
+			raise StopIteration
+
+	def close(self) -> None:
+		"""
+		Stop reading ahead, and discard any scans which have been read but not consumed.
+
+		This waits for the scan currently being read to finish, after which the reader can be used again.
+		"""
+
+		with self._condition:
+			self._closed = True
+			self._queue.clear()
+			self._queued_bytes = 0
+			self._condition.notify_all()
+
+		self._thread.join()
+
+	def __enter__(self) -> "Prefetcher":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+	def __repr__(self) -> str:
+		return f"<{self.__class__.__name__}(depth={self.depth}, queued={len(self._queue)})>"
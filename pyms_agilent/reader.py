@@ -34,6 +34,7 @@ from pyms.Spectrum import Scan  # type: ignore  # TODO
 
 # this package
 from pyms_agilent.mhdac.mass_spec_data_reader import MassSpecDataReader
+from pyms_agilent.prefetch import Prefetcher
 
 __all__ = ["agilent_reader"]
 
@@ -60,10 +61,13 @@ def agilent_reader(file_name: PathLike) -> GCMS_data:  # pragma: no cover (!Wind
 
 	reader = MassSpecDataReader(file_name)
 
-	for scan_no in range(reader.file_information.ms_scan_file_info.total_scans):
-		spectrum = reader.get_spectrum_by_scan(scan_no)
-		scan_list.append(Scan(spectrum.x_data, spectrum.y_data))
-		time_list.append(mean(spectrum.acquired_time_ranges[0]) * 60.0)
+	scan_numbers = range(reader.file_information.ms_scan_file_info.total_scans)
+
+	# The next scans are read while the current one is being converted.
+	with Prefetcher(reader, scan_numbers) as scans:  # type: ignore
+		for scan_no, spectrum in scans:
+			scan_list.append(Scan(spectrum.x_data, spectrum.y_data))
+			time_list.append(mean(spectrum.acquired_time_ranges[0]) * 60.0)
 
 	# sanity check
 	time_len = len(time_list)
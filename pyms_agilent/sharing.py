@@ -0,0 +1,243 @@
+#  !/usr/bin/env python
+#
+#  sharing.py
+"""
+Passing arrays between processes through :mod:`multiprocessing.shared_memory`.
+
+Frozen spectra and chromatograms (and the live classes which wrap .NET objects, which are frozen first)
+are reduced with :func:`~.reduce_with_shared_arrays` when they are sent between processes by
+:mod:`multiprocessing` or :mod:`concurrent.futures`. Their data is sent as :class:`numpy.ndarray` objects,
+and arrays of at least :data:`~.shared_memory_threshold` bytes are copied through shared memory rather than pickled.
+
+Objects pickled with :func:`pickle.dumps` are not affected.
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import os
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple, Type
+
+# 3rd party
+import attr
+import numpy  # type: ignore
+
+try:
+	# stdlib
+	from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # pragma: no cover (py38+)
+	shared_memory = None  # type: ignore
+
+__all__ = [
+		"shared_memory_threshold",
+		"share_arrays",
+		"read_shared_arrays",
+		"ensure_resource_tracker",
+		"SharedArrays",
+		"reduce_with_shared_arrays",
+		"register_reducer",
+		]
+
+#: Arrays totalling at least this many bytes are passed through shared memory rather than pickled.
+shared_memory_threshold: int = 64 * 1024
+
+# Describes an array in a shared memory block: (dtype, shape, offset)
+_ArraySpec = Tuple[str, Tuple[int, ...], int]
+
+
+def share_arrays(arrays: Sequence[numpy.ndarray], track: bool = False) -> Tuple[Any, List[_ArraySpec]]:
+	"""
+	Copy the arrays into a new shared memory block.
+
+	The block is removed by :func:`~.read_shared_arrays`, so the arrays can only be read once.
+
+	:param arrays:
+	:param track: Whether to leave the block registered with :mod:`multiprocessing.resource_tracker`,
+		which removes it when the program exits if it has not been read by then.
+		The block must then be read by a process which shares this process's resource tracker.
+		Otherwise the block is only removed once it is read.
+
+	:returns: The :class:`~multiprocessing.shared_memory.SharedMemory` block,
+		and the information needed to read the arrays back from it.
+	"""
+
+	specs: List[_ArraySpec] = []
+	offset = 0
+
+	for array in arrays:
+		# Keep every array aligned to 8 bytes.
+		offset += -offset % 8
+		specs.append((array.dtype.str, array.shape, offset))
+		offset += array.nbytes
+
+	block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+
+	if not track:
+		resource_tracker.unregister(block._name, "shared_memory")  # type: ignore
+
+	for array, (dtype, shape, start) in zip(arrays, specs):
+		target = numpy.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+		target[...] = array
+		del target
+
+	return block, specs
+
+
+def read_shared_arrays(name: str, specs: Sequence[_ArraySpec]) -> Tuple[numpy.ndarray, ...]:
+	"""
+	Copy the arrays out of the shared memory block with the given name, and remove the block.
+
+	:param name:
+	:param specs: The information returned by :func:`~.share_arrays`.
+	"""
+
+	block = shared_memory.SharedMemory(name=name)
+
+	try:
+		arrays = []
+
+		for dtype, shape, offset in specs:
+			view = numpy.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+			arrays.append(view.copy())
+			del view
+
+		return tuple(arrays)
+
+	finally:
+		block.close()
+
+		# Also unregisters the block, which was registered with the resource tracker when it was opened
+		# (and, if it was tracked, when it was created).
+		block.unlink()
+
+
+def ensure_resource_tracker() -> None:
+	"""
+	Start the :mod:`multiprocessing.resource_tracker` for this process, if it is not already running.
+
+	Call this before starting worker processes, so they share the tracker with this process
+	even when they are started with ``fork``. Blocks created by :class:`~.SharedArrays`
+	in the workers are then removed when the program exits, even if they are never read.
+	"""
+
+	if shared_memory is not None and os.name != "nt":
+		resource_tracker.ensure_running()
+
+
+def _tracker_is_inherited() -> bool:
+	"""
+	Returns whether this process uses a resource tracker which was started by another process.
+
+	A block registered with such a tracker outlives this process,
+	and is unregistered when the process which reads the block removes it.
+	"""
+
+	tracker = resource_tracker._resource_tracker  # type: ignore
+
+	if tracker._fd is None:
+		return False
+
+	if tracker._pid is None:
+		# The tracker was passed to this process when it was spawned.
+		return True
+
+	try:
+		os.waitpid(tracker._pid, os.WNOHANG)
+	except ChildProcessError:
+		# The tracker is not a child of this process.
+		return True
+
+	return False
+
+
+class SharedArrays:
+	"""
+	A tuple of arrays which is passed through shared memory when pickled, if it is large enough.
+
+	The block is removed when the arrays are unpickled, so each pickle can only be loaded once.
+	This makes it suitable for sending objects between processes, but not for storing them.
+
+	When pickled in a worker process which shares its parent's :mod:`multiprocessing.resource_tracker`
+	(see :func:`~.ensure_resource_tracker`) the block stays registered with the tracker until it is read,
+	so if the pickle is never loaded (for example because a result could not be sent) the block is removed
+	when the program exits. Otherwise the block is not removed until the machine restarts.
+
+	Unpickling returns a :class:`tuple` of the arrays.
+
+	Shared memory is only used on POSIX systems, where a block outlives the process which created it.
+
+	:param arrays:
+	"""
+
+	def __init__(self, arrays: Iterable[numpy.ndarray]):
+		self.arrays: Tuple[numpy.ndarray, ...] = tuple(numpy.ascontiguousarray(array) for array in arrays)
+
+	def __reduce__(self):
+		nbytes = sum(array.nbytes for array in self.arrays)
+
+		if shared_memory is None or os.name == "nt" or nbytes < shared_memory_threshold:
+			return tuple, (self.arrays, )
+
+		block, specs = share_arrays(self.arrays, track=_tracker_is_inherited())
+		block.close()
+		return read_shared_arrays, (block.name, specs)
+
+
+def _rebuild_with_arrays(
+		cls: Type,
+		values: Dict[str, Any],
+		array_names: Sequence[str],
+		arrays: Sequence[numpy.ndarray],
+		) -> Any:
+	for name, array in zip(array_names, arrays):
+		values[name] = array.tolist()
+
+	return cls(**values)
+
+
+def reduce_with_shared_arrays(obj: Any, array_names: Sequence[str] = ("x_data", "y_data")) -> Tuple:
+	"""
+	Reduce an :mod:`attrs` class, passing the given attributes as :class:`~.SharedArrays`.
+
+	Objects which are not :mod:`attrs` classes are converted with their ``freeze()`` method first.
+
+	:param obj:
+	:param array_names: The names of the attributes which contain lists of numbers.
+	"""
+
+	if not attr.has(type(obj)):
+		obj = obj.freeze()
+
+	values = {a.name: getattr(obj, a.name) for a in attr.fields(type(obj)) if a.init}
+	arrays = SharedArrays(numpy.asarray(values.pop(name), dtype=numpy.float64) for name in array_names)
+
+	return _rebuild_with_arrays, (type(obj), values, tuple(array_names), arrays)
+
+
+def register_reducer(*classes: Type, reducer: Callable[[Any], Tuple] = reduce_with_shared_arrays) -> None:
+	"""
+	Use ``reducer`` when the given classes are sent between processes by :mod:`multiprocessing`.
+
+	:param classes:
+	:param reducer:
+	"""
+
+	for cls in classes:
+		ForkingPickler.register(cls, reducer)
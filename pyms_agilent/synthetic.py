@@ -0,0 +1,654 @@
+#  !/usr/bin/env python
+#
+#  synthetic.py
+"""
+Generate synthetic ``.d`` datafiles of any size, for testing and benchmarking.
+
+A synthetic run is written as a ``.d`` directory containing the XML metadata files
+(:file:`Contents.xml`, :file:`MSTS.xml`, :file:`Devices.xml` and :file:`sample_info.xml`),
+alongside a snapshot of its scans, spectra, TIC and instrument curves which can be read with
+:class:`~pyms_agilent.frozen.FrozenDataReader`. The snapshot has the same name as the datafile,
+with the suffix ``.pmaf``.
+
+The spectra contain a number of compounds which elute as Gaussian peaks, on top of random noise.
+The data is reproducible for a given ``seed``.
+
+Example:
+
+.. code-block:: python
+
+	run = SyntheticRun(n_scans=200_000, points_per_scan=2000, n_segments=4, polarity_switching=True)
+	datafile, snapshot = run.write("Synthetic.d")
+
+	reader = FrozenDataReader(snapshot)
+
+.. note::
+
+	The binary files written by the MassHunter acquisition software (:file:`MSScan.bin`, :file:`MSPeak.bin`,
+	and the ``.cd`` and ``.cg`` instrument curve files) are not written, as their format is not documented.
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import bisect
+import datetime
+import pathlib
+from typing import Any, Dict, List, Sequence, Tuple
+
+# 3rd party
+import attr
+import numpy  # type: ignore
+from domdf_python_tools.typing import PathLike
+from lxml import etree  # type: ignore
+
+# this package
+from pyms_agilent.enums import (
+		ChromType,
+		DataUnit,
+		DataValueType,
+		DeviceType,
+		DeviceVendor,
+		IonizationMode,
+		IRMStatus,
+		MeasurementTypeEnum,
+		MSLevel,
+		MSScanType,
+		MSStorageMode,
+		SampleCategory,
+		SeparationTechniqueEnum,
+		SpecType,
+		StoredDataType
+		)
+from pyms_agilent.frozen import FrozenDataFileWriter
+from pyms_agilent.mhdac.chromatograms import FrozenInstrumentCurve, FrozenTIC
+from pyms_agilent.mhdac.file_information import FrozenFileInformation
+from pyms_agilent.mhdac.ms_scan_file_info import FrozenMSScanFileInformation
+from pyms_agilent.mhdac.scan_record import FrozenMSScanRecord
+from pyms_agilent.mhdac.signalinfo import FrozenSignalInfo
+from pyms_agilent.mhdac.spectrum import FrozenMS2SpecData, FrozenSpecData
+from pyms_agilent.utils import Range
+from pyms_agilent.xml_parser.devices import Device, DeviceList
+
+__all__ = ["SyntheticRun", "write_synthetic_datafile"]
+
+# The instrument curves written for the pump, with their units and typical values.
+_pump_signals = [("Pressure", "bar", 400.0), ("Flow", "mL/min", 0.5)]
+
+
+def _positive(instance, attribute, value) -> None:
+	if value < 1:
+		raise ValueError(f"'{attribute.name}' must be at least 1.")
+
+
+def _not_negative(instance, attribute, value) -> None:
+	if value < 0:
+		raise ValueError(f"'{attribute.name}' must not be negative.")
+
+
+@attr.s(slots=True)
+class SyntheticRun:
+	"""
+	The settings for a synthetic LC-MS/MS run.
+
+	The run is made up of cycles, each of which is one MS scan followed by ``ms2_per_cycle`` MS/MS scans
+	of the most intense ions in the MS scan.
+	"""
+
+	#: The total number of scans.
+	n_scans: int = attr.ib(default=1000, converter=int, validator=_positive)
+
+	#: The number of points in each spectrum.
+	points_per_scan: int = attr.ib(default=1000, converter=int, validator=_positive)
+
+	#: The number of MS time segments. The scans are divided equally between them.
+	n_segments: int = attr.ib(default=1, converter=int, validator=_positive)
+
+	#: Whether the ionisation polarity alternates between positive and negative with each cycle.
+	polarity_switching: bool = attr.ib(default=False, converter=bool)
+
+	#: The number of MS/MS scans after each MS scan.
+	ms2_per_cycle: int = attr.ib(default=1, converter=int, validator=_not_negative)
+
+	#: The time taken by each scan, in minutes.
+	scan_time: float = attr.ib(default=0.005, converter=float)
+
+	#: The range of m/z values in each spectrum.
+	mz_range: Tuple[float, float] = attr.ib(default=(50.0, 1000.0), converter=tuple)
+
+	#: The number of compounds which elute during the run.
+	n_compounds: int = attr.ib(default=50, converter=int, validator=_not_negative)
+
+	#: The number of points per minute in the instrument curves.
+	signal_rate: float = attr.ib(default=60.0, converter=float)
+
+	#: The seed for the random number generator.
+	seed: int = attr.ib(default=20200124, converter=int)
+
+	@property
+	def run_duration(self) -> float:
+		"""
+		Returns the duration of the run, in minutes.
+		"""
+
+		return self.n_scans * self.scan_time
+
+	def retention_time(self, scan_no: int) -> float:
+		"""
+		Returns the retention time of the given scan, in minutes.
+
+		:param scan_no:
+		"""
+
+		return (scan_no + 1) * self.scan_time
+
+	def ms_level(self, scan_no: int) -> MSLevel:
+		"""
+		Returns the MS level of the given scan.
+
+		:param scan_no:
+		"""
+
+		return MSLevel.MSMS if scan_no % (self.ms2_per_cycle + 1) else MSLevel.MS
+
+	def polarity(self, scan_no: int) -> str:
+		"""
+		Returns the ionisation polarity of the given scan, ``'+'`` or ``'-'``.
+
+		:param scan_no:
+		"""
+
+		if self.polarity_switching and (scan_no // (self.ms2_per_cycle + 1)) % 2:
+			return '-'
+		else:
+			return '+'
+
+	def get_time_segments(self) -> List[Tuple[int, int, int]]:
+		"""
+		Returns the ID, first scan and number of scans of each MS time segment.
+		"""
+
+		n_segments = min(self.n_segments, self.n_scans)
+		boundaries = [round(self.n_scans * idx / n_segments) for idx in range(n_segments + 1)]
+
+		return [(idx + 1, start, stop - start) for idx, (start, stop) in enumerate(zip(boundaries, boundaries[1:]))]
+
+	def _compounds(self) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+		# The index of each compound's m/z in the spectrum, and the time, width and height of its peak.
+		rng = numpy.random.RandomState(self.seed)
+		mz_index = rng.randint(0, self.points_per_scan, self.n_compounds)
+		apex = rng.uniform(0, self.run_duration, self.n_compounds)
+		width = rng.uniform(2, 10, self.n_compounds) * self.scan_time * (self.ms2_per_cycle + 1)
+		height = rng.lognormal(11, 1.5, self.n_compounds)
+		return mz_index, apex, width, height
+
+	def make_scan(self, scan_no: int) -> Tuple[FrozenMSScanRecord, FrozenSpecData]:
+		"""
+		Returns the scan record and spectrum for the given scan.
+
+		:param scan_no:
+		"""
+
+		return self._make_scans(scan_no, scan_no + 1)[0]
+
+	def _make_scans(self, start: int, stop: int) -> List[Tuple[FrozenMSScanRecord, FrozenSpecData]]:
+		x_data = numpy.linspace(*self.mz_range, self.points_per_scan)
+		x_list = x_data.tolist()
+		mz_index, apex, width, height = self._compounds()
+		segment_starts = [first_scan for _, first_scan, _ in self.get_time_segments()]
+
+		scans: List[Tuple[FrozenMSScanRecord, FrozenSpecData]] = []
+		spectrum: FrozenSpecData
+
+		for scan_no in range(start, stop):
+			# Each scan has its own random state, so scans can be generated in any order.
+			rng = numpy.random.RandomState((self.seed + scan_no) % 2**32)
+			retention_time = self.retention_time(scan_no)
+			y_data = rng.gamma(0.5, 200.0, self.points_per_scan).round()
+			abundance = height * numpy.exp(-0.5 * ((retention_time - apex) / width)**2)
+			numpy.add.at(y_data, mz_index, abundance.round())
+
+			ms_level = self.ms_level(scan_no)
+			polarity = self.polarity(scan_no)
+			is_ms2 = ms_level == MSLevel.MSMS
+			cycle_start = scan_no - scan_no % (self.ms2_per_cycle + 1)
+
+			if is_ms2 and self.n_compounds:
+				# Fragment the compounds which are most abundant at this point in the run.
+				rank = (scan_no - cycle_start - 1) % self.n_compounds
+				precursor = float(x_data[mz_index[numpy.argsort(-abundance)[rank]]])
+			elif is_ms2:
+				precursor = float(x_data[0])
+			else:
+				precursor = 0.0
+
+			base_peak = int(y_data.argmax())
+
+			record = FrozenMSScanRecord(
+					base_peak_intensity=float(y_data[base_peak]),
+					base_peak_mz=float(x_data[base_peak]),
+					collision_energy=20.0 if is_ms2 else 0.0,
+					compensation_field=float("nan"),
+					dispersion_field=float("nan"),
+					fragmentor_voltage=380.0,
+					ion_polarity=polarity,
+					ionization_mode=IonizationMode.ESI,
+					is_collision_energy_dynamic=False,
+					is_fragmentor_voltage_dynamic=False,
+					ms_level=ms_level,
+					ms_scan_type=MSScanType.ProductIon if is_ms2 else MSScanType.Scan,
+					mz_of_interest=precursor,
+					retention_time=retention_time,
+					scan_id=scan_no + 1,
+					tic=float(y_data.sum()),
+					time_segment=bisect.bisect_right(segment_starts, scan_no),
+					)
+
+			spectrum_kwargs = dict(
+					abundance_limit=16742400.0,
+					acquired_time_ranges=[Range(retention_time, retention_time)],
+					chrom_peak_index=-1,
+					collision_energy=record.collision_energy,
+					compensation_field=float("nan"),
+					device_name="QTOF",
+					device_type=DeviceType.QuadrupoleTimeOfFlight,
+					dispersion_field=float("nan"),
+					fragmentor_voltage=380.0,
+					x_axis_info=(DataValueType.MassToCharge, DataUnit.Thomsons),
+					y_axis_info=(DataValueType.IonAbundance, DataUnit.Counts),
+					ionization_polarity=polarity,
+					ionization_mode=IonizationMode.ESI,
+					is_chromatogram=False,
+					is_data_in_mass_unit=True,
+					is_mass_spectrum=True,
+					is_icp_data=False,
+					is_uv_spectrum=False,
+					ms_level=ms_level,
+					ms_scan_type=record.ms_scan_type,
+					ms_storage_mode=MSStorageMode.ProfileSpectrum,
+					mz_of_interest=[Range(precursor, precursor)] if is_ms2 else [],
+					measured_mass_range=Range(*self.mz_range),
+					ordinal_number=1,
+					parent_scan_id=cycle_start + 1 if is_ms2 else 0,
+					sampling_period=0.5,
+					scan_id=record.scan_id,
+					spectrum_type=SpecType.TofMassSpectrum,
+					threshold=0.0,
+					total_data_points=self.points_per_scan,
+					total_scan_count=1,
+					x_data=x_list,
+					y_data=y_data.tolist(),
+					)
+
+			if is_ms2:
+				spectrum = FrozenMS2SpecData(
+						**spectrum_kwargs,
+						precursor_charge=1,
+						precursor_intensity=float(abundance.max(initial=0.0)),
+						)
+			else:
+				spectrum = FrozenSpecData(**spectrum_kwargs)
+
+			scans.append((record, spectrum))
+
+		return scans
+
+	def file_information(self) -> FrozenFileInformation:
+		"""
+		Returns the information about the datafile.
+		"""
+
+		scan_types = MSScanType.Scan | MSScanType.ProductIon if self.ms2_per_cycle else MSScanType.Scan
+
+		return FrozenFileInformation(
+				acquisition_time=datetime.datetime(2020, 1, 24, 12, 30, 15, tzinfo=datetime.timezone.utc),
+				irm_status=IRMStatus.Success,
+				datafile_name="Synthetic.d",
+				ms_data_present=True,
+				non_ms_data_present=True,
+				uv_data_present=False,
+				measurement_type=MeasurementTypeEnum.Chromatographic,
+				separation_technique=SeparationTechniqueEnum.LC,
+				ms_scan_file_info=FrozenMSScanFileInformation(
+						collision_energies=[0.0, 20.0] if self.ms2_per_cycle else [0.0],
+						compensation_field_values=[],
+						dispersion_field_values=[],
+						has_ms_data=True,
+						device_type=DeviceType.QuadrupoleTimeOfFlight,
+						fragmentor_voltages=[380.0],
+						ionisation_mode=IonizationMode.ESI,
+						ionisation_polarity="+-" if self.polarity_switching else '+',
+						ms_level=2 if self.ms2_per_cycle else 1,
+						scan_types=scan_types,
+						spectra_format=MSStorageMode.ProfileSpectrum,
+						total_scans=self.n_scans,
+						has_fixed_cycle_length_data=False,
+						are_multiple_spectra_present_per_scan=False,
+						sim_ions=[],
+						),
+				)
+
+	def devices(self) -> DeviceList:
+		"""
+		Returns the devices in the instrument configuration.
+		"""
+
+		return DeviceList(
+				version=1,
+				devices=[
+						Device(
+								device_id=1,
+								display_name="QTOF",
+								model_number="G6550A",
+								ordinal_number=1,
+								serial_number="SYNTHETIC1",
+								type_=DeviceType.QuadrupoleTimeOfFlight,
+								stored_data_type=StoredDataType.MassSpectra,
+								vendor=DeviceVendor.Agilent,
+								),
+						Device(
+								device_id=1013,
+								display_name="QuatPump",
+								model_number="G7111B",
+								ordinal_number=1,
+								serial_number="SYNTHETIC2",
+								type_=DeviceType.QuaternaryPump,
+								stored_data_type=StoredDataType.InstrumentCurves,
+								vendor=DeviceVendor.Agilent,
+								),
+						],
+				)
+
+	def sample_data(self) -> Dict[str, str]:
+		"""
+		Returns the sample information.
+		"""
+
+		return {
+				"Sample Name": "Synthetic",
+				"Sample Position": "P1-A1",
+				"Comment": f"{self.n_scans} scans of {self.points_per_scan} points",
+				}
+
+	def signals(self) -> List[FrozenSignalInfo]:
+		"""
+		Returns the instrument curves for the pump.
+		"""
+
+		n_points = max(int(self.run_duration * self.signal_rate), 2)
+		x_data = numpy.linspace(0.0, self.run_duration, n_points)
+		rng = numpy.random.RandomState(self.seed)
+		signals = []
+
+		for name, units, value in _pump_signals:
+			y_data = value * (1 + 0.01 * rng.standard_normal(n_points))
+
+			curve = FrozenInstrumentCurve(
+					chromatogram_type=ChromType.Signal,
+					device_name="QuatPump",
+					device_type=DeviceType.QuaternaryPump,
+					is_chromatogram=True,
+					is_icp_data=False,
+					is_cycle_summed=False,
+					is_mass_spectrum=False,
+					is_primary_mrm=False,
+					is_uv_spectrum=False,
+					ordinal_number=1,
+					signal_description=name,
+					signal_name=name,
+					total_data_points=n_points,
+					x_data=x_data.tolist(),
+					y_data=y_data.tolist(),
+					x_axis_info=(DataValueType.AcqTime, DataUnit.Minutes),
+					y_axis_info=(DataValueType.Unspecified, units),
+					)
+
+			signals.append(
+					FrozenSignalInfo(
+							device_name="QuatPump",
+							device_type=DeviceType.QuaternaryPump,
+							device_ordinal_number=1,
+							signal_name=name,
+							instrument_curve=curve,
+							)
+					)
+
+		return signals
+
+	def _tic(self, retention_times: numpy.ndarray, tic: numpy.ndarray) -> FrozenTIC:
+		return FrozenTIC(
+				chromatogram_type=ChromType.TotalIon,
+				device_name="QTOF",
+				device_type=DeviceType.QuadrupoleTimeOfFlight,
+				is_chromatogram=True,
+				is_icp_data=False,
+				is_cycle_summed=False,
+				is_mass_spectrum=False,
+				is_primary_mrm=False,
+				is_uv_spectrum=False,
+				ordinal_number=1,
+				signal_description='',
+				signal_name="TIC",
+				total_data_points=len(tic),
+				x_data=retention_times.tolist(),
+				y_data=tic.tolist(),
+				abundance_limit=16742400.0,
+				acquired_time_ranges=[Range(float(retention_times[0]), float(retention_times[-1]))],
+				collision_energy=0.0,
+				fragmentor_voltage=380.0,
+				ionization_polarity="+-" if self.polarity_switching else '+',
+				ionization_mode=IonizationMode.ESI,
+				ms_level=MSLevel.All,
+				ms_scan_type=MSScanType.All,
+				ms_storage_mode=MSStorageMode.ProfileSpectrum,
+				mz_of_interest=[],
+				measured_mass_range=[],
+				mz_regions_were_excluded=False,
+				sampling_period=0.5,
+				threshold=0.0,
+				x_axis_info=(DataValueType.AcqTime, DataUnit.Minutes),
+				y_axis_info=(DataValueType.IonAbundance, DataUnit.Counts),
+				)
+
+	def write_snapshot(self, filename: PathLike, chunk_size: int = 256) -> pathlib.Path:
+		"""
+		Write a snapshot of the run, which can be read with :class:`~pyms_agilent.frozen.FrozenDataReader`.
+
+		Scans are generated ``chunk_size`` at a time, so memory usage does not depend on the length of the run.
+
+		:param filename:
+		:param chunk_size:
+
+		:returns: The filename of the snapshot.
+		"""
+
+		retention_times = numpy.empty(self.n_scans)
+		tic = numpy.empty(self.n_scans)
+
+		with FrozenDataFileWriter(filename) as writer:
+			writer.set_file_information(self.file_information())
+			writer.set_devices(self.devices())
+
+			for start in range(0, self.n_scans, chunk_size):
+				for record, spectrum in self._make_scans(start, min(start + chunk_size, self.n_scans)):
+					writer.add_scan(record, spectrum)
+					retention_times[record.scan_id - 1] = record.retention_time
+					tic[record.scan_id - 1] = record.tic
+
+			writer.set_tic(self._tic(retention_times, tic))
+			writer.add_signals(
+					"QuatPump",
+					DeviceType.QuaternaryPump,
+					StoredDataType.InstrumentCurves,
+					1,
+					self.signals(),
+					)
+			writer.set_sample_data(SampleCategory.All, self.sample_data())
+			writer.set_sample_data(SampleCategory.General, self.sample_data())
+			writer.set_timesegment_ids([timesegment_id for timesegment_id, _, _ in self.get_time_segments()])
+
+		return writer.filename
+
+	def write_metadata(self, acqdata_dir: PathLike) -> None:
+		"""
+		Write :file:`Contents.xml`, :file:`MSTS.xml`, :file:`Devices.xml` and :file:`sample_info.xml`
+		to the given directory, which is created if it does not exist.
+
+		:param acqdata_dir: The ``AcqData`` directory of the datafile.
+		"""  # noqa: D400
+
+		acqdata_dir = pathlib.Path(acqdata_dir)
+		acqdata_dir.mkdir(parents=True, exist_ok=True)
+
+		file_information = self.file_information()
+
+		_write_xml(
+				acqdata_dir / "Contents.xml",
+				"Contents",
+				[
+						("Version", 3),
+						("AcquiredTime", file_information.acquisition_time.isoformat()),
+						("AcqStatus", 2),
+						("InstrumentName", "Synthetic"),
+						("LockedMode", 0),
+						("MeasurementType", int(file_information.measurement_type)),
+						("SeparationTechnique", int(file_information.separation_technique)),
+						("TotalRunDuration", self.run_duration * 60),
+						("AcqSoftwareVersion", "pyms-agilent synthetic run"),
+						],
+				)
+
+		segments = []
+		for timesegment_id, first_scan, n_scans in self.get_time_segments():
+			segments.append((
+					"TimeSegment",
+					{"TimeSegmentID": timesegment_id},
+					[
+							("StartTime", self.retention_time(first_scan)),
+							("EndTime", self.retention_time(first_scan + n_scans - 1)),
+							("NumOfScans", n_scans),
+							("FixedCycleLength", 0),
+							],
+					))
+
+		_write_xml(acqdata_dir / "MSTS.xml", "TimeSegments", [("Version", 3), *segments, ("IRMStatus", 0)])
+
+		devices = []
+		for device in self.devices():
+			devices.append((
+					"Device",
+					{"DeviceID": device.device_id},
+					[
+							("Name", device.display_name),
+							("ModelNumber", device.model_number),
+							("OrdinalNumber", device.ordinal_number),
+							("SerialNumber", device.serial_number),
+							("Type", int(device.type_)),
+							("StoredDataType", int(device.stored_data_type)),
+							("Delay", device.delay),
+							("Vendor", int(device.vendor)),
+							],
+					))
+
+		_write_xml(acqdata_dir / "Devices.xml", "Devices", [("Version", 1), *devices])
+
+		fields: List[tuple] = []
+		for name, value in self.sample_data().items():
+			fields.append((
+					"Field",
+					{},
+					[
+							("Name", name),
+							("DisplayName", name),
+							("Value", value),
+							("DataType", 8),
+							("Units", ''),
+							("FieldType", "SYSTEM"),
+							("Overridden", "False"),
+							],
+					))
+
+		_write_xml(acqdata_dir / "sample_info.xml", "SampleInfo", [("Version", "1.0"), *fields])
+
+	def write(self, filename: PathLike) -> Tuple[pathlib.Path, pathlib.Path]:
+		"""
+		Write the run as a ``.d`` datafile, with its snapshot alongside.
+
+		:param filename: The ``.d`` directory to create.
+
+		:returns: The filenames of the datafile and the snapshot.
+		"""
+
+		datafile = pathlib.Path(filename)
+		self.write_metadata(datafile / "AcqData")
+		snapshot = self.write_snapshot(datafile.with_suffix(".pmaf"))
+
+		return datafile, snapshot
+
+
+def _append_element(parent: etree._Element, tag: str, *content: Any) -> None:
+	"""
+	Append an element to ``parent``.
+
+	:param parent:
+	:param tag:
+	:param content: Either the text of the element, or a mapping of its attributes and a list of its children.
+	"""
+
+	if len(content) == 1:
+		etree.SubElement(parent, tag).text = str(content[0])
+		return
+
+	attributes, children = content
+	element = etree.SubElement(parent, tag, {key: str(value) for key, value in attributes.items()})
+
+	for child in children:
+		_append_element(element, *child)
+
+
+def _write_xml(filename: pathlib.Path, root_tag: str, children: Sequence[tuple]) -> None:
+	"""
+	Write an XML file.
+
+	:param filename:
+	:param root_tag: The tag of the root element.
+	:param children: ``(tag, text)`` tuples for elements containing text,
+		and ``(tag, attributes, children)`` tuples for elements containing other elements.
+	"""
+
+	root = etree.Element(root_tag)
+
+	for child in children:
+		_append_element(root, *child)
+
+	etree.ElementTree(root).write(str(filename), encoding="utf-8", xml_declaration=True, pretty_print=True)
+
+
+def write_synthetic_datafile(filename: PathLike, **kwargs) -> Tuple[pathlib.Path, pathlib.Path]:
+	"""
+	Write a synthetic ``.d`` datafile, with its snapshot alongside.
+
+	:param filename: The ``.d`` directory to create.
+	:param kwargs: Settings for the run. See :class:`~.SyntheticRun`.
+
+	:returns: The filenames of the datafile and the snapshot.
+	"""
+
+	return SyntheticRun(**kwargs).write(filename)
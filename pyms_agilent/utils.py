@@ -26,7 +26,7 @@ General utility functions.
 # stdlib
 import enum
 import math
-from typing import Any, Callable, Iterable, List, NamedTuple, Type
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Type
 
 # 3rd party
 import enum_tools
@@ -44,7 +44,8 @@ __all__ = [
 		"frozen_comparison",
 		"Interface",
 		"datatable2dataframe",
-		"isnan"
+		"isnan",
+		"freeze",
 		]
 
 
@@ -168,14 +169,113 @@ def datatable2dataframe(datatable) -> pandas.DataFrame:  # pragma: no cover (!Wi
 	"""
 	Converts a dotNET :class:`System.Data.DataTable` object to a pandas data frame.
 
+	The table is serialised in a single call and the frame is then built column by column,
+	rather than crossing the Python/.NET boundary for every row.
+
 	:param datatable:
 	:type datatable: :class:`System.Data.DataTable`
 	"""
 
-	return pandas.DataFrame(
-			columns=[column.Caption for column in list(datatable.Columns)],
-			data=[list(row.ItemArray) for row in list(datatable.Rows)]
-			)
+	# 3rd party
+	import System  # type: ignore
+	from System.Data import XmlWriteMode  # type: ignore
+	from System.Xml import XmlConvert  # type: ignore
+
+	if not datatable.TableName:
+		# WriteXml refuses to serialise a table without a name.
+		datatable = datatable.Copy()
+		datatable.TableName = "Table"
+
+	columns = [
+			_DataColumn(column.Caption, XmlConvert.EncodeLocalName(column.ColumnName), column.DataType.FullName)
+			for column in list(datatable.Columns)
+			]
+
+	writer = System.IO.StringWriter()
+	datatable.WriteXml(writer, XmlWriteMode.IgnoreSchema)
+
+	return _datatable_xml_to_dataframe(writer.ToString(), columns)
+
+
+class _DataColumn(NamedTuple):
+	"""
+	The parts of a :class:`System.Data.DataColumn` needed to rebuild it from the table's XML.
+	"""
+
+	#: The caption of the column, used as the column name in the data frame.
+	caption: str
+
+	#: The name of the XML element the column's values are written to.
+	element_name: str
+
+	#: The full name of the column's .NET type, e.g. ``System.Double``.
+	type_name: str
+
+
+_integer_types = {
+		"System.Byte",
+		"System.SByte",
+		"System.Int16",
+		"System.UInt16",
+		"System.Int32",
+		"System.UInt32",
+		"System.Int64",
+		"System.UInt64",
+		}
+
+_float_types = {"System.Single", "System.Double", "System.Decimal"}
+
+
+def _convert_column(values: List[Optional[str]], type_name: str) -> pandas.Series:
+	"""
+	Convert the text of a :class:`System.Data.DataColumn` to a typed pandas series.
+
+	Null values (which are omitted from the XML) become :py:obj:`None`, or ``NaN`` for numeric columns.
+
+	:param values:
+	:param type_name: The full name of the column's .NET type.
+	"""
+
+	if type_name in _integer_types:
+		return pandas.to_numeric(pandas.Series(values, dtype=object))
+	elif type_name in _float_types:
+		return pandas.Series(values, dtype=object).astype(float)
+	elif type_name == "System.Boolean":
+		return pandas.Series([None if v is None else v == "true" for v in values], dtype=object)
+	elif type_name == "System.DateTime":
+		try:
+			return pandas.Series(pandas.to_datetime(values))
+		except ValueError:
+			# Local times are written with their UTC offset, which differs either side of a change to or from
+			# daylight saving time. pandas cannot hold mixed offsets in a datetime column.
+			return pandas.Series([None if v is None else pandas.Timestamp(v) for v in values], dtype=object)
+	else:
+		return pandas.Series(values, dtype=object)
+
+
+def _datatable_xml_to_dataframe(xml: str, columns: Sequence[_DataColumn]) -> pandas.DataFrame:
+	"""
+	Build a pandas data frame from the XML written by :meth:`System.Data.DataTable.WriteXml`.
+
+	:param xml: The XML, written without the schema.
+	:param columns: The columns of the table, in order.
+	"""
+
+	# 3rd party
+	from lxml import etree  # type: ignore
+
+	root = etree.fromstring(xml.encode("UTF-8"))
+	rows = [{child.tag: child.text or '' for child in row} for row in root]
+
+	frame = pandas.DataFrame({
+			idx: _convert_column([row.get(column.element_name) for row in rows], column.type_name)
+			for idx, column in enumerate(columns)
+			})
+
+	# Captions need not be unique, so they are only applied once the frame has been built.
+	frame.columns = [column.caption for column in columns]
+
+	return frame
 
 
 @register_pretty(enum.EnumMeta)
@@ -211,6 +311,41 @@ def isnan(value: Any) -> bool:
 		return False
 
 
+def freeze(value: Any) -> Any:
+	"""
+	Convert wrappers around .NET objects to their frozen equivalents.
+
+	The frozen objects can be pickled, and can be used from any thread.
+	Lists are converted item by item. Other values are returned unchanged.
+
+	:param value:
+	"""
+
+	if hasattr(value, "freeze"):
+		return value.freeze()
+	elif isinstance(value, list):
+		return [freeze(item) for item in value]
+	else:
+		return value
+
+
+def _unpickle_frozen(frozen: Any) -> Any:
+	return frozen
+
+
+def _reduce_frozen(self, protocol: int) -> Tuple[Callable, Tuple]:
+	"""
+	Implementation of ``__reduce_ex__`` for wrappers around .NET objects.
+
+	The .NET object cannot be pickled, so the frozen version is pickled in its place,
+	and is what is returned when the object is unpickled.
+
+	:param protocol:
+	"""
+
+	return _unpickle_frozen, (self.freeze(), )
+
+
 def frozen_comparison(*classes: Type) -> Callable[[Type], Type]:
 	"""
 	Decorator to add the ``__eq__`` method to classes that compares frozen
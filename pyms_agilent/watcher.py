@@ -0,0 +1,548 @@
+#  !/usr/bin/env python
+#
+#  watcher.py
+"""
+Watch a directory tree for ``.d`` datafiles, and process each one when its acquisition completes.
+
+New datafiles are detected with inotify on Linux, and by periodically searching the directory tree elsewhere.
+inotify does not see changes made to network shares by other machines, so polling should be used for those.
+
+A run is complete once ``AcqStatus`` in its :file:`Contents.xml` is
+:py:enum:mem:`~pyms_agilent.enums.AcqStatusEnum.End` or :py:enum:mem:`~pyms_agilent.enums.AcqStatusEnum.Stop`.
+
+Example:
+
+.. code-block:: python
+
+	def process(datafile: pathlib.Path):
+		DataReader(datafile).freeze_all(datafile.with_suffix(".pmaf"))
+
+	with DatafileWatcher("/mnt/instrument/Data", process, max_workers=4, use_inotify=False):
+		...
+
+"""
+#
+#  Copyright © 2019-2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import ctypes
+import ctypes.util
+import errno
+import os
+import pathlib
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# 3rd party
+from domdf_python_tools.typing import PathLike
+
+# this package
+from pyms_agilent.metadata import find_datafiles, is_acquisition_complete
+
+__all__ = ["DatafileWatcher", "inotify_available"]
+
+# From <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+
+_event_header = struct.Struct("iIII")
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+	if not sys.platform.startswith("linux"):
+		return None
+
+	try:
+		libc = ctypes.CDLL(ctypes.util.find_library('c') or "libc.so.6", use_errno=True)
+	except OSError:
+		return None
+
+	if not hasattr(libc, "inotify_init1"):
+		return None
+
+	return libc
+
+
+_libc = _load_libc()
+
+
+def inotify_available() -> bool:
+	"""
+	Returns whether inotify can be used to watch for new datafiles.
+	"""
+
+	return _libc is not None
+
+
+class _Inotify:
+	"""
+	Minimal wrapper around the Linux inotify API.
+	"""
+
+	# Contents.xml is checked once it has been written and closed, rather than after every write.
+	_mask = _IN_CREATE | _IN_MOVED_TO | _IN_CLOSE_WRITE
+
+	def __init__(self):
+		if _libc is None:
+			raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+
+		self.fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+		if self.fd < 0:
+			err = ctypes.get_errno()
+			raise OSError(err, os.strerror(err))
+
+		self.directories: Dict[int, str] = {}
+
+	def add_watch(self, directory: str) -> bool:
+		"""
+		Watch the given directory, returning whether the watch could be added.
+
+		:param directory:
+		"""
+
+		wd = _libc.inotify_add_watch(self.fd, os.fsencode(directory), self._mask)  # type: ignore
+
+		if wd < 0:
+			# e.g. the directory has been removed, or the limit on the number of watches has been reached.
+			return False
+
+		self.directories[wd] = directory
+		return True
+
+	def read_events(self) -> List[Tuple[Optional[str], str, int]]:
+		"""
+		Returns the pending events as ``(directory, name, mask)`` tuples.
+
+		The directory is :py:obj:`None` if the event queue overflowed.
+		"""
+
+		try:
+			data = os.read(self.fd, 64 * 1024)
+		except BlockingIOError:
+			return []
+
+		events = []
+		offset = 0
+
+		while offset < len(data):
+			wd, mask, _, length = _event_header.unpack_from(data, offset)
+			offset += _event_header.size
+			name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+			offset += length
+
+			if mask & _IN_Q_OVERFLOW:
+				events.append((None, '', mask))
+			elif mask & _IN_IGNORED:
+				self.directories.pop(wd, None)
+			elif wd in self.directories:
+				events.append((self.directories[wd], name, mask))
+
+		return events
+
+	def close(self) -> None:
+		os.close(self.fd)
+
+
+def _is_datafile_name(name: str) -> bool:
+	return name.lower().endswith(".d")
+
+
+class DatafileWatcher:
+	"""
+	Watches a directory tree for ``.d`` datafiles whose acquisition has completed.
+
+	``process`` is called with the path of each datafile once its acquisition has completed.
+	Each datafile is processed at most once. Datafiles whose acquisition had already completed when
+	the watcher started are skipped, unless ``process_existing`` is :py:obj:`True`.
+
+	:param root: The directory to watch.
+	:param process: The function to call with the path of each completed datafile.
+	:param max_workers: The maximum number of datafiles to process at the same time.
+	:param poll_interval: The number of seconds between checks for completed acquisitions.
+		When polling this is also the interval between searches of the directory tree.
+	:param use_inotify: Whether to detect new datafiles with inotify. If :py:obj:`None` inotify is used if available.
+	:param process_existing: Whether to process datafiles which were already complete when the watcher started.
+	:param on_error: Function to call with the path and the exception if ``process`` raises an exception.
+		The exceptions are also recorded in :attr:`~.DatafileWatcher.errors`.
+
+	:raises OSError: if ``use_inotify`` is :py:obj:`True` but inotify is not available.
+	"""
+
+	def __init__(
+			self,
+			root: PathLike,
+			process: Callable[[pathlib.Path], Any],
+			max_workers: int = 1,
+			poll_interval: float = 5.0,
+			use_inotify: Optional[bool] = None,
+			process_existing: bool = False,
+			on_error: Optional[Callable[[pathlib.Path, BaseException], Any]] = None,
+			):
+
+		if max_workers < 1:
+			raise ValueError("'max_workers' must be at least 1.")
+		if poll_interval <= 0:
+			raise ValueError("'poll_interval' must be greater than zero.")
+
+		if use_inotify is None:
+			use_inotify = inotify_available()
+		elif use_inotify and not inotify_available():
+			raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+
+		self.root = pathlib.Path(root)
+		self.process = process
+		self.max_workers = int(max_workers)
+		self.poll_interval = float(poll_interval)
+		self.process_existing = bool(process_existing)
+		self.on_error = on_error
+
+		#: The datafiles which have been passed to ``process``, in the order they were dispatched.
+		self.dispatched: List[pathlib.Path] = []
+
+		#: The datafiles for which ``process`` raised an exception, and the exceptions.
+		self.errors: List[Tuple[pathlib.Path, BaseException]] = []
+
+		self._use_inotify = use_inotify
+		self._inotify: Optional[_Inotify] = None
+		self._executor: Optional[ThreadPoolExecutor] = None
+
+		# Datafiles which have been found, but whose acquisition has not completed.
+		self._pending: Set[str] = set()
+
+		# Datafiles which have been found, whether or not they have been processed.
+		self._seen: Set[str] = set()
+
+		self._started = False
+		self._lock = threading.RLock()
+		self._stop_event = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+		# The thread currently inside run(), if any.
+		self._running: Optional[int] = None
+		self._not_running = threading.Event()
+		self._not_running.set()
+		self._wakeup_r, self._wakeup_w = -1, -1
+
+	@property
+	def backend(self) -> str:
+		"""
+		Returns how new datafiles are detected, either ``'inotify'`` or ``'polling'``.
+		"""
+
+		return "inotify" if self._use_inotify else "polling"
+
+	@property
+	def pending(self) -> List[pathlib.Path]:
+		"""
+		Returns the datafiles which are waiting for their acquisition to complete.
+		"""
+
+		with self._lock:
+			return [pathlib.Path(datafile) for datafile in sorted(self._pending)]
+
+	def _initialise(self) -> None:
+		if self._started:
+			return
+
+		self._started = True
+		self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+		if self._use_inotify:
+			self._inotify = _Inotify()
+			self._wakeup_r, self._wakeup_w = os.pipe()
+
+			# Watches are added before searching, so datafiles created during the search are not missed.
+			self._watch_tree(str(self.root), initial=True)
+		else:
+			self._search(initial=True)
+
+	def _found(self, datafile: str, initial: bool = False) -> None:
+		"""
+		Record a datafile which has been found in the directory tree.
+
+		:param datafile:
+		:param initial: Whether the datafile was found when the watcher started.
+		"""
+
+		if datafile in self._seen:
+			return
+
+		self._seen.add(datafile)
+
+		if initial and not self.process_existing and is_acquisition_complete(datafile):
+			return
+
+		self._pending.add(datafile)
+
+	def _search(self, initial: bool = False) -> None:
+		for datafile in find_datafiles(self.root):
+			self._found(str(datafile), initial=initial)
+
+	def _watch_datafile(self, datafile: str, initial: bool = False) -> None:
+		assert self._inotify is not None
+
+		# Contents.xml is in AcqData, but the datafile itself is watched in case AcqData has not been created yet.
+		self._inotify.add_watch(datafile)
+		self._inotify.add_watch(os.path.join(datafile, "AcqData"))
+		self._found(datafile, initial=initial)
+
+	def _watch_tree(self, directory: str, initial: bool = False) -> None:
+		assert self._inotify is not None
+
+		if not self._inotify.add_watch(directory):
+			return
+
+		try:
+			with os.scandir(directory) as it:
+				entries = [(entry.name, entry.path) for entry in it if entry.is_dir(follow_symlinks=False)]
+		except OSError:
+			return
+
+		for name, path in entries:
+			if _is_datafile_name(name):
+				self._watch_datafile(path, initial=initial)
+			else:
+				self._watch_tree(path, initial=initial)
+
+	def _handle_events(self) -> Set[str]:
+		"""
+		Process the pending inotify events, and return the datafiles which have changed.
+		"""
+
+		assert self._inotify is not None
+
+		changed = set()
+
+		for directory, name, mask in self._inotify.read_events():
+			if directory is None:
+				# Events were lost, so fall back to searching the whole tree.
+				self._search()
+				changed.update(self._pending)
+				continue
+
+			path = os.path.join(directory, name)
+
+			if os.path.basename(directory) == "AcqData" and _is_datafile_name(os.path.dirname(directory)):
+				changed.add(os.path.dirname(directory))
+			elif _is_datafile_name(directory):
+				if name == "AcqData" and mask & _IN_ISDIR:
+					self._inotify.add_watch(path)
+				changed.add(directory)
+			elif mask & _IN_ISDIR:
+				if _is_datafile_name(name):
+					self._watch_datafile(path)
+					changed.add(path)
+				else:
+					self._watch_tree(path)
+					changed.update(self._pending)
+
+		for datafile in changed:
+			self._found(datafile)
+
+		return changed
+
+	def _dispatch_completed(self, candidates: Optional[Set[str]] = None) -> List[pathlib.Path]:
+		"""
+		Dispatch the pending datafiles whose acquisition has completed.
+
+		:param candidates: If given, only these datafiles are checked.
+		"""
+
+		assert self._executor is not None
+
+		if candidates is None:
+			candidates = self._pending
+
+		candidates = candidates & self._pending
+
+		# Forget datafiles which were deleted (or moved) before their acquisition completed,
+		# so they are found again if they reappear.
+		for datafile in [datafile for datafile in candidates if not os.path.isdir(datafile)]:
+			candidates.discard(datafile)
+			self._pending.discard(datafile)
+			self._seen.discard(datafile)
+
+		completed = [datafile for datafile in sorted(candidates) if is_acquisition_complete(datafile)]
+
+		for datafile in completed:
+			self._pending.discard(datafile)
+			path = pathlib.Path(datafile)
+			self.dispatched.append(path)
+
+			future = self._executor.submit(self.process, path)
+			future.add_done_callback(lambda f, path=path: self._finished(path, f))
+
+		return [pathlib.Path(datafile) for datafile in completed]
+
+	def _finished(self, path: pathlib.Path, future: Future) -> None:
+		if future.cancelled():
+			return
+
+		exception = future.exception()
+
+		if exception is not None:
+			with self._lock:
+				self.errors.append((path, exception))
+
+			if self.on_error is not None:
+				self.on_error(path, exception)
+
+	def poll(self) -> List[pathlib.Path]:
+		"""
+		Look for new datafiles, and dispatch any whose acquisition has completed.
+
+		This is called periodically by :meth:`~.DatafileWatcher.run`,
+		but can also be called directly to check for completed datafiles on demand.
+
+		:returns: The datafiles which were dispatched.
+		"""
+
+		with self._lock:
+			if self._stop_event.is_set():
+				raise ValueError("The watcher has been stopped.")
+
+			if not self._started:
+				self._initialise()
+			elif self._inotify is not None:
+				self._handle_events()
+			else:
+				self._search()
+
+			return self._dispatch_completed()
+
+	def _wait(self, timeout: float) -> None:
+		"""
+		Wait until the next poll, an inotify event, or :meth:`~.DatafileWatcher.stop` is called.
+
+		:param timeout:
+		"""
+
+		if self._inotify is None:
+			self._stop_event.wait(timeout)
+			return
+
+		ready, _, _ = select.select([self._inotify.fd, self._wakeup_r], [], [], timeout)
+
+		if self._wakeup_r in ready:
+			os.read(self._wakeup_r, 1024)
+
+	def run(self, timeout: Optional[float] = None) -> None:
+		"""
+		Watch the directory tree until :meth:`~.DatafileWatcher.stop` is called from another thread.
+
+		:param timeout: If given, stop watching after this many seconds.
+		"""
+
+		deadline = None if timeout is None else time.monotonic() + timeout
+		next_poll = time.monotonic()
+
+		self._running = threading.get_ident()
+		self._not_running.clear()
+
+		try:
+			while not self._stop_event.is_set():
+				now = time.monotonic()
+
+				if deadline is not None and now >= deadline:
+					break
+
+				if now >= next_poll:
+					try:
+						self.poll()
+					except ValueError:
+						# stop() was called since the loop condition was checked.
+						if self._stop_event.is_set():
+							break
+						raise
+
+					next_poll = now + self.poll_interval
+				elif self._inotify is not None:
+					with self._lock:
+						self._dispatch_completed(self._handle_events())
+
+				wait_until = next_poll if deadline is None else min(next_poll, deadline)
+				self._wait(max(wait_until - time.monotonic(), 0))
+
+		finally:
+			self._running = None
+			self._not_running.set()
+
+	def start(self) -> "DatafileWatcher":
+		"""
+		Start watching the directory tree in a background thread.
+		"""
+
+		if self._thread is not None:
+			raise RuntimeError("The watcher has already been started.")
+
+		with self._lock:
+			self._initialise()
+
+		self._thread = threading.Thread(target=self.run, name=f"DatafileWatcher({self.root})", daemon=True)
+		self._thread.start()
+		return self
+
+	def stop(self, wait: bool = True) -> None:
+		"""
+		Stop watching the directory tree.
+
+		:param wait: Whether to wait for the datafiles which have been dispatched to finish processing.
+		"""
+
+		self._stop_event.set()
+
+		if self._wakeup_w >= 0:
+			os.write(self._wakeup_w, b"\0")
+
+		# Wait for run() to return, unless stop() was called from the thread running it.
+		if self._running != threading.get_ident():
+			self._not_running.wait()
+
+		with self._lock:
+			executor, self._executor = self._executor, None
+
+			if self._inotify is not None:
+				self._inotify.close()
+				self._inotify = None
+				os.close(self._wakeup_r)
+				os.close(self._wakeup_w)
+				self._wakeup_r, self._wakeup_w = -1, -1
+
+		# The lock is released first, as the workers need it to record their results.
+		if executor is not None:
+			executor.shutdown(wait=wait)
+
+	def __enter__(self) -> "DatafileWatcher":
+		return self.start()
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.stop()
+
+	def __repr__(self) -> str:
+		return f"<{self.__class__.__name__}({str(self.root)!r}, backend={self.backend!r})>"
@@ -26,24 +26,81 @@ Parser for :file:`{<datafile>}.d/AcqData/AcqMethod.xml`.
 # stdlib
 import pathlib
 from pprint import pprint
-from typing import Any, Dict, List, Sequence
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
 
 # 3rd party
 import attr
 import lxml.objectify  # type: ignore
 from attr_utils.docstrings import add_attrs_doc
 from attr_utils.serialise import serde
-from domdf_python_tools.bases import Dictable
+from domdf_python_tools.bases import Dictable, UserList
 from domdf_python_tools.doctools import prettify_docstrings
 from domdf_python_tools.typing import PathLike
 from domdf_python_tools.utils import strtobool
-from lxml import objectify
-from mh_utils.xml import XMLFileMixin
+from lxml import etree, objectify  # type: ignore
 
 # this package
-from .core import make_from_element, tag2dict
+from pyms_agilent.archive import ArchivePath, resolve_path
+from .core import ExtractionPlan, XMLFileMixin, get_parser, make_from_element
 
-__all__ = ["Device", "AcqMethod", "read_acqmethod"]
+__all__ = ["DeviceConfiguration", "Device", "AcqMethod", "read_acqmethod"]
+
+_report_ns = "{http://tempuri.org/DataFileReport.xsd}"
+_rdl_ns = "{http://tempuri.org/DSRdlReport.xsd}"
+
+_rc_section_plan = ExtractionPlan(xmlns=_rdl_ns[1:-1])
+_scic_section_plan = ExtractionPlan()
+
+
+class DeviceConfiguration(UserList[Dict[str, Any]]):
+	"""
+	List of key: value mappings for the configuration options of a :class:`~.Device`.
+
+	When created by :class:`~.AcqMethod` the configuration sections are only parsed
+	the first time the list is accessed.
+
+	:param initlist: Iterable to initialise the list from.
+	:param loader: Function returning the configuration sections, called the first time the list is accessed.
+	"""
+
+	def __init__(
+			self,
+			initlist: Optional[Iterable[Dict[str, Any]]] = None,
+			loader: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None,
+			):
+		self._loader = None
+		super().__init__(initlist)
+		self._loader = loader
+
+	@property  # type: ignore
+	def data(self) -> List[Dict[str, Any]]:  # type: ignore
+		"""
+		The configuration sections, which are parsed the first time they are accessed.
+		"""
+
+		if self._loader is not None:
+			loader, self._loader = self._loader, None
+			self._data.extend(loader())
+
+		return self._data
+
+	@data.setter
+	def data(self, value: List[Dict[str, Any]]):
+		self._data = value
+
+	@property
+	def is_loaded(self) -> bool:
+		"""
+		Returns whether the configuration sections have been parsed.
+		"""
+
+		return self._loader is None
+
+
+def _make_configuration(value: Iterable[Dict[str, Any]]) -> DeviceConfiguration:
+	if isinstance(value, DeviceConfiguration):
+		return value
+	return DeviceConfiguration(value)
 
 
 @add_attrs_doc
@@ -62,7 +119,10 @@ class Device:
 	device_id: str = attr.ib(converter=str)
 	display_name: str = attr.ib(converter=str)
 	rc_device: bool = attr.ib(converter=strtobool)
-	configuration: List[Dict[str, Any]] = attr.ib(converter=list, default=attr.Factory(list))
+	configuration: DeviceConfiguration = attr.ib(
+			converter=_make_configuration,
+			default=attr.Factory(DeviceConfiguration),
+			)
 
 	@classmethod
 	def from_xml(cls, element):
@@ -72,12 +132,89 @@ class Device:
 		:param element: The XML element to parse the data from
 		"""
 		return cls(
-				device_id=getattr(element, "{http://tempuri.org/DataFileReport.xsd}DeviceId"),
+				device_id=getattr(element, f"{_report_ns}DeviceId"),
 				display_name=element.DisplayName,
 				rc_device=strtobool(str(element.IsRCDevice)),
 				)
 
 
+class _SectionIndex:
+	"""
+	Assigns the configuration sections embedded in an :file:`AcqMethod.xml` file to their devices.
+
+	The embedded XML is only parsed when the configuration of one of the devices is first accessed,
+	and each section is only converted to a dictionary when the configuration of its device is accessed.
+
+	:param devices:
+	:param rc_devices_xml: The embedded XML of the RC devices.
+	:param scic_devices_xml: The embedded XML of the SCIC devices.
+	"""
+
+	def __init__(self, devices: Sequence[Device], rc_devices_xml: str, scic_devices_xml: str):
+		self.devices = devices
+		self.rc_devices_xml = rc_devices_xml
+		self.scic_devices_xml = scic_devices_xml
+		self._sections: Optional[Dict[int, List[Any]]] = None
+
+	def _build(self) -> Dict[int, List[Any]]:
+		parser = get_parser()
+		sections: Dict[int, List[Any]] = {idx: [] for idx in range(len(self.devices))}
+
+		rc_devices: Dict[str, int] = {}
+		for idx, device in enumerate(self.devices):
+			if device.rc_device:
+				rc_devices.setdefault(device.display_name, idx)
+
+		if self.rc_devices_xml.strip():
+			rc_devices_xml = objectify.fromstring(self.rc_devices_xml, parser=parser)
+
+			for section in rc_devices_xml.iterchildren(f"{_rdl_ns}Section"):
+				display_name = section.findtext(f"{_rdl_ns}ModuleDisplayName")
+				if display_name not in rc_devices:  # pragma: no cover
+					raise ValueError(f"Unknown Device {display_name}")
+				sections[rc_devices[display_name]].append((section, _rc_section_plan))
+
+		scic_devices: Dict[str, int] = {}
+
+		if self.scic_devices_xml.strip():
+			scic_devices_xml = objectify.fromstring(self.scic_devices_xml, parser=parser)
+
+			for section in scic_devices_xml.iterchildren("SectionInfo"):
+				repeater_id = section.findtext("RepeaterId1")
+
+				if repeater_id not in scic_devices:
+					for idx, device in enumerate(self.devices):
+						if device.device_id.endswith(repeater_id) and not device.rc_device:
+							scic_devices[repeater_id] = idx
+							break
+					else:  # pragma: no cover
+						raise ValueError(f"Unknown Device {section.findtext('Name')}")
+
+				sections[scic_devices[repeater_id]].append((section, _scic_section_plan))
+
+		return sections
+
+	def configuration(self, device_idx: int) -> List[Dict[str, Any]]:
+		"""
+		Returns the configuration sections for the device with the given index.
+
+		:param device_idx:
+		"""
+
+		if self._sections is None:
+			self._sections = self._build()
+
+		return [plan(section) for section, plan in self._sections.pop(device_idx, [])]
+
+	def attach(self) -> None:
+		"""
+		Set the configuration of each device to load its sections on demand.
+		"""
+
+		for idx, device in enumerate(self.devices):
+			device.configuration = DeviceConfiguration(loader=lambda idx=idx: self.configuration(idx))
+
+
 @prettify_docstrings
 class AcqMethod(XMLFileMixin, Dictable):
 	"""
@@ -126,52 +263,82 @@ class AcqMethod(XMLFileMixin, Dictable):
 		method_name = str(element.MethodReport.MethodName)  # original method filename
 		method_path = pathlib.Path(str(element.MethodReport.MethodPath))  # full original path to method file
 
-		parser = objectify.makeparser(schema=None)
+		devices = list(make_from_element(element, f"{_report_ns}Devices", Device))
 
-		# embedded XML of rc devices
-		rc_devices_xml = objectify.fromstring(str(element.MethodReport.RCDevicesXml), parser=parser)
+		_SectionIndex(
+				devices,
+				rc_devices_xml=str(element.MethodReport.RCDevicesXml),  # embedded XML of rc devices
+				scic_devices_xml=str(element.MethodReport.SCICDevicesXml),  # embedded XML of scic devices
+				).attach()
 
-		# embedded XML of scic devices
-		scic_devices_xml = objectify.fromstring(str(element.MethodReport.SCICDevicesXml), parser=parser)
+		return cls(
+				version=version,
+				name=method_name,
+				filename=method_path,
+				devices=devices,
+				)
+
+	@classmethod
+	def from_xml_file(
+			cls,
+			filename: Union[PathLike, ArchivePath],
+			validate: Optional[bool] = None,
+			) -> "AcqMethod":
+		"""
+		Construct an :class:`~.AcqMethod` object from an :file:`AcqMethod.xml` file.
 
+		The file is parsed incrementally, and each element is discarded once it has been read.
+		The configuration of each device is only parsed when it is first accessed.
+
+		:param filename: The filename of the XML file, which may be inside a zip or tar archive.
+		:param validate: Ignored, as there is no schema for :file:`AcqMethod.xml`.
+		"""
+
+		filename = resolve_path(filename)
+
+		if not filename.is_file():
+			raise FileNotFoundError(f"XML file '{filename}' not found.")
+
+		report: Dict[str, str] = {}
 		devices: List[Device] = []
 
-		for device in make_from_element(element, "{http://tempuri.org/DataFileReport.xsd}Devices", Device):
-			devices.append(device)
-
-		for section in rc_devices_xml.findall("{http://tempuri.org/DSRdlReport.xsd}Section"):
-			section_data = tag2dict(section, xmlns="http://tempuri.org/DSRdlReport.xsd")
-			for device in devices:
-				if section_data["module_display_name"] == device.display_name and device.rc_device:
-					device.configuration.append(section_data)
-					break
-			else:  # pragma: no cover
-				raise ValueError(f"Unknown Device {section_data['module_display_name']}")
-
-		# pprint(devices)
-
-		for section in scic_devices_xml.findall("SectionInfo"):
-			section_data = tag2dict(section)
-			for device in devices:
-				if device.device_id.endswith(section_data["repeater_id1"]) and not device.rc_device:
-					device.configuration.append(section_data)
-					break
-			else:  # pragma: no cover
-				raise ValueError(f"Unknown Device {section_data['name']}")
+		with filename.open("rb") as fp:
+			for _, element in etree.iterparse(fp, events=("end", )):
+				tag = element.tag
+
+				if tag == f"{_report_ns}Devices":
+					devices.append(
+							Device(
+									device_id=element.findtext(f"{_report_ns}DeviceId"),
+									display_name=element.findtext(f"{_report_ns}DisplayName"),
+									rc_device=strtobool(element.findtext(f"{_report_ns}IsRCDevice")),
+									)
+							)
+					element.clear()
+
+				elif element.getparent() is not None and element.getparent().tag == f"{_report_ns}MethodReport":
+					report[tag[len(_report_ns):]] = element.text or ''
+					element.clear()
+
+		_SectionIndex(
+				devices,
+				rc_devices_xml=report.get("RCDevicesXml", ''),
+				scic_devices_xml=report.get("SCICDevicesXml", ''),
+				).attach()
 
 		return cls(
-				version=version,
-				name=method_name,
-				filename=method_path,
+				version=float(report["Version"]),
+				name=report["MethodName"],
+				filename=pathlib.Path(report["MethodPath"]),
 				devices=devices,
 				)
 
 
-def read_acqmethod(base_path: PathLike) -> AcqMethod:
+def read_acqmethod(base_path: Union[PathLike, ArchivePath]) -> AcqMethod:
 	"""
 	Construct an :class:`~.AcqMethod` object from the :file:`AcqMethod.xml` file in the given directory.
 
 	:param base_path: Directory containing the :file:`AcqMethod.xml` file.
 	"""
 
-	return AcqMethod.from_xml_file(pathlib.Path(base_path) / "AcqMethod.xml")
+	return AcqMethod.from_xml_file(resolve_path(base_path) / "AcqMethod.xml")
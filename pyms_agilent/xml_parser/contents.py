@@ -25,7 +25,6 @@ Parser for :file:`Contents.xml`.
 
 # stdlib
 import datetime
-import pathlib
 from typing import Union
 
 # 3rd party
@@ -35,14 +34,14 @@ from domdf_python_tools.compat import importlib_resources
 from domdf_python_tools.typing import PathLike
 from mh_utils.utils import element_to_bool
 from mh_utils.worklist_parser.parser import parse_worklist_datetime
-from mh_utils.xml import XMLFileMixin
 
 # this package
+from pyms_agilent.archive import ArchivePath, resolve_path
 from pyms_agilent.enums import AcqStatusEnum, MeasurementTypeEnum, SeparationTechniqueEnum
 from pyms_agilent.xml_parser import agilent_xsd
 
 # this package
-from .core import _get_from_enum
+from .core import XMLFileMixin, _get_from_enum
 
 __all__ = ["Contents", "read_contents_xml"]
 
@@ -140,11 +139,11 @@ class Contents(XMLFileMixin, Dictable):
 				)
 
 
-def read_contents_xml(base_path: PathLike) -> Contents:
+def read_contents_xml(base_path: Union[PathLike, ArchivePath]) -> Contents:
 	"""
 	Construct a :class:`~.Contents` object from the :file:`Contents.xml` file in the given directory.
 
 	:param base_path:
 	"""
 
-	return Contents.from_xml_file(pathlib.Path(base_path) / "Contents.xml")
+	return Contents.from_xml_file(resolve_path(base_path) / "Contents.xml")
@@ -24,18 +24,171 @@ Core functionality.
 #
 
 # stdlib
-import re
+import operator
+import pathlib
+import threading
 from abc import ABC
-from typing import Any, Dict, Iterable, Optional, Type
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
 
 # 3rd party
 import lxml.objectify  # type: ignore
+import mh_utils.xml
 from attr_utils.docstrings import add_attrs_doc
 from domdf_python_tools.bases import NamedList
+from domdf_python_tools.typing import PathLike
+from lxml import etree, objectify
+from lxml.etree import _ElementTree  # type: ignore
 from mh_utils.utils import camel_to_snake
-from mh_utils.xml import XMLFileMixin
 
-__all__ = ["make_from_element", "XMLList", "_get_from_enum", "tag2dict"]
+# this package
+from pyms_agilent.archive import ArchivePath, resolve_path
+
+__all__ = [
+		"make_from_element",
+		"XMLList",
+		"_get_from_enum",
+		"tag2dict",
+		"ExtractionPlan",
+		"IndexedListMixin",
+		"get_schema",
+		"get_parser",
+		"get_validated_tree",
+		"set_validation",
+		"XMLFileMixin",
+		]
+
+# lxml parsers must not be shared between threads, so each thread has its own cache of parsers.
+# Compiled schemas can be shared, so are compiled once per process.
+_thread_cache = threading.local()
+_schemas: Dict[str, etree.XMLSchema] = {}
+_schemas_lock = threading.Lock()
+
+# Whether XML files are validated against their schema by default.
+_validate = True
+
+
+def _cache(name: str) -> Dict:
+	try:
+		return getattr(_thread_cache, name)
+	except AttributeError:
+		cache: Dict = {}
+		setattr(_thread_cache, name, cache)
+		return cache
+
+
+def get_schema(schema_file: PathLike) -> etree.XMLSchema:
+	"""
+	Returns the compiled XML schema for the given XSD file.
+
+	The schema is only compiled the first time it is requested, and is shared between threads.
+
+	:param schema_file:
+	"""
+
+	key = str(schema_file)
+
+	with _schemas_lock:
+		if key not in _schemas:
+			if not pathlib.Path(key).is_file():
+				raise FileNotFoundError(f"XML schema '{key}' not found.")
+
+			_schemas[key] = etree.XMLSchema(etree.parse(key))
+
+		return _schemas[key]
+
+
+def get_parser(schema_file: Optional[PathLike] = None) -> etree.XMLParser:
+	"""
+	Returns an :mod:`lxml.objectify` parser which validates against the given XSD file.
+
+	The parser is only created the first time it is requested in each thread.
+
+	:param schema_file: If :py:obj:`None` the parser does not validate the XML.
+	"""
+
+	parsers = _cache("parsers")
+	key = None if schema_file is None else str(schema_file)
+
+	if key not in parsers:
+		schema = None if key is None else get_schema(key)
+		parsers[key] = objectify.makeparser(schema=schema)
+
+	return parsers[key]
+
+
+def set_validation(enabled: bool) -> bool:
+	"""
+	Set whether XML files are validated against their schema by default.
+
+	Disabling validation is faster, but should only be done for trusted files.
+
+	:param enabled:
+
+	:returns: The previous setting.
+	"""
+
+	global _validate
+
+	previous = _validate
+	_validate = bool(enabled)
+	return previous
+
+
+def get_validated_tree(
+		xml_file: Union[PathLike, ArchivePath],
+		schema_file: Optional[PathLike] = None,
+		validate: Optional[bool] = None,
+		) -> _ElementTree:
+	"""
+	Returns an :mod:`lxml.objectify` tree from the given XML file, validated against the schema file.
+
+	This is equivalent to :func:`mh_utils.xml.get_validated_tree`, but the compiled schema
+	and the parser are reused between files.
+
+	:param xml_file: The XML file to parse, which may be inside a zip or tar archive.
+	:param schema_file: The schema file to validate against.
+	:param validate: Whether to validate the file against the schema.
+		If :py:obj:`None` the setting from :func:`~.set_validation` is used.
+
+	:raises: :exc:`lxml.etree.XMLSyntaxError` if the file is not valid.
+	"""
+
+	xml_file = resolve_path(xml_file)
+
+	if not xml_file.is_file():
+		raise FileNotFoundError(f"XML file '{xml_file}' not found.")
+
+	if validate is None:
+		validate = _validate
+
+	parser = get_parser(schema_file if validate else None)
+
+	if isinstance(xml_file, ArchivePath):
+		with xml_file.open("rb") as fp:
+			return objectify.parse(fp, parser=parser)
+
+	return objectify.parse(str(xml_file), parser=parser)
+
+
+class XMLFileMixin(mh_utils.xml.XMLFileMixin):
+	"""
+	ABC mixin to provide a function for instantiating the class from an XML file.
+
+	The compiled schema for the class is cached, and reused for every file that is parsed.
+	"""
+
+	@classmethod
+	def from_xml_file(cls, filename: Union[PathLike, ArchivePath], validate: Optional[bool] = None):
+		"""
+		Generate an instance of this class by parsing an from an XML file.
+
+		:param filename: The filename of the XML file, which may be inside a zip or tar archive.
+		:param validate: Whether to validate the file against the schema.
+			If :py:obj:`None` the setting from :func:`~.set_validation` is used.
+		"""
+
+		tree = get_validated_tree(filename, cls._schema, validate=validate)
+		return cls.from_xml(tree.getroot())
 
 
 def make_from_element(
@@ -57,6 +210,105 @@ def make_from_element(
 		yield class_.from_xml(item)
 
 
+class IndexedListMixin:
+	"""
+	Mixin for :class:`~domdf_python_tools.bases.UserList` subclasses which keeps a hash index
+	of the items by the value of one of their attributes, for constant-time lookups with :meth:`~.get`.
+
+	The index is rebuilt the next time it is needed after the list is modified.
+	"""  # noqa: D400
+
+	#: The attribute of the items used as the key in the index.
+	_key_attribute: str = "name"
+
+	#: The attributes of the items which become columns in :meth:`~.to_frame`.
+	_frame_columns: Sequence[str] = ()
+
+	_index: Optional[Dict[Any, Any]] = None
+
+	data: List[Any]
+
+	def _build_index(self) -> Dict[Any, Any]:
+		index: Dict[Any, Any] = {}
+		key_getter = operator.attrgetter(self._key_attribute)
+
+		for item in self.data:
+			# The first item with a given key wins, as with a linear search.
+			index.setdefault(key_getter(item), item)
+
+		self._index = index
+		return index
+
+	def get(self, name: Any, default: Any = None) -> Any:
+		"""
+		Returns the first item whose key attribute is ``name``, or ``default`` if there is no such item.
+
+		:param name:
+		:param default:
+		"""
+
+		index = self._index
+		if index is None:
+			index = self._build_index()
+
+		return index.get(name, default)
+
+	def names(self) -> List[Any]:
+		"""
+		Returns the unique values of the key attribute, in order.
+		"""
+
+		index = self._index
+		if index is None:
+			index = self._build_index()
+
+		return list(index)
+
+	def to_frame(self):
+		"""
+		Returns a :class:`pandas.DataFrame` with one row per item and one column per attribute.
+		"""
+
+		# 3rd party
+		import pandas  # type: ignore  # Imported here as it is slow to import, and rarely needed when parsing.
+
+		columns = {}
+		for column in self._frame_columns:
+			columns[column] = list(map(operator.attrgetter(column), self.data))
+
+		return pandas.DataFrame(columns, columns=list(self._frame_columns))
+
+
+def _invalidates_index(name: str) -> Callable:
+	# Wraps a method of UserList which modifies the list so that it also discards the index.
+
+	def method(self, *args, **kwargs):
+		self._index = None
+		return getattr(super(IndexedListMixin, self), name)(*args, **kwargs)
+
+	method.__name__ = name
+	return method
+
+
+for _method_name in (
+		"__setitem__",
+		"__delitem__",
+		"__iadd__",
+		"__imul__",
+		"append",
+		"insert",
+		"pop",
+		"remove",
+		"clear",
+		"reverse",
+		"sort",
+		"extend",
+		):
+	setattr(IndexedListMixin, _method_name, _invalidates_index(_method_name))
+
+del _method_name
+
+
 @add_attrs_doc
 class XMLList(XMLFileMixin, NamedList, ABC):
 	"""
@@ -125,6 +377,98 @@ def _get_from_enum(value: Any, enum, type_: Any = str) -> Any:
 		return enum(type_(value))
 
 
+def _value_converter(element_type: Type) -> Callable[[Any], Any]:
+	if issubclass(element_type, lxml.objectify.IntElement):
+		return lambda element: int(element.text)
+	elif issubclass(element_type, lxml.objectify.StringElement):
+		return lambda element: str(element.text)
+	elif issubclass(element_type, lxml.objectify.FloatElement):
+		return lambda element: float(element.text)
+	else:
+		return lambda element: element.text
+
+
+# Value converters for each objectify element class, shared by all plans.
+_value_converters: Dict[Type, Callable[[Any], Any]] = {}
+
+
+class ExtractionPlan:
+	"""
+	Precomputed rules for converting the child tags of an XML element into a dictionary.
+
+	The snake_case key for each tag name, and the converter for each type of element,
+	are computed the first time they are seen and then reused for every element the plan is applied to.
+	Parsers should create a plan for each type of element at module level.
+
+	:param camel_lookup: Optional mapping of CamelCase tag names to their snake_case equivalents.
+	:param xmlns: Optional url that prefixes tag names, and which should be removed from the keys in the dictionary.
+	"""
+
+	def __init__(self, camel_lookup: Optional[Dict[str, str]] = None, xmlns: Optional[str] = None):
+		self.camel_lookup = dict(camel_lookup or {})
+		self.xmlns = xmlns
+		self._prefix = f"{{{xmlns}}}" if xmlns else ''
+		self._keys: Dict[str, str] = {}
+
+	def key_for(self, tag: str) -> str:
+		"""
+		Returns the dictionary key for the given tag name.
+
+		:param tag:
+		"""
+
+		try:
+			return self._keys[tag]
+		except KeyError:
+			pass
+
+		tag_name = tag
+		if self._prefix and tag_name.startswith(self._prefix):
+			tag_name = tag_name[len(self._prefix):]
+
+		if tag_name in self.camel_lookup:
+			key = self.camel_lookup[tag_name]
+		else:
+			key = camel_to_snake(tag_name)
+
+		self._keys[tag] = key
+		return key
+
+	def __call__(self, element: lxml.objectify.ObjectifiedElement) -> Dict[str, Any]:
+		"""
+		Returns a dictionary mapping the child tags of ``element`` to their values.
+
+		:param element: The element to parse tags from.
+		"""
+
+		keys = self._keys
+		converters = _value_converters
+		output_dict: Dict[str, Any] = {}
+
+		for tag in element.iterchildren():
+			try:
+				key = keys[tag.tag]
+			except KeyError:
+				key = self.key_for(tag.tag)
+
+			element_type = type(tag)
+			try:
+				converter = converters[element_type]
+			except KeyError:
+				converter = converters[element_type] = _value_converter(element_type)
+
+			output_dict[key] = converter(tag)
+
+		return output_dict
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}(camel_lookup={self.camel_lookup!r}, xmlns={self.xmlns!r})>"
+
+
+# Plans created by tag2dict, keyed by the camel_lookup items and xmlns.
+_plans: Dict[Tuple, ExtractionPlan] = {}
+
+
 def tag2dict(
 		element: lxml.objectify.ObjectifiedElement,
 		camel_lookup: Optional[Dict[str, str]] = None,
@@ -133,32 +477,19 @@ def tag2dict(
 	"""
 	Returns a dictionary mapping child tags (converted from CamelCase to snake_case) to values.
 
+	An :class:`~.ExtractionPlan` is created for each combination of ``camel_lookup`` and ``xmlns``,
+	and is reused by later calls with the same arguments.
+
 	:param element: The element to parse tags from.
 	:param camel_lookup: Optional mapping of CamelCase tag names to their snake_case equivalents.
 	:param xmlns: Optional url that prefixes tag names, and which should be removed from the keys in the dictionary.
 	"""
 
-	output_dict: Dict[str, Any] = {}
+	plan_key = (tuple(camel_lookup.items()) if camel_lookup else (), xmlns)
 
-	for tag in element.iterchildren():
-
-		if xmlns:
-			tag_name = re.sub(fr"^{{{xmlns}}}", '', tag.tag)
-		else:
-			tag_name = tag.tag
-
-		if camel_lookup is not None:
-			tag_name = camel_lookup.get(tag_name, camel_to_snake(tag_name))
-		else:
-			tag_name = camel_to_snake(tag_name)
-
-		if isinstance(tag, lxml.objectify.IntElement):
-			output_dict[tag_name] = int(tag.text)
-		elif isinstance(tag, lxml.objectify.StringElement):
-			output_dict[tag_name] = str(tag.text)
-		elif isinstance(tag, lxml.objectify.FloatElement):
-			output_dict[tag_name] = float(tag.text)
-		else:
-			output_dict[tag_name] = tag.text
+	try:
+		plan = _plans[plan_key]
+	except KeyError:
+		plan = _plans[plan_key] = ExtractionPlan(camel_lookup, xmlns)
 
-	return output_dict
+	return plan(element)
@@ -24,7 +24,6 @@ Parser for :file:`DefaultMassCal.xml`.
 #
 
 # stdlib
-import pathlib
 from typing import Dict, Optional, Sequence, Union
 
 # 3rd party
@@ -34,6 +33,7 @@ from domdf_python_tools.compat import importlib_resources
 from domdf_python_tools.typing import PathLike
 
 # this package
+from pyms_agilent.archive import ArchivePath, resolve_path
 from pyms_agilent.enums import CalibrationFormulaEnum, CalibrationTechniqueEnum
 from pyms_agilent.xml_parser import agilent_xsd
 
@@ -192,11 +192,11 @@ class CalibrationList(XMLList):
 		return class_
 
 
-def read_mass_cal_xml(base_path: PathLike) -> CalibrationList:
+def read_mass_cal_xml(base_path: Union[PathLike, ArchivePath]) -> CalibrationList:
 	"""
 	Construct a :class:`~.CalibrationList` object from the :file:`DefaultMassCal.xml` file in the given directory.
 
 	:param base_path:
 	"""
 
-	return CalibrationList.from_xml_file(pathlib.Path(base_path) / "DefaultMassCal.xml")
+	return CalibrationList.from_xml_file(resolve_path(base_path) / "DefaultMassCal.xml")
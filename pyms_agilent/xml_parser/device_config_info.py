@@ -24,8 +24,7 @@ Parser for :file:`DeviceConfigInfo.xml`.
 #
 
 # stdlib
-import pathlib
-from typing import Sequence
+from typing import Iterable, List, Optional, Sequence, Union
 
 # 3rd party
 import attr
@@ -35,12 +34,12 @@ from attr_utils.serialise import serde
 from domdf_python_tools.bases import Dictable
 from domdf_python_tools.doctools import prettify_docstrings
 from domdf_python_tools.typing import PathLike
-from mh_utils.xml import XMLFileMixin
 
 # this package
-from .core import make_from_element
+from pyms_agilent.archive import ArchivePath, resolve_path
+from .core import IndexedListMixin, XMLFileMixin, make_from_element
 
-__all__ = ["Device", "Parameter", "DeviceConfigInfo", "read_device_config_xml"]
+__all__ = ["Device", "Parameter", "ParameterList", "DeviceConfigInfo", "read_device_config_xml"]
 
 
 @serde
@@ -133,6 +132,29 @@ class Parameter(Dictable):
 		return f"<{self.__class__.__name__}({self.display_name})>"
 
 
+class ParameterList(IndexedListMixin, List[Parameter]):
+	"""
+	List of :class:`~.Parameter` objects, which can be looked up by display name with :meth:`~.ParameterList.get`.
+
+	:param initlist: Iterable to initialise the list from.
+	"""
+
+	def __init__(self, initlist: Optional[Iterable[Parameter]] = None):
+		super().__init__(initlist or ())
+		self._build_index()
+
+	_key_attribute = "display_name"
+	_frame_columns = Parameter.__slots__
+
+	@property
+	def data(self) -> List[Parameter]:  # type: ignore
+		"""
+		Returns the list itself, as this is a :class:`list` subclass rather than a :class:`~collections.UserList`.
+		"""
+
+		return self
+
+
 @prettify_docstrings
 class DeviceConfigInfo(XMLFileMixin, Dictable):
 	"""
@@ -145,7 +167,7 @@ class DeviceConfigInfo(XMLFileMixin, Dictable):
 	def __init__(self, parameters: Sequence[Parameter], devices: Sequence[Device]):
 		super().__init__()
 
-		self.parameters = list(parameters)
+		self.parameters = ParameterList(parameters)
 		self.devices = list(devices)
 
 	__slots__ = ["parameters", "devices"]
@@ -176,7 +198,7 @@ class DeviceConfigInfo(XMLFileMixin, Dictable):
 		return cls(parameters, devices)
 
 
-def read_device_config_xml(base_path: PathLike) -> DeviceConfigInfo:
+def read_device_config_xml(base_path: Union[PathLike, ArchivePath]) -> DeviceConfigInfo:
 	"""
 	Construct a :class:`~.DeviceConfigInfo` object from the :file:`DeviceConfigInfo.xml`
 	file in the given directory.
@@ -184,4 +206,4 @@ def read_device_config_xml(base_path: PathLike) -> DeviceConfigInfo:
 	:param base_path:
 	"""  # noqa D400
 
-	return DeviceConfigInfo.from_xml_file(pathlib.Path(base_path) / "DeviceConfigInfo.xml")
+	return DeviceConfigInfo.from_xml_file(resolve_path(base_path) / "DeviceConfigInfo.xml")
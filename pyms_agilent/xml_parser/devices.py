@@ -24,8 +24,7 @@ Parser for :file:`Devices.xml`.
 #
 
 # stdlib
-import pathlib
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Union
 
 # 3rd party
 import lxml.objectify  # type: ignore
@@ -34,13 +33,15 @@ from domdf_python_tools.compat import importlib_resources
 from domdf_python_tools.typing import PathLike
 
 # this package
+from pyms_agilent.archive import ArchivePath, resolve_path
 from pyms_agilent.enums import DeviceType, DeviceVendor, StoredDataType
 from pyms_agilent.xml_parser import agilent_xsd
-from pyms_agilent.xml_parser.acq_method import tag2dict
-from pyms_agilent.xml_parser.core import XMLList
+from pyms_agilent.xml_parser.core import ExtractionPlan, XMLList
 
 __all__ = ["Device", "DeviceList", "read_devices_xml"]
 
+_device_plan = ExtractionPlan(camel_lookup={"Name": "display_name", "Type": "type_"})
+
 
 class Device(Dictable):
 	r"""
@@ -122,7 +123,7 @@ class Device(Dictable):
 
 		return cls(
 				device_id=element.attrib["DeviceID"],
-				**tag2dict(element, camel_lookup={"Name": "display_name", "Type": "type_"})
+				**_device_plan(element),
 				)
 
 
@@ -155,7 +156,7 @@ class DeviceList(XMLList):
 		return devices
 
 
-def read_devices_xml(base_path: PathLike) -> DeviceList:
+def read_devices_xml(base_path: Union[PathLike, ArchivePath]) -> DeviceList:
 	"""
 	Construct a :class:`~.DeviceList` object from the :file:`DeviceList.xml`
 	file in the given directory.
@@ -163,4 +164,4 @@ def read_devices_xml(base_path: PathLike) -> DeviceList:
 	:param base_path:
 	"""  # noqa D400
 
-	return DeviceList.from_xml_file(pathlib.Path(base_path) / "Devices.xml")
+	return DeviceList.from_xml_file(resolve_path(base_path) / "Devices.xml")
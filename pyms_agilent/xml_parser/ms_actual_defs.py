@@ -24,7 +24,6 @@ Parser for :file:`MSActualDefs.xml`.
 #
 
 # stdlib
-import pathlib
 from typing import Callable, Optional, Sequence, Union
 
 # 3rd party
@@ -36,10 +35,11 @@ from domdf_python_tools.typing import PathLike
 from numpy import float64, int64  # type: ignore
 
 # this package
+from pyms_agilent.archive import ArchivePath, resolve_path
 from pyms_agilent.xml_parser import agilent_xsd
 
 # this package
-from .core import XMLList, make_from_element
+from .core import IndexedListMixin, XMLList, make_from_element
 
 __all__ = ["Actual", "ActualsDef", "read_ms_actuals_defs"]
 
@@ -150,13 +150,13 @@ class Actual(Dictable):
 				)
 
 
-class ActualsDef(XMLList):
+class ActualsDef(IndexedListMixin, XMLList):
 	r"""
 	Stores the overall Actual Definition Information for all devices.
 
 	Parsed from :file:`MSActualDefs.xml`.
 
-	List of :class:`~.Actual` objects.
+	List of :class:`~.Actual` objects, which can be looked up by display name with :meth:`~.ActualsDef.get`.
 
 	:param version: The version of the :file:`MSActualDefs.xml` file.
 	:param type\_:
@@ -173,6 +173,10 @@ class ActualsDef(XMLList):
 			):
 		super().__init__(version, actuals)
 		self.type_ = int(type_)
+		self._build_index()
+
+	_key_attribute = "display_name"
+	_frame_columns = Actual.__slots__
 
 	with importlib_resources.path(agilent_xsd, "MSActualDefs.xsd") as schema_path:
 		_schema = str(schema_path)
@@ -192,11 +196,11 @@ class ActualsDef(XMLList):
 				)
 
 
-def read_ms_actuals_defs(base_path: PathLike) -> ActualsDef:
+def read_ms_actuals_defs(base_path: Union[PathLike, ArchivePath]) -> ActualsDef:
 	"""
 	Construct an :class:`~.ActualsDef` object from the :file:`MSActualDefs.xml` file in the given directory.
 
 	:param base_path:
 	"""
 
-	return ActualsDef.from_xml_file(pathlib.Path(base_path) / "MSActualDefs.xml")
+	return ActualsDef.from_xml_file(resolve_path(base_path) / "MSActualDefs.xml")
@@ -25,7 +25,6 @@ Parser for mass spectrometry time segment data in :file:`MSTS.xml`.
 
 # stdlib
 import datetime
-import pathlib
 from typing import List, Optional, Union
 
 # 3rd party
@@ -34,9 +33,11 @@ import lxml.objectify  # type: ignore
 from attr_utils.pprinter import pretty_repr
 from attr_utils.serialise import serde
 from domdf_python_tools.compat import importlib_resources
+from domdf_python_tools.typing import PathLike
 from domdf_python_tools.utils import strtobool
 
 # this package
+from pyms_agilent.archive import ArchivePath, resolve_path
 from . import agilent_xsd
 from .core import XMLList
 
@@ -135,11 +136,11 @@ class MSTimeSegments(XMLList):
 		return obj
 
 
-def read_msts_xml(base_path) -> "MSTimeSegments":
+def read_msts_xml(base_path: Union[PathLike, ArchivePath]) -> "MSTimeSegments":
 	"""
 	Construct an an :class:`~.MSTS` object from the :file:`sample_info.xml` file in the given directory.
 
 	:param base_path:
 	"""
 
-	return MSTimeSegments.from_xml_file(pathlib.Path(base_path) / "MSTS.xml")
+	return MSTimeSegments.from_xml_file(resolve_path(base_path) / "MSTS.xml")
@@ -24,8 +24,7 @@ Parser for :file:`sample_info.xml`.
 #
 
 # stdlib
-import pathlib
-from typing import Any, List
+from typing import Any, List, Union
 
 # 3rd party
 import attr
@@ -33,14 +32,16 @@ import lxml.objectify  # type: ignore
 from attr_utils.pprinter import pretty_repr
 from attr_utils.serialise import serde
 from domdf_python_tools.compat import importlib_resources
+from domdf_python_tools.typing import PathLike
 from domdf_python_tools.utils import strtobool
 from mh_utils.utils import strip_string
 
 # this package
+from pyms_agilent.archive import ArchivePath, resolve_path
 from pyms_agilent.xml_parser import agilent_xsd
 
 # this package
-from .core import XMLList
+from .core import IndexedListMixin, XMLList
 
 __all__ = ["Field", "SampleInfo", "read_sample_info_xml"]
 
@@ -95,11 +96,12 @@ class Field:
 				)
 
 
-class SampleInfo(XMLList):
+class SampleInfo(IndexedListMixin, XMLList):
 	"""
 	List of information about the sample, parsed from :file:`sample_info.xml`.
 
-	Each piece of information is represented as a :class:`.~Field`
+	Each piece of information is represented as a :class:`.~Field`.
+	Fields can be looked up by name with :meth:`~.SampleInfo.get`.
 
 	:param version: The version number of the sample info data.
 	:param fields:
@@ -117,6 +119,8 @@ class SampleInfo(XMLList):
 
 	_content_type = Field
 	_content_xml_name = "Field"
+	_key_attribute = "name"
+	_frame_columns = ("name", "display_name", "value", "data_type", "units", "field_type", "overridden")
 
 	with importlib_resources.path(agilent_xsd, "sample_info.xsd") as path:
 		_schema = str(path)
@@ -133,14 +137,15 @@ class SampleInfo(XMLList):
 
 		obj = cls(version)
 		obj._append_from_element(element)
+		obj._build_index()
 		return obj
 
 
-def read_sample_info_xml(base_path) -> "SampleInfo":
+def read_sample_info_xml(base_path: Union[PathLike, ArchivePath]) -> "SampleInfo":
 	"""
 	Construct an :class:`~.SampleInfo` object from the :file:`sample_info.xml` file in the given directory.
 
 	:param base_path:
 	"""
 
-	return SampleInfo.from_xml_file(pathlib.Path(base_path) / "sample_info.xml")
+	return SampleInfo.from_xml_file(resolve_path(base_path) / "sample_info.xml")
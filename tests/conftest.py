@@ -1 +1,266 @@
+# stdlib
+import datetime
+import pathlib
+
+# 3rd party
+import numpy  # type: ignore
+import pytest
+
+# this package
+from pyms_agilent.enums import (
+		ChromType,
+		DataUnit,
+		DataValueType,
+		DeviceType,
+		IonizationMode,
+		IRMStatus,
+		MeasurementTypeEnum,
+		MSLevel,
+		MSScanType,
+		MSStorageMode,
+		SampleCategory,
+		SeparationTechniqueEnum,
+		SpecType,
+		StoredDataType
+		)
+from pyms_agilent.frozen import FrozenDataFileWriter
+from pyms_agilent.mhdac.chromatograms import FrozenInstrumentCurve, FrozenTIC
+from pyms_agilent.mhdac.file_information import FrozenFileInformation
+from pyms_agilent.mhdac.ms_scan_file_info import FrozenMSScanFileInformation
+from pyms_agilent.mhdac.scan_record import FrozenMSScanRecord
+from pyms_agilent.mhdac.signalinfo import FrozenSignalInfo
+from pyms_agilent.mhdac.spectrum import FrozenMS2SpecData, FrozenSpecData
+from pyms_agilent.utils import Range
+from pyms_agilent.xml_parser.devices import read_devices_xml
+
 pytest_plugins = ("coincidence", "pytest_regressions")
+
+#: The number of scans in the ``frozen_datafile`` fixture.
+N_SCANS = 20
+
+
+def make_scan(scan_no: int):
+	"""
+	Returns a synthetic scan record and spectrum.
+
+	Odd-numbered scans are MS/MS scans of the preceding scan.
+	"""
+
+	retention_time = 0.05 + scan_no * 0.01
+	is_ms2 = scan_no % 2 == 1
+	n_points = 5 + scan_no
+
+	x_data = [100.0 + i * 10.5 + scan_no for i in range(n_points)]
+	y_data = [float((i + 1) * (scan_no + 1) * 100) for i in range(n_points)]
+
+	record = FrozenMSScanRecord(
+			base_peak_intensity=max(y_data),
+			base_peak_mz=x_data[-1],
+			collision_energy=20.0 if is_ms2 else 0.0,
+			compensation_field=float("nan"),
+			dispersion_field=float("nan"),
+			fragmentor_voltage=380.0,
+			ion_polarity='+',
+			ionization_mode=IonizationMode.ESI,
+			is_collision_energy_dynamic=False,
+			is_fragmentor_voltage_dynamic=False,
+			ms_level=MSLevel.MSMS if is_ms2 else MSLevel.MS,
+			ms_scan_type=MSScanType.ProductIon if is_ms2 else MSScanType.Scan,
+			mz_of_interest=250.5 + scan_no if is_ms2 else 0.0,
+			retention_time=retention_time,
+			scan_id=1000 + scan_no,
+			tic=sum(y_data),
+			time_segment=1 if scan_no < N_SCANS // 2 else 2,
+			)
+
+	spectrum_kwargs = dict(
+			abundance_limit=16742400.0,
+			acquired_time_ranges=[Range(retention_time, retention_time)],
+			chrom_peak_index=-1,
+			collision_energy=record.collision_energy,
+			compensation_field=float("nan"),
+			device_name="QTOF",
+			device_type=DeviceType.QuadrupoleTimeOfFlight,
+			dispersion_field=float("nan"),
+			fragmentor_voltage=380.0,
+			x_axis_info=(DataValueType.MassToCharge, DataUnit.Thomsons),
+			y_axis_info=(DataValueType.IonAbundance, DataUnit.Counts),
+			ionization_polarity='+',
+			ionization_mode=IonizationMode.ESI,
+			is_chromatogram=False,
+			is_data_in_mass_unit=True,
+			is_mass_spectrum=True,
+			is_icp_data=False,
+			is_uv_spectrum=False,
+			ms_level=record.ms_level,
+			ms_scan_type=record.ms_scan_type,
+			ms_storage_mode=MSStorageMode.PeakDetectedSpectrum,
+			mz_of_interest=[Range(record.mz_of_interest, record.mz_of_interest)] if is_ms2 else [],
+			measured_mass_range=Range(x_data[0], x_data[-1]),
+			ordinal_number=1,
+			parent_scan_id=record.scan_id - 1 if is_ms2 else 0,
+			sampling_period=0.5,
+			scan_id=record.scan_id,
+			spectrum_type=SpecType.TofMassSpectrum,
+			threshold=0.0,
+			total_data_points=n_points,
+			total_scan_count=1,
+			x_data=x_data,
+			y_data=y_data,
+			)
+
+	if is_ms2:
+		spectrum = FrozenMS2SpecData(**spectrum_kwargs, precursor_charge=2, precursor_intensity=5000.0 + scan_no)
+	else:
+		spectrum = FrozenSpecData(**spectrum_kwargs)
+
+	return record, spectrum
+
+
+def make_tic() -> FrozenTIC:
+	"""
+	Returns a synthetic TIC for the ``frozen_datafile`` fixture.
+	"""
+
+	x_data = [make_scan(i)[0].retention_time for i in range(N_SCANS)]
+	y_data = [make_scan(i)[0].tic for i in range(N_SCANS)]
+
+	return FrozenTIC(
+			chromatogram_type=ChromType.TotalIon,
+			device_name="QTOF",
+			device_type=DeviceType.QuadrupoleTimeOfFlight,
+			is_chromatogram=True,
+			is_icp_data=False,
+			is_cycle_summed=False,
+			is_mass_spectrum=False,
+			is_primary_mrm=False,
+			is_uv_spectrum=False,
+			ordinal_number=1,
+			signal_description='',
+			signal_name="TIC",
+			total_data_points=N_SCANS,
+			x_data=x_data,
+			y_data=y_data,
+			abundance_limit=16742400.0,
+			acquired_time_ranges=[Range(x_data[0], x_data[-1])],
+			collision_energy=0.0,
+			fragmentor_voltage=380.0,
+			ionization_polarity='+',
+			ionization_mode=IonizationMode.ESI,
+			ms_level=MSLevel.All,
+			ms_scan_type=MSScanType.All,
+			ms_storage_mode=MSStorageMode.PeakDetectedSpectrum,
+			mz_of_interest=[],
+			measured_mass_range=[],
+			mz_regions_were_excluded=False,
+			sampling_period=0.5,
+			threshold=0.0,
+			x_axis_info=(DataValueType.AcqTime, DataUnit.Minutes),
+			y_axis_info=(DataValueType.IonAbundance, DataUnit.Counts),
+			)
+
+
+def make_signal(name: str = "Pressure") -> FrozenSignalInfo:
+	"""
+	Returns a synthetic instrument curve for the ``frozen_datafile`` fixture.
+	"""
+
+	curve = FrozenInstrumentCurve(
+			chromatogram_type=ChromType.Signal,
+			device_name="QuatPump",
+			device_type=DeviceType.QuaternaryPump,
+			is_chromatogram=True,
+			is_icp_data=False,
+			is_cycle_summed=False,
+			is_mass_spectrum=False,
+			is_primary_mrm=False,
+			is_uv_spectrum=False,
+			ordinal_number=1,
+			signal_description=name,
+			signal_name=name,
+			total_data_points=4,
+			x_data=[0.0, 0.1, 0.2, 0.3],
+			y_data=[400.0, 401.5, 402.25, 399.75],
+			x_axis_info=(DataValueType.AcqTime, DataUnit.Minutes),
+			y_axis_info=(DataValueType.Unspecified, "bar"),
+			)
+
+	return FrozenSignalInfo(
+			device_name="QuatPump",
+			device_type=DeviceType.QuaternaryPump,
+			device_ordinal_number=1,
+			signal_name=name,
+			instrument_curve=curve,
+			)
+
+
+def make_file_information() -> FrozenFileInformation:
+	"""
+	Returns synthetic file information for the ``frozen_datafile`` fixture.
+	"""
+
+	return FrozenFileInformation(
+			acquisition_time=datetime.datetime(2020, 1, 24, 12, 30, 15, tzinfo=datetime.timezone.utc),
+			irm_status=IRMStatus.Success,
+			datafile_name=r"D:\MassHunter\Data\synthetic.d",
+			ms_data_present=True,
+			non_ms_data_present=True,
+			uv_data_present=False,
+			measurement_type=MeasurementTypeEnum.Chromatographic,
+			separation_technique=SeparationTechniqueEnum.LC,
+			ms_scan_file_info=FrozenMSScanFileInformation(
+					collision_energies=[0.0, 20.0],
+					compensation_field_values=[],
+					dispersion_field_values=[],
+					has_ms_data=True,
+					device_type=DeviceType.QuadrupoleTimeOfFlight,
+					fragmentor_voltages=[380.0],
+					ionisation_mode=IonizationMode.ESI,
+					ionisation_polarity='+',
+					ms_level=2,
+					scan_types=MSScanType.Scan | MSScanType.ProductIon,
+					spectra_format=MSStorageMode.PeakDetectedSpectrum,
+					total_scans=N_SCANS,
+					has_fixed_cycle_length_data=False,
+					are_multiple_spectra_present_per_scan=False,
+					sim_ions=[],
+					),
+			)
+
+
+def write_frozen_datafile(filename: pathlib.Path) -> pathlib.Path:
+	"""
+	Write a synthetic frozen datafile to ``filename``.
+	"""
+
+	devices = read_devices_xml(pathlib.Path(__file__).parent / "example1.d" / "AcqData")
+
+	with FrozenDataFileWriter(filename) as writer:
+		writer.set_file_information(make_file_information())
+		writer.set_devices(devices)
+
+		for scan_no in range(N_SCANS):
+			writer.add_scan(*make_scan(scan_no))
+
+		writer.set_tic(make_tic())
+		writer.add_signals(
+				"QuatPump",
+				DeviceType.QuaternaryPump,
+				StoredDataType.InstrumentCurves,
+				1,
+				[make_signal("Pressure"), make_signal("Flow")],
+				)
+		writer.set_ms_actuals({
+				"Gas Temp": (numpy.array([0.0, 0.2]), numpy.array([325.0, 325.5])),
+				"Vcap": ([0.0], [3500.0]),
+				})
+		writer.set_sample_data(SampleCategory.All, {"Sample Name": "synthetic", "Position": "P1-A1"})
+		writer.set_sample_data(SampleCategory.General, {"Sample Name": "synthetic"})
+		writer.set_timesegment_ids([1, 2])
+
+	return writer.filename
+
+
+@pytest.fixture(scope="session")
+def frozen_datafile(tmp_path_factory) -> pathlib.Path:
+	return write_frozen_datafile(tmp_path_factory.mktemp("frozen") / "synthetic.pmaf")
@@ -6,7 +6,8 @@ import lxml.objectify  # type: ignore
 import pytest
 
 # this package
-from pyms_agilent.xml_parser.acq_method import AcqMethod, Device, read_acqmethod, tag2dict
+from pyms_agilent.xml_parser.acq_method import AcqMethod, Device, DeviceConfiguration, read_acqmethod
+from pyms_agilent.xml_parser.core import tag2dict
 
 
 def test_from_xml_file(monkeypatch):
@@ -111,3 +112,55 @@ def test_tag2dict():
 					"granny smith": "delicious",
 					"grapes": None,
 					}
+
+
+def test_configuration_on_demand(monkeypatch):
+	monkeypatch.chdir(pathlib.Path(__file__).parent)
+	filename = pathlib.Path("Propellant_Std_1ug_1_200124-0002.d") / "AcqData" / "AcqMethod.xml"
+
+	method = AcqMethod.from_xml_file(filename)
+	assert isinstance(method.devices[0].configuration, DeviceConfiguration)
+	assert not any(device.configuration.is_loaded for device in method.devices)
+
+	pump = method.devices[1]
+	assert pump.display_name == "Quat. Pump"
+	assert len(pump.configuration) == 79
+	assert pump.configuration.is_loaded
+	assert not method.devices[0].configuration.is_loaded
+
+	assert all(section["module_display_name"] == "Quat. Pump" for section in pump.configuration)
+
+	qtof = method.devices[4]
+	assert qtof.rc_device is False
+	assert len(qtof.configuration) == 72
+	assert all(section["repeater_id1"] == "QTOF_1" for section in qtof.configuration)
+
+	# The streaming parser gives the same result as parsing the objectified tree.
+	tree = lxml.objectify.parse(str(filename))
+	from_tree = AcqMethod.from_xml(tree.getroot())
+	assert from_tree.devices == method.devices
+
+
+def test_device_configuration():
+	device = Device("Pump_1", "Pump", True, configuration=[{"flow": 1.0}])
+	assert isinstance(device.configuration, DeviceConfiguration)
+	assert device.configuration == [{"flow": 1.0}]
+	assert device.configuration.is_loaded
+
+	calls = []
+
+	def loader():
+		calls.append(1)
+		return [{"flow": 2.0}]
+
+	configuration = DeviceConfiguration(loader=loader)
+	assert not configuration.is_loaded
+	configuration.append({"flow": 3.0})
+	assert configuration == [{"flow": 2.0}, {"flow": 3.0}]
+	assert list(configuration) == [{"flow": 2.0}, {"flow": 3.0}]
+	assert calls == [1]
+
+
+def test_missing_file(tmp_pathplus):
+	with pytest.raises(FileNotFoundError):
+		AcqMethod.from_xml_file(tmp_pathplus / "AcqMethod.xml")
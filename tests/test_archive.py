@@ -0,0 +1,156 @@
+# stdlib
+import pathlib
+import tarfile
+import zipfile
+
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent.archive import ArchivePath, TarArchive, ZipArchive, open_archive, resolve_path
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.metadata import extract_metadata, is_datafile, prepare_filepath
+from pyms_agilent.xml_parser.contents import read_contents_xml
+from tests.conftest import N_SCANS
+
+datafile = pathlib.Path(__file__).parent / "example1.d"
+datafile_name = "runs/example1.d"
+
+
+def _members():
+	for filename in sorted((datafile / "AcqData").glob("*.xml")):
+		yield filename, f"{datafile_name}/AcqData/{filename.name}"
+
+
+@pytest.fixture(params=["stored", "deflated"])
+def zip_archive(tmp_pathplus, frozen_datafile, request) -> pathlib.Path:
+	filename = tmp_pathplus / "runs.zip"
+	compression = zipfile.ZIP_STORED if request.param == "stored" else zipfile.ZIP_DEFLATED
+
+	with zipfile.ZipFile(filename, 'w', compression=compression) as zf:
+		for source, member in _members():
+			zf.write(source, member)
+		zf.write(frozen_datafile, "runs/synthetic.frozen")
+		zf.writestr("runs/notes.txt", "Not a datafile")
+
+	return filename
+
+
+@pytest.fixture(params=['', "gz"])
+def tar_archive(tmp_pathplus, frozen_datafile, request) -> pathlib.Path:
+	filename = tmp_pathplus / f"runs.tar{'.' if request.param else ''}{request.param}"
+
+	with tarfile.open(filename, f"w:{request.param}") as tf:
+		for source, member in _members():
+			tf.add(source, member)
+		tf.add(frozen_datafile, "runs/synthetic.frozen")
+
+	return filename
+
+
+def check_archive(archive_filename: pathlib.Path, stored: bool, expected_reader: FrozenDataReader):
+	archive = open_archive(archive_filename)
+	assert open_archive(archive_filename) is archive
+
+	datafiles = list(archive.find_datafiles())
+	assert datafiles == [ArchivePath(archive, datafile_name)]
+	assert str(datafiles[0]) == str(archive_filename / "runs" / "example1.d")
+
+	assert archive.root.is_dir()
+	assert "synthetic.frozen" in [p.name for p in (archive.root / "runs").iterdir()]
+
+	acqdata = datafiles[0] / "AcqData"
+	assert acqdata.is_dir()
+	assert (acqdata / "Contents.xml").is_file()
+	assert not (acqdata / "Missing.xml").exists()
+	assert (acqdata / "Contents.xml").is_stored() is stored
+	assert (acqdata / "Contents.xml").read_bytes() == (datafile / "AcqData" / "Contents.xml").read_bytes()
+
+	# Random access within a member
+	with (acqdata / "MSTS.xml").open("rb") as fp:
+		expected = (datafile / "AcqData" / "MSTS.xml").read_bytes()
+		fp.seek(20)
+		assert fp.read(30) == expected[20:50]
+		fp.seek(-10, 2)
+		assert fp.read() == expected[-10:]
+
+	# Paths through the archive are resolved automatically.
+	assert resolve_path(archive_filename / datafile_name) == datafiles[0]
+	assert is_datafile(archive_filename / datafile_name)
+	assert is_datafile(datafiles[0])
+	assert not is_datafile(archive_filename / "runs")
+
+	assert read_contents_xml(acqdata) == read_contents_xml(datafile / "AcqData")
+
+	metadata = extract_metadata(archive_filename / datafile_name)
+	on_disk = extract_metadata(datafile)
+	assert metadata["contents"] == on_disk["contents"]
+	assert metadata["sample_info"] == on_disk["sample_info"]
+	assert metadata["devices"] == on_disk["devices"]
+	assert metadata["method"].name == on_disk["method"].name
+
+	reader = FrozenDataReader(archive_filename / "runs" / "synthetic.frozen")
+	assert reader.total_scans == N_SCANS
+	assert len(reader.get_tic().y_data) == N_SCANS
+	assert list(reader.get_spectrum_by_scan(3).x_data) == list(expected_reader.get_spectrum_by_scan(3).x_data)
+
+	return archive
+
+
+def test_zip(zip_archive, frozen_datafile):
+	stored = zipfile.ZipFile(zip_archive).infolist()[0].compress_type == zipfile.ZIP_STORED
+	archive = check_archive(zip_archive, stored=stored, expected_reader=FrozenDataReader(frozen_datafile))
+	assert isinstance(archive, ZipArchive)
+
+
+def test_tar(tar_archive, frozen_datafile):
+	stored = tar_archive.suffix == ".tar"
+	archive = check_archive(tar_archive, stored=stored, expected_reader=FrozenDataReader(frozen_datafile))
+	assert isinstance(archive, TarArchive)
+
+
+def test_open_archive_errors(tmp_pathplus):
+	(tmp_pathplus / "file.txt").write_text("Hello World")
+
+	with pytest.raises(ValueError, match="is not a zip or tar archive"):
+		open_archive(tmp_pathplus / "file.txt")
+
+	assert resolve_path(tmp_pathplus / "file.txt" / "inside.d") == tmp_pathplus / "file.txt" / "inside.d"
+	assert not is_datafile(tmp_pathplus / "file.txt" / "inside.d")
+
+
+def test_open_archive_close(zip_archive):
+	with open_archive(zip_archive) as archive:
+		assert is_datafile(zip_archive / datafile_name)
+
+	with pytest.raises(ValueError, match="has been closed"):
+		archive.open(f"{datafile_name}/AcqData/Contents.xml")
+
+	# Closing the archive removes it from the cache.
+	assert open_archive(zip_archive) is not archive
+	assert extract_metadata(zip_archive / datafile_name)["contents"].instrument_name
+
+
+def test_open_archive_modified(zip_archive):
+	archive = open_archive(zip_archive)
+
+	with zipfile.ZipFile(zip_archive, 'a') as zf:
+		zf.writestr("runs/more_notes.txt", "Still not a datafile")
+
+	new_archive = open_archive(zip_archive)
+	assert new_archive is not archive
+	assert archive._fd is None
+	assert is_datafile(zip_archive / datafile_name)
+
+	new_archive.close()
+
+
+def test_prepare_filepath(zip_archive):
+	path = prepare_filepath(zip_archive / datafile_name, mkdirs=False)
+	assert isinstance(path, ArchivePath)
+
+	with pytest.raises(ValueError, match="archives are read-only"):
+		prepare_filepath(path)
+
+	with pytest.raises(ValueError, match="can only be opened for reading"):
+		(path / "AcqData" / "Contents.xml").open('w')
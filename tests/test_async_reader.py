@@ -0,0 +1,190 @@
+# stdlib
+import asyncio
+import threading
+
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent.async_reader import AsyncDataReader
+from pyms_agilent.enums import DeviceType, SampleCategory, StoredDataType
+from pyms_agilent.frozen import FrozenDataReader
+from tests.conftest import N_SCANS
+
+
+class ThreadCheckingReader(FrozenDataReader):
+	"""
+	Records the threads the reader is used from.
+	"""
+
+	def __init__(self, filename):
+		super().__init__(filename)
+		self.threads = {threading.get_ident()}
+		self.started = threading.Event()
+		self.release = threading.Event()
+		self.release.set()
+
+	def get_spectrum_by_scan(self, scan_no):
+		self.threads.add(threading.get_ident())
+		self.started.set()
+		assert self.release.wait(timeout=5)
+		return super().get_spectrum_by_scan(scan_no)
+
+
+class LiveWrapper:
+	"""
+	Stands in for a wrapper around a .NET object, which must be frozen on the reader's thread.
+	"""
+
+	def __init__(self, frozen):
+		self.frozen = frozen
+		self.freeze_threads = set()
+
+	def freeze(self):
+		self.freeze_threads.add(threading.get_ident())
+		return self.frozen
+
+
+class LiveReader(FrozenDataReader):
+	"""
+	Returns live wrappers, like the reader for the native ``.d`` format.
+	"""
+
+	def __init__(self, filename):
+		super().__init__(filename)
+		self.wrappers = []
+
+	def _wrap(self, frozen):
+		wrapper = LiveWrapper(frozen)
+		self.wrappers.append(wrapper)
+		return wrapper
+
+	def get_tic(self):
+		return self._wrap(super().get_tic())
+
+	def get_spectrum_by_scan(self, scan_no):
+		return self._wrap(super().get_spectrum_by_scan(scan_no))
+
+	def get_signal_listing(self, *args, **kwargs):
+		return [self._wrap(signal) for signal in super().get_signal_listing(*args, **kwargs)]
+
+
+def run(coro):
+	loop = asyncio.new_event_loop()
+	try:
+		return loop.run_until_complete(coro)
+	finally:
+		loop.close()
+
+
+def test_async_reader(frozen_datafile):
+	expected = FrozenDataReader(frozen_datafile)
+
+	async def main():
+		async with await AsyncDataReader.open(frozen_datafile, reader_factory=ThreadCheckingReader) as reader:
+			assert repr(reader) == f"<AsyncDataReader({str(frozen_datafile)!r})>"
+			assert await reader.get_total_scans() == N_SCANS
+			assert list((await reader.get_tic()).y_data) == list(expected.get_tic().y_data)
+
+			spectrum = await reader.get_spectrum_by_scan(3)
+			assert list(spectrum.x_data) == list(expected.get_spectrum_by_scan(3).x_data)
+			assert (await reader.get_scan_record(3)).scan_id == expected.get_scan_record(3).scan_id
+
+			signals = await reader.get_signal_listing(
+					"QuatPump",
+					DeviceType.QuaternaryPump,
+					StoredDataType.InstrumentCurves,
+					)
+			assert [signal.signal_name for signal in signals] == ["Pressure", "Flow"]
+
+			assert set(await reader.get_ms_actuals()) == {"Gas Temp", "Vcap"}
+			assert await reader.get_sample_data(SampleCategory.General) == {"Sample Name": "synthetic"}
+			assert not await reader.refresh_datafile()
+			assert len(await reader.run(lambda r: r.get_devices())) == len(expected.get_devices())
+
+			scans = [scan_no async for scan_no, spectrum in reader.iter_spectra(batch_size=3)]
+			assert scans == list(range(N_SCANS))
+			scans = [scan_no async for scan_no, spectrum in reader.iter_spectra(start=5, stop=9, batch_size=3)]
+			assert scans == [5, 6, 7, 8]
+
+			# The datafile was opened, and is always read, on the same thread, which is not the event loop's.
+			threads = await reader.run(lambda r: r.threads)
+			assert len(threads) == 1
+			assert threading.get_ident() not in threads
+
+		assert reader.closed
+		await reader.close()
+
+		with pytest.raises(ValueError, match="I/O operation on closed datafile."):
+			await reader.get_tic()
+
+	run(main())
+
+
+def test_cancellation(frozen_datafile):
+
+	async def main():
+		reader = await AsyncDataReader.open(frozen_datafile, reader_factory=ThreadCheckingReader)
+		thread_reader = await reader.run(lambda r: r)
+		thread_reader.release.clear()
+
+		# The first call blocks the reader's thread, so the second has not started when it is cancelled.
+		slow = asyncio.ensure_future(reader.get_spectrum_by_scan(1))
+		queued = asyncio.ensure_future(reader.get_spectrum_by_scan(2))
+		await asyncio.get_event_loop().run_in_executor(None, thread_reader.started.wait, 5)
+
+		# The event loop is not blocked while the reader is busy.
+		await asyncio.sleep(0.01)
+
+		queued.cancel()
+		thread_reader.release.set()
+
+		assert list((await slow).x_data)
+		with pytest.raises(asyncio.CancelledError):
+			await queued
+
+		await reader.close()
+
+	run(main())
+
+
+def test_results_frozen_on_reader_thread(frozen_datafile):
+	expected = FrozenDataReader(frozen_datafile)
+
+	async def main():
+		async with await AsyncDataReader.open(frozen_datafile, reader_factory=LiveReader) as reader:
+			assert await reader.get_tic() == expected.get_tic()
+			assert await reader.get_spectrum_by_scan(3) == expected.get_spectrum_by_scan(3)
+
+			signals = await reader.get_signal_listing(
+					"QuatPump",
+					DeviceType.QuaternaryPump,
+					StoredDataType.InstrumentCurves,
+					)
+			assert [signal.signal_name for signal in signals] == ["Pressure", "Flow"]
+
+			spectra = [spectrum async for _, spectrum in reader.iter_spectra(stop=4, batch_size=3)]
+			assert spectra == [expected.get_spectrum_by_scan(scan_no) for scan_no in range(4)]
+
+			wrappers = reader._reader.wrappers
+
+		assert len(wrappers) == 8
+		for wrapper in wrappers:
+			assert len(wrapper.freeze_threads) == 1
+			assert threading.get_ident() not in wrapper.freeze_threads
+
+	run(main())
+
+
+def test_errors(frozen_datafile, tmp_pathplus):
+
+	async def main():
+		with pytest.raises(FileNotFoundError):
+			await AsyncDataReader.open(tmp_pathplus / "missing.pmaf", reader_factory=FrozenDataReader)
+
+		async with await AsyncDataReader.open(frozen_datafile, reader_factory=FrozenDataReader) as reader:
+			spectra = reader.iter_spectra(batch_size=0)
+			with pytest.raises(ValueError, match="'batch_size' must be at least 1."):
+				await spectra.__anext__()
+
+	run(main())
@@ -0,0 +1,166 @@
+# stdlib
+import datetime
+import os
+import pathlib
+import shutil
+
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent.catalogue import MetadataCatalogue
+
+tests_dir = pathlib.Path(__file__).parent
+
+datafiles = [
+		"example1.d",
+		"MJA5_1000_090919_001.d",
+		"Propellant_Std_1ug_1_200124-0002.d",
+		]
+
+
+def copy_datafile(name: str, destination: pathlib.Path) -> pathlib.Path:
+	# Only the XML files are needed for the catalogue
+	(destination / name / "AcqData").mkdir(parents=True)
+
+	for xml_file in (tests_dir / name / "AcqData").glob("*.xml"):
+		shutil.copy2(xml_file, destination / name / "AcqData" / xml_file.name)
+
+	return destination / name
+
+
+@pytest.fixture()
+def data_dir(tmp_pathplus) -> pathlib.Path:
+	root = tmp_pathplus / "data"
+	copy_datafile(datafiles[0], root)
+	copy_datafile(datafiles[1], root / "2019")
+	copy_datafile(datafiles[2], root / "2020" / "January")
+
+	# Not a datafile, so should be ignored
+	shutil.copytree(tests_dir / "not_a_datafile.d", root / "not_a_datafile.d")
+
+	return pathlib.Path(os.path.abspath(root))
+
+
+@pytest.fixture()
+def catalogue(tmp_pathplus):
+	with MetadataCatalogue(tmp_pathplus / "catalogue.sqlite") as catalogue:
+		yield catalogue
+
+
+def test_refresh(catalogue: MetadataCatalogue, data_dir: pathlib.Path):
+	result = catalogue.refresh(data_dir, workers=2)
+	assert sorted(p.name for p in result.added) == sorted(datafiles)
+	assert result.updated == []
+	assert result.removed == []
+	assert result.unchanged == 0
+	assert result.errors == []
+	assert len(catalogue) == 3
+
+	result = catalogue.refresh(data_dir)
+	assert result.added == result.updated == result.removed == []
+	assert result.unchanged == 3
+
+	# Only the datafile whose XML changed is re-parsed
+	sample_info = data_dir / "2019" / datafiles[1] / "AcqData" / "sample_info.xml"
+	stat = sample_info.stat()
+	os.utime(sample_info, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+	result = catalogue.refresh(data_dir)
+	assert result.updated == [data_dir / "2019" / datafiles[1]]
+	assert result.added == result.removed == []
+	assert result.unchanged == 2
+	assert len(catalogue) == 3
+
+	rows = catalogue.query("SELECT COUNT(*) AS n FROM sample_info WHERE name = 'Sample Name'")
+	assert rows[0]["n"] == 3
+
+	# Deleted datafiles are removed, along with their child rows
+	shutil.rmtree(data_dir / "2019")
+	result = catalogue.refresh(data_dir)
+	assert result.removed == [data_dir / "2019" / datafiles[1]]
+	assert result.unchanged == 2
+	assert len(catalogue) == 2
+
+	rows = catalogue.query("SELECT COUNT(*) AS n FROM sample_info WHERE name = 'Sample Name'")
+	assert rows[0]["n"] == 2
+
+
+def test_refresh_subdirectory(catalogue: MetadataCatalogue, data_dir: pathlib.Path):
+	catalogue.refresh(data_dir)
+
+	# Datafiles outside the refreshed directory are left alone
+	result = catalogue.refresh(data_dir / "2020")
+	assert result.removed == []
+	assert result.unchanged == 1
+	assert len(catalogue) == 3
+
+
+def test_refresh_case_sensitive(catalogue: MetadataCatalogue, tmp_pathplus):
+	upper = pathlib.Path(os.path.abspath(tmp_pathplus / "Data"))
+	lower = pathlib.Path(os.path.abspath(tmp_pathplus / "data"))
+	copy_datafile(datafiles[0], upper)
+
+	if lower.exists():
+		pytest.skip("The filesystem is case-insensitive.")
+
+	copy_datafile(datafiles[0], lower)
+
+	# Directories whose names differ only in case are separate trees
+	assert catalogue.refresh(upper).added == [upper / datafiles[0]]
+	result = catalogue.refresh(lower)
+	assert result.added == [lower / datafiles[0]]
+	assert result.removed == []
+
+	result = catalogue.refresh(upper)
+	assert result.removed == []
+	assert result.unchanged == 1
+	assert len(catalogue) == 2
+
+
+def test_refresh_errors(catalogue: MetadataCatalogue, data_dir: pathlib.Path):
+	(data_dir / datafiles[0] / "AcqData" / "Contents.xml").write_text("<Contents>")
+
+	result = catalogue.refresh(data_dir)
+	assert len(result.added) == 2
+	assert [p for p, e in result.errors] == [data_dir / datafiles[0]]
+	assert len(catalogue) == 2
+
+
+def test_find(catalogue: MetadataCatalogue, data_dir: pathlib.Path):
+	catalogue.refresh(data_dir)
+
+	assert [p.name for p in catalogue.find()] == [
+			"MJA5_1000_090919_001.d",
+			"Propellant_Std_1ug_1_200124-0002.d",
+			"example1.d",
+			]
+	assert [p.name for p in catalogue.find(method_name="Cannabinoids in Urine.m")] == ["MJA5_1000_090919_001.d"]
+	assert len(catalogue.find(instrument_name="Instrument 1")) == 3
+	assert catalogue.find(instrument_name="Instrument 2") == []
+
+	after = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+	assert [p.name for p in catalogue.find(acquired_after=after)] == [
+			"Propellant_Std_1ug_1_200124-0002.d",
+			"example1.d",
+			]
+	assert [p.name for p in catalogue.find(acquired_before=datetime.datetime(2020, 1, 1))] == [
+			"MJA5_1000_090919_001.d",
+			]
+
+	assert [p.name for p in catalogue.find(Sample_Name="MJA5_x1000")] == ["MJA5_1000_090919_001.d"]
+
+
+def test_query(catalogue: MetadataCatalogue, data_dir: pathlib.Path):
+	catalogue.refresh(data_dir)
+
+	rows = catalogue.query(
+			"SELECT path, n_scans FROM datafiles JOIN time_segments ON datafiles.id = time_segments.datafile_id "
+			"WHERE timesegment_id = ?",
+			(1, ),
+			)
+	assert len(rows) == 3
+	assert all(row["n_scans"] > 0 for row in rows)
+
+	rows = catalogue.query("SELECT DISTINCT type FROM devices")
+	assert rows
@@ -2,7 +2,13 @@
 import pathlib
 
 # this package
-from pyms_agilent.xml_parser.device_config_info import Device, DeviceConfigInfo, Parameter, read_device_config_xml
+from pyms_agilent.xml_parser.device_config_info import (
+		Device,
+		DeviceConfigInfo,
+		Parameter,
+		ParameterList,
+		read_device_config_xml
+		)
 
 
 def test_device():
@@ -125,3 +131,21 @@ class TestDeviceConfigInfo:
 				"parameters": [],
 				"devices": [],
 				}
+
+
+def test_parameter_list():
+	datafile = pathlib.Path(__file__).parent / "Propellant_Std_1ug_1_200124-0002.d"
+	config = read_device_config_xml(datafile / "AcqData")
+
+	assert isinstance(config.parameters, ParameterList)
+	assert config.parameters.get("Thermostat Temp.").resource_id == "Thermostat_Temperature"
+	assert config.parameters.get("Not a parameter") is None
+
+	frame = config.parameters.to_frame()
+	assert frame.shape == (len(config.parameters), 6)
+	assert list(frame["display_name"]) == [parameter.display_name for parameter in config.parameters]
+
+	parameters = ParameterList()
+	assert parameters.get("Flow") is None
+	parameters.extend([Parameter("Flow", "QuatPump_1", "method", "Flow", '1.0', "mL/min")])
+	assert parameters.get("Flow").value == "1.0"
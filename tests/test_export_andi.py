@@ -0,0 +1,67 @@
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+from tests.conftest import N_SCANS, make_scan
+
+netCDF4 = pytest.importorskip("netCDF4")
+
+# 3rd party
+from pyms.GCMS.IO.ANDI import ANDI_reader  # type: ignore  # noqa: E402
+
+# this package
+from pyms_agilent.export.andi import write_andi  # noqa: E402
+
+
+class ArrayOnlyReader(FrozenDataReader):
+
+	def get_spectrum_by_scan(self, scan_no):
+		raise AssertionError("The ANDI exporter should not construct spectrum objects.")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 50, 262144])
+def test_write_andi(frozen_datafile, tmp_pathplus, chunk_size):
+	filename = write_andi(ArrayOnlyReader(frozen_datafile), tmp_pathplus / "synthetic.cdf", chunk_size=chunk_size)
+
+	data = ANDI_reader(filename)
+	assert len(data.scan_list) == N_SCANS
+
+	for scan_no, scan in enumerate(data.scan_list):
+		record, spectrum = make_scan(scan_no)
+		assert scan.mass_list == spectrum.x_data
+		assert scan.intensity_list == spectrum.y_data
+		assert data.time_list[scan_no] == pytest.approx(record.retention_time * 60)
+
+	rootgrp = netCDF4.Dataset(str(filename), 'r')
+	try:
+		assert rootgrp.data_model == "NETCDF3_CLASSIC"
+		assert rootgrp.experiment_title == "synthetic"
+		assert rootgrp.experiment_date_time_stamp == "20200124123015+0000"
+		assert rootgrp.test_ionization_mode == "Electrospray Ionization"
+		assert rootgrp.test_ionization_polarity == "Positive Polarity"
+		assert rootgrp.experiment_type == "Centroided Mass Spectrum"
+
+		scan_index = rootgrp.variables["scan_index"][:].tolist()
+		point_count = rootgrp.variables["point_count"][:].tolist()
+		assert point_count == [len(make_scan(i)[1].x_data) for i in range(N_SCANS)]
+		assert scan_index == [sum(point_count[:i]) for i in range(N_SCANS)]
+		assert rootgrp.variables["total_intensity"][:].tolist() == [make_scan(i)[0].tic for i in range(N_SCANS)]
+		assert rootgrp.variables["mass_range_max"][3] == make_scan(3)[1].x_data[-1]
+	finally:
+		rootgrp.close()
+
+
+def test_write_andi_error_removes_file(frozen_datafile, tmp_pathplus):
+
+	class BrokenReader(FrozenDataReader):
+
+		def get_spectrum_arrays(self, scan_no):
+			raise ValueError("Broken")
+
+	filename = tmp_pathplus / "broken.cdf"
+
+	with pytest.raises(ValueError, match="Broken"):
+		write_andi(BrokenReader(frozen_datafile), filename)
+
+	assert not filename.exists()
@@ -0,0 +1,104 @@
+# stdlib
+import copy
+
+# 3rd party
+import numpy  # type: ignore
+import pytest
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+from tests.conftest import N_SCANS, make_scan, make_signal, make_tic
+
+h5py = pytest.importorskip("h5py")
+
+# this package
+from pyms_agilent.export.hdf5 import find_scans, get_spectrum, write_hdf5  # noqa: E402
+
+
+@pytest.fixture()
+def hdf5_file(frozen_datafile, tmp_pathplus):
+	return write_hdf5(FrozenDataReader(frozen_datafile), tmp_pathplus / "synthetic.h5", chunk_size=16)
+
+
+def test_spectra(hdf5_file):
+	with h5py.File(hdf5_file, 'r') as h5file:
+		assert h5file["spectra/mz"].chunks == (16, )
+		assert h5file["spectra/mz"].compression == "gzip"
+		assert h5file["spectra/offsets"].shape == (N_SCANS + 1, )
+		assert h5file.attrs["datafile_name"] == r"D:\MassHunter\Data\synthetic.d"
+
+		for scan_no in range(N_SCANS):
+			record, spectrum = make_scan(scan_no)
+			mz, intensity = get_spectrum(h5file, scan_no)
+			assert mz.tolist() == spectrum.x_data
+			assert intensity.tolist() == spectrum.y_data
+
+		with pytest.raises(ValueError, match="scan_no out of range"):
+			get_spectrum(h5file, N_SCANS)
+		with pytest.raises(ValueError, match="scan_no must be greater than or equal to 0"):
+			get_spectrum(h5file, -1)
+
+
+def test_scans(hdf5_file):
+	with h5py.File(hdf5_file, 'r') as h5file:
+		scans = h5file["scans"][:]
+
+		for scan_no, row in enumerate(scans):
+			record, spectrum = make_scan(scan_no)
+			assert row["scan_id"] == record.scan_id
+			assert row["retention_time"] == record.retention_time
+			assert row["time_segment"] == record.time_segment
+			assert row["ion_polarity"] == b'+'
+
+			if scan_no % 2:
+				assert row["precursor_charge"] == 2
+				assert row["precursor_intensity"] == 5000.0 + scan_no
+			else:
+				assert row["precursor_charge"] == 0
+				assert numpy.isnan(row["precursor_intensity"])
+
+		assert find_scans(h5file, 0.075, 0.105).tolist() == [3, 4, 5]
+		assert find_scans(h5file, 10, 20).tolist() == []
+
+
+def test_chromatograms(hdf5_file):
+	with h5py.File(hdf5_file, 'r') as h5file:
+		assert h5file["tic/x"][:].tolist() == make_tic().x_data
+		assert h5file["tic/y"][:].tolist() == make_tic().y_data
+
+		assert list(h5file["instrument_curves"]) == ["QuatPump"]
+		assert sorted(h5file["instrument_curves/QuatPump"]) == ["Flow", "Pressure"]
+		pressure = h5file["instrument_curves/QuatPump/Pressure"]
+		assert pressure['y'][:].tolist() == make_signal().instrument_curve.y_data
+		assert pressure.attrs["y_unit"] == "bar"
+
+		assert sorted(h5file["actuals"]) == ["Gas Temp", "Vcap"]
+		assert h5file["actuals/Gas Temp/y"][:].tolist() == [325.0, 325.5]
+
+
+class TwinPumpReader(FrozenDataReader):
+	"""
+	Reports two pumps with the same name but different ordinal numbers.
+	"""
+
+	def get_devices(self):
+		devices = [device for device in super().get_devices() if device.display_name == "QuatPump"]
+		second_pump = copy.copy(devices[0])
+		second_pump.ordinal_number = 2
+		return [*devices, second_pump]
+
+	def get_signal_listing(self, device_name, device_type, data_type, ordinal=1):
+		return super().get_signal_listing(device_name, device_type, data_type)
+
+
+def test_duplicate_device_names(frozen_datafile, tmp_pathplus):
+	hdf5_file = write_hdf5(TwinPumpReader(frozen_datafile), tmp_pathplus / "twin.h5")
+
+	with h5py.File(hdf5_file, 'r') as h5file:
+		assert sorted(h5file["instrument_curves"]) == ["QuatPump_1", "QuatPump_2"]
+
+		for ordinal in (1, 2):
+			device_group = h5file[f"instrument_curves/QuatPump_{ordinal}"]
+			assert device_group.attrs["name"] == "QuatPump"
+			assert device_group.attrs["ordinal_number"] == ordinal
+			assert sorted(device_group) == ["Flow", "Pressure"]
@@ -0,0 +1,81 @@
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent.export.mgf import Precursor, PrecursorIndex, write_mgf
+from pyms_agilent.frozen import FrozenDataReader
+from tests.conftest import N_SCANS, make_scan
+
+
+class CountingReader(FrozenDataReader):
+
+	def __init__(self, filename):
+		super().__init__(filename)
+		self.spectra_read = []
+
+	def get_spectrum_by_scan(self, scan_no):
+		self.spectra_read.append(scan_no)
+		return super().get_spectrum_by_scan(scan_no)
+
+
+def test_write_mgf(frozen_datafile, tmp_pathplus):
+	reader = CountingReader(frozen_datafile)
+	filename = tmp_pathplus / "synthetic.mgf"
+	index = write_mgf(reader, filename)
+
+	ms2_scans = list(range(1, N_SCANS, 2))
+	assert reader.spectra_read == ms2_scans
+	assert len(index) == len(ms2_scans)
+
+	data = filename.read_bytes()
+	blocks = data.decode("UTF-8").split("END IONS\n")[:-1]
+	assert len(blocks) == len(ms2_scans)
+
+	lines = blocks[0].strip().splitlines()
+	record, spectrum = make_scan(1)
+	assert lines[:6] == [
+			"BEGIN IONS",
+			"TITLE=synthetic scanId=1001",
+			"PEPMASS=251.5 5001.0",
+			"CHARGE=2+",
+			f"RTINSECONDS={record.retention_time * 60}",
+			"SCANS=1001",
+			]
+	assert lines[6:] == [f"{mz} {intensity}" for mz, intensity in zip(spectrum.x_data, spectrum.y_data)]
+
+	for precursor in index:
+		assert data[precursor.offset:].startswith(f"BEGIN IONS\nTITLE=synthetic scanId={precursor.scan_id}\n".encode())
+
+
+def test_precursor_index():
+	index = PrecursorIndex()
+	for scan_no, mz in enumerate([500.25, 300.1, 300.105, 700.0]):
+		index.add(Precursor(mz, 2, 0.1 * scan_no, scan_no, 1000 + scan_no, 0))
+
+	assert [p.mz for p in index] == [300.1, 300.105, 500.25, 700.0]
+	assert [p.scan_no for p in index.find(300.1)] == [1, 2]
+	assert [p.scan_no for p in index.find(300.1, tolerance=0.001)] == [1]
+	assert index.find(400) == []
+	assert repr(index) == "<PrecursorIndex(4 spectra)>"
+
+	# Spectra added after a lookup are sorted into place, after any with the same precursor m/z.
+	index.add(Precursor(300.1, 2, 0.4, 4, 1004, 0))
+	index.add(Precursor(100.0, 2, 0.5, 5, 1005, 0))
+	assert [p.scan_no for p in index] == [5, 1, 4, 2, 0, 3]
+	assert [p.scan_no for p in index.find(300.1, tolerance=0.001)] == [1, 4]
+	assert [p.scan_no for p in index.find(100)] == [5]
+
+
+def test_write_mgf_error_removes_file(frozen_datafile, tmp_pathplus):
+
+	class BrokenReader(FrozenDataReader):
+
+		def get_spectrum_by_scan(self, scan_no):
+			raise ValueError("Broken")
+
+	filename = tmp_pathplus / "broken.mgf"
+
+	with pytest.raises(ValueError, match="Broken"):
+		write_mgf(BrokenReader(frozen_datafile), filename)
+
+	assert not filename.exists()
@@ -0,0 +1,155 @@
+# stdlib
+import base64
+import hashlib
+import zlib
+
+# 3rd party
+import numpy  # type: ignore
+import pytest
+from lxml import etree  # type: ignore
+
+# this package
+from pyms_agilent.export.mzml import MzMLWriter, native_id, write_mzml
+from pyms_agilent.frozen import FrozenDataReader
+from tests.conftest import N_SCANS, make_scan, make_tic
+
+NS = {"mz": "http://psi.hupo.org/ms/mzml"}
+
+
+def cv_params(element):
+	return {param.get("accession"): param.get("value") for param in element.findall("mz:cvParam", NS)}
+
+
+def decode(binary_data_array):
+	params = cv_params(binary_data_array)
+	data = base64.b64decode(binary_data_array.findtext("mz:binary", namespaces=NS))
+	if "MS:1000574" in params:
+		data = zlib.decompress(data)
+	return numpy.frombuffer(data, dtype="<f8").tolist()
+
+
+@pytest.fixture()
+def mzml_file(frozen_datafile, tmp_pathplus):
+	return write_mzml(FrozenDataReader(frozen_datafile), tmp_pathplus / "synthetic.mzML")
+
+
+def test_spectra(mzml_file):
+	root = etree.parse(str(mzml_file)).getroot()
+	spectra = root.findall(".//mz:spectrum", NS)
+
+	assert root.find("mz:mzML", NS).get("id") == "synthetic"
+	assert root.find(".//mz:spectrumList", NS).get("count") == str(N_SCANS)
+	assert len(spectra) == N_SCANS
+
+	for scan_no, element in enumerate(spectra):
+		record, spectrum = make_scan(scan_no)
+		params = cv_params(element)
+
+		assert element.get("id") == native_id(record.scan_id)
+		assert element.get("defaultArrayLength") == str(len(spectrum.x_data))
+		assert params["MS:1000511"] == str(int(spectrum.ms_level))
+		assert "MS:1000130" in params
+		assert "MS:1000127" in params
+		assert float(params["MS:1000285"]) == record.tic
+
+		scan_params = cv_params(element.find(".//mz:scan", NS))
+		assert float(scan_params["MS:1000016"]) == record.retention_time
+
+		mz_array, intensity_array = element.findall(".//mz:binaryDataArray", NS)
+		assert decode(mz_array) == spectrum.x_data
+		assert decode(intensity_array) == spectrum.y_data
+
+		if scan_no % 2:
+			assert "MS:1000580" in params
+			precursor = element.find(".//mz:precursor", NS)
+			assert precursor.get("spectrumRef") == native_id(record.scan_id - 1)
+			selected_ion = cv_params(precursor.find(".//mz:selectedIon", NS))
+			assert float(selected_ion["MS:1000744"]) == 250.5 + scan_no
+			assert selected_ion["MS:1000041"] == '2'
+			assert float(selected_ion["MS:1000042"]) == 5000.0 + scan_no
+			assert float(cv_params(precursor.find("mz:activation", NS))["MS:1000045"]) == 20.0
+		else:
+			assert "MS:1000579" in params
+			assert element.find(".//mz:precursorList", NS) is None
+
+
+def test_tic(mzml_file):
+	root = etree.parse(str(mzml_file)).getroot()
+	chromatogram = root.find(".//mz:chromatogram", NS)
+
+	assert chromatogram.get("id") == "TIC"
+	assert "MS:1000235" in cv_params(chromatogram)
+
+	time_array, intensity_array = chromatogram.findall(".//mz:binaryDataArray", NS)
+	assert decode(time_array) == make_tic().x_data
+	assert decode(intensity_array) == make_tic().y_data
+
+
+def test_index(mzml_file):
+	data = mzml_file.read_bytes()
+	root = etree.fromstring(data)
+
+	index_list_offset = int(root.findtext("mz:indexListOffset", namespaces=NS))
+	assert data[index_list_offset:].startswith(b"<indexList ")
+
+	offsets = root.findall("mz:indexList/mz:index[@name='spectrum']/mz:offset", NS)
+	assert len(offsets) == N_SCANS
+
+	for offset in offsets:
+		expected = f'<spectrum index="{offsets.index(offset)}" id="{offset.get("idRef")}"'.encode("UTF-8")
+		assert data[int(offset.text):].startswith(expected)
+
+	chromatogram_offset = root.find("mz:indexList/mz:index[@name='chromatogram']/mz:offset", NS)
+	assert data[int(chromatogram_offset.text):].startswith(b'<chromatogram index="0" id="TIC"')
+
+	checksum_end = data.index(b"<fileChecksum>") + len(b"<fileChecksum>")
+	assert root.findtext("mz:fileChecksum", namespaces=NS) == hashlib.sha1(data[:checksum_end]).hexdigest()
+
+
+def test_no_compression(frozen_datafile, tmp_pathplus):
+	mzml_file = write_mzml(FrozenDataReader(frozen_datafile), tmp_pathplus / "uncompressed.mzML", compression=False)
+	root = etree.parse(str(mzml_file)).getroot()
+
+	mz_array = root.find(".//mz:spectrum/mz:binaryDataArrayList/mz:binaryDataArray", NS)
+	assert "MS:1000576" in cv_params(mz_array)
+	assert decode(mz_array) == make_scan(0)[1].x_data
+
+
+def test_writer_errors(tmp_pathplus):
+	filename = tmp_pathplus / "broken.mzML"
+
+	with MzMLWriter(filename) as writer:
+		with pytest.raises(ValueError, match="Spectra must be added after 'begin"):
+			writer.add_spectrum(make_scan(0)[1])
+
+		writer.begin("2020-01-24 run", spectrum_count=1)
+
+		with pytest.raises(ValueError, match="header has already been written"):
+			writer.begin("run", spectrum_count=1)
+
+		writer.add_spectrum(make_scan(0)[1])
+
+		with pytest.raises(ValueError, match="Only 1 spectra were declared"):
+			writer.add_spectrum(make_scan(1)[1])
+
+	root = etree.parse(str(filename)).getroot()
+	assert root.find("mz:mzML", NS).get("id") == "_2020-01-24_run"
+	assert root.find(".//mz:chromatogramList", NS) is None
+
+	with pytest.raises(ValueError, match="I/O operation on closed writer."):
+		writer.add_spectrum(make_scan(0)[1])
+
+
+def test_writer_count_mismatch(tmp_pathplus):
+	filename = tmp_pathplus / "mismatch.mzML"
+
+	writer = MzMLWriter(filename)
+	writer.begin("run", spectrum_count=2)
+	writer.add_spectrum(make_scan(0)[1])
+
+	with pytest.raises(ValueError, match="2 spectra were declared in 'begin\\(\\)', but 1 were written."):
+		writer.close()
+
+	# Discard the incomplete file, as leaving the ``with`` block with the error would.
+	writer.__exit__(ValueError, None, None)
+	assert not filename.exists()
@@ -0,0 +1,74 @@
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent.enums import MSLevel, MSScanType
+from pyms_agilent.frozen import FrozenDataReader
+from tests.conftest import N_SCANS, make_scan
+
+pyarrow = pytest.importorskip("pyarrow")
+pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+
+# this package
+from pyms_agilent.export.parquet import SCAN_SCHEMA, iter_record_batches, write_parquet  # noqa: E402
+
+
+@pytest.fixture()
+def reader(frozen_datafile) -> FrozenDataReader:
+	return FrozenDataReader(frozen_datafile)
+
+
+def test_iter_record_batches(reader):
+	batches = list(iter_record_batches(reader, batch_size=4))
+
+	# Two time segments of 10 scans each -> 4 + 4 + 2 for each segment
+	assert [batch.num_rows for batch in batches] == [4, 4, 2, 4, 4, 2]
+
+	for batch in batches:
+		assert batch.schema == SCAN_SCHEMA
+		assert len(set(batch.column("time_segment").to_pylist())) == 1
+
+	rows = pyarrow.Table.from_batches(batches).to_pylist()
+	assert len(rows) == N_SCANS
+
+	for scan_no, row in enumerate(rows):
+		record, spectrum = make_scan(scan_no)
+		assert row["scan_no"] == scan_no
+		assert row["scan_id"] == record.scan_id
+		assert row["retention_time"] == record.retention_time
+		assert row["ion_polarity"] == '+'
+		assert row["mz"] == spectrum.x_data
+		assert row["intensity"] == spectrum.y_data
+
+		if scan_no % 2:
+			assert row["ms_level"] == MSLevel.MSMS
+			assert row["ms_scan_type"] == MSScanType.ProductIon
+			assert row["parent_scan_id"] == record.scan_id - 1
+			assert row["precursor_charge"] == 2
+			assert row["precursor_intensity"] == 5000.0 + scan_no
+		else:
+			assert row["ms_level"] == MSLevel.MS
+			assert row["precursor_charge"] is None
+			assert row["precursor_intensity"] is None
+
+	with pytest.raises(ValueError, match="'batch_size' must be at least 1."):
+		next(iter_record_batches(reader, batch_size=0))
+
+
+def test_write_parquet(reader, tmp_pathplus):
+	filename = write_parquet(reader, tmp_pathplus / "synthetic.parquet", batch_size=8)
+	parquet_file = pyarrow_parquet.ParquetFile(str(filename))
+
+	assert [
+			parquet_file.metadata.row_group(idx).num_rows for idx in range(parquet_file.num_row_groups)
+			] == [8, 2, 8, 2]
+
+	metadata = parquet_file.schema_arrow.metadata
+	assert metadata[b"pyms_agilent.datafile_name"] == rb"D:\MassHunter\Data\synthetic.d"
+
+	table = parquet_file.read()
+	assert table.num_rows == N_SCANS
+	assert table.column("mz").to_pylist()[3] == make_scan(3)[1].x_data
+
+	ms2 = pyarrow_parquet.read_table(str(filename), filters=[("ms_level", '=', 2)])
+	assert ms2.column("scan_no").to_pylist() == list(range(1, N_SCANS, 2))
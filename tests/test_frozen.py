@@ -0,0 +1,221 @@
+# stdlib
+import datetime
+import pathlib
+
+# 3rd party
+import numpy  # type: ignore
+import pytest
+
+# this package
+from pyms_agilent.enums import (
+		DeviceType,
+		IonizationMode,
+		IRMStatus,
+		MSLevel,
+		MSScanType,
+		SampleCategory,
+		SeparationTechniqueEnum,
+		StoredDataType
+		)
+from pyms_agilent.frozen import FrozenDataFileWriter, FrozenDataReader, freeze_datafile
+from pyms_agilent.mhdac.chromatograms import FrozenTIC
+from pyms_agilent.mhdac.mass_spec_data_reader import MSActual
+from pyms_agilent.mhdac.scan_record import UndefinedMSScanRecord
+from pyms_agilent.mhdac.spectrum import FrozenMS2SpecData, FrozenSpecData
+from pyms_agilent.utils import Range
+from tests.conftest import N_SCANS, make_file_information, make_scan, make_signal, make_tic
+
+
+@pytest.fixture()
+def reader(frozen_datafile) -> FrozenDataReader:
+	return FrozenDataReader(frozen_datafile)
+
+
+class TestFrozenDataReader:
+
+	def test_file_information(self, reader):
+		assert reader.acquisition_time == datetime.datetime(2020, 1, 24, 12, 30, 15, tzinfo=datetime.timezone.utc)
+		assert reader.irm_status is IRMStatus.Success
+		assert reader.datafile_name == pathlib.PureWindowsPath(r"D:\MassHunter\Data\synthetic.d")
+		assert reader.ms_data_present
+		assert reader.non_ms_data_present
+		assert not reader.uv_data_present
+		assert reader.separation_technique is SeparationTechniqueEnum.LC
+		assert reader._file_info == make_file_information()
+
+	def test_ms_scan_file_info(self, reader):
+		assert reader.total_scans == N_SCANS
+		assert reader.collision_energies == [0.0, 20.0]
+		assert reader.device_type is DeviceType.QuadrupoleTimeOfFlight
+		assert reader.ionisation_polarity == '+'
+		assert reader.scan_types == MSScanType.Scan | MSScanType.ProductIon
+		assert reader.sim_ions == []
+
+	def test_get_spectrum_by_scan(self, reader):
+		for scan_no in range(N_SCANS):
+			spectrum = reader.get_spectrum_by_scan(scan_no)
+			assert spectrum == make_scan(scan_no)[1]
+
+		assert type(reader.get_spectrum_by_scan(0)) is FrozenSpecData
+		ms2 = reader.get_spectrum_by_scan(1)
+		assert isinstance(ms2, FrozenMS2SpecData)
+		assert ms2.precursor_charge == 2
+		assert ms2.precursor_intensity == 5001.0
+		assert ms2.mz_of_interest == [Range(251.5, 251.5)]
+		assert ms2.measured_mass_range == Range(101.0, 153.5)
+
+		with pytest.raises(ValueError, match="scan_no must be greater than or equal to 0"):
+			reader.get_spectrum_by_scan(-1)
+		with pytest.raises(ValueError, match="scan_no out of range"):
+			reader.get_spectrum_by_scan(N_SCANS)
+
+	def test_get_spectrum_arrays(self, reader):
+		x_data, y_data = reader.get_spectrum_arrays(3)
+		record, spectrum = make_scan(3)
+
+		assert isinstance(x_data, numpy.ndarray)
+		assert x_data.tolist() == spectrum.x_data
+		assert y_data.tolist() == spectrum.y_data
+
+		with pytest.raises(ValueError, match="assignment destination is read-only"):
+			x_data[0] = 0
+
+	def test_get_spectrum_by_time(self, reader):
+		assert reader.get_spectrum_by_time(0.0).scan_id == 1000
+		assert reader.get_spectrum_by_time(0.081).scan_id == 1003
+		assert reader.get_spectrum_by_time(100).scan_id == 1000 + N_SCANS - 1
+		assert reader.get_spectrum_by_time(0.081, scan_type=MSScanType.Scan).scan_id == 1004
+		assert reader.get_spectrum_by_time(0.081, scan_type=MSScanType.AllMSN).scan_id == 1003
+		assert reader.get_spectrum_by_time(0.081, ionization_mode=IonizationMode.ESI).scan_id == 1003
+		assert reader.get_spectrum_by_time(0.081, ionization_polarity=0).scan_id == 1003
+
+		with pytest.raises(ValueError, match="No such scan."):
+			reader.get_spectrum_by_time(0.081, ionization_polarity=-1)
+		with pytest.raises(ValueError, match="retention_time cannot be < 0"):
+			reader.get_spectrum_by_time(-1)
+
+	def test_get_scan_record(self, reader):
+		for scan_no in range(N_SCANS):
+			assert reader.get_scan_record(scan_no) == make_scan(scan_no)[0]
+
+		assert reader.get_scan_record(2).ms_level is MSLevel.MS
+		assert reader.get_scan_record(N_SCANS).is_undefined()
+		assert reader.get_scan_record(-1) is UndefinedMSScanRecord
+
+	def test_get_tic(self, reader):
+		tic = reader.get_tic()
+		assert isinstance(tic, FrozenTIC)
+		assert tic == make_tic()
+		assert FrozenTIC.from_dict(tic.to_dict(convert_values=True)) == tic
+
+	def test_get_signal_listing(self, reader):
+		signals = reader.get_signal_listing("QuatPump", DeviceType.QuaternaryPump, StoredDataType.InstrumentCurves)
+		assert signals == [make_signal("Pressure"), make_signal("Flow")]
+		assert signals[0].get_instrument_curve().get_y_axis_info()[1] == "bar"
+
+		assert reader.get_signal_listing("QuatPump", DeviceType.QuaternaryPump, StoredDataType.Chromatograms) == []
+		assert reader.get_signal_listing("Telescope", DeviceType.QuaternaryPump, StoredDataType.InstrumentCurves) == []
+
+	def test_get_ms_actuals(self, reader):
+		assert reader.has_actuals
+		assert reader.get_ms_actuals() == {
+				"Gas Temp": MSActual([0.0, 0.2], [325.0, 325.5]),
+				"Vcap": MSActual([0.0], [3500.0]),
+				}
+
+	def test_get_sample_data(self, reader):
+		assert reader.get_sample_data() == {"Sample Name": "synthetic", "Position": "P1-A1"}
+		assert reader.get_sample_data(SampleCategory.General) == {"Sample Name": "synthetic"}
+		assert reader.get_sample_data(SampleCategory.UserParams) == {}
+
+	def test_get_timesegment_ids(self, reader):
+		assert reader.get_timesegment_ids() == [1, 2]
+
+	def test_devices(self, reader):
+		assert [device.display_name for device in reader.get_devices()] == [
+				"QTOF", "VWD", "HiP-ALS", "QuatPump", "TCC"
+				]
+		assert reader.get_device_name(DeviceType.QuaternaryPump) == "QuatPump"
+		assert reader.get_device_name(DeviceType.FlameIonizationDetector) is None
+		assert reader.is_datatype_present(StoredDataType.InstrumentCurves, "QuatPump")
+		assert not reader.is_datatype_present(StoredDataType.Chromatograms, "QuatPump")
+		assert not reader.is_datatype_present(StoredDataType.InstrumentCurves, "Telescope")
+		assert not reader.is_uv_signal_present(DeviceType.QuaternaryPump, "Pressure", "QuatPump")
+
+	def test_refresh_and_close(self, reader):
+		assert not reader.refresh_datafile()
+		assert reader.close_datafile()
+
+		with pytest.raises(ValueError, match="I/O operation on closed datafile."):
+			reader.get_spectrum_arrays(0)
+
+
+def test_not_frozen(tmp_pathplus):
+	with pytest.raises(FileNotFoundError):
+		FrozenDataReader(tmp_pathplus / "missing.pmaf")
+
+	(tmp_pathplus / "empty.pmaf").write_bytes(b'')
+	with pytest.raises(ValueError, match="is not a frozen datafile"):
+		FrozenDataReader(tmp_pathplus / "empty.pmaf")
+
+	(tmp_pathplus / "garbage.pmaf").write_bytes(b"garbage" * 100)
+	with pytest.raises(ValueError, match="is not a frozen datafile"):
+		FrozenDataReader(tmp_pathplus / "garbage.pmaf")
+
+
+def test_writer_error_removes_file(tmp_pathplus):
+	filename = tmp_pathplus / "broken.pmaf"
+
+	def write_broken():
+		with FrozenDataFileWriter(filename) as writer:
+			writer.add_scan(*make_scan(0))
+			1 / 0  # pylint: disable=pointless-statement
+
+	with pytest.raises(ZeroDivisionError):
+		write_broken()
+
+	assert not filename.exists()
+
+
+def test_writer_closed(tmp_pathplus):
+	writer = FrozenDataFileWriter(tmp_pathplus / "closed.pmaf")
+	writer.set_file_information(make_file_information())
+	writer.close()
+	writer.close()
+
+	with pytest.raises(ValueError, match="I/O operation on closed writer."):
+		writer.add_scan(*make_scan(0))
+
+	reader = FrozenDataReader(tmp_pathplus / "closed.pmaf")
+	assert reader.total_scans == N_SCANS
+	assert reader.get_timesegment_ids() == []
+	assert not reader.has_actuals
+
+	with pytest.raises(ValueError, match="The datafile does not contain a TIC."):
+		reader.get_tic()
+
+
+def test_freeze_datafile(reader, tmp_pathplus):
+	filename = freeze_datafile(reader, tmp_pathplus / "refrozen.pmaf")
+	assert filename == tmp_pathplus / "refrozen.pmaf"
+
+	refrozen = FrozenDataReader(filename)
+	assert refrozen._file_info == reader._file_info
+	assert refrozen.total_scans == N_SCANS
+
+	for scan_no in range(N_SCANS):
+		assert refrozen.get_scan_record(scan_no) == reader.get_scan_record(scan_no)
+		assert refrozen.get_spectrum_by_scan(scan_no) == reader.get_spectrum_by_scan(scan_no)
+		assert type(refrozen.get_spectrum_by_scan(scan_no)) is type(reader.get_spectrum_by_scan(scan_no))
+
+	assert refrozen.get_tic() == reader.get_tic()
+	assert [device.display_name for device in refrozen.get_devices()] == [
+			device.display_name for device in reader.get_devices()
+			]
+
+	signals = refrozen.get_signal_listing("QuatPump", DeviceType.QuaternaryPump, StoredDataType.InstrumentCurves)
+	assert signals == reader.get_signal_listing("QuatPump", DeviceType.QuaternaryPump, StoredDataType.InstrumentCurves)
+
+	assert refrozen.get_ms_actuals() == reader.get_ms_actuals()
+	assert refrozen.get_sample_data() == reader.get_sample_data()
+	assert refrozen.get_timesegment_ids() == reader.get_timesegment_ids()
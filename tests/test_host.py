@@ -0,0 +1,115 @@
+# stdlib
+import multiprocessing
+import os
+import subprocess
+import sys
+import textwrap
+
+# 3rd party
+import numpy  # type: ignore
+import pytest
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.host import ReaderClient, ReaderHost, main
+from pyms_agilent.mhdac.spectrum import FrozenSpecData
+from tests.conftest import N_SCANS
+
+
+@pytest.fixture()
+def host():
+	with ReaderHost(backend="replay", authkey=b"secret") as host:
+		yield host
+
+
+def test_host(host: ReaderHost, frozen_datafile):
+	expected = FrozenDataReader(frozen_datafile)
+
+	with ReaderClient(host.address, authkey=b"secret") as client:
+		for scan_no in (0, 3, N_SCANS - 1):
+			mz, intensity = client.get_spectrum_arrays(frozen_datafile, scan_no)
+			expected_mz, expected_intensity = expected.get_spectrum_arrays(scan_no)
+			assert mz.dtype == numpy.float64
+			numpy.testing.assert_array_equal(mz, expected_mz)
+			numpy.testing.assert_array_equal(intensity, expected_intensity)
+
+		assert client.call(frozen_datafile, "get_sample_data") == expected.get_sample_data()
+
+		spectrum = client.call(frozen_datafile, "get_spectrum_by_scan", 5)
+		assert isinstance(spectrum, FrozenSpecData)
+		assert list(spectrum.x_data) == list(expected.get_spectrum_by_scan(5).x_data)
+
+		# Errors are raised in the client
+		with pytest.raises(AttributeError, match="Cannot call private method '_get_array'"):
+			client.call(frozen_datafile, "_get_array")
+
+		with pytest.raises(FileNotFoundError):
+			client.call(os.path.join(os.path.dirname(frozen_datafile), "missing.pmaf"), "get_tic")
+
+		# The connection is still usable after an error
+		assert len(client.call(frozen_datafile, "get_tic").y_data) == N_SCANS
+
+	# The datafile is kept open between clients
+	assert host.pool.open_count == 1
+
+	with ReaderClient(host.address, authkey=b"secret") as client:
+		client.get_spectrum_arrays(frozen_datafile, 1)
+		assert host.pool.open_count == 1
+
+	with pytest.raises(ValueError, match="The client has been closed."):
+		client.call(frozen_datafile, "get_tic")
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="shared memory requires Python 3.8")
+def test_shared_memory_cleaned_up(host: ReaderHost, frozen_datafile):
+	before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else None
+
+	with ReaderClient(host.address, authkey=b"secret") as client:
+		for scan_no in range(N_SCANS):
+			client.get_spectrum_arrays(frozen_datafile, scan_no)
+
+	if before is not None:
+		# The last block is removed once the host notices the client has disconnected.
+		for _ in range(100):
+			if set(os.listdir("/dev/shm")) <= before:
+				break
+			multiprocessing.Event().wait(0.01)
+
+		assert set(os.listdir("/dev/shm")) <= before
+
+
+def test_other_process(host: ReaderHost, frozen_datafile):
+	script = textwrap.dedent(
+			f"""\
+	from pyms_agilent.host import ReaderClient
+	with ReaderClient({host.address!r}, authkey=b"secret") as client:
+		mz, intensity = client.get_spectrum_arrays({str(frozen_datafile)!r}, 3)
+		print(len(mz), float(intensity.sum()))
+	"""
+			)
+
+	result = subprocess.run([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+	assert result.returncode == 0, result.stderr.decode()
+
+	mz, intensity = FrozenDataReader(frozen_datafile).get_spectrum_arrays(3)
+	assert result.stdout.decode().split() == [str(len(mz)), str(float(intensity.sum()))]
+	assert b"leaked" not in result.stderr
+
+
+def test_errors():
+	with pytest.raises(ValueError, match="Unknown backend 'dotnet'. Choose from: native, replay"):
+		ReaderHost(backend="dotnet")
+
+	with ReaderHost(backend="replay", authkey=b"secret") as host:
+		with pytest.raises(multiprocessing.AuthenticationError):
+			ReaderClient(host.address, authkey=b"wrong")
+
+		with pytest.raises(RuntimeError, match="The host has already been started."):
+			host.start()
+
+
+def test_main_help(capsys):
+	with pytest.raises(SystemExit):
+		main(["--help"])
+
+	assert "--backend {native,replay}" in capsys.readouterr().out
@@ -0,0 +1,164 @@
+# stdlib
+import asyncio
+import pathlib
+import shutil
+import threading
+from typing import List
+
+# 3rd party
+import attr
+import pytest
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.live import LiveEvent, NewCurvePoints, NewScan, _Follower, follow
+from pyms_agilent.metadata import is_acquisition_complete
+from tests.conftest import N_SCANS
+
+tests_dir = pathlib.Path(__file__).parent
+
+
+class GrowingReader(FrozenDataReader):
+	"""
+	A frozen datafile which reveals more scans and curve points each time it is refreshed,
+	as if it were being acquired.
+	"""
+
+	def __init__(self, filename, step: int = 5):
+		super().__init__(filename)
+		self.step = step
+		self.visible = step
+		self.refreshes = 0
+		self.curve_reads = []
+		self.threads = set()
+
+	@property
+	def total_scans(self) -> int:
+		return self.visible
+
+	def refresh_datafile(self) -> bool:
+		self.threads.add(threading.get_ident())
+		self.refreshes += 1
+
+		if self.visible >= N_SCANS:
+			return False
+
+		self.visible = min(self.visible + self.step, N_SCANS)
+		return True
+
+	def get_signal_listing(self, *args, **kwargs):
+		# Each curve has one point for every five scans.
+		n_points = self.visible // 5
+		signals = []
+		self.curve_reads.append(self.visible)
+		self.threads.add(threading.get_ident())
+
+		for signal in super().get_signal_listing(*args, **kwargs):
+			curve = signal.get_instrument_curve()
+			curve = attr.evolve(
+					curve,
+					total_data_points=n_points,
+					x_data=curve.x_data[:n_points],
+					y_data=curve.y_data[:n_points],
+					)
+			signals.append(attr.evolve(signal, instrument_curve=curve))
+
+		return signals
+
+
+def collect(reader, **kwargs) -> List[LiveEvent]:
+
+	async def consume():
+		return [event async for event in follow(reader, **kwargs)]
+
+	loop = asyncio.new_event_loop()
+	try:
+		return loop.run_until_complete(consume())
+	finally:
+		loop.close()
+
+
+def test_follow(frozen_datafile):
+	reader = GrowingReader(frozen_datafile)
+	events = collect(reader, poll_interval=0.001, max_interval=0.004, idle_timeout=0.05)
+
+	scans = [event for event in events if isinstance(event, NewScan)]
+	assert [scan.scan_no for scan in scans] == list(range(N_SCANS))
+	assert [scan.record.scan_id for scan in scans] == [
+			reader.get_scan_record(scan_no).scan_id for scan_no in range(N_SCANS)
+			]
+	assert all(scan.spectrum is not None for scan in scans)
+	assert list(scans[3].spectrum.x_data) == list(reader.get_spectrum_by_scan(3).x_data)
+
+	# Each new curve point is only yielded once.
+	pressure = [event for event in events if isinstance(event, NewCurvePoints) and event.signal_name == "Pressure"]
+	assert [len(event.x_data) for event in pressure] == [1, 1, 1, 1]
+	assert [event.y_data[0] for event in pressure] == [400.0, 401.5, 402.25, 399.75]
+	assert pressure[0].device_name == "QuatPump"
+	assert pressure[0].ordinal == 1
+
+	# Polling continued with backoff until the idle timeout elapsed.
+	assert reader.refreshes > 3
+
+	# The curves are only read again after a refresh finds new data.
+	assert sorted(set(reader.curve_reads)) == [5, 10, 15, 20]
+	assert reader.curve_reads.count(N_SCANS) == reader.curve_reads.count(5)
+
+	# The reader is only used from a thread other than the event loop's.
+	assert len(reader.threads) == 1
+	assert threading.get_ident() not in reader.threads
+
+
+def test_drain_is_lazy(frozen_datafile):
+	reader = GrowingReader(frozen_datafile, step=N_SCANS)
+	follower = _Follower(reader, spectra=False, curves=True)
+
+	events = follower.drain()
+	assert next(events).scan_no == 0
+	assert follower.next_scan_no == 1
+
+	assert len([event for event in events if isinstance(event, NewScan)]) == N_SCANS - 1
+	curve_reads = len(reader.curve_reads)
+
+	assert list(follower.drain()) == []
+	assert len(reader.curve_reads) == curve_reads
+
+
+def test_follow_without_spectra_or_curves(frozen_datafile):
+	events = collect(
+			GrowingReader(frozen_datafile, step=N_SCANS),
+			poll_interval=0.001,
+			idle_timeout=0,
+			spectra=False,
+			curves=False,
+			)
+
+	assert len(events) == N_SCANS
+	assert all(isinstance(event, NewScan) and event.spectrum is None for event in events)
+
+
+def test_follow_until_complete(frozen_datafile, tmp_pathplus):
+	datafile = tmp_pathplus / "Sample1.d"
+	shutil.copytree(tests_dir / "example1.d" / "AcqData", datafile / "AcqData", ignore=shutil.ignore_patterns("*.bin"))
+	assert is_acquisition_complete(datafile)
+
+	reader = GrowingReader(frozen_datafile, step=N_SCANS // 2)
+	reader.filename = str(datafile)
+
+	# Once the acquisition is complete the remaining scans are read and the generator finishes.
+	events = collect(reader, poll_interval=0.001, curves=False)
+	assert len(events) == N_SCANS
+	assert reader.refreshes == 1
+
+
+@pytest.mark.parametrize(
+		"kwargs, message",
+		[
+				({"poll_interval": 0}, "'poll_interval' must be greater than zero."),
+				({"poll_interval": 2, "max_interval": 1}, "'max_interval' cannot be less than 'poll_interval'."),
+				({"backoff": 0.5}, "'backoff' cannot be less than 1."),
+				]
+		)
+def test_follow_errors(frozen_datafile, kwargs, message):
+	with pytest.raises(ValueError, match=message):
+		collect(FrozenDataReader(frozen_datafile), **kwargs)
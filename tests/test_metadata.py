@@ -7,7 +7,15 @@ import pytest
 from domdf_python_tools.paths import PathPlus
 
 # this package
-from pyms_agilent.metadata import extract_metadata, is_datafile, prepare_filepath
+from pyms_agilent import metadata as metadata_module
+from pyms_agilent.metadata import (
+		LazyMetadataDict,
+		extract_metadata,
+		find_datafiles,
+		is_acquisition_complete,
+		is_datafile,
+		prepare_filepath
+		)
 from pyms_agilent.xml_parser.acq_method import AcqMethod
 from pyms_agilent.xml_parser.contents import Contents
 from pyms_agilent.xml_parser.default_mass_cal import CalibrationList
@@ -89,3 +97,134 @@ def test_extract_metadata(monkeypatch):
 			match=r"'.*([/\\])pyms-agilent\1tests' does not appear to be a valid .d datafile.",
 			):
 		extract_metadata(pathlib.Path(__file__).parent)
+
+
+def test_extract_metadata_lazy(monkeypatch):
+	monkeypatch.chdir(pathlib.Path(__file__).parent)
+	datafile = pathlib.Path("Propellant_Std_1ug_1_200124-0002.d")
+
+	metadata = extract_metadata(datafile, lazy=True)
+
+	assert isinstance(metadata, LazyMetadataDict)
+	assert len(metadata) == 8
+	assert list(metadata) == list(extract_metadata(datafile, workers=1))
+	assert "sample_info" in metadata
+	assert not any(metadata.is_loaded(key) for key in metadata)
+
+	sample_info = metadata["sample_info"]
+	assert isinstance(sample_info, SampleInfo)
+	assert metadata["sample_info"] is sample_info
+	assert metadata.is_loaded("sample_info")
+	assert not metadata.is_loaded("method")
+	assert repr(metadata) == (
+			"<LazyMetadataDict('Propellant_Std_1ug_1_200124-0002.d', loaded=[sample_info])>"
+			)
+
+	with pytest.raises(KeyError, match="foo"):
+		metadata["foo"]  # pylint: disable=pointless-statement
+
+	assert metadata.get("foo") is None
+
+	loaded = metadata.load_all(workers=4)
+	assert loaded["sample_info"] is sample_info
+	assert isinstance(loaded["method"], AcqMethod)
+	assert all(metadata.is_loaded(key) for key in metadata)
+
+	with pytest.raises(ValueError, match="does not appear to be a valid .d datafile."):
+		LazyMetadataDict(pathlib.Path(__file__).parent)
+
+
+@pytest.mark.parametrize("workers", [None, 1, 3])
+def test_extract_metadata_workers(monkeypatch, workers):
+	monkeypatch.chdir(pathlib.Path(__file__).parent)
+
+	metadata = extract_metadata("Propellant_Std_1ug_1_200124-0002.d", workers=workers)
+
+	assert isinstance(metadata, dict)
+	assert isinstance(metadata["method"], AcqMethod)
+	assert isinstance(metadata["devices"], DeviceList)
+	assert isinstance(metadata["sample_info"], SampleInfo)
+	assert metadata["sample_info"] == extract_metadata(
+			"Propellant_Std_1ug_1_200124-0002.d",
+			lazy=True,
+			)["sample_info"]
+
+
+def test_extract_metadata_default_no_threads(monkeypatch):
+	monkeypatch.chdir(pathlib.Path(__file__).parent)
+
+	def no_threads(*args, **kwargs):
+		raise AssertionError("A thread pool was created.")
+
+	monkeypatch.setattr(metadata_module, "ThreadPoolExecutor", no_threads)
+
+	metadata = extract_metadata("Propellant_Std_1ug_1_200124-0002.d")
+	assert isinstance(metadata["method"], AcqMethod)
+
+	with pytest.raises(AssertionError, match="A thread pool was created."):
+		extract_metadata("Propellant_Std_1ug_1_200124-0002.d", workers=2)
+
+
+@pytest.fixture()
+def datafile_tree(tmp_pathplus):
+	for directory in [
+			"run_1.d",
+			"2020/run_2.d",
+			"2020/January/run_3.d",
+			"2020/January/run_3.d/nested.d",
+			"2021/empty",
+			]:
+		(tmp_pathplus / directory / "AcqData").mkdir(parents=True)
+		(tmp_pathplus / directory / "AcqData" / "Contents.xml").write_text('')
+
+	(tmp_pathplus / "2021" / "empty" / "AcqData" / "Contents.xml").unlink()
+	(tmp_pathplus / "2021" / "not_a_datafile.d").mkdir()
+	(tmp_pathplus / "2021" / "file.d").write_text('')
+
+	return tmp_pathplus
+
+
+def test_find_datafiles(datafile_tree):
+	expected = [
+			datafile_tree / "run_1.d",
+			datafile_tree / "2020/run_2.d",
+			datafile_tree / "2020/January/run_3.d",
+			]
+
+	assert sorted(find_datafiles(datafile_tree)) == sorted(expected)
+	assert sorted(find_datafiles(datafile_tree, workers=4)) == sorted(expected)
+	assert sorted(find_datafiles(str(datafile_tree), workers=4)) == sorted(expected)
+
+	# Stable, depth-first order when scanning in a single thread.
+	assert list(find_datafiles(datafile_tree, workers=1)) == expected
+
+	assert list(find_datafiles(datafile_tree / "2021")) == []
+	assert list(find_datafiles(datafile_tree / "missing")) == []
+
+
+def test_find_datafiles_close(datafile_tree):
+	generator = find_datafiles(datafile_tree, workers=2)
+	assert is_datafile(next(generator))
+	generator.close()
+
+
+def test_is_datafile_file(tmp_pathplus):
+	(tmp_pathplus / "file.d").write_text('')
+	assert not is_datafile(tmp_pathplus / "file.d")
+	assert not is_datafile(tmp_pathplus / "missing.d")
+
+
+def test_is_acquisition_complete(tmp_pathplus):
+	assert is_acquisition_complete(pathlib.Path(__file__).parent / "example1.d")
+	assert not is_acquisition_complete(pathlib.Path(__file__).parent / "not_a_datafile.d")
+	assert not is_acquisition_complete(tmp_pathplus / "missing.d")
+
+	contents = (pathlib.Path(__file__).parent / "example1.d" / "AcqData" / "Contents.xml").read_text()
+	(tmp_pathplus / "running.d" / "AcqData").mkdir(parents=True)
+	running = contents.replace("<AcqStatus>2</AcqStatus>", "<AcqStatus>1</AcqStatus>")
+	(tmp_pathplus / "running.d" / "AcqData" / "Contents.xml").write_text(running)
+	assert not is_acquisition_complete(tmp_pathplus / "running.d")
+
+	# Partially written
+	(tmp_pathplus / "running.d" / "AcqData" / "Contents.xml").write_text(contents[:100])
+	assert not is_acquisition_complete(tmp_pathplus / "running.d")
@@ -176,3 +176,18 @@ class TestActualsDef:
 		datafile = pathlib.Path("Propellant_Std_1ug_1_200124-0002.d")
 
 		assert isinstance(read_ms_actuals_defs(datafile / "AcqData"), ActualsDef)
+
+
+def test_actuals_def_get():
+	datafile = pathlib.Path(__file__).parent / "Propellant_Std_1ug_1_200124-0002.d"
+	actuals = read_ms_actuals_defs(datafile / "AcqData")
+
+	assert actuals.get("TOF Vac").actual_id == 313
+	assert actuals.get("Not an actual") is None
+
+	frame = actuals.to_frame()
+	assert frame.shape == (len(actuals), 8)
+	assert frame["actual_id"][frame["display_name"] == "TOF Vac"].tolist() == [313]
+
+	actuals = ActualsDef(1, actuals=[Actual(1, "Gas Temp"), Actual(2, "Vcap")])
+	assert actuals.get("Vcap").actual_id == 2
@@ -0,0 +1,145 @@
+# stdlib
+import os
+import pathlib
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+# 3rd party
+import numpy  # type: ignore
+import pytest
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.parallel import Partition, iter_spectra, partition_scans, read_spectra
+from tests.conftest import N_SCANS
+
+tests_dir = pathlib.Path(__file__).parent
+
+
+class MarkingReader(FrozenDataReader):
+	"""
+	Leaves a file next to the datafile when it is closed, named after the process which closed it.
+	"""
+
+	def close_datafile(self) -> bool:
+		pathlib.Path(f"{self.filename}.closed.{os.getpid()}").touch()
+		return super().close_datafile()
+
+
+class CountingExecutor(ProcessPoolExecutor):
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.submitted = 0
+
+	def submit(self, *args, **kwargs):
+		self.submitted += 1
+		return super().submit(*args, **kwargs)
+
+
+def test_partition_scans(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+
+	# The synthetic datafile has no MSTS.xml, so the time segments are found from the scan records.
+	assert partition_scans(reader) == [Partition(0, 10, 1), Partition(10, 20, 2)]
+
+	assert partition_scans(reader, scans_per_partition=4) == [
+			Partition(0, 4, 1),
+			Partition(4, 8, 1),
+			Partition(8, 10, 1),
+			Partition(10, 14, 2),
+			Partition(14, 18, 2),
+			Partition(18, 20, 2),
+			]
+
+	assert sum(partition.n_scans for partition in partition_scans(reader, 3)) == N_SCANS
+
+	with pytest.raises(ValueError, match="'scans_per_partition' must be at least 1."):
+		partition_scans(reader, scans_per_partition=0)
+
+
+def test_partition_scans_msts():
+	reader = SimpleNamespace(filename=str(tests_dir / "example1.d"), total_scans=1333)
+	assert partition_scans(reader, scans_per_partition=500) == [  # type: ignore
+		Partition(0, 500, 1),
+		Partition(500, 1000, 1),
+		Partition(1000, 1333, 1),
+		]
+
+
+def test_iter_spectra(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+	expected = [reader.get_spectrum_by_scan(scan_no) for scan_no in range(N_SCANS)]
+
+	spectra = list(
+			iter_spectra(frozen_datafile, scans_per_partition=3, max_workers=2, reader_factory=FrozenDataReader)
+			)
+	assert [scan_no for scan_no, _ in spectra] == list(range(N_SCANS))
+	assert [spectrum for _, spectrum in spectra] == expected
+
+	spectra = read_spectra(frozen_datafile, arrays=True, max_workers=2, reader_factory=FrozenDataReader)
+	assert len(spectra) == N_SCANS
+
+	for scan_no, (mz, intensity) in enumerate(spectra):
+		expected_mz, expected_intensity = reader.get_spectrum_arrays(scan_no)
+		numpy.testing.assert_array_equal(mz, expected_mz)
+		numpy.testing.assert_array_equal(intensity, expected_intensity)
+
+
+def test_iter_spectra_partitions(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+
+	with ProcessPoolExecutor(max_workers=2) as executor:
+		spectra = iter_spectra(
+				frozen_datafile,
+				partitions=[(5, 8), Partition(8, 8), Partition(15, 17, 2)],
+				reader_factory=FrozenDataReader,
+				executor=executor,
+				)
+
+		assert [(scan_no, spectrum.scan_id) for scan_no, spectrum in spectra] == [
+				(scan_no, reader.get_scan_record(scan_no).scan_id) for scan_no in (5, 6, 7, 15, 16)
+				]
+
+		# Stopping early cancels the partitions which have not been read, but leaves the executor running.
+		spectra = iter_spectra(
+				frozen_datafile,
+				scans_per_partition=1,
+				max_workers=1,
+				reader_factory=FrozenDataReader,
+				executor=executor,
+				)
+		assert next(spectra)[0] == 0
+		spectra.close()
+
+		assert executor.submit(sum, [1, 2]).result() == 3
+
+
+def test_worker_readers_closed(frozen_datafile, tmp_pathplus):
+	datafile = shutil.copy2(frozen_datafile, tmp_pathplus / "synthetic.pmaf")
+
+	spectra = list(iter_spectra(datafile, scans_per_partition=3, max_workers=2, reader_factory=MarkingReader))
+	assert len(spectra) == N_SCANS
+
+	# The reader used to partition the scans is closed by this process, and the others by the workers as they exit.
+	closed_by = {int(path.suffix[1:]) for path in tmp_pathplus.glob("synthetic.pmaf.closed.*")}
+	assert os.getpid() in closed_by
+	assert len(closed_by) > 1
+
+
+def test_max_pending_from_executor(frozen_datafile):
+	with CountingExecutor(max_workers=1) as executor:
+		spectra = iter_spectra(
+				frozen_datafile,
+				scans_per_partition=1,
+				max_workers=8,
+				reader_factory=FrozenDataReader,
+				executor=executor,
+				)
+
+		next(spectra)
+
+		# Two partitions are read ahead for the executor's single worker, not for the 8 given as max_workers.
+		assert executor.submitted == 2
+		assert len(list(spectra)) == N_SCANS - 1
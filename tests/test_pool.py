@@ -0,0 +1,209 @@
+# stdlib
+import shutil
+import threading
+import time
+from typing import List
+
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.pool import ReaderPool
+from tests.conftest import N_SCANS
+
+
+class TrackingReader(FrozenDataReader):
+	opened: List["TrackingReader"] = []
+
+	def __init__(self, filename):
+		super().__init__(filename)
+		self.closed = False
+		self.opened.append(self)
+
+	def close_datafile(self) -> bool:
+		self.closed = True
+		return super().close_datafile()
+
+
+@pytest.fixture()
+def datafiles(frozen_datafile, tmp_pathplus):
+	TrackingReader.opened = []
+	copies = []
+
+	for name in ("a.pmaf", "b.pmaf", "c.pmaf"):
+		copies.append(shutil.copy2(frozen_datafile, tmp_pathplus / name))
+
+	return copies
+
+
+def test_reuse(datafiles):
+	pool = ReaderPool(max_per_file=2, reader_factory=TrackingReader)
+
+	with pool.reader(datafiles[0]) as reader:
+		assert reader.total_scans == N_SCANS
+		first = reader
+
+	# The warm reader is reused
+	with pool.reader(datafiles[0]) as reader:
+		assert reader is first
+
+		# A second reader is opened while the first is checked out
+		with pool.reader(datafiles[0]) as second:
+			assert second is not first
+
+	assert len(TrackingReader.opened) == 2
+	assert pool.open_count == pool.idle_count == 2
+
+	pool.close()
+	assert all(reader.closed for reader in TrackingReader.opened)
+	assert pool.open_count == 0
+
+	with pytest.raises(ValueError, match="The pool has been closed."):
+		pool.checkout(datafiles[0])
+
+
+def test_max_per_file(datafiles):
+	pool = ReaderPool(max_per_file=1, reader_factory=TrackingReader)
+	reader = pool.checkout(datafiles[0])
+
+	with pytest.raises(TimeoutError, match="Timed out waiting for a reader"):
+		pool.checkout(datafiles[0], timeout=0.01)
+
+	# Another thread checks the reader in while we wait
+	timer = threading.Timer(0.05, pool.checkin, (reader, ))
+	timer.start()
+	assert pool.checkout(datafiles[0], timeout=5) is reader
+	timer.join()
+
+	pool.checkin(reader)
+
+	with pytest.raises(ValueError, match="The reader was not checked out from this pool."):
+		pool.checkin(reader)
+
+
+def test_max_open(datafiles):
+	pool = ReaderPool(max_open=2, reader_factory=TrackingReader)
+
+	with pool.reader(datafiles[0]):
+		pass
+	with pool.reader(datafiles[1]):
+		pass
+
+	# The least recently used idle reader is closed to make room.
+	with pool.reader(datafiles[2]):
+		assert pool.open_count == 2
+		assert [reader.closed for reader in TrackingReader.opened] == [True, False, False]
+
+		with pool.reader(datafiles[0]):
+			assert [reader.closed for reader in TrackingReader.opened] == [True, True, False, False]
+
+			# Every reader is in use.
+			with pytest.raises(TimeoutError):
+				pool.checkout(datafiles[1], timeout=0.01)
+
+
+def test_idle_timeout(datafiles):
+	pool = ReaderPool(idle_timeout=0.02, reader_factory=TrackingReader)
+
+	with pool.reader(datafiles[0]):
+		pass
+
+	assert pool.evict_idle() == 0
+	time.sleep(0.05)
+	assert pool.evict_idle() == 1
+	assert TrackingReader.opened[0].closed
+	assert pool.open_count == 0
+
+
+def test_expired_closed_before_waiting(datafiles):
+	pool = ReaderPool(max_per_file=1, idle_timeout=0.02, reader_factory=TrackingReader)
+
+	with pool.reader(datafiles[1]):
+		pass
+
+	expired = TrackingReader.opened[0]
+	busy = pool.checkout(datafiles[0])
+	time.sleep(0.05)
+
+	waiter = threading.Thread(target=lambda: pool.checkin(pool.checkout(datafiles[0], timeout=5)))
+	waiter.start()
+
+	# The expired reader is closed while the checkout is still waiting.
+	for _ in range(100):
+		if expired.closed:
+			break
+		time.sleep(0.01)
+
+	assert expired.closed
+	assert waiter.is_alive()
+
+	pool.checkin(busy)
+	waiter.join(timeout=5)
+	assert not waiter.is_alive()
+	pool.close()
+
+
+def test_discard(datafiles):
+	with ReaderPool(reader_factory=TrackingReader) as pool:
+		reader = pool.checkout(datafiles[0])
+		pool.checkin(reader, discard=True)
+		assert reader.closed
+		assert pool.open_count == 0
+
+		# Checked out readers are closed when they are returned to a closed pool.
+		reader = pool.checkout(datafiles[0])
+
+	assert not reader.closed
+	pool.checkin(reader)
+	assert reader.closed
+
+
+def test_failed_open(tmp_pathplus):
+	pool = ReaderPool(max_per_file=1, reader_factory=FrozenDataReader)
+
+	for _ in range(2):
+		with pytest.raises(FileNotFoundError):
+			pool.checkout(tmp_pathplus / "missing.pmaf", timeout=0)
+
+	assert pool.open_count == 0
+
+
+def test_concurrent(datafiles):
+	pool = ReaderPool(max_per_file=2, max_open=3, reader_factory=TrackingReader)
+	in_use = set()
+	errors = []
+	lock = threading.Lock()
+
+	def worker(n: int):
+		try:
+			for i in range(20):
+				with pool.reader(datafiles[(n + i) % 3]) as reader:
+					with lock:
+						assert id(reader) not in in_use
+						in_use.add(id(reader))
+
+					assert reader.get_scan_record(i % N_SCANS).scan_id >= 0
+
+					with lock:
+						in_use.discard(id(reader))
+		except Exception as e:  # pragma: no cover
+			errors.append(e)
+
+	threads = [threading.Thread(target=worker, args=(n, )) for n in range(6)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert errors == []
+	assert pool.open_count <= 3
+	assert repr(pool) == f"<ReaderPool(open={pool.open_count}, idle={pool.open_count})>"
+
+
+def test_errors():
+	with pytest.raises(ValueError, match="'max_per_file' must be at least 1."):
+		ReaderPool(max_per_file=0)
+
+	with pytest.raises(ValueError, match="'max_open' must be at least 1."):
+		ReaderPool(max_open=0)
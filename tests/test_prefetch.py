@@ -0,0 +1,139 @@
+# stdlib
+import threading
+import time
+
+# 3rd party
+import numpy  # type: ignore
+import pytest
+
+# this package
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.prefetch import Prefetcher, estimate_size
+from tests.conftest import N_SCANS
+
+
+def test_prefetcher(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+	expected = [reader.get_spectrum_by_scan(scan_no) for scan_no in range(N_SCANS)]
+
+	with Prefetcher(reader, depth=4) as scans:
+		assert list(scans) == list(enumerate(expected))
+
+		# Exhausted
+		assert list(scans) == []
+
+	assert scans.stats.fetched == N_SCANS
+	assert scans.stats.peak_bytes > 0
+	assert repr(scans) == "<Prefetcher(depth=4, queued=0)>"
+
+
+def test_frozen_in_background(frozen_datafile):
+	freeze_threads = set()
+
+	class LiveSpectrum:
+
+		def __init__(self, frozen):
+			self.frozen = frozen
+
+		def freeze(self):
+			freeze_threads.add(threading.get_ident())
+			return self.frozen
+
+	class LiveReader(FrozenDataReader):
+
+		def get_spectrum_by_scan(self, scan_no):
+			return LiveSpectrum(super().get_spectrum_by_scan(scan_no))
+
+	reader = LiveReader(frozen_datafile)
+	expected = FrozenDataReader(frozen_datafile)
+
+	with Prefetcher(reader, range(5)) as scans:
+		assert [spectrum for _, spectrum in scans] == [expected.get_spectrum_by_scan(n) for n in range(5)]
+
+	assert len(freeze_threads) == 1
+	assert threading.get_ident() not in freeze_threads
+
+
+def test_depth(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+
+	with Prefetcher(reader, depth=3) as scans:
+		# The prefetcher reads three scans ahead, then waits for the consumer.
+		deadline = time.monotonic() + 5
+		while scans.stats.producer_stalls == 0 and time.monotonic() < deadline:
+			time.sleep(0.001)
+
+		time.sleep(0.01)
+		assert scans.stats.producer_stalls == 1
+		assert scans.stats.fetched == 4  # 3 queued, 1 waiting for room
+		assert [scan_no for scan_no, _ in scans] == list(range(N_SCANS))
+
+
+def test_max_bytes(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+	fetch = lambda reader, scan_no: reader.get_spectrum_arrays(scan_no)  # noqa: E731
+	max_bytes = estimate_size(reader.get_spectrum_arrays(N_SCANS - 1)) * 2
+
+	with Prefetcher(reader, depth=N_SCANS, max_bytes=max_bytes, fetch=fetch) as scans:
+		for scan_no, (mz, intensity) in scans:
+			numpy.testing.assert_array_equal(mz, reader.get_spectrum_arrays(scan_no)[0])
+			time.sleep(0.001)
+
+	assert 0 < scans.stats.peak_bytes <= max_bytes
+
+
+def test_slow_reader(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+
+	def fetch(reader, scan_no):
+		time.sleep(0.005)
+		return reader.get_scan_record(scan_no)
+
+	with Prefetcher(reader, range(5), fetch=fetch) as scans:
+		assert [record.scan_id for _, record in scans] == [1000, 1001, 1002, 1003, 1004]
+
+	# The consumer has to wait for every scan.
+	assert scans.stats.consumer_waits == 5
+	assert scans.stats.consumer_wait_time > 0.01
+	assert scans.stats.fetch_time > 0.02
+	assert scans.stats.producer_stalls == 0
+
+
+def test_error(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+
+	with Prefetcher(reader, [0, 1, N_SCANS + 5, 2]) as scans:
+		assert next(scans)[0] == 0
+		assert next(scans)[0] == 1
+
+		with pytest.raises(ValueError, match="scan_no out of range"):
+			next(scans)
+
+		assert list(scans) == []
+
+
+def test_close(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+	release = threading.Event()
+
+	def fetch(reader, scan_no):
+		release.wait(5)
+		return scan_no
+
+	scans = Prefetcher(reader, fetch=fetch, depth=2)
+	release.set()
+	assert next(scans) == (0, 0)
+	scans.close()
+
+	assert not scans._thread.is_alive()
+	assert list(scans) == []
+	assert scans.stats.fetched <= 4
+
+	with pytest.raises(ValueError, match="'depth' must be at least 1."):
+		Prefetcher(reader, depth=0)
+
+
+def test_estimate_size():
+	assert estimate_size(numpy.zeros(10)) == 80
+	assert estimate_size((numpy.zeros(10), numpy.zeros(5, dtype=numpy.float32))) == 100
+	assert estimate_size(object()) == 0
@@ -31,3 +31,37 @@ class TestSampleInfo:
 	def test_creation(self):
 		assert SampleInfo(1).version == 1
 		assert SampleInfo('1').version == 1  # type: ignore
+
+
+def test_get():
+	datafile = pathlib.Path(__file__).parent / "Propellant_Std_1ug_1_200124-0002.d"
+	sample_info = read_sample_info_xml(datafile / "AcqData")
+
+	assert sample_info.get("Sample Name") is sample_info[1]
+	assert sample_info.get("Sample Name").value == "Propellant Standard 1ug/mL (1)"
+	assert sample_info.get("Missing") is None
+	assert sample_info.get("Missing", 123) == 123
+	assert sample_info.names()[:2] == ["Sample ID", "Sample Name"]
+
+	# The index is updated when the list changes.
+	sample_info.append(Field(name="Missing", value="found"))
+	assert sample_info.get("Missing").value == "found"
+	del sample_info[1]
+	assert sample_info.get("Sample Name") is None
+
+	# The first field with a given name is returned.
+	sample_info.insert(0, Field(name="Missing", value="first"))
+	assert sample_info.get("Missing").value == "first"
+
+
+def test_to_frame():
+	datafile = pathlib.Path(__file__).parent / "Propellant_Std_1ug_1_200124-0002.d"
+	sample_info = read_sample_info_xml(datafile / "AcqData")
+
+	frame = sample_info.to_frame()
+	assert frame.shape == (len(sample_info), 7)
+	assert list(frame.columns) == ["name", "display_name", "value", "data_type", "units", "field_type", "overridden"]
+	assert frame["value"][1] == "Propellant Standard 1ug/mL (1)"
+	assert list(frame["name"]) == [field.name for field in sample_info]
+
+	assert SampleInfo(1).to_frame().shape == (0, 7)
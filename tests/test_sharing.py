@@ -0,0 +1,155 @@
+# stdlib
+import os
+import pickle
+import subprocess
+import sys
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.reduction import ForkingPickler
+
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent import sharing
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.mhdac.spectrum import FrozenSpecData
+from tests.conftest import N_SCANS, make_scan, make_signal, make_tic
+
+shm_dir = "/dev/shm"
+
+requires_shared_memory = pytest.mark.skipif(
+		sharing.shared_memory is None or not os.path.isdir(shm_dir),
+		reason="Requires POSIX shared memory",
+		)
+
+
+def big_spectrum(n_points: int = 100_000) -> FrozenSpecData:
+	_, spectrum = make_scan(2)
+	kwargs = {a: getattr(spectrum, a) for a in spectrum.to_dict()}
+	kwargs["x_data"] = [100.0 + i * 0.01 for i in range(n_points)]
+	kwargs["y_data"] = [float(i % 1000) for i in range(n_points)]
+	kwargs["total_data_points"] = n_points
+	return FrozenSpecData(**kwargs)
+
+
+def sum_intensities(spectrum: FrozenSpecData) -> float:
+	return sum(spectrum.y_data)
+
+
+def read_spectrum(reader: FrozenDataReader, scan_no: int) -> FrozenSpecData:
+	return reader.get_spectrum_by_scan(scan_no)
+
+
+@pytest.mark.parametrize("obj", [make_scan(3)[1], make_scan(4)[1], make_tic(), make_signal().instrument_curve])
+def test_forking_pickler(obj):
+	data = ForkingPickler.dumps(obj)
+	unpickled = pickle.loads(data)
+
+	assert unpickled == obj
+	assert type(unpickled) is type(obj)
+	assert type(unpickled.x_data) is list
+	assert all(type(x) is float for x in unpickled.x_data)
+
+	# Plain pickling is unaffected.
+	assert b"numpy" not in pickle.dumps(obj)
+	assert pickle.loads(pickle.dumps(obj)) == obj
+
+
+@requires_shared_memory
+def test_shared_memory(monkeypatch):
+	spectrum = big_spectrum()
+	before = set(os.listdir(shm_dir))
+
+	data = ForkingPickler.dumps(spectrum)
+	assert len(data) < 10_000
+	assert len(set(os.listdir(shm_dir)) - before) == 1
+
+	# The block is removed once the spectrum has been unpickled.
+	assert pickle.loads(data) == spectrum
+	assert set(os.listdir(shm_dir)) <= before
+
+	# Small arrays are pickled along with the rest of the object.
+	monkeypatch.setattr(sharing, "shared_memory_threshold", 1 << 30)
+	data = ForkingPickler.dumps(spectrum)
+	assert len(data) > 1_600_000
+	assert set(os.listdir(shm_dir)) <= before
+	assert pickle.loads(data) == spectrum
+
+
+def dump_spectrum(n_points: int) -> None:
+	# The pickle is never loaded, as if it could not be sent.
+	ForkingPickler.dumps(big_spectrum(n_points))
+
+
+@requires_shared_memory
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_shared_memory_not_loaded(method):
+	script = textwrap.dedent(
+			f"""\
+	import multiprocessing
+	from concurrent.futures import ProcessPoolExecutor
+	from pyms_agilent.sharing import ensure_resource_tracker
+	from tests.test_sharing import dump_spectrum
+
+	ensure_resource_tracker()
+	with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context({method!r})) as executor:
+		executor.submit(dump_spectrum, 100_000).result()
+	"""
+			)
+
+	before = set(os.listdir(shm_dir))
+	result = subprocess.run([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+	assert result.returncode == 0, result.stderr.decode()
+
+	# The block is removed by the resource tracker once the program exits.
+	for _ in range(500):
+		if set(os.listdir(shm_dir)) <= before:
+			break
+		time.sleep(0.01)
+
+	assert set(os.listdir(shm_dir)) <= before
+
+
+@requires_shared_memory
+def test_no_resource_tracker_warnings():
+	script = textwrap.dedent(
+			"""\
+	from concurrent.futures import ProcessPoolExecutor
+	from tests.test_sharing import big_spectrum, sum_intensities
+
+	with ProcessPoolExecutor(2) as executor:
+		assert len(list(executor.map(big_spectrum, [100_000] * 4))) == 4
+		assert executor.submit(sum_intensities, big_spectrum()).result()
+	"""
+			)
+
+	result = subprocess.run([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+	assert result.returncode == 0, result.stderr.decode()
+	assert b"resource_tracker" not in result.stderr
+
+
+def test_pickle_reader(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+	data = pickle.dumps(reader)
+
+	# The reader is reopened by filename rather than copying the datafile.
+	assert len(data) < os.path.getsize(frozen_datafile)
+
+	unpickled = pickle.loads(data)
+	assert isinstance(unpickled, FrozenDataReader)
+	assert unpickled is not reader
+	assert unpickled.filename == reader.filename
+	assert unpickled.get_spectrum_by_scan(5) == reader.get_spectrum_by_scan(5)
+
+
+def test_process_pool(frozen_datafile):
+	reader = FrozenDataReader(frozen_datafile)
+
+	with ProcessPoolExecutor(max_workers=2) as executor:
+		spectra = list(executor.map(read_spectrum, [reader] * N_SCANS, range(N_SCANS)))
+		assert spectra == [reader.get_spectrum_by_scan(scan_no) for scan_no in range(N_SCANS)]
+
+		spectrum = big_spectrum()
+		assert executor.submit(sum_intensities, spectrum).result() == sum(spectrum.y_data)
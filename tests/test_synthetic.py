@@ -0,0 +1,103 @@
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent.enums import DeviceType, MSLevel, StoredDataType
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.metadata import is_datafile
+from pyms_agilent.parallel import partition_scans
+from pyms_agilent.synthetic import SyntheticRun, write_synthetic_datafile
+from pyms_agilent.xml_parser.contents import read_contents_xml
+from pyms_agilent.xml_parser.devices import read_devices_xml
+from pyms_agilent.xml_parser.ms_time_segments import read_msts_xml
+from pyms_agilent.xml_parser.sample_info import read_sample_info_xml
+
+N_SCANS = 41
+
+
+@pytest.fixture(scope="module")
+def synthetic_run():
+	return SyntheticRun(n_scans=N_SCANS, points_per_scan=50, n_segments=3, polarity_switching=True, n_compounds=5)
+
+
+@pytest.fixture(scope="module")
+def synthetic_datafile(synthetic_run, tmp_path_factory):
+	return synthetic_run.write(tmp_path_factory.mktemp("synthetic") / "Synthetic.d")
+
+
+def test_metadata(synthetic_datafile):
+	datafile, snapshot = synthetic_datafile
+	acqdata = datafile / "AcqData"
+
+	assert is_datafile(datafile)
+	assert snapshot == datafile.with_suffix(".pmaf")
+
+	# The files are validated against their schemas as they are read.
+	contents = read_contents_xml(acqdata)
+	assert contents.acq_status == 2
+	assert contents.instrument_name == "Synthetic"
+
+	time_segments = read_msts_xml(acqdata)
+	assert [segment.timesegment_id for segment in time_segments] == [1, 2, 3]
+	assert [segment.n_scans for segment in time_segments] == [14, 13, 14]
+	assert time_segments[0].start_time < time_segments[0].end_time < time_segments[1].start_time
+
+	devices = read_devices_xml(acqdata)
+	assert [device.display_name for device in devices] == ["QTOF", "QuatPump"]
+	assert devices[0].type_ == DeviceType.QuadrupoleTimeOfFlight
+
+	assert read_sample_info_xml(acqdata).get("Sample Name").value == "Synthetic"
+
+
+def test_snapshot(synthetic_run, synthetic_datafile):
+	_, snapshot = synthetic_datafile
+	reader = FrozenDataReader(snapshot)
+
+	assert reader.total_scans == N_SCANS
+	assert reader.get_timesegment_ids() == [1, 2, 3]
+	assert reader.get_tic().total_data_points == N_SCANS
+
+	for scan_no in (0, 1, 2, 3, 20, N_SCANS - 1):
+		record, spectrum = synthetic_run.make_scan(scan_no)
+		assert reader.get_scan_record(scan_no) == record
+		assert reader.get_spectrum_by_scan(scan_no) == spectrum
+
+	records = [reader.get_scan_record(scan_no) for scan_no in range(N_SCANS)]
+	assert [record.ms_level for record in records[:4]] == [MSLevel.MS, MSLevel.MSMS, MSLevel.MS, MSLevel.MSMS]
+	assert [record.ion_polarity for record in records[:6]] == ['+', '+', '-', '-', '+', '+']
+	assert reader.get_spectrum_by_scan(1).parent_scan_id == records[0].scan_id
+
+	partitions = partition_scans(reader)
+	assert [(p.start, p.stop, p.time_segment) for p in partitions] == [(0, 14, 1), (14, 27, 2), (27, 41, 3)]
+
+	signals = reader.get_signal_listing("QuatPump", DeviceType.QuaternaryPump, StoredDataType.InstrumentCurves)
+	assert [signal.signal_name for signal in signals] == ["Pressure", "Flow"]
+
+
+def test_reproducible(synthetic_run):
+	other = SyntheticRun(n_scans=N_SCANS, points_per_scan=50, n_segments=3, polarity_switching=True, n_compounds=5)
+	assert other.make_scan(7) == synthetic_run.make_scan(7)
+
+	_, spectrum = SyntheticRun(n_scans=N_SCANS, points_per_scan=50, seed=1).make_scan(7)
+	assert spectrum.y_data != synthetic_run.make_scan(7)[1].y_data
+	assert len(spectrum.x_data) == 50
+
+
+def test_no_ms2(tmp_path):
+	_, snapshot = write_synthetic_datafile(tmp_path / "MS1.d", n_scans=10, points_per_scan=20, ms2_per_cycle=0)
+	reader = FrozenDataReader(snapshot)
+
+	assert {reader.get_scan_record(scan_no).ms_level for scan_no in range(10)} == {MSLevel.MS}
+	assert {reader.get_scan_record(scan_no).ion_polarity for scan_no in range(10)} == {'+'}
+
+
+@pytest.mark.parametrize("setting", ["n_scans", "points_per_scan", "n_segments"])
+def test_invalid(setting):
+	with pytest.raises(ValueError, match=f"'{setting}' must be at least 1."):
+		SyntheticRun(**{setting: 0})
+
+
+@pytest.mark.parametrize("setting", ["ms2_per_cycle", "n_compounds"])
+def test_negative(setting):
+	with pytest.raises(ValueError, match=f"'{setting}' must not be negative."):
+		SyntheticRun(**{setting: -1})
@@ -0,0 +1,147 @@
+# stdlib
+import datetime
+import pickle
+
+# 3rd party
+import numpy  # type: ignore
+import pandas  # type: ignore
+
+# this package
+from pyms_agilent.data_reader import DataReader
+from pyms_agilent.enums import SampleCategory
+from pyms_agilent.frozen import FrozenDataReader
+from pyms_agilent.utils import _DataColumn, _convert_column, _datatable_xml_to_dataframe, _reduce_frozen
+from tests.conftest import make_scan
+
+datatable_xml = """\
+<NewDataSet>
+  <Table>
+    <DisplayName>Sample Name</DisplayName>
+    <DisplayValue>synthetic</DisplayValue>
+    <DataType>8</DataType>
+    <Units></Units>
+    <IsSet>true</IsSet>
+    <Value>1.5</Value>
+    <Changed>2020-01-24T10:15:00</Changed>
+  </Table>
+  <Table>
+    <DisplayName>Position</DisplayName>
+    <DisplayValue>P1-A1</DisplayValue>
+    <DataType>8</DataType>
+    <IsSet>false</IsSet>
+  </Table>
+</NewDataSet>
+"""
+
+columns = [
+		_DataColumn("DisplayName", "DisplayName", "System.String"),
+		_DataColumn("DisplayValue", "DisplayValue", "System.String"),
+		_DataColumn("DataType", "DataType", "System.Int32"),
+		_DataColumn("Units", "Units", "System.String"),
+		_DataColumn("IsSet", "IsSet", "System.Boolean"),
+		_DataColumn("Value", "Value", "System.Double"),
+		_DataColumn("Changed", "Changed", "System.DateTime"),
+		]
+
+
+def test_datatable_xml_to_dataframe():
+	df = _datatable_xml_to_dataframe(datatable_xml, columns)
+
+	assert list(df.columns) == [column.caption for column in columns]
+	assert list(df["DisplayName"]) == ["Sample Name", "Position"]
+	assert df["DataType"].dtype == numpy.int64
+	assert list(df["DataType"]) == [8, 8]
+
+	# Empty elements are empty strings; missing elements are nulls.
+	assert list(df["Units"]) == ['', None]
+	assert list(df["IsSet"]) == [True, False]
+	assert df["Value"][0] == 1.5
+	assert numpy.isnan(df["Value"][1])
+	assert df["Changed"][0] == pandas.Timestamp(2020, 1, 24, 10, 15)
+	assert pandas.isna(df["Changed"][1])
+
+	assert dict(zip(df["DisplayName"], df["DisplayValue"])) == {"Sample Name": "synthetic", "Position": "P1-A1"}
+
+
+def test_datatable_xml_to_dataframe_empty():
+	df = _datatable_xml_to_dataframe("<NewDataSet />", columns)
+	assert list(df.columns) == [column.caption for column in columns]
+	assert df.empty
+
+	# Captions need not be unique
+	duplicated = [columns[0], _DataColumn("DisplayName", "DisplayValue", "System.String")]
+	df = _datatable_xml_to_dataframe(datatable_xml, duplicated)
+	assert list(df.columns) == ["DisplayName", "DisplayName"]
+	assert df.shape == (2, 2)
+
+
+def test_convert_column_mixed_offsets():
+	# Local times either side of a change to daylight saving time
+	values = ["2020-01-24T10:15:00-05:00", "2020-07-24T10:15:00-04:00", None]
+	series = _convert_column(values, "System.DateTime")
+
+	assert series[0] == pandas.Timestamp("2020-01-24T15:15:00Z")
+	assert series[1] == pandas.Timestamp("2020-07-24T14:15:00Z")
+	assert series[1].utcoffset() == datetime.timedelta(hours=-4)
+	assert pandas.isna(series[2])
+
+	# A single offset is kept as a datetime column
+	series = _convert_column(values[:1] + [None], "System.DateTime")
+	assert pandas.api.types.is_datetime64_any_dtype(series)
+	assert series[0] == pandas.Timestamp("2020-01-24T15:15:00Z")
+
+
+class SpectrumWrapper:
+	"""
+	Stands in for a wrapper around a .NET object, which cannot itself be pickled.
+	"""
+
+	def __init__(self, spectrum):
+		self._spectrum = spectrum
+
+	def freeze(self):
+		return self._spectrum
+
+	__reduce_ex__ = _reduce_frozen
+
+
+def test_reduce_frozen():
+	spectrum = make_scan(1)[1]
+	unpickled = pickle.loads(pickle.dumps(SpectrumWrapper(spectrum)))
+
+	assert type(unpickled) is type(spectrum)
+	assert unpickled == spectrum
+
+
+class CountingReader(FrozenDataReader):
+
+	def __init__(self, filename):
+		super().__init__(filename)
+		self.sample_data_calls = 0
+
+	def get_sample_data(self, category=SampleCategory.All):
+		self.sample_data_calls += 1
+		return super().get_sample_data(category)
+
+
+def test_sample_data_cache(frozen_datafile):
+	# Wrap a frozen reader in the high-level reader, in place of the MHDAC.
+	reader = DataReader.__new__(DataReader)
+	reader.filename = str(frozen_datafile)
+	reader._data_reader = CountingReader(frozen_datafile)
+	reader._sample_data = {}
+
+	assert reader.get_sample_data() == {"Sample Name": "synthetic", "Position": "P1-A1"}
+	assert reader.get_sample_data(SampleCategory.All.value) == {"Sample Name": "synthetic", "Position": "P1-A1"}
+	assert reader._data_reader.sample_data_calls == 1
+
+	# Callers get their own copy
+	reader.get_sample_data()["Sample Name"] = "modified"
+	assert reader.get_sample_data()["Sample Name"] == "synthetic"
+
+	assert reader.get_sample_data(SampleCategory.General) == {"Sample Name": "synthetic"}
+	assert reader._data_reader.sample_data_calls == 2
+
+	reader.close_datafile()
+	assert reader.get_sample_data() == {"Sample Name": "synthetic", "Position": "P1-A1"}
+	assert reader._data_reader.sample_data_calls == 3
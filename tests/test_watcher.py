@@ -0,0 +1,178 @@
+# stdlib
+import pathlib
+import shutil
+import threading
+import time
+from typing import List
+
+# 3rd party
+import pytest
+
+# this package
+from pyms_agilent.watcher import DatafileWatcher, inotify_available
+
+contents_xml = (pathlib.Path(__file__).parent / "example1.d" / "AcqData" / "Contents.xml").read_text()
+
+
+def write_contents(datafile: pathlib.Path, acq_status: int) -> pathlib.Path:
+	(datafile / "AcqData").mkdir(parents=True, exist_ok=True)
+	contents = contents_xml.replace("<AcqStatus>2</AcqStatus>", f"<AcqStatus>{acq_status}</AcqStatus>")
+	(datafile / "AcqData" / "Contents.xml").write_text(contents)
+	return datafile
+
+
+class Recorder:
+
+	def __init__(self):
+		self.processed: List[pathlib.Path] = []
+		self.event = threading.Event()
+
+	def __call__(self, datafile: pathlib.Path):
+		if datafile.name == "broken.d":
+			raise ValueError("Cannot process datafile")
+
+		self.processed.append(datafile)
+		self.event.set()
+
+
+def test_poll(tmp_pathplus):
+	write_contents(tmp_pathplus / "existing.d", 2)
+	write_contents(tmp_pathplus / "2020" / "running.d", 1)
+
+	recorder = Recorder()
+	watcher = DatafileWatcher(tmp_pathplus, recorder, use_inotify=False)
+	assert watcher.backend == "polling"
+
+	# Datafiles which were already complete are skipped
+	assert watcher.poll() == []
+	assert watcher.pending == [tmp_pathplus / "2020" / "running.d"]
+
+	write_contents(tmp_pathplus / "2020" / "new.d", 1)
+	assert watcher.poll() == []
+	assert watcher.pending == [tmp_pathplus / "2020" / "new.d", tmp_pathplus / "2020" / "running.d"]
+
+	write_contents(tmp_pathplus / "2020" / "running.d", 2)
+	write_contents(tmp_pathplus / "broken.d", 3)
+	assert watcher.poll() == [tmp_pathplus / "2020" / "running.d", tmp_pathplus / "broken.d"]
+
+	# Each datafile is only processed once
+	assert watcher.poll() == []
+
+	watcher.stop()
+	assert sorted(watcher.dispatched) == [tmp_pathplus / "2020" / "running.d", tmp_pathplus / "broken.d"]
+	assert recorder.processed == [tmp_pathplus / "2020" / "running.d"]
+	assert [path for path, exc in watcher.errors] == [tmp_pathplus / "broken.d"]
+	assert isinstance(watcher.errors[0][1], ValueError)
+	assert watcher.pending == [tmp_pathplus / "2020" / "new.d"]
+
+
+def test_deleted_while_pending(tmp_pathplus):
+	write_contents(tmp_pathplus / "running.d", 1)
+
+	recorder = Recorder()
+	watcher = DatafileWatcher(tmp_pathplus, recorder, use_inotify=False)
+	assert watcher.poll() == []
+	assert watcher.pending == [tmp_pathplus / "running.d"]
+
+	shutil.rmtree(tmp_pathplus / "running.d")
+	assert watcher.poll() == []
+	assert watcher.pending == []
+
+	# A datafile created again with the same name is processed.
+	write_contents(tmp_pathplus / "running.d", 2)
+	assert watcher.poll() == [tmp_pathplus / "running.d"]
+	watcher.stop()
+
+	assert recorder.processed == [tmp_pathplus / "running.d"]
+
+
+def test_process_existing(tmp_pathplus):
+	write_contents(tmp_pathplus / "existing.d", 2)
+
+	errors = []
+	recorder = Recorder()
+	watcher = DatafileWatcher(tmp_pathplus, recorder, use_inotify=False, process_existing=True)
+	watcher.on_error = lambda path, exc: errors.append(path)
+
+	write_contents(tmp_pathplus / "broken.d", 2)
+	assert sorted(watcher.poll()) == [tmp_pathplus / "broken.d", tmp_pathplus / "existing.d"]
+	watcher.stop()
+
+	assert recorder.processed == [tmp_pathplus / "existing.d"]
+	assert errors == [tmp_pathplus / "broken.d"]
+
+
+@pytest.mark.parametrize(
+		"use_inotify",
+		[
+				pytest.param(True, marks=pytest.mark.skipif(not inotify_available(), reason="inotify unavailable")),
+				False,
+				]
+		)
+def test_background(tmp_pathplus, use_inotify):
+	recorder = Recorder()
+
+	# With inotify, new datafiles are found without waiting for the next poll.
+	poll_interval = 60 if use_inotify else 0.02
+
+	with DatafileWatcher(tmp_pathplus, recorder, use_inotify=use_inotify, poll_interval=poll_interval) as watcher:
+		assert watcher.backend == ("inotify" if use_inotify else "polling")
+
+		# Created after the watcher started, in a new subdirectory.
+		(tmp_pathplus / "2021" / "January").mkdir(parents=True)
+		time.sleep(0.05)
+		datafile = tmp_pathplus / "2021" / "January" / "run.d"
+		datafile.mkdir()
+		time.sleep(0.05)
+		write_contents(datafile, 1)
+		time.sleep(0.1)
+
+		assert not recorder.event.is_set()
+		write_contents(datafile, 2)
+		assert recorder.event.wait(timeout=5)
+
+	assert recorder.processed == [datafile]
+
+
+def test_run_timeout(tmp_pathplus):
+	watcher = DatafileWatcher(tmp_pathplus, Recorder(), use_inotify=False, poll_interval=0.01)
+
+	start = time.monotonic()
+	watcher.run(timeout=0.05)
+	assert 0.05 <= time.monotonic() - start < 1
+
+	watcher.stop()
+
+
+def test_run_stopped_before_poll(tmp_pathplus):
+	watcher = DatafileWatcher(tmp_pathplus, Recorder(), use_inotify=False)
+	poll = watcher.poll
+
+	def stop_then_poll():
+		# As if stop() were called from another thread just before run() polls.
+		watcher._stop_event.set()
+		return poll()
+
+	watcher.poll = stop_then_poll  # type: ignore
+	watcher.run(timeout=5)
+	watcher.stop()
+
+
+def test_errors(tmp_pathplus):
+	with pytest.raises(ValueError, match="'max_workers' must be at least 1."):
+		DatafileWatcher(tmp_pathplus, print, max_workers=0)
+
+	with pytest.raises(ValueError, match="'poll_interval' must be greater than zero."):
+		DatafileWatcher(tmp_pathplus, print, poll_interval=0)
+
+	watcher = DatafileWatcher(tmp_pathplus, print, use_inotify=False).start()
+
+	with pytest.raises(RuntimeError, match="The watcher has already been started."):
+		watcher.start()
+
+	watcher.stop()
+
+	with pytest.raises(ValueError, match="The watcher has been stopped."):
+		watcher.poll()
+
+	assert repr(watcher) == f"<DatafileWatcher({str(tmp_pathplus)!r}, backend='polling')>"
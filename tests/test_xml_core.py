@@ -0,0 +1,146 @@
+# stdlib
+import pathlib
+import threading
+
+# 3rd party
+import lxml.objectify  # type: ignore
+import pytest
+from lxml import etree  # type: ignore
+
+# this package
+from pyms_agilent.xml_parser import core
+from pyms_agilent.xml_parser.core import (
+		ExtractionPlan,
+		get_parser,
+		get_schema,
+		get_validated_tree,
+		set_validation,
+		tag2dict
+		)
+from pyms_agilent.xml_parser.ms_time_segments import MSTimeSegments
+
+msts_xml = pathlib.Path(__file__).parent / "example1.d" / "AcqData" / "MSTS.xml"
+
+invalid_msts = """\
+<?xml version="1.0" encoding="utf-8"?>
+<TimeSegments>
+	<Version>3</Version>
+	<TimeSegment TimeSegmentID="1">
+		<StartTime>0.0</StartTime>
+		<EndTime>15.0</EndTime>
+		<NumOfScans>1333</NumOfScans>
+		<FixedCycleLength>0</FixedCycleLength>
+		<Colour>Blue</Colour>
+	</TimeSegment>
+	<IRMStatus>0</IRMStatus>
+</TimeSegments>
+"""
+
+
+@pytest.fixture()
+def validation():
+	previous = set_validation(True)
+	yield
+	set_validation(previous)
+
+
+def test_schema_cache():
+	schema = get_schema(MSTimeSegments._schema)
+	assert isinstance(schema, etree.XMLSchema)
+	assert get_schema(MSTimeSegments._schema) is schema
+	assert get_parser(MSTimeSegments._schema) is get_parser(MSTimeSegments._schema)
+	assert get_parser() is get_parser(None)
+	assert get_parser() is not get_parser(MSTimeSegments._schema)
+
+	other_thread = []
+	thread = threading.Thread(
+			target=lambda: other_thread.extend([get_schema(MSTimeSegments._schema), get_parser(MSTimeSegments._schema)])
+			)
+	thread.start()
+	thread.join()
+
+	# Schemas are compiled once per process, but each thread has its own parser.
+	assert other_thread[0] is schema
+	assert other_thread[1] is not get_parser(MSTimeSegments._schema)
+
+	with pytest.raises(FileNotFoundError, match="XML schema '.*missing.xsd' not found."):
+		get_schema("missing.xsd")
+
+
+def test_from_xml_file(validation):
+	msts = MSTimeSegments.from_xml_file(msts_xml)
+	assert msts[0].n_scans == 1333
+	assert MSTimeSegments.from_xml_file(msts_xml, validate=False) == msts
+
+	with pytest.raises(FileNotFoundError, match="XML file '.*MSTS.xml' not found."):
+		MSTimeSegments.from_xml_file(msts_xml.parent.parent / "MSTS.xml")
+
+
+def test_skip_validation(tmp_pathplus, validation):
+	(tmp_pathplus / "MSTS.xml").write_text(invalid_msts)
+
+	with pytest.raises(etree.XMLSyntaxError, match="Colour"):
+		get_validated_tree(tmp_pathplus / "MSTS.xml", MSTimeSegments._schema)
+
+	with pytest.raises(etree.XMLSyntaxError, match="Colour"):
+		MSTimeSegments.from_xml_file(tmp_pathplus / "MSTS.xml")
+
+	msts = MSTimeSegments.from_xml_file(tmp_pathplus / "MSTS.xml", validate=False)
+	assert msts[0].n_scans == 1333
+
+	assert set_validation(False) is True
+	assert not core._validate
+	assert MSTimeSegments.from_xml_file(tmp_pathplus / "MSTS.xml") == msts
+
+	with pytest.raises(etree.XMLSyntaxError, match="Colour"):
+		MSTimeSegments.from_xml_file(tmp_pathplus / "MSTS.xml", validate=True)
+
+
+section_xml = """\
+<Section xmlns="http://tempuri.org/DSRdlReport.xsd">
+	<ModuleDisplayName>Quat. Pump</ModuleDisplayName>
+	<Ordinal>1</Ordinal>
+	<ParameterValue>100.5</ParameterValue>
+	<ParameterName>Flow</ParameterName>
+</Section>
+"""
+
+
+def test_extraction_plan():
+	element = lxml.objectify.fromstring(section_xml)
+	plan = ExtractionPlan(
+			camel_lookup={"ParameterName": "name"},
+			xmlns="http://tempuri.org/DSRdlReport.xsd",
+			)
+
+	expected = {
+			"module_display_name": "Quat. Pump",
+			"ordinal": 1,
+			"parameter_value": 100.5,
+			"name": "Flow",
+			}
+
+	assert plan(element) == expected
+	assert plan(element) == expected
+	assert plan.key_for("{http://tempuri.org/DSRdlReport.xsd}ModuleDisplayName") == "module_display_name"
+	assert plan.key_for("ModuleDisplayName") == "module_display_name"
+
+	assert tag2dict(
+			element,
+			camel_lookup={"ParameterName": "name"},
+			xmlns="http://tempuri.org/DSRdlReport.xsd",
+			) == expected
+
+	# Without xmlns the namespace is part of the key
+	assert "ordinal" not in ExtractionPlan()(element)
+
+	assert repr(ExtractionPlan()) == "<ExtractionPlan(camel_lookup={}, xmlns=None)>"
+
+
+def test_tag2dict_reuses_plans():
+	element = lxml.objectify.fromstring(section_xml)
+	tag2dict(element, xmlns="http://tempuri.org/DSRdlReport.xsd")
+	n_plans = len(core._plans)
+
+	tag2dict(element, xmlns="http://tempuri.org/DSRdlReport.xsd")
+	assert len(core._plans) == n_plans